@@ -1,6 +1,41 @@
-from .assembly import *
-from .calibration import *
-from .sample_preparation import *
-from .transformation import *
-from .plating import *
-from .utils import *
\ No newline at end of file
+"""
+PUDU protocol classes.
+
+The protocol classes are loaded on first use (PEP 562), so ``import pudu`` and
+submodules that do not drive the robot (``pudu.generate_protocol``, the manual
+Markdown generators) do not import opentrons or xlsxwriter. ``from pudu import
+SBOLLoopAssembly`` and ``pudu.SBOLLoopAssembly`` work as before.
+"""
+
+import importlib
+
+_LAZY_MODULES = {
+    'assembly': ['ManualReactionRecord', 'BaseAssembly', 'Domestication', 'ManualLoopAssembly',
+                 'SBOLLoopAssembly', 'ManualAssembly', 'LoopAssembly', 'DEFAULT_DOMESTICATION_ASSEMBLY',
+                 'DEFAULT_MANUAL_ASSEMBLIES', 'DEFAULT_SBOL_ASSEMBLIES'],
+    'calibration': ['BaseCalibration', 'GFPODCalibration', 'RGBODCalibration'],
+    'sample_preparation': ['SamplePreparation', 'PlateSamples', 'PlateWithGradient'],
+    'transformation': ['Transformation', 'HeatShockTransformation', 'ManualTransformationRecord',
+                       'ManualTransformation'],
+    'plating': ['Plating', 'ManualPlatingRecord', 'ManualPlating'],
+    'consolidated': ['AssemblyTransformationPlating'],
+    'utils': ['colors', 'is_multichannel', 'split_full_columns', 'column_heads', 'single_nozzle', 'Camera',
+              'SmartPipette'],
+}
+
+_LAZY_ATTRIBUTES = {name: module for module, names in _LAZY_MODULES.items() for name in names}
+
+__all__ = list(_LAZY_ATTRIBUTES)
+
+
+def __getattr__(name):
+    module = _LAZY_ATTRIBUTES.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(f"{__name__}.{module}"), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
@@ -1,12 +1,15 @@
-import xlsxwriter
-from opentrons import protocol_api
-from typing import List, Dict, Optional
+from typing import List, Dict, Optional, TYPE_CHECKING
 from fnmatch import fnmatch
-from itertools import product
 import json
+import os
 from abc import ABC, abstractmethod
 from dataclasses import dataclass, field
 from pudu.utils import Camera, colors
+from pudu.scheduling import HoldScheduler, HoldTask, schedulable
+from pudu.tip_budget import TipBudget, apply_tip_state, export_tip_state
+
+if TYPE_CHECKING:
+    from opentrons import protocol_api
 
 
 @dataclass
@@ -34,6 +37,9 @@ class BaseAssembly(ABC):
     Contains shared hardware setup, liquid handling, and tip management functionality.
     """
 
+    # Whether the subclass can split its library into rounds with part tube swaps
+    supports_part_swaps = False
+
     def __init__(self,
                  json_params: Optional[Dict] = None,
                  volume_total_reaction: float = 20,
@@ -57,7 +63,15 @@ class BaseAssembly(ABC):
                  take_video: bool = False,
                  water_testing: bool = False,
                  output_xlsx: bool = True,
-                 protocol_name: str = ''):
+                 protocol_name: str = '',
+                 reagent_first: bool = False,
+                 master_mix: bool = False,
+                 master_mix_overage: float = 0.1,
+                 master_mix_dead_volume: float = 20,
+                 allow_part_swaps: bool = False,
+                 schedule_holds: bool = False,
+                 tip_state: Optional[Dict] = None,
+                 tip_state_output: Optional[str] = None):
         """
         Initialize shared assembly protocol parameters.
 
@@ -100,6 +114,33 @@ class BaseAssembly(ABC):
             output_xlsx: If ``True``, write an Excel file summarising the deck layout
                 during simulation.
             protocol_name: Base name used for output files (e.g. the Excel workbook).
+            reagent_first: If ``True``, dispense each common reagent (water, ligase
+                buffer, ligase and each restriction enzyme) to all reaction wells with a
+                single tip per source before adding the DNA parts well by well. When
+                ``False``, every reagent transfer into every well uses a fresh tip.
+            master_mix: If ``True``, combine ligase buffer, ligase and restriction enzyme
+                (plus water when every reaction of the group needs the same volume) into
+                one master mix tube per restriction enzyme on the temperature module, then
+                dispense it with a single ``distribute`` per enzyme. Takes precedence over
+                ``reagent_first``.
+            master_mix_overage: Fractional excess of master mix prepared per reaction
+                (``0.1`` = 10% extra).
+            master_mix_dead_volume: Volume in µL prepared on top of the overage to cover
+                what the pipette cannot recover from the bottom of the tube.
+            allow_part_swaps: If ``True`` and the library needs more parts than fit on the
+                temperature module, split the assemblies into rounds whose parts fit and
+                pause between rounds so the operator can swap part tubes. Supported by
+                ``SBOLLoopAssembly``; the other assembly classes raise ``ValueError``.
+            schedule_holds: If ``True``, ramp the temperature module while the
+                thermocycler block cools, and run the work queued with
+                ``schedule_during_holds`` during the single-repetition thermocycler
+                holds instead of after them (see ``pudu.scheduling``).
+            tip_state: Tip state written by the previous protocol run on the robot
+                (``tip_state.json``). When ``initial_tip`` is not set, the partially used
+                rack it records is continued instead of starting a fresh one.
+            tip_state_output: If given, the tip state after this protocol is written to
+                this path (relative to ``output_dir``) during simulation, for the next
+                protocol in the chain. By default, no tip state file is written.
         """
 
         kwargs_params = {
@@ -124,7 +165,13 @@ class BaseAssembly(ABC):
             'take_video': take_video,
             'water_testing': water_testing,
             'output_xlsx': output_xlsx,
-            'protocol_name': protocol_name
+            'protocol_name': protocol_name,
+            'reagent_first': reagent_first,
+            'master_mix': master_mix,
+            'master_mix_overage': master_mix_overage,
+            'master_mix_dead_volume': master_mix_dead_volume,
+            'allow_part_swaps': allow_part_swaps,
+            'schedule_holds': schedule_holds
         }
 
         params = self._merge_params(json_params, kwargs_params)
@@ -154,27 +201,37 @@ class BaseAssembly(ABC):
         self.water_testing = params['water_testing']
         self.output_xlsx = params['output_xlsx']
         self.protocol_name = params['protocol_name']
+        self.reagent_first = params['reagent_first']
+        self.master_mix = params['master_mix']
+        self.master_mix_overage = params['master_mix_overage']
+        self.master_mix_dead_volume = params['master_mix_dead_volume']
+        self.allow_part_swaps = params['allow_part_swaps']
+        if self.allow_part_swaps and not self.supports_part_swaps:
+            raise ValueError(f"{type(self).__name__} does not support allow_part_swaps; "
+                             f"only SBOLLoopAssembly can swap part tubes between rounds")
+        self.schedule_holds = params['schedule_holds']
 
         # Shared tracking dictionaries
         self.dict_of_parts_in_temp_mod_position = {}
         self.dict_of_parts_in_thermocycler = {}
         self.dna_list_for_transformation_protocol = []
         self.product_uri_to_wells = {}
+        self.master_mix_tubes = {}
         self.xlsx_output = None
 
         #Initialize Camera
         self.camera = Camera()
-        # Tip management
-        self.tip_management = {
-            'all_racks': [],
-            'on_deck_racks': [],
-            'off_deck_racks': [],
-            'available_slots': [],
-            'tips_used': 0,
-            'tips_per_batch': 0,
-            'current_batch': 1,
-            'total_batches': 1
-        }
+        # Tip racks, loaded and swapped in batches (see setup_tip_management)
+        self.tip_budget = None
+        self.tip_state = tip_state
+        self.tip_state_output = tip_state_output
+        # Simulation writes the xlsx, transformation input and tip state files unless switched off
+        self.export_outputs = True
+        # Directory the exported files are written to
+        self.output_dir = '.'
+        # Work for the thermocycler holds (see schedule_during_holds)
+        self.hold_tasks = []
+        self.hold_scheduler = None
 
     def _merge_params(self, json_params: Dict, kwargs_params: Dict) -> Dict:
         """
@@ -213,7 +270,13 @@ class BaseAssembly(ABC):
             'take_video': False,
             'water_testing': False,
             'output_xlsx': True,
-            'protocol_name': ''
+            'protocol_name': '',
+            'reagent_first': False,
+            'master_mix': False,
+            'master_mix_overage': 0.1,
+            'master_mix_dead_volume': 20,
+            'allow_part_swaps': False,
+            'schedule_holds': False
         }
 
         # Start with defaults
@@ -285,51 +348,6 @@ class BaseAssembly(ABC):
                 f"    3. Decrease reagent volumes"
             )
 
-    def _well_to_index(self, well_name: str) -> int:
-        """
-        Convert well name (e.g., 'A1', 'H12') to 0-based index in 96-well plate.
-
-        Args:
-            well_name: Well position like 'A1', 'B3', 'H12'
-
-        Returns:
-            Zero-based index (0-95) for the well
-
-        Raises:
-            ValueError: If well_name format is invalid
-        """
-        if not well_name or len(well_name) < 2:
-            raise ValueError(f"Invalid well name: '{well_name}'. Expected format like 'A1', 'B3', 'H12'")
-
-        row = well_name[0]
-        try:
-            col = int(well_name[1:])
-        except ValueError:
-            raise ValueError(f"Invalid well name: '{well_name}'. Column must be a number (e.g., 'A1', 'H12')")
-
-        if row not in 'ABCDEFGH':
-            raise ValueError(f"Invalid well name: '{well_name}'. Row must be A-H")
-
-        if col < 1 or col > 12:
-            raise ValueError(f"Invalid well name: '{well_name}'. Column must be 1-12")
-
-        row_index = ord(row) - ord('A')
-        col_index = col - 1
-        return row_index + (col_index * 8)
-
-    def _tips_available_from_position(self, well_name: str) -> int:
-        """
-        Calculate how many tips are available starting from a given position.
-
-        Args:
-            well_name: Starting well position like 'A1', 'H12'
-
-        Returns:
-            Number of tips available from that position to H12
-        """
-        start_index = self._well_to_index(well_name)
-        return 96 - start_index
-
     @abstractmethod
     def process_assemblies(self):
         """Process input assemblies - format-specific implementation"""
@@ -352,59 +370,43 @@ class BaseAssembly(ABC):
         """Calculate total tips needed - format-specific implementation"""
         pass
 
+    def schedule_during_holds(self, name: str, work, seconds: float):
+        """
+        Queue pipetting work to run during the thermocycler holds of ``run``.
+
+        With ``schedule_holds`` the work runs in the first hold long enough for it,
+        otherwise (or when no hold fits) after thermocycling. *work* is called with
+        the ``ProtocolContext`` and must not touch the thermocycler plate.
+
+        Args:
+            name: Description written as a protocol comment when the work starts.
+            work: Callable taking the ``ProtocolContext``.
+            seconds: Estimated duration of the work.
+        """
+        self.hold_tasks.append(HoldTask(name, work, seconds))
+
     def setup_tip_management(self, protocol):
-        """Setup batch tip management for high-throughput applications."""
-        total_tips_needed = self._calculate_total_tips_needed()
+        """
+        Setup batch tip management for high-throughput applications.
 
-        first_rack_tips = 96
-        if self.initial_tip:
+        Racks beyond ``tiprack_positions`` are loaded off deck and swapped in batch by
+        batch (see ``pudu.tip_budget.TipBudget``).
+
+        Returns:
+            All tip racks in pickup order.
+        """
+        total_tips_needed = self._calculate_total_tips_needed()
+        self.tip_budget = TipBudget(self.tiprack_labware, self.tiprack_positions, total_tips_needed,
+                                    initial_tip=self.initial_tip)
+        apply_tip_state(protocol, [self.tip_budget], self.tip_state)
+        initial_tip = self.tip_budget.initial_tip
+        if initial_tip:
             try:
-                first_rack_tips = self._tips_available_from_position(self.initial_tip)
-                protocol.comment(f"Starting from tip {self.initial_tip} ({first_rack_tips} tips available on first rack)")
+                first_rack_tips = self.tip_budget.first_rack_pickups
             except ValueError as e:
                 raise ValueError(f"Error with initial_tip parameter: {e}")
-
-        # Calculate racks needed, accounting for the partially used first rack
-        if total_tips_needed <= first_rack_tips:
-            tip_racks_needed = 1
-        else:
-            remaining_tips = total_tips_needed - first_rack_tips
-            additional_racks = (remaining_tips + 95) // 96
-            tip_racks_needed = 1 + additional_racks
-
-        available_deck_slots = self.tiprack_positions
-        max_racks_on_deck = len(available_deck_slots)
-
-        protocol.comment(f"Protocol requires {total_tips_needed} tips ({tip_racks_needed} racks)")
-
-        all_tip_racks = []
-        on_deck_racks = []
-        for i in range(min(tip_racks_needed, max_racks_on_deck)):
-            rack = protocol.load_labware(self.tiprack_labware, available_deck_slots[i])
-            all_tip_racks.append(rack)
-            on_deck_racks.append(rack)
-
-        off_deck_racks = []
-        for i in range(max_racks_on_deck, tip_racks_needed):
-            rack = protocol.load_labware(self.tiprack_labware, protocol_api.OFF_DECK)
-            all_tip_racks.append(rack)
-            off_deck_racks.append(rack)
-
-        self.tip_management.update({
-            'all_racks': all_tip_racks,
-            'on_deck_racks': on_deck_racks,
-            'off_deck_racks': off_deck_racks,
-            'available_slots': available_deck_slots,
-            'tips_used': 0,
-            'tips_per_batch': max_racks_on_deck * 96,
-            'current_batch': 1,
-            'total_batches': (tip_racks_needed + max_racks_on_deck - 1) // max_racks_on_deck
-        })
-
-        if len(off_deck_racks) > 0:
-            protocol.comment(f"Will perform {self.tip_management['total_batches'] - 1} tip rack batch swaps")
-
-        return all_tip_racks
+            protocol.comment(f"Starting from tip {initial_tip} ({first_rack_tips} tips available on first rack)")
+        return self.tip_budget.load(protocol)
 
     def liquid_transfer(self, protocol, pipette, volume, source, dest,
                         asp_rate: float = 0.5, disp_rate: float = 1.0,
@@ -436,14 +438,7 @@ class BaseAssembly(ABC):
             drop_tip: If ``True``, drop the tip after the transfer.
         """
         if new_tip:
-            if self._check_if_swap_needed():
-                self._perform_tip_rack_batch_swap(protocol)
-            try:
-                pipette.pick_up_tip()
-                self._increment_tip_counter()
-            except Exception as e:
-                protocol.comment(f"Tip pickup failed with error: {e}")
-                raise
+            self._pick_up_tip(protocol, pipette)
 
         if mix_before > 0:
             pipette.mix(mix_reps, mix_before, source)
@@ -463,8 +458,376 @@ class BaseAssembly(ABC):
         if drop_tip:
             pipette.drop_tip()
 
+    def _dispense_reactions(self, protocol, pipette, reactions, dd_h2o,
+                            t4_dna_ligase_buffer, t4_dna_ligase):
+        """
+        Dispense common reagents and DNA parts into every planned reaction well.
+
+        By default each reaction receives water, ligase buffer, ligase and restriction
+        enzyme with a fresh tip per transfer, followed by its parts. With
+        ``reagent_first`` the common reagents are dispensed to all reactions up front
+        (see ``_dispense_common_reagents``) and only the parts are added per well. With
+        ``master_mix`` the common reagents are combined per restriction enzyme and
+        distributed from the master mix tubes (see ``_dispense_master_mixes``).
+
+        Args:
+            protocol: Opentrons ``ProtocolContext``.
+            pipette: Loaded pipette instrument object.
+            reactions: List of reaction dicts with keys ``well`` (destination well),
+                ``water`` (water volume in µL), ``enzyme`` (restriction enzyme source
+                well) and ``parts`` (DNA part source wells in dispensing order).
+            dd_h2o: Water source well.
+            t4_dna_ligase_buffer: T4 DNA ligase buffer source well.
+            t4_dna_ligase: T4 DNA ligase source well.
+        """
+        if self.master_mix:
+            self._dispense_master_mixes(protocol, pipette, reactions, dd_h2o,
+                                        t4_dna_ligase_buffer, t4_dna_ligase)
+        elif self.reagent_first:
+            self._dispense_common_reagents(protocol, pipette, reactions, dd_h2o,
+                                           t4_dna_ligase_buffer, t4_dna_ligase)
+
+        current_round = 0
+        for reaction in reactions:
+            if reaction.get('round', 0) != current_round:
+                current_round = reaction['round']
+                self._swap_part_round(protocol, current_round)
+            if not (self.master_mix or self.reagent_first):
+                self._add_common_reagents(protocol, pipette, reaction, dd_h2o,
+                                          t4_dna_ligase_buffer, t4_dna_ligase)
+            self._add_parts(protocol, pipette, reaction)
+
+    @staticmethod
+    def _allocate_part_rounds(part_sets: List[set], capacity: int) -> List[List[int]]:
+        """
+        Group assemblies into rounds whose combined parts fit *capacity* block positions.
+
+        Assemblies are placed largest part set first into the round that needs the
+        fewest new tubes for them (best-fit decreasing), opening a new round only when
+        no round has room. Rounds are then ordered so that consecutive rounds share as
+        many parts as possible, which keeps the number of tube swaps low.
+
+        Args:
+            part_sets: Parts (including backbone) of every assembly, in input order.
+            capacity: Number of block positions available for parts.
+
+        Returns:
+            List of rounds, each a list of assembly indices in input order.
+
+        Raises:
+            ValueError: If a single assembly needs more parts than *capacity*.
+        """
+        rounds = []  # [assembly indices, parts]
+        for index in sorted(range(len(part_sets)), key=lambda i: -len(part_sets[i])):
+            parts = part_sets[index]
+            if len(parts) > capacity:
+                raise ValueError(
+                    f'Assembly {index + 1} needs {len(parts)} parts but only {capacity} '
+                    f'temperature module positions are available for parts.'
+                )
+            best_round, best_new = None, None
+            for round_ in rounds:
+                new_parts = len(parts - round_[1])
+                if len(round_[1]) + new_parts <= capacity and (best_new is None or new_parts < best_new):
+                    best_round, best_new = round_, new_parts
+            if best_round is None:
+                rounds.append([[index], set(parts)])
+            else:
+                best_round[0].append(index)
+                best_round[1].update(parts)
+
+        ordered = [rounds.pop(0)]
+        while rounds:
+            next_round = max(rounds, key=lambda round_: len(round_[1] & ordered[-1][1]))
+            rounds.remove(next_round)
+            ordered.append(next_round)
+        return [sorted(indices) for indices, _ in ordered]
+
+    @staticmethod
+    def _plan_block_contents(round_parts: List[List[str]], first_slot: int,
+                             number_of_slots: int) -> List[Dict[int, str]]:
+        """
+        Plan which part tube sits in every block position during each round.
+
+        Tubes needed again stay where they are. New tubes go to empty positions
+        first and only then replace tubes the round does not need, so every swap
+        touches as few tubes as possible.
+
+        Args:
+            round_parts: Parts needed by each round.
+            first_slot: First block position reserved for parts.
+            number_of_slots: Number of block positions reserved for parts.
+
+        Returns:
+            One ``{block position: part name}`` dict per round.
+        """
+        contents = []
+        block = {}
+        for parts in round_parts:
+            block = dict(block)
+            needed = set(parts)
+            placed = set(block.values()) & needed
+            empty = [slot for slot in range(first_slot, first_slot + number_of_slots) if slot not in block]
+            stale = sorted(slot for slot, part in block.items() if part not in needed)
+            free = iter(empty + stale)
+            for part in sorted(needed - placed):
+                block[next(free)] = part
+            contents.append(block)
+        return contents
+
+    def _swap_part_round(self, protocol, round_index: int):
+        """Pause for the operator to swap part tubes before *round_index*"""
+        swap = self.part_swaps[round_index]
+        block = swap['block']
+        instructions = [f"remove {name} from {block.wells()[slot].well_name}" for name, slot in swap['remove']]
+        instructions += [f"place {name} in {block.wells()[slot].well_name}" for name, slot in swap['add']]
+        protocol.pause(f"Part swap for round {round_index + 1} of {len(self.part_swaps)}: "
+                       f"{'; '.join(instructions)}. Resume when done.")
+
+        for name, _ in swap['remove']:
+            self.dict_of_parts_in_temp_mod_position.pop(name, None)
+        for name, slot in swap['add']:
+            self._load_reagent(protocol, module_labware=block, well_position=slot, name=name)
+
+    def _add_common_reagents(self, protocol, pipette, reaction, dd_h2o,
+                             t4_dna_ligase_buffer, t4_dna_ligase):
+        """Add water, ligase buffer, ligase and restriction enzyme to one reaction, one tip each."""
+        dest_well = reaction['well']
+
+        self.liquid_transfer(protocol=protocol, pipette=pipette, volume=reaction['water'],
+                             source=dd_h2o, dest=dest_well,
+                             asp_rate=self.aspiration_rate, disp_rate=self.dispense_rate, touch_tip=True)
+
+        self.liquid_transfer(protocol=protocol, pipette=pipette, volume=self.volume_t4_dna_ligase_buffer,
+                             source=t4_dna_ligase_buffer, dest=dest_well,
+                             asp_rate=self.aspiration_rate, disp_rate=self.dispense_rate,
+                             mix_before=self.volume_t4_dna_ligase_buffer, touch_tip=True)
+
+        self.liquid_transfer(protocol=protocol, pipette=pipette, volume=self.volume_t4_dna_ligase,
+                             source=t4_dna_ligase, dest=dest_well,
+                             asp_rate=self.aspiration_rate, disp_rate=self.dispense_rate,
+                             mix_before=self.volume_t4_dna_ligase, touch_tip=True)
+
+        self.liquid_transfer(protocol=protocol, pipette=pipette, volume=self.volume_restriction_enzyme,
+                             source=reaction['enzyme'], dest=dest_well,
+                             asp_rate=self.aspiration_rate, disp_rate=self.dispense_rate,
+                             mix_before=self.volume_restriction_enzyme, touch_tip=True)
+
+    def _dispense_common_reagents(self, protocol, pipette, reactions, dd_h2o,
+                                  t4_dna_ligase_buffer, t4_dna_ligase):
+        """
+        Dispense each common reagent to all reactions with a single tip per source.
+
+        Reagents are added in the same order as the per-well mode (water, ligase buffer,
+        ligase, then each restriction enzyme to the reactions that use it). The source is
+        mixed once before the first aspiration and the tip is dropped after the last
+        destination.
+        """
+        protocol.comment("Dispensing common reagents to all reactions (reagent-first mode)")
+
+        self._dispense_from_source(protocol, pipette, dd_h2o,
+                                   [(reaction['well'], reaction['water']) for reaction in reactions])
+        self._dispense_from_source(protocol, pipette, t4_dna_ligase_buffer,
+                                   [(reaction['well'], self.volume_t4_dna_ligase_buffer) for reaction in reactions],
+                                   mix_volume=self.volume_t4_dna_ligase_buffer)
+        self._dispense_from_source(protocol, pipette, t4_dna_ligase,
+                                   [(reaction['well'], self.volume_t4_dna_ligase) for reaction in reactions],
+                                   mix_volume=self.volume_t4_dna_ligase)
+
+        for group in self._group_reactions_by_enzyme(reactions).values():
+            self._dispense_from_source(protocol, pipette, group[0]['enzyme'],
+                                       [(reaction['well'], self.volume_restriction_enzyme) for reaction in group],
+                                       mix_volume=self.volume_restriction_enzyme)
+
+    def _group_reactions_by_enzyme(self, reactions) -> Dict[str, List[Dict]]:
+        """Group reactions by restriction enzyme source well, in the order enzymes first appear."""
+        groups = {}
+        for reaction in reactions:
+            groups.setdefault(reaction['enzyme'].well_name, []).append(reaction)
+        return groups
+
+    def _master_mix_recipe(self, number_of_reactions: int, water_volume: float = 0.0) -> Dict[str, float]:
+        """
+        Component volumes for a master mix serving *number_of_reactions* reactions.
+
+        Per-reaction volumes are scaled by ``1 + master_mix_overage``, plus enough extra
+        to leave ``master_mix_dead_volume`` in the tube.
+
+        Args:
+            number_of_reactions: Reactions dispensed from the master mix.
+            water_volume: Water per reaction included in the mix (0 to leave water out).
+
+        Returns:
+            Dict with ``water``, ``buffer``, ``ligase`` and ``enzyme`` volumes in µL.
+        """
+        per_reaction = {
+            'water': water_volume,
+            'buffer': self.volume_t4_dna_ligase_buffer,
+            'ligase': self.volume_t4_dna_ligase,
+            'enzyme': self.volume_restriction_enzyme
+        }
+        volume_per_reaction = sum(per_reaction.values())
+        scale = number_of_reactions * (1 + self.master_mix_overage) + self.master_mix_dead_volume / volume_per_reaction
+        return {component: round(volume * scale, 2) for component, volume in per_reaction.items()}
+
+    def _load_master_mix_tubes(self, protocol, alum_block, temp_module_well_counter) -> int:
+        """Reserve an empty tube for the master mix of each restriction enzyme, after the parts."""
+        enzyme_names = [name for name in self.dict_of_parts_in_temp_mod_position
+                        if name.startswith('Restriction Enzyme ')]
+        for enzyme_name in enzyme_names:
+            tube = alum_block.wells()[temp_module_well_counter]
+            mix_name = enzyme_name.replace('Restriction Enzyme', 'Master Mix', 1)
+
+            self.master_mix_tubes[self.dict_of_parts_in_temp_mod_position[enzyme_name]] = tube
+            self.dict_of_parts_in_temp_mod_position[mix_name] = tube.well_name
+            protocol.comment(f"Reserved {mix_name} tube at position {tube.well_name}")
+            temp_module_well_counter += 1
+
+        return temp_module_well_counter
+
+    def _dispense_master_mixes(self, protocol, pipette, reactions, dd_h2o,
+                               t4_dna_ligase_buffer, t4_dna_ligase):
+        """
+        Prepare one master mix per restriction enzyme and distribute it to its reactions.
+
+        Water is part of the mix only when every reaction of the enzyme group needs the
+        same volume; otherwise it is dispensed separately with a single tip. All mixes are
+        planned and checked against the tube capacity before any liquid is moved.
+
+        Raises:
+            ValueError: If a master mix does not fit in its tube.
+        """
+        plans = []
+        loose_water = []
+        for enzyme_well_name, group in self._group_reactions_by_enzyme(reactions).items():
+            water_volumes = {reaction['water'] for reaction in group}
+            water_volume = water_volumes.pop() if len(water_volumes) == 1 else 0.0
+            if not water_volume:
+                loose_water.extend((reaction['well'], reaction['water']) for reaction in group)
+
+            tube = self.master_mix_tubes[enzyme_well_name]
+            recipe = self._master_mix_recipe(len(group), water_volume)
+            total_volume = sum(recipe.values())
+            if total_volume > tube.max_volume:
+                raise ValueError(
+                    f"Master mix error: {total_volume:.1f}µL of master mix for {len(group)} reactions does not fit "
+                    f"in the {tube.max_volume}µL tube at {tube.well_name}.\n"
+                    f"  Solutions:\n"
+                    f"    1. Reduce 'master_mix_overage' or 'master_mix_dead_volume'\n"
+                    f"    2. Use a temperature module labware with larger tubes\n"
+                    f"    3. Set 'master_mix' to False"
+                )
+            plans.append((group, tube, recipe, water_volume))
+
+        protocol.comment("Preparing master mixes on the temperature module")
+
+        if loose_water:
+            self._dispense_from_source(protocol, pipette, dd_h2o, loose_water)
+
+        for group, tube, recipe, water_volume in plans:
+            components = [(dd_h2o, recipe['water'], 0.0),
+                          (t4_dna_ligase_buffer, recipe['buffer'], self.volume_t4_dna_ligase_buffer),
+                          (t4_dna_ligase, recipe['ligase'], self.volume_t4_dna_ligase),
+                          (group[0]['enzyme'], recipe['enzyme'], self.volume_restriction_enzyme)]
+            components = [component for component in components if component[1] > 0]
+
+            for i, (source, volume, mix_volume) in enumerate(components):
+                self._pick_up_tip(protocol, pipette)
+                if mix_volume > 0:
+                    pipette.transfer(volume, source, tube, new_tip='never', mix_before=(3, mix_volume))
+                else:
+                    pipette.transfer(volume, source, tube, new_tip='never')
+                # The last component's tip mixes and distributes the master mix
+                if i != len(components) - 1:
+                    pipette.drop_tip()
+
+            pipette.mix(10, min(sum(recipe.values()), pipette.max_volume), tube)
+            volume_per_reaction = (water_volume + self.volume_t4_dna_ligase_buffer +
+                                   self.volume_t4_dna_ligase + self.volume_restriction_enzyme)
+            pipette.distribute(volume_per_reaction, tube, [reaction['well'] for reaction in group],
+                               new_tip='never')
+            pipette.drop_tip()
+
+    def _dispense_from_source(self, protocol, pipette, source, targets, mix_volume: float = 0.0):
+        """
+        Transfer from one source into several destination wells reusing a single tip.
+
+        Args:
+            protocol: Opentrons ``ProtocolContext``.
+            pipette: Loaded pipette instrument object.
+            source: Source well.
+            targets: List of ``(dest_well, volume)`` tuples, dispensed in order.
+            mix_volume: If > 0, mix the source with this volume before the first aspiration.
+        """
+        for i, (dest_well, volume) in enumerate(targets):
+            self.liquid_transfer(protocol=protocol, pipette=pipette, volume=volume,
+                                 source=source, dest=dest_well,
+                                 asp_rate=self.aspiration_rate, disp_rate=self.dispense_rate,
+                                 mix_before=mix_volume if i == 0 else 0.0, touch_tip=True,
+                                 new_tip=(i == 0), drop_tip=(i == len(targets) - 1))
+
+    def _add_parts(self, protocol, pipette, reaction):
+        """Add the DNA parts of one reaction, then mix the reaction to remove air bubbles."""
+        dest_well = reaction['well']
+        parts = reaction['parts']
+
+        for i, part_source in enumerate(parts):
+            # Don't drop tip on last part, it is reused for mixing
+            self.liquid_transfer(protocol=protocol, pipette=pipette, volume=self.volume_part,
+                                 source=part_source, dest=dest_well,
+                                 asp_rate=self.aspiration_rate, disp_rate=self.dispense_rate,
+                                 mix_before=self.volume_part, touch_tip=True,
+                                 drop_tip=(i != len(parts) - 1))
+
+        # Remove air bubbles
+        mix_volume = min(self.volume_total_reaction, pipette.max_volume)
+        for _ in range(int(self.volume_total_reaction / 10)):
+            self.liquid_transfer(protocol=protocol, pipette=pipette, volume=mix_volume,
+                                 source=dest_well.bottom(), dest=dest_well.bottom(8),
+                                 asp_rate=1.0, disp_rate=1.0, new_tip=False, drop_tip=False, touch_tip=True)
+        pipette.drop_tip()
+
+    def _calculate_reagent_tips(self, reaction_groups: Dict[str, List[int]],
+                                number_of_constant_reagents: int = 4) -> int:
+        """
+        Calculate tips used for the common reagents (water, ligase buffer, ligase, enzyme).
+
+        Args:
+            reaction_groups: Number of DNA parts of every reaction (replicates included),
+                keyed by restriction enzyme.
+            number_of_constant_reagents: Common reagent transfers per reaction in the
+                per-well mode.
+        """
+        reaction_groups = {enzyme: parts for enzyme, parts in reaction_groups.items() if parts}
+        total_reactions = sum(len(parts) for parts in reaction_groups.values())
+        if total_reactions == 0:
+            return 0
+        if self.master_mix:
+            # Buffer, ligase and enzyme per mix (the enzyme tip also mixes and distributes),
+            # water per mix when uniform, otherwise one shared tip for all loose water
+            tips = 0
+            loose_water = False
+            for parts in reaction_groups.values():
+                uniform_water = len(set(parts)) == 1
+                tips += number_of_constant_reagents - 1 + int(uniform_water)
+                loose_water = loose_water or not uniform_water
+            return tips + int(loose_water)
+        if self.reagent_first:
+            # One tip per source: water, buffer and ligase plus one per enzyme
+            return number_of_constant_reagents - 1 + len(reaction_groups)
+        return number_of_constant_reagents * total_reactions
+
+    def _master_mix_positions(self, number_of_enzymes: int) -> int:
+        """Temperature module positions taken by master mix tubes."""
+        return number_of_enzymes if self.master_mix else 0
+
     def get_xlsx_output(self, name: str):
-        workbook = xlsxwriter.Workbook(f"{name}.xlsx")
+        try:
+            import xlsxwriter
+        except ImportError:
+            raise ImportError("xlsxwriter is required. Install with: pip install xlsxwriter")
+
+        workbook = xlsxwriter.Workbook(os.path.join(self.output_dir, f"{name}.xlsx"))
         worksheet = workbook.add_worksheet()
         row_num = 0
         col_num = 0
@@ -487,7 +850,7 @@ class BaseAssembly(ABC):
         self.xlsx_output = workbook
         return self.xlsx_output
 
-    def run(self, protocol: protocol_api.ProtocolContext):
+    def run(self, protocol: 'protocol_api.ProtocolContext'):
         """Main protocol execution - uses template method pattern"""
         # Process assemblies (format-specific)
         self.process_assemblies()
@@ -499,12 +862,15 @@ class BaseAssembly(ABC):
 
         thermocycler_module = protocol.load_module('thermocycler module')
         thermo_plate = thermocycler_module.load_labware(name=self.thermocycler_labware)
+        self.hold_scheduler = HoldScheduler(protocol, thermocycler_module, enabled=self.schedule_holds,
+                                            tasks=self.hold_tasks)
 
         all_tip_racks = self.setup_tip_management(protocol)
         pipette = protocol.load_instrument(self.pipette, self.pipette_position, tip_racks=all_tip_racks)
-        if self.initial_tip:
-            pipette.starting_tip = self.tip_management['on_deck_racks'][0][self.initial_tip]
-            protocol.comment(f"Pipette will start from tip {self.initial_tip}")
+        self.tip_budget.pipette = pipette
+        if self.tip_budget.initial_tip:
+            pipette.starting_tip = self.tip_budget.on_deck_racks[0][self.tip_budget.initial_tip]
+            protocol.comment(f"Pipette will start from tip {self.tip_budget.initial_tip}")
 
         # Load common reagents (shared)
         dd_h2o = self._load_reagent(protocol, module_labware=alum_block, well_position=0,
@@ -516,12 +882,20 @@ class BaseAssembly(ABC):
 
         # Load parts and enzymes (format-specific)
         temp_module_well_counter = self._load_parts_and_enzymes(protocol, alum_block)
+        if self.master_mix:
+            temp_module_well_counter = self._load_master_mix_tubes(protocol, alum_block, temp_module_well_counter)
 
         # Setup temperatures
         thermocycler_module.open_lid()
         if not self.water_testing:
-            temperature_module.set_temperature(4)
-            thermocycler_module.set_block_temperature(4)
+            if self.schedule_holds:
+                # Ramp the temperature module while the thermocycler block cools
+                temperature_module.start_set_temperature(4)
+                thermocycler_module.set_block_temperature(4)
+                temperature_module.await_temperature(4)
+            else:
+                temperature_module.set_temperature(4)
+                thermocycler_module.set_block_temperature(4)
 
         # Media capture start
         if self.take_picture:
@@ -558,14 +932,15 @@ class BaseAssembly(ABC):
                 {'temperature': 16, 'hold_time_minutes': 5}
             ]
             denaturation = [
-                {'temperature': 60, 'hold_time_minutes': 10},
-                {'temperature': 80, 'hold_time_minutes': 10}
+                schedulable({'temperature': 60, 'hold_time_minutes': 10}),
+                schedulable({'temperature': 80, 'hold_time_minutes': 10})
             ]
-            thermocycler_module.execute_profile(steps=profile, repetitions=75, block_max_volume=30)
-            thermocycler_module.execute_profile(steps=denaturation, repetitions=1, block_max_volume=30)
+            self.hold_scheduler.execute_profile(steps=profile, repetitions=75, block_max_volume=30)
+            self.hold_scheduler.execute_profile(steps=denaturation, repetitions=1, block_max_volume=30)
             thermocycler_module.set_block_temperature(4)
+        self.hold_scheduler.run_pending()
 
-        if protocol.is_simulating():
+        if protocol.is_simulating() and self.export_outputs:
             if self.output_xlsx:
                 try:
                     if not self.protocol_name:
@@ -578,6 +953,13 @@ class BaseAssembly(ABC):
                 self._export_transformation_input(protocol)
             except Exception as e:
                 protocol.comment(f"Could not export transformation input: {e}")
+            # Export the partially used tip racks for the next protocol (simulation only)
+            if self.tip_state_output:
+                try:
+                    export_tip_state(protocol, [self.tip_budget], self.tip_state, type(self).__name__,
+                                     os.path.join(self.output_dir, self.tip_state_output))
+                except Exception as e:
+                    protocol.comment(f"Could not export tip state: {e}")
 
         # Output results
         print('Parts and reagents in temp_module')
@@ -594,7 +976,7 @@ class BaseAssembly(ABC):
         Format: { "product_uri": ["well1", "well2", ...], ... }
         """
         output_path = 'transformation_input.json'
-        with open(output_path, 'w') as f:
+        with open(os.path.join(self.output_dir, output_path), 'w') as f:
             json.dump(self.product_uri_to_wells, f, indent=2)
 
         protocol.comment("\n" + "="*70)
@@ -622,36 +1004,9 @@ class BaseAssembly(ABC):
 
         return well
 
-    def _increment_tip_counter(self):
-        """Increment tip usage counter"""
-        self.tip_management['tips_used'] += 1
-
-    def _check_if_swap_needed(self):
-        current_batch_tips = self.tip_management['tips_used'] % self.tip_management['tips_per_batch']
-        return (current_batch_tips == 0 and
-                self.tip_management['tips_used'] > 0 and
-                len(self.tip_management['off_deck_racks']) > 0)
-
-    def _perform_tip_rack_batch_swap(self, protocol):
-        """Perform tip rack batch swap when current batch is exhausted"""
-        available_slots = self.tip_management['available_slots']
-
-        for rack in self.tip_management['on_deck_racks']:
-            protocol.move_labware(labware=rack, new_location=protocol_api.OFF_DECK)
-
-        remaining_racks = len(self.tip_management['off_deck_racks'])
-        racks_to_move = min(len(available_slots), remaining_racks)
-
-        new_on_deck_racks = []
-        for i in range(racks_to_move):
-            rack = self.tip_management['off_deck_racks'].pop(0)
-            protocol.move_labware(labware=rack, new_location=available_slots[i])
-            new_on_deck_racks.append(rack)
-
-        self.tip_management['on_deck_racks'] = new_on_deck_racks
-        self.tip_management['current_batch'] += 1
-
-        protocol.comment(f"Tip rack batch {self.tip_management['current_batch']} ready!")
+    def _pick_up_tip(self, protocol, pipette):
+        """Pick up a tip, swapping in the next tip rack batch first if needed."""
+        self.tip_budget.pick_up_tip(protocol, pipette)
 
 class Domestication(BaseAssembly):
     """
@@ -770,59 +1125,22 @@ class Domestication(BaseAssembly):
             self.dict_of_parts_in_temp_mod_position[f"Restriction Enzyme {self.restriction_enzyme}"]]
         backbone_source = alum_block[self.dict_of_parts_in_temp_mod_position[f"Backbone {self.backbone}"]]
 
-        # Process each part
+        # Plan one reaction per part and replicate
+        reactions = []
+        thermo_wells = thermo_plate.wells()
         for part in self.parts_list:
             part_source = alum_block[self.dict_of_parts_in_temp_mod_position[f"Part {part}"]]
 
             # Process replicates for this part
             for r in range(self.replicates):
-                dest_well = thermo_plate.wells()[thermocycler_well_counter]
+                dest_well = thermo_wells[thermocycler_well_counter]
                 dest_well_name = dest_well.well_name
 
                 # Calculate water volume (total - reagents - 2 parts: backbone + part)
                 volume_dd_h20 = self.volume_total_reaction - (volume_reagents + self.volume_part * 2)
 
-                # Add reagents
-                self.liquid_transfer(protocol=protocol, pipette=pipette, volume=volume_dd_h20,
-                                     source=dd_h2o, dest=dest_well,
-                                     asp_rate=self.aspiration_rate, disp_rate=self.dispense_rate,
-                                     touch_tip=True)
-
-                self.liquid_transfer(protocol=protocol, pipette=pipette, volume=self.volume_t4_dna_ligase_buffer,
-                                     source=t4_dna_ligase_buffer, dest=dest_well,
-                                     asp_rate=self.aspiration_rate, disp_rate=self.dispense_rate,
-                                     mix_before=self.volume_t4_dna_ligase_buffer, touch_tip=True)
-
-                self.liquid_transfer(protocol=protocol, pipette=pipette, volume=self.volume_t4_dna_ligase,
-                                     source=t4_dna_ligase, dest=dest_well,
-                                     asp_rate=self.aspiration_rate, disp_rate=self.dispense_rate,
-                                     mix_before=self.volume_t4_dna_ligase, touch_tip=True)
-
-                self.liquid_transfer(protocol=protocol, pipette=pipette, volume=self.volume_restriction_enzyme,
-                                     source=restriction_enzyme, dest=dest_well,
-                                     asp_rate=self.aspiration_rate, disp_rate=self.dispense_rate,
-                                     mix_before=self.volume_restriction_enzyme, touch_tip=True)
-
-                # Add backbone
-                self.liquid_transfer(protocol=protocol, pipette=pipette, volume=self.volume_part,
-                                     source=backbone_source, dest=dest_well,
-                                     asp_rate=self.aspiration_rate, disp_rate=self.dispense_rate,
-                                     mix_before=self.volume_part, touch_tip=True)
-
-                # Add part (don't drop tip yet)
-                self.liquid_transfer(protocol=protocol, pipette=pipette, volume=self.volume_part,
-                                     source=part_source, dest=dest_well,
-                                     asp_rate=self.aspiration_rate, disp_rate=self.dispense_rate,
-                                     mix_before=self.volume_part, touch_tip=True, drop_tip=False)
-
-                # Remove air bubbles with mixing
-                mix_volume = min(self.volume_total_reaction, pipette.max_volume)
-                for _ in range(int(self.volume_total_reaction / 10)):
-                    self.liquid_transfer(protocol=protocol, pipette=pipette, volume=mix_volume,
-                                         source=dest_well.bottom(), dest=dest_well.bottom(8),
-                                         asp_rate=1.0, disp_rate=1.0, new_tip=False, drop_tip=False,
-                                         touch_tip=True)
-                pipette.drop_tip()
+                reactions.append({'well': dest_well, 'water': volume_dd_h20,
+                                  'enzyme': restriction_enzyme, 'parts': [backbone_source, part_source]})
 
                 # Track assembly
                 assembly_name = f"Part: {part}, Replicate: {r + 1}"
@@ -837,6 +1155,8 @@ class Domestication(BaseAssembly):
 
                 thermocycler_well_counter += 1
 
+        self._dispense_reactions(protocol, pipette, reactions, dd_h2o, t4_dna_ligase_buffer, t4_dna_ligase)
+
         return thermocycler_well_counter
 
     def _calculate_total_tips_needed(self, number_of_constant_reagents: int = 6) -> int:
@@ -846,7 +1166,11 @@ class Domestication(BaseAssembly):
             number_of_constant_reagents: water + ligase buffer + ligase + enzyme + backbone + part = 6
         """
         total_assemblies = len(self.parts_list) * self.replicates
-        return number_of_constant_reagents * total_assemblies
+        # Backbone and part always take a fresh tip per reaction
+        dna_tips = 2 * total_assemblies
+        reaction_groups = {self.restriction_enzyme: [2] * total_assemblies}
+        return self._calculate_reagent_tips(reaction_groups,
+                                            number_of_constant_reagents=number_of_constant_reagents - 2) + dna_tips
 
     def _validate_assembly_requirements(self):
         """Validate domestication assembly requirements"""
@@ -860,7 +1184,7 @@ class Domestication(BaseAssembly):
             raise ValueError("No restriction enzyme provided for domestication")
 
         # Calculate reagent positions: water(1) + ligase buffer(1) + ligase(1) + enzyme(1) + backbone(1) = 5
-        reagent_positions = 5
+        reagent_positions = 5 + self._master_mix_positions(number_of_enzymes=1)
         max_parts = 24 - reagent_positions
 
         if len(self.parts_list) > max_parts:
@@ -895,12 +1219,21 @@ class ManualLoopAssembly(BaseAssembly):
     """
     Manual/Combinatorial Loop Assembly - generates combinations from roles.
     Supports Odd/Even pattern detection for automatic enzyme selection.
+
+    Combinations are never materialised: library sizes are counted arithmetically
+    and combinations are generated one at a time as reactions are planned. Odd
+    libraries come first, then even libraries, each in ``itertools.product`` order
+    over its roles. ``combination_offset`` and ``max_combinations`` select the
+    window of that sequence built in this run, so a library with millions of
+    theoretical combinations can be planned a plate at a time.
     """
 
     def __init__(self,
                  assembly_data: Optional[Dict] = None,
                  json_params: Optional[str] = None,
                  assemblies: Optional[List[Dict]] = None,
+                 combination_offset: int = 0,
+                 max_combinations: Optional[int] = None,
                  *args, **kwargs):
         """
         Initialize Manual Loop Assembly protocol.
@@ -909,6 +1242,9 @@ class ManualLoopAssembly(BaseAssembly):
             assembly_data: Dict containing 'assemblies' key (new standardized approach)
             json_params: Optional advanced parameters
             assemblies: List of assembly dicts (backward compatibility)
+            combination_offset: Index of the first combination to build.
+            max_combinations: Number of combinations to build from ``combination_offset``.
+                ``None`` builds all remaining combinations.
             \*args, \*\*kwargs: Passed to BaseAssembly
         """
         # Handle parameter precedence: assembly_data <- assemblies kwarg
@@ -931,23 +1267,36 @@ class ManualLoopAssembly(BaseAssembly):
         self.parts_set = set()
         self.has_odd = False
         self.has_even = False
-        self.odd_combinations = []
-        self.even_combinations = []
+        if combination_offset < 0:
+            raise ValueError(f"combination_offset must be >= 0, got {combination_offset}")
+        if max_combinations is not None and max_combinations < 1:
+            raise ValueError(f"max_combinations must be >= 1, got {max_combinations}")
+        self.combination_offset = combination_offset
+        self.max_combinations = max_combinations
+        self.odd_libraries = []
+        self.even_libraries = []
+        self.odd_slices = []
+        self.even_slices = []
+        self.total_combinations = 0
 
     def process_assemblies(self):
-        """Process manual format assemblies and generate combinations"""
+        """Process manual format assemblies and select the combinations to build"""
         self._reset_assembly_state()
 
         for assembly in self.assemblies:
             assembly_type = self._get_assembly_type(assembly['receiver'])
             if assembly_type == 'odd':
                 self.has_odd = True
-                combos = self._generate_combinations_for_assembly(assembly)
-                self.odd_combinations.extend(combos)
+                self.odd_libraries.append(self._parts_per_role(assembly))
             if assembly_type == 'even':
                 self.has_even = True
-                combos = self._generate_combinations_for_assembly(assembly)
-                self.even_combinations.extend(combos)
+                self.even_libraries.append(self._parts_per_role(assembly))
+
+        odd_total = sum(self._library_size(roles) for roles in self.odd_libraries)
+        even_total = sum(self._library_size(roles) for roles in self.even_libraries)
+        self.total_combinations = odd_total + even_total
+        self.odd_slices = self._select_combinations(self.odd_libraries, first_index=0)
+        self.even_slices = self._select_combinations(self.even_libraries, first_index=odd_total)
 
         self._validate_assembly_requirements()
 
@@ -982,41 +1331,43 @@ class ManualLoopAssembly(BaseAssembly):
                                        volume_reagents, thermocycler_well_counter) -> int:
         """Process manual format combinations with automatic enzyme selection"""
 
+        reactions = []
         if self.has_odd:
             restriction_enzyme_bsai = alum_block[self.dict_of_parts_in_temp_mod_position["Restriction Enzyme BSAI"]]
-            thermocycler_well_counter = self._process_combinations(
-                protocol=protocol, pipette=pipette,
-                combinations=self.odd_combinations,
+            reactions.extend(self._process_combinations(
+                combinations=self._iter_combinations(self.odd_slices),
                 restriction_enzyme=restriction_enzyme_bsai,
                 thermo_plate=thermo_plate, alum_block=alum_block,
-                dd_h2o=dd_h2o, t4_dna_ligase_buffer=t4_dna_ligase_buffer,
-                t4_dna_ligase=t4_dna_ligase, volume_reagents=volume_reagents,
-                thermocycler_well_counter=thermocycler_well_counter
-            )
+                volume_reagents=volume_reagents,
+                thermocycler_well_counter=thermocycler_well_counter + len(reactions)
+            ))
 
         if self.has_even:
             restriction_enzyme_sapi = alum_block[self.dict_of_parts_in_temp_mod_position["Restriction Enzyme SAPI"]]
-            thermocycler_well_counter = self._process_combinations(
-                protocol=protocol, pipette=pipette,
-                combinations=self.even_combinations,
+            reactions.extend(self._process_combinations(
+                combinations=self._iter_combinations(self.even_slices),
                 restriction_enzyme=restriction_enzyme_sapi,
                 thermo_plate=thermo_plate, alum_block=alum_block,
-                dd_h2o=dd_h2o, t4_dna_ligase_buffer=t4_dna_ligase_buffer,
-                t4_dna_ligase=t4_dna_ligase, volume_reagents=volume_reagents,
-                thermocycler_well_counter=thermocycler_well_counter
-            )
+                volume_reagents=volume_reagents,
+                thermocycler_well_counter=thermocycler_well_counter + len(reactions)
+            ))
 
-        return thermocycler_well_counter
+        self._dispense_reactions(protocol, pipette, reactions, dd_h2o, t4_dna_ligase_buffer, t4_dna_ligase)
+
+        return thermocycler_well_counter + len(reactions)
 
     def _calculate_total_tips_needed(self, number_of_constant_reagents: int = 4) -> int:
         """Calculate total tips for manual format"""
-        total_combinations = len(self.odd_combinations) + len(self.even_combinations)
-        reagent_tips = number_of_constant_reagents
-        total_reagent_tips = reagent_tips * total_combinations * self.replicates
+        reaction_groups = {
+            'BSAI': [len(roles) for roles, start, stop in self.odd_slices
+                     for _ in range((stop - start) * self.replicates)],
+            'SAPI': [len(roles) for roles, start, stop in self.even_slices
+                     for _ in range((stop - start) * self.replicates)]
+        }
+        total_reagent_tips = self._calculate_reagent_tips(
+            reaction_groups, number_of_constant_reagents=number_of_constant_reagents)
 
-        total_part_tips = 0
-        for combination in self.odd_combinations + self.even_combinations:
-            total_part_tips += len(combination) * self.replicates
+        total_part_tips = sum(sum(group) for group in reaction_groups.values())
 
         return total_reagent_tips + total_part_tips
 
@@ -1026,8 +1377,11 @@ class ManualLoopAssembly(BaseAssembly):
         self.parts_set = set()
         self.has_odd = False
         self.has_even = False
-        self.odd_combinations = []
-        self.even_combinations = []
+        self.odd_libraries = []
+        self.even_libraries = []
+        self.odd_slices = []
+        self.even_slices = []
+        self.total_combinations = 0
 
     def _get_assembly_type(self, receiver_name):
         """Determine if assembly is odd, even, or neither"""
@@ -1041,19 +1395,71 @@ class ManualLoopAssembly(BaseAssembly):
             f"Check receiver naming."
         )
 
-    def _generate_combinations_for_assembly(self, assembly):
-        """Generate all possible part combinations for a single assembly"""
+    def _parts_per_role(self, assembly) -> List[List[str]]:
+        """List the candidate parts of every role of a single assembly, in role order"""
         parts_per_role = []
         for role, parts in assembly.items():
             if isinstance(parts, str):
                 parts_list = [parts]
             else:
                 parts_list = list(parts)
-
-            self.parts_set.update(parts_list)
             parts_per_role.append(parts_list)
 
-        return list(product(*parts_per_role))
+        return parts_per_role
+
+    @staticmethod
+    def _library_size(parts_per_role) -> int:
+        """Number of combinations of a library, counted without generating them"""
+        size = 1
+        for parts in parts_per_role:
+            size *= len(parts)
+        return size
+
+    @staticmethod
+    def _combination_at(parts_per_role, index: int) -> tuple:
+        """Return the combination at *index* in ``itertools.product`` order"""
+        combination = []
+        for parts in reversed(parts_per_role):
+            index, position = divmod(index, len(parts))
+            combination.append(parts[position])
+        return tuple(reversed(combination))
+
+    def _select_combinations(self, libraries, first_index: int) -> List[tuple]:
+        """
+        Intersect each library with the selected combination window.
+
+        Args:
+            libraries: Lists of parts per role, one per assembly.
+            first_index: Position of the first combination of ``libraries`` in the
+                sequence of all combinations (odd libraries, then even libraries).
+
+        Returns:
+            List of ``(parts_per_role, start, stop)`` for every library with selected
+            combinations; ``start``/``stop`` index into that library's combinations.
+        """
+        window_start = self.combination_offset
+        window_stop = self.total_combinations
+        if self.max_combinations is not None:
+            window_stop = min(window_stop, window_start + self.max_combinations)
+
+        slices = []
+        for parts_per_role in libraries:
+            size = self._library_size(parts_per_role)
+            start = max(window_start - first_index, 0)
+            stop = min(window_stop - first_index, size)
+            if start < stop:
+                slices.append((parts_per_role, start, stop))
+            first_index += size
+        return slices
+
+    def _iter_combinations(self, slices):
+        """Yield the selected combinations one at a time"""
+        for parts_per_role, start, stop in slices:
+            for index in range(start, stop):
+                yield self._combination_at(parts_per_role, index)
+
+    def _selected_combination_count(self) -> int:
+        return sum(stop - start for _, start, stop in self.odd_slices + self.even_slices)
 
     def _validate_assembly_requirements(self):
         """Validate manual assembly requirements"""
@@ -1063,85 +1469,61 @@ class ManualLoopAssembly(BaseAssembly):
                 "Check assembly dictionaries for Odd and Even receivers."
             )
 
-        reagent_positions = 3 + int(self.has_odd) + int(self.has_even)
-        max_parts = 24 - reagent_positions
-
-        if len(self.parts_set) > max_parts:
+        if self.combination_offset >= self.total_combinations:
             raise ValueError(
-                f'This protocol only supports assemblies with up to {max_parts} parts. '
-                f'Number of parts in the protocol is {len(self.parts_set)}. '
-                f'Parts: {self.parts_set}. '
-                f'Reagent positions used: {reagent_positions}/24'
+                f'combination_offset {self.combination_offset} is past the last combination. '
+                f'The assemblies define {self.total_combinations} combinations.'
             )
 
         available_wells = 96 - self.thermocycler_starting_well
-        total_combinations = len(self.odd_combinations) + len(self.even_combinations)
-        wells_needed = total_combinations * self.replicates
+        wells_needed = self._selected_combination_count() * self.replicates
 
         if wells_needed > available_wells:
             raise ValueError(
                 f'This protocol only supports assemblies with up to {available_wells} '
-                f'combinations. Number of combinations in the protocol are {wells_needed}.'
+                f'combinations. Number of combinations in the protocol are {wells_needed}.\n'
+                f'The assemblies define {self.total_combinations} combinations; use '
+                f'max_combinations and combination_offset to build them in batches.'
             )
 
-        # Validate reaction volumes for all combinations
-        for combination in self.odd_combinations + self.even_combinations:
-            num_parts = len(combination)
-            self._validate_reaction_volumes(num_parts)
+        # Only the selected combinations decide which enzymes and parts are loaded
+        self.has_odd = bool(self.odd_slices)
+        self.has_even = bool(self.even_slices)
+        for combination in self._iter_combinations(self.odd_slices + self.even_slices):
+            self.parts_set.update(combination)
 
-    def _process_combinations(self, protocol, pipette, combinations, restriction_enzyme,
-                              thermo_plate, alum_block, dd_h2o, t4_dna_ligase_buffer,
-                              t4_dna_ligase, volume_reagents, thermocycler_well_counter):
-        """Process combinations with specified restriction enzyme"""
+        number_of_enzymes = int(self.has_odd) + int(self.has_even)
+        reagent_positions = 3 + number_of_enzymes + self._master_mix_positions(number_of_enzymes)
+        max_parts = 24 - reagent_positions
 
+        if len(self.parts_set) > max_parts:
+            raise ValueError(
+                f'This protocol only supports assemblies with up to {max_parts} parts. '
+                f'Number of parts in the protocol is {len(self.parts_set)}. '
+                f'Parts: {self.parts_set}. '
+                f'Reagent positions used: {reagent_positions}/24'
+            )
+
+        # Every combination of a library has one part per role
+        for parts_per_role, _, _ in self.odd_slices + self.even_slices:
+            self._validate_reaction_volumes(len(parts_per_role))
+
+    def _process_combinations(self, combinations, restriction_enzyme, thermo_plate, alum_block,
+                              volume_reagents, thermocycler_well_counter) -> List[Dict]:
+        """Plan reactions for combinations with specified restriction enzyme"""
+
+        reactions = []
+        thermo_wells = thermo_plate.wells()
         for combination in combinations:
             for r in range(self.replicates):
-                dest_well = thermo_plate.wells()[thermocycler_well_counter]
+                dest_well = thermo_wells[thermocycler_well_counter]
                 dest_well_name = dest_well.well_name
 
                 volume_dd_h20 = self.volume_total_reaction - (volume_reagents + self.volume_part * len(combination))
+                part_sources = [alum_block[self.dict_of_parts_in_temp_mod_position[part]] for part in combination]
 
-                # Add reagents
-                self.liquid_transfer(protocol=protocol, pipette=pipette, volume=volume_dd_h20,
-                                     source=dd_h2o, dest=dest_well,
-                                     asp_rate=self.aspiration_rate, disp_rate=self.dispense_rate, touch_tip=True)
-
-                self.liquid_transfer(protocol=protocol, pipette=pipette, volume=self.volume_t4_dna_ligase_buffer,
-                                     source=t4_dna_ligase_buffer, dest=dest_well,
-                                     asp_rate=self.aspiration_rate, disp_rate=self.dispense_rate,
-                                     mix_before=self.volume_t4_dna_ligase_buffer, touch_tip=True)
-
-                self.liquid_transfer(protocol=protocol, pipette=pipette, volume=self.volume_t4_dna_ligase,
-                                     source=t4_dna_ligase, dest=dest_well,
-                                     asp_rate=self.aspiration_rate, disp_rate=self.dispense_rate,
-                                     mix_before=self.volume_t4_dna_ligase, touch_tip=True)
-
-                self.liquid_transfer(protocol=protocol, pipette=pipette, volume=self.volume_restriction_enzyme,
-                                     source=restriction_enzyme, dest=dest_well,
-                                     asp_rate=self.aspiration_rate, disp_rate=self.dispense_rate,
-                                     mix_before=self.volume_restriction_enzyme, touch_tip=True)
-
-                # Add parts
-                for i, part in enumerate(combination):
-                    part_source = alum_block[self.dict_of_parts_in_temp_mod_position[part]]
-                    if i == len(combination) - 1:  # Don't drop tip on last part
-                        self.liquid_transfer(protocol=protocol, pipette=pipette, volume=self.volume_part,
-                                             source=part_source, dest=dest_well,
-                                             asp_rate=self.aspiration_rate, disp_rate=self.dispense_rate,
-                                             mix_before=self.volume_part, touch_tip=True, drop_tip=False)
-                    else:
-                        self.liquid_transfer(protocol=protocol, pipette=pipette, volume=self.volume_part,
-                                             source=part_source, dest=dest_well,
-                                             asp_rate=self.aspiration_rate, disp_rate=self.dispense_rate,
-                                             mix_before=self.volume_part, touch_tip=True)
-
-                # Remove air bubbles
-                mix_volume = min(self.volume_total_reaction, pipette.max_volume)
-                for _ in range(int(self.volume_total_reaction / 10)):
-                    self.liquid_transfer(protocol=protocol, pipette=pipette, volume=mix_volume,
-                                         source=dest_well.bottom(), dest=dest_well.bottom(8),
-                                         asp_rate=1.0, disp_rate=1.0, new_tip=False, drop_tip=False, touch_tip=True)
-                pipette.drop_tip()
+                reactions.append({'well': dest_well, 'water': volume_dd_h20,
+                                  'enzyme': restriction_enzyme, 'parts': part_sources})
 
                 # Track combination
                 self.dict_of_parts_in_thermocycler[f"Replicate: {r + 1}, Combination: {combination}"] = dest_well_name
@@ -1156,7 +1538,7 @@ class ManualLoopAssembly(BaseAssembly):
 
                 thermocycler_well_counter += 1
 
-        return thermocycler_well_counter
+        return reactions
 
 
 class SBOLLoopAssembly(BaseAssembly):
@@ -1165,6 +1547,8 @@ class SBOLLoopAssembly(BaseAssembly):
     Each assembly dictionary represents one specific construct to build.
     """
 
+    supports_part_swaps = True
+
     def __init__(self,
                  assembly_data: Optional[Dict] = None,
                  json_params: Optional[str] = None,
@@ -1198,6 +1582,10 @@ class SBOLLoopAssembly(BaseAssembly):
         self.restriction_enzyme_set = set()
         self.combined_set = set()
         self.assembly_combinations = []  # SBOL assemblies are explicit, not combinatorial
+        self.part_rounds = []          # assembly indices per round of part tubes on the block
+        self.number_of_part_positions = 0
+        self.block_contents = []       # {block position: part} per round
+        self.part_swaps = []           # tube swaps before each round (see _swap_part_round)
 
     def process_assemblies(self):
         """Process SBOL format assemblies - each is explicit, no combinations needed"""
@@ -1243,95 +1631,87 @@ class SBOLLoopAssembly(BaseAssembly):
                                name=f"Restriction Enzyme {enzyme_name}")
             temp_module_well_counter += 1
 
-        # Load all unique parts (including backbones)
-        for part in sorted(self.combined_set):
-            self._load_reagent(protocol, module_labware=alum_block,
-                               well_position=temp_module_well_counter,
-                               name=f"{part}")
-            temp_module_well_counter += 1
+        # Load the parts (including backbones) of the first round
+        round_parts = [sorted({part for index in indices for part in self.assembly_combinations[index]['parts']})
+                       for indices in self.part_rounds]
+        self.block_contents = self._plan_block_contents(round_parts, temp_module_well_counter,
+                                                        self.number_of_part_positions)
+        for slot, part in sorted(self.block_contents[0].items()):
+            self._load_reagent(protocol, module_labware=alum_block, well_position=slot, name=f"{part}")
 
-        return temp_module_well_counter
+        return temp_module_well_counter + self.number_of_part_positions
 
     def _process_assembly_combinations(self, protocol, pipette, thermo_plate, alum_block,
                                        dd_h2o, t4_dna_ligase_buffer, t4_dna_ligase,
                                        volume_reagents, thermocycler_well_counter) -> int:
         """Process SBOL assembly combinations with explicit enzyme selection"""
 
-        for assembly_combo in self.assembly_combinations:
-            for r in range(self.replicates):
-                dest_well = thermo_plate.wells()[thermocycler_well_counter]
-                dest_well_name = dest_well.well_name
+        reactions = []
+        self.part_swaps = [None]
+        for round_index, indices in enumerate(self.part_rounds):
+            contents = self.block_contents[round_index]
+            slots = {part: slot for slot, part in contents.items()}
+            if round_index > 0:
+                previous = self.block_contents[round_index - 1]
+                self.part_swaps.append({
+                    'block': alum_block,
+                    'remove': [(part, slot) for slot, part in previous.items() if contents[slot] != part],
+                    'add': [(part, slot) for slot, part in contents.items() if previous.get(slot) != part],
+                })
+            for index in indices:
+                thermocycler_well_counter = self._plan_assembly_reactions(
+                    self.assembly_combinations[index], round_index, slots, reactions,
+                    thermo_plate, alum_block, volume_reagents, thermocycler_well_counter)
 
-                parts = assembly_combo['parts']
-                enzyme_name = assembly_combo['enzyme']
-                product_name = assembly_combo['product']
-
-                volume_dd_h20 = self.volume_total_reaction - (volume_reagents + self.volume_part * len(parts))
-
-                # Add reagents
-                self.liquid_transfer(protocol=protocol, pipette=pipette, volume=volume_dd_h20,
-                                     source=dd_h2o, dest=dest_well,
-                                     asp_rate=self.aspiration_rate, disp_rate=self.dispense_rate, touch_tip=True)
-
-                self.liquid_transfer(protocol=protocol, pipette=pipette, volume=self.volume_t4_dna_ligase_buffer,
-                                     source=t4_dna_ligase_buffer, dest=dest_well,
-                                     asp_rate=self.aspiration_rate, disp_rate=self.dispense_rate,
-                                     mix_before=self.volume_t4_dna_ligase_buffer, touch_tip=True)
-
-                self.liquid_transfer(protocol=protocol, pipette=pipette, volume=self.volume_t4_dna_ligase,
-                                     source=t4_dna_ligase, dest=dest_well,
-                                     asp_rate=self.aspiration_rate, disp_rate=self.dispense_rate,
-                                     mix_before=self.volume_t4_dna_ligase, touch_tip=True)
-
-                # Add restriction enzyme (explicit from SBOL)
-                restriction_enzyme = alum_block[
-                    self.dict_of_parts_in_temp_mod_position[f"Restriction Enzyme {enzyme_name}"]]
-                self.liquid_transfer(protocol=protocol, pipette=pipette, volume=self.volume_restriction_enzyme,
-                                     source=restriction_enzyme, dest=dest_well,
-                                     asp_rate=self.aspiration_rate, disp_rate=self.dispense_rate,
-                                     mix_before=self.volume_restriction_enzyme, touch_tip=True)
-
-                # Add parts (including backbone)
-                for i, part in enumerate(parts):
-                    part_source = alum_block[self.dict_of_parts_in_temp_mod_position[part]]
-                    if i == len(parts) - 1:  # Don't drop tip on last part
-                        self.liquid_transfer(protocol=protocol, pipette=pipette, volume=self.volume_part,
-                                             source=part_source, dest=dest_well,
-                                             asp_rate=self.aspiration_rate, disp_rate=self.dispense_rate,
-                                             mix_before=self.volume_part, touch_tip=True, drop_tip=False)
-                    else:
-                        self.liquid_transfer(protocol=protocol, pipette=pipette, volume=self.volume_part,
-                                             source=part_source, dest=dest_well,
-                                             asp_rate=self.aspiration_rate, disp_rate=self.dispense_rate,
-                                             mix_before=self.volume_part, touch_tip=True)
-
-                # Remove air bubbles
-                mix_volume = min(self.volume_total_reaction, pipette.max_volume)
-                for _ in range(int(self.volume_total_reaction / 10)):
-                    self.liquid_transfer(protocol=protocol, pipette=pipette, volume=mix_volume,
-                                         source=dest_well.bottom(), dest=dest_well.bottom(8),
-                                         asp_rate=1.0, disp_rate=1.0, new_tip=False, drop_tip=False, touch_tip=True)
-                pipette.drop_tip()
+        self._dispense_reactions(protocol, pipette, reactions, dd_h2o, t4_dna_ligase_buffer, t4_dna_ligase)
 
-                # Track assembly
-                self.dict_of_parts_in_thermocycler[f"Replicate: {r + 1}, Product: {product_name}"] = dest_well_name
-                self.dna_list_for_transformation_protocol.append(f"{product_name}_rep{r + 1}")
+        return thermocycler_well_counter
 
-                # Track URI -> well locations for transformation export
-                product_uri = assembly_combo['product_uri']
-                if product_uri not in self.product_uri_to_wells:
-                    self.product_uri_to_wells[product_uri] = []
-                self.product_uri_to_wells[product_uri].append(dest_well_name)
+    def _plan_assembly_reactions(self, assembly_combo, round_index, slots, reactions, thermo_plate,
+                                 alum_block, volume_reagents, thermocycler_well_counter) -> int:
+        """Plan the replicate reactions of one assembly, sourcing parts from this round's slots"""
+        parts = assembly_combo['parts']
+        enzyme_name = assembly_combo['enzyme']
+        product_name = assembly_combo['product']
 
-                thermocycler_well_counter += 1
+        volume_dd_h20 = self.volume_total_reaction - (volume_reagents + self.volume_part * len(parts))
+
+        # Restriction enzyme is explicit from SBOL, parts include the backbone
+        restriction_enzyme = alum_block[
+            self.dict_of_parts_in_temp_mod_position[f"Restriction Enzyme {enzyme_name}"]]
+        block_wells = alum_block.wells()
+        part_sources = [block_wells[slots[part]] for part in parts]
+
+        thermo_wells = thermo_plate.wells()
+        for r in range(self.replicates):
+            dest_well = thermo_wells[thermocycler_well_counter]
+            dest_well_name = dest_well.well_name
+
+            reactions.append({'well': dest_well, 'water': volume_dd_h20, 'enzyme': restriction_enzyme,
+                              'parts': part_sources, 'round': round_index})
+
+            # Track assembly
+            self.dict_of_parts_in_thermocycler[f"Replicate: {r + 1}, Product: {product_name}"] = dest_well_name
+            self.dna_list_for_transformation_protocol.append(f"{product_name}_rep{r + 1}")
+
+            # Track URI -> well locations for transformation export
+            product_uri = assembly_combo['product_uri']
+            if product_uri not in self.product_uri_to_wells:
+                self.product_uri_to_wells[product_uri] = []
+            self.product_uri_to_wells[product_uri].append(dest_well_name)
+
+            thermocycler_well_counter += 1
 
         return thermocycler_well_counter
 
     def _calculate_total_tips_needed(self, number_of_constant_reagents: int = 4) -> int:
         """Calculate total tips for SBOL format"""
-        total_assemblies = len(self.assembly_combinations)
-        reagent_tips = number_of_constant_reagents
-        total_reagent_tips = reagent_tips * total_assemblies * self.replicates
+        reaction_groups = {}
+        for assembly_combo in self.assembly_combinations:
+            reaction_groups.setdefault(assembly_combo['enzyme'], []).extend(
+                [len(assembly_combo['parts'])] * self.replicates)
+        total_reagent_tips = self._calculate_reagent_tips(
+            reaction_groups, number_of_constant_reagents=number_of_constant_reagents)
 
         total_part_tips = 0
         for assembly_combo in self.assembly_combinations:
@@ -1347,6 +1727,10 @@ class SBOLLoopAssembly(BaseAssembly):
         self.restriction_enzyme_set = set()
         self.combined_set = set()
         self.assembly_combinations = []
+        self.part_rounds = []
+        self.number_of_part_positions = 0
+        self.block_contents = []
+        self.part_swaps = []
 
     def _extract_name_from_uri(self, uri: str) -> str:
         """Extract part name from SBOL URI"""
@@ -1364,16 +1748,25 @@ class SBOLLoopAssembly(BaseAssembly):
         if not self.assembly_combinations:
             raise ValueError("No valid SBOL assemblies found in input.")
 
-        # Calculate reagent positions: water(1) + ligase(1) + buffer(1) + unique enzymes
-        reagent_positions = 3 + len(self.restriction_enzyme_set)
+        # Calculate reagent positions: water(1) + ligase(1) + buffer(1) + unique enzymes (+ their master mixes)
+        reagent_positions = 3 + len(self.restriction_enzyme_set) + \
+            self._master_mix_positions(len(self.restriction_enzyme_set))
         max_parts = 24 - reagent_positions
 
-        if len(self.combined_set) > max_parts:
+        if len(self.combined_set) <= max_parts:
+            self.part_rounds = [list(range(len(self.assembly_combinations)))]
+            self.number_of_part_positions = len(self.combined_set)
+        elif self.allow_part_swaps:
+            part_sets = [set(assembly_combo['parts']) for assembly_combo in self.assembly_combinations]
+            self.part_rounds = self._allocate_part_rounds(part_sets, capacity=max_parts)
+            self.number_of_part_positions = max_parts
+        else:
             raise ValueError(
                 f'This protocol only supports assemblies with up to {max_parts} parts. '
                 f'Number of parts in the protocol is {len(self.combined_set)}. '
                 f'Parts: {self.combined_set}. '
-                f'Reagent positions used: {reagent_positions}/24'
+                f'Reagent positions used: {reagent_positions}/24\n'
+                f'Set allow_part_swaps=True to swap part tubes between rounds of assemblies.'
             )
 
         # Validate thermocycler capacity
@@ -0,0 +1,216 @@
+"""
+Split assembly libraries that do not fit one thermocycler plate into plate runs.
+
+A Loop Assembly run fills at most ``96 - thermocycler_starting_well`` wells and
+holds at most 24 reagents and parts on the temperature module. The assembly
+classes raise ``ValueError`` when an input exceeds either limit.
+``plan_assembly_batches`` splits the input into consecutive plate runs that each
+pass the class' own validation. Each run gets its own
+``thermocycler_starting_well``, ``initial_tip`` and ``protocol_name``.
+
+Each run continues from the tip where the previous run stopped. Put the partly
+used tip rack in the first tip rack slot before starting the next run. The
+well layout of every run is taken from a dry run (see ``pudu.dry_run``).
+``write_assembly_batches`` writes one protocol file per plate and a combined
+``transformation_input.json`` keyed by plate::
+
+    {
+        "plate_1": {"https://SBOL2Build.org/composite_1/1": ["A1"], ...},
+        "plate_2": {"https://SBOL2Build.org/composite_97/1": ["A1"], ...}
+    }
+
+Each plate entry has the same format as the file a single assembly run writes,
+so it can be passed as ``plasmid_locations`` to a transformation of that plate.
+
+Example::
+
+    from pudu.batching import plan_assembly_batches, write_assembly_batches
+
+    batches = plan_assembly_batches(assemblies, 'SBOL', json_params={'replicates': 2})
+    write_assembly_batches(batches, 'library_runs')
+"""
+
+import contextlib
+import io
+import json
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from pudu.assembly import SBOLLoopAssembly, Domestication
+from pudu.dry_run import dry_run
+from pudu.tip_budget import TIPS_PER_RACK, tip_index, tip_well_name
+
+BATCHABLE_ASSEMBLY_CLASSES = {
+    'SBOL': SBOLLoopAssembly,
+    'Domestication': Domestication,
+}
+
+
+@dataclass
+class AssemblyBatch:
+    """
+    One plate run of a batched assembly library.
+
+    Attributes:
+        plate: 1-based plate number.
+        assembly_subtype: ``'SBOL'`` or ``'Domestication'``.
+        assemblies: Assembly input for this run, in the format of the original input.
+        params: ``json_params`` for this run, including ``thermocycler_starting_well``,
+            ``initial_tip`` and ``protocol_name``.
+        product_uri_to_wells: Thermocycler wells of every product in this run.
+        tips_used: Tips the run picks up.
+    """
+    plate: int
+    assembly_subtype: str
+    assemblies: List[Dict]
+    params: Dict
+    product_uri_to_wells: Dict[str, List[str]] = field(default_factory=dict)
+    tips_used: int = 0
+
+
+def _build(assembly_subtype: str, assemblies: List[Dict], params: Dict):
+    """Instantiate and validate the assembly class for one run."""
+    assembly = BATCHABLE_ASSEMBLY_CLASSES[assembly_subtype](assembly_data=assemblies,
+                                                            json_params=params)
+    assembly.process_assemblies()
+    return assembly
+
+
+def _split_units(assembly_subtype: str, assemblies: List[Dict]) -> List:
+    """Smallest pieces of input that can go to different plates."""
+    if assembly_subtype == 'Domestication':
+        if len(assemblies) != 1:
+            raise ValueError(f"Domestication supports exactly one assembly, got {len(assemblies)}")
+        parts = assemblies[0]['parts']
+        return [parts] if isinstance(parts, str) else list(parts)
+    return list(assemblies)
+
+
+def _join_units(assembly_subtype: str, assemblies: List[Dict], units: List) -> List[Dict]:
+    """Assembly input for a run made of *units*."""
+    if assembly_subtype == 'Domestication':
+        return [dict(assemblies[0], parts=list(units))]
+    return list(units)
+
+
+def plan_assembly_batches(assemblies: List[Dict], assembly_subtype: str = 'SBOL',
+                          json_params: Optional[Dict] = None) -> List[AssemblyBatch]:
+    """
+    Split an assembly input into plate runs.
+
+    Assemblies (or, for Domestication, parts) are added to a run in input order
+    until the next one would fail the assembly class' validation. That happens when
+    the run would need more thermocycler wells or more temperature module
+    positions than are available.
+
+    Args:
+        assemblies: Assembly input as accepted by the assembly class.
+        assembly_subtype: ``'SBOL'`` or ``'Domestication'``.
+        json_params: Parameters shared by every run. ``thermocycler_starting_well``
+            and ``initial_tip`` apply to the first run only.
+
+    Returns:
+        List of ``AssemblyBatch``, one per plate.
+
+    Raises:
+        ValueError: If ``assembly_subtype`` cannot be batched or a single assembly
+            does not fit a plate on its own.
+    """
+    if assembly_subtype not in BATCHABLE_ASSEMBLY_CLASSES:
+        raise ValueError(
+            f"Cannot batch '{assembly_subtype}' assemblies. "
+            f"Supported subtypes: {sorted(BATCHABLE_ASSEMBLY_CLASSES)}.\n"
+            f"For Manual assemblies use combination_offset and max_combinations."
+        )
+
+    shared_params = dict(json_params or {})
+    base_name = shared_params.get('protocol_name') or 'assembly'
+    units = _split_units(assembly_subtype, assemblies)
+
+    later_params = dict(shared_params, thermocycler_starting_well=0)
+    groups = []
+    current = []
+    for unit in units:
+        params = later_params if groups else shared_params
+        try:
+            _build(assembly_subtype, _join_units(assembly_subtype, assemblies, current + [unit]), params)
+            current.append(unit)
+        except ValueError:
+            if not current:
+                raise
+            groups.append(current)
+            current = [unit]
+            _build(assembly_subtype, _join_units(assembly_subtype, assemblies, current), later_params)
+    if current:
+        groups.append(current)
+
+    batches = []
+    initial_tip = shared_params.get('initial_tip')
+    next_tip = tip_index(initial_tip) if initial_tip else 0
+    for plate, group in enumerate(groups, start=1):
+        params = dict(shared_params, protocol_name=f"{base_name}_plate_{plate}")
+        params['initial_tip'] = tip_well_name(next_tip) if next_tip else None
+        if plate > 1:
+            params['thermocycler_starting_well'] = 0
+
+        batch_assemblies = _join_units(assembly_subtype, assemblies, group)
+        assembly = BATCHABLE_ASSEMBLY_CLASSES[assembly_subtype](assembly_data=batch_assemblies,
+                                                                json_params=params)
+        with contextlib.redirect_stdout(io.StringIO()):
+            dry_run(assembly, simulating=False)
+        tips_used = assembly._calculate_total_tips_needed()
+
+        batches.append(AssemblyBatch(plate=plate, assembly_subtype=assembly_subtype,
+                                     assemblies=batch_assemblies, params=params,
+                                     product_uri_to_wells=dict(assembly.product_uri_to_wells),
+                                     tips_used=tips_used))
+        next_tip = (next_tip + tips_used) % TIPS_PER_RACK
+
+    return batches
+
+
+def combined_transformation_input(batches: List[AssemblyBatch]) -> Dict[str, Dict[str, List[str]]]:
+    """Product well locations of every run, keyed by ``plate_<n>``."""
+    return {f"plate_{batch.plate}": batch.product_uri_to_wells for batch in batches}
+
+
+def write_assembly_batches(batches: List[AssemblyBatch], output_dir='.',
+                           metadata: Optional[Dict] = None,
+                           transformation_input: str = 'transformation_input.json') -> List[Path]:
+    """
+    Write one protocol file per plate run and the combined transformation input.
+
+    Args:
+        batches: Plate runs from ``plan_assembly_batches``.
+        output_dir: Directory for the generated files; created if missing.
+        metadata: Opentrons metadata passed to ``generate_protocol``. The plate
+            number is appended to ``protocolName``.
+        transformation_input: File name of the combined transformation input.
+
+    Returns:
+        Paths of the written protocol files, in plate order, followed by the
+        combined transformation input.
+    """
+    from pudu.generate_protocol import generate_protocol
+
+    output_dir = Path(output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+
+    written = []
+    for batch in batches:
+        plate_metadata = dict(metadata or {})
+        if 'protocolName' in plate_metadata:
+            plate_metadata['protocolName'] = f"{plate_metadata['protocolName']} (plate {batch.plate})"
+        code = generate_protocol(protocol_data=batch.assemblies, json_params=batch.params,
+                                 metadata=plate_metadata or None, protocol_type='assembly',
+                                 assembly_subtype=batch.assembly_subtype)
+        path = output_dir / f"{batch.params['protocol_name']}.py"
+        path.write_text(code)
+        written.append(path)
+
+    combined_path = output_dir / transformation_input
+    with open(combined_path, 'w') as f:
+        json.dump(combined_transformation_input(batches), f, indent=2)
+    written.append(combined_path)
+    return written
@@ -0,0 +1,413 @@
+"""
+Startup and simulation benchmarks for PUDU.
+
+Measures four things:
+
+* **import** — cold import time of ``pudu``, ``pudu.generate_protocol`` and the
+  protocol modules, each in a fresh interpreter.
+* **run** — wall-clock time, peak Python memory (``tracemalloc``) and command
+  count of every protocol class' ``run()`` under simulation, for scaling inputs
+  of 1, 24, 96 and 384 reactions built from the ``workflow_example/`` inputs.
+  Sizes a class cannot hold in one run (e.g. 384 reactions on a 96-well plate)
+  are recorded as skipped with the validation message, and runs that fail in
+  simulation (e.g. running out of tips) are recorded with the error. The
+  calibrations and ``PlateWithGradient`` have a fixed plate layout and are only
+  run at 1 reaction. File exports are switched off, so nothing is written to
+  the working directory.
+* **generate** — ``generate_protocol`` throughput in protocols per second.
+
+Simulation runs against ``opentrons.simulate.get_protocol_api`` by default.
+Pass ``backend='dry_run'`` to use the much faster ``DryRunContext``.
+
+Results are written as JSON with the interpreter, platform and package versions,
+so runs from different releases can be compared::
+
+    python -m pudu.benchmark -o benchmarks/1.0.0b9.json
+    python -m pudu.benchmark -o current.json --compare benchmarks/1.0.0b9.json
+
+``--compare`` lists every measurement that got slower (or used more memory) by
+more than ``--threshold`` (default 20%) and exits with status 1 if there is any.
+"""
+
+import argparse
+import contextlib
+import copy
+import io
+import json
+import platform
+import statistics
+import subprocess
+import sys
+import time
+import traceback
+import tracemalloc
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Sequence
+
+DEFAULT_SIZES = (1, 24, 96, 384)
+IMPORT_TARGETS = ('pudu', 'pudu.generate_protocol', 'pudu.assembly', 'pudu.transformation', 'pudu.plating')
+# Measurements compared between runs, and whether a larger value is worse
+COMPARED_METRICS = {
+    'seconds': True,
+    'peak_memory_bytes': True,
+    'protocols_per_second': False,
+}
+
+WORKFLOW_EXAMPLE = Path(__file__).resolve().parents[2] / 'workflow_example'
+
+# Used when the package is installed without the repository's workflow_example/
+FALLBACK_ASSEMBLIES = [
+    {
+        "Product": "https://SBOL2Build.org/composite_plasmid_1/1",
+        "Backbone": "https://sbolcanvas.org/pSB1C3/1",
+        "PartsList": [
+            "https://sbolcanvas.org/J23101/1",
+            "https://sbolcanvas.org/B0034/1",
+            "https://sbolcanvas.org/GFP/1",
+            "https://sbolcanvas.org/B0015/1"
+        ],
+        "Restriction Enzyme": "https://SBOL2Build.org/BsaI/1"
+    }
+]
+
+
+def _example_assemblies() -> List[Dict]:
+    try:
+        with open(WORKFLOW_EXAMPLE / 'assembly_input.json') as f:
+            return json.load(f)
+    except OSError:
+        return FALLBACK_ASSEMBLIES
+
+
+def _well_name(index: int) -> str:
+    return f"{'ABCDEFGH'[index % 8]}{index // 8 + 1}"
+
+
+def _first_sentence(error: Exception) -> str:
+    return str(error).splitlines()[0].split('. ')[0]
+
+
+def _raised_by_validation(error: Exception) -> bool:
+    """Whether *error* was raised inside a protocol's ``_validate_*`` method."""
+    return any(frame.name.startswith('_validate') for frame in traceback.extract_tb(error.__traceback__))
+
+
+# ---------------------------------------------------------------------------
+# Scaling inputs
+# ---------------------------------------------------------------------------
+
+def sbol_input(reactions: int) -> List[Dict]:
+    """*reactions* SBOL assemblies cycling through the example constructs."""
+    templates = _example_assemblies()
+    return [dict(templates[i % len(templates)], Product=f"https://SBOL2Build.org/composite_plasmid_{i + 1}/1")
+            for i in range(reactions)]
+
+
+def domestication_input(reactions: int) -> List[Dict]:
+    """One domestication of *reactions* parts."""
+    return [{'parts': [f'part_{i + 1}' for i in range(reactions)], 'backbone': 'pUPD2',
+             'restriction_enzyme': 'BsmbI'}]
+
+
+def manual_input(reactions: int) -> List[Dict]:
+    """A three-role combinatorial library with at least *reactions* combinations."""
+    variants = 1
+    while variants ** 3 < reactions:
+        variants += 1
+    library = {role: [f'{role}_{i}' for i in range(variants)] for role in ('promoter', 'rbs', 'cds')}
+    return [dict(library, receiver='Odd_1')]
+
+
+def transformation_input(reactions: int) -> List[Dict]:
+    """*reactions* single-plasmid transformations into one chassis."""
+    return [{'Strain': f'https://SBOL2Build.org/composite_strain_{i + 1}/1',
+             'Chassis': 'https://sbolcanvas.org/DH5alpha/1',
+             'Plasmids': [f'https://SBOL2Build.org/composite_plasmid_{i + 1}/1']}
+            for i in range(reactions)]
+
+
+def plating_input(reactions: int) -> Dict:
+    """*reactions* cultures in consecutive thermocycler wells."""
+    return {'bacterium_locations': {
+        _well_name(i): [f'composite_strain_{i + 1}', 'Competent_Cell_DH5alpha', f'composite_plasmid_{i + 1}',
+                        'Media_1']
+        for i in range(reactions)}}
+
+
+def sample_names(reactions: int) -> List[str]:
+    """*reactions* sample names for ``PlateSamples``."""
+    return [f'sample_{i + 1}' for i in range(reactions)]
+
+
+def _fixed_layout(factory: Callable[[], object]) -> Callable[[int], object]:
+    """Factory for a protocol whose plate layout does not scale: it only runs at 1 reaction."""
+    def build(reactions: int):
+        if reactions != 1:
+            raise ValueError("Fixed plate layout, benchmarked at 1 reaction only")
+        return factory()
+    return build
+
+
+def _protocol_cases() -> Dict[str, Callable[[int], object]]:
+    """Protocol class name -> factory building a protocol object for a reaction count."""
+    from pudu.assembly import SBOLLoopAssembly, Domestication, ManualLoopAssembly
+    from pudu.transformation import HeatShockTransformation
+    from pudu.plating import Plating
+    from pudu.calibration import GFPODCalibration, RGBODCalibration
+    from pudu.sample_preparation import PlateSamples, PlateWithGradient
+
+    return {
+        'SBOLLoopAssembly': lambda n: SBOLLoopAssembly(sbol_input(n), output_xlsx=False, replicates=1),
+        'Domestication': lambda n: Domestication(domestication_input(n), output_xlsx=False, replicates=1),
+        'ManualLoopAssembly': lambda n: ManualLoopAssembly(manual_input(n), output_xlsx=False, replicates=1,
+                                                           max_combinations=n),
+        'HeatShockTransformation': lambda n: HeatShockTransformation(
+            transformation_data=transformation_input(n), replicates=1),
+        'Plating': lambda n: Plating(plating_data=plating_input(n)),
+        'GFPODCalibration': _fixed_layout(GFPODCalibration),
+        'RGBODCalibration': _fixed_layout(RGBODCalibration),
+        'PlateSamples': lambda n: PlateSamples(samples=sample_names(n)),
+        'PlateWithGradient': _fixed_layout(lambda: PlateWithGradient(sample_name='sample', inducer_name='inducer')),
+    }
+
+
+# ---------------------------------------------------------------------------
+# Measurements
+# ---------------------------------------------------------------------------
+
+def measure_import(module: str, repeats: int = 5) -> Dict:
+    """Median cold import time of *module*, each sample in a new interpreter."""
+    code = (f"import time; start = time.perf_counter(); import {module}; "
+            f"print(time.perf_counter() - start)")
+    samples = []
+    for _ in range(repeats):
+        result = subprocess.run([sys.executable, '-c', code], capture_output=True, text=True)
+        if result.returncode != 0:
+            return {'benchmark': 'import', 'name': module, 'skipped': result.stderr.strip().splitlines()[-1]}
+        samples.append(float(result.stdout.strip()))
+    return {'benchmark': 'import', 'name': module, 'seconds': statistics.median(samples),
+            'samples': samples}
+
+
+def _subject(protocol_obj):
+    """Copy of *protocol_obj* for one run, with its file exports switched off."""
+    subject = copy.deepcopy(protocol_obj)
+    if hasattr(subject, 'export_outputs'):
+        subject.export_outputs = False
+    return subject
+
+
+def _simulation_context(backend: str, api_level: str):
+    if backend == 'dry_run':
+        from pudu.dry_run import DryRunContext
+        return DryRunContext(simulating=False)
+    if backend == 'opentrons':
+        from opentrons import simulate
+        return simulate.get_protocol_api(api_level)
+    raise ValueError(f"Unknown backend '{backend}'. Use 'dry_run' or 'opentrons'.")
+
+
+def measure_run(protocol_class: str, factory: Callable[[int], object], reactions: int,
+                backend: str = 'opentrons', api_level: str = '2.21', repeats: int = 3) -> Dict:
+    """
+    Time ``run()`` of the protocol built by *factory* for *reactions* reactions.
+
+    The best of *repeats* runs is reported. Peak memory comes from a separate
+    run under ``tracemalloc``, so tracing does not slow down the timed runs.
+    Inputs rejected by the constructor or by a ``_validate_*`` check of ``run()``
+    (``ValueError``) are recorded as ``skipped``; any other exception raised
+    during the run is recorded as ``error``. Each run works on a copy of the
+    protocol object with ``export_outputs`` off.
+    """
+    record = {'benchmark': 'run', 'name': protocol_class, 'reactions': reactions, 'backend': backend}
+    try:
+        protocol_obj = factory(reactions)
+    except ValueError as e:
+        record['skipped'] = _first_sentence(e)
+        return record
+
+    samples = []
+    context = None
+    for _ in range(repeats):
+        subject = _subject(protocol_obj)
+        context = _simulation_context(backend, api_level)
+        start = time.perf_counter()
+        try:
+            with contextlib.redirect_stdout(io.StringIO()):
+                subject.run(context)
+        except ValueError as e:
+            if _raised_by_validation(e):
+                record['skipped'] = _first_sentence(e)
+            else:
+                record['error'] = f"{type(e).__name__}: {e}"
+            return record
+        except Exception as e:
+            record['error'] = f"{type(e).__name__}: {e}"
+            return record
+        samples.append(time.perf_counter() - start)
+
+    subject = _subject(protocol_obj)
+    traced_context = _simulation_context(backend, api_level)
+    tracemalloc.start()
+    try:
+        with contextlib.redirect_stdout(io.StringIO()):
+            subject.run(traced_context)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    record.update(seconds=min(samples), samples=samples, peak_memory_bytes=peak)
+    record['commands'] = len(context.command_log if hasattr(context, 'command_log') else context.commands())
+    return record
+
+
+def measure_generate(protocol_type: str, protocol_data, assembly_subtype: Optional[str] = None,
+                     count: int = 50) -> Dict:
+    """``generate_protocol`` throughput for *count* files after one warm-up call."""
+    from pudu.generate_protocol import generate_protocol
+
+    generate_protocol(protocol_data, protocol_type=protocol_type, assembly_subtype=assembly_subtype)
+    start = time.perf_counter()
+    for _ in range(count):
+        generate_protocol(protocol_data, protocol_type=protocol_type, assembly_subtype=assembly_subtype)
+    seconds = time.perf_counter() - start
+    return {'benchmark': 'generate', 'name': protocol_type if assembly_subtype is None
+            else f'{protocol_type} ({assembly_subtype})', 'count': count, 'seconds': seconds / count,
+            'protocols_per_second': count / seconds}
+
+
+def _package_version(name: str) -> Optional[str]:
+    from pudu.simulation_cache import _package_version as version
+    return version(name)
+
+
+def run_benchmarks(sizes: Sequence[int] = DEFAULT_SIZES, backend: str = 'opentrons',
+                   import_repeats: int = 5, run_repeats: int = 3, generate_count: int = 50,
+                   protocols: Optional[Sequence[str]] = None) -> Dict:
+    """
+    Run the benchmark suite.
+
+    Args:
+        sizes: Reaction counts of the scaling inputs.
+        backend: ``'opentrons'`` or ``'dry_run'``.
+        import_repeats: Fresh interpreters per import measurement.
+        run_repeats: Timed ``run()`` calls per protocol and size.
+        generate_count: ``generate_protocol`` calls per protocol type.
+        protocols: Protocol class names to benchmark. Defaults to all.
+
+    Returns:
+        Dict with ``meta`` (environment) and ``results`` (one record per measurement).
+    """
+    results = [measure_import(module, import_repeats) for module in IMPORT_TARGETS]
+
+    cases = _protocol_cases()
+    for protocol_class in protocols or cases:
+        if protocol_class not in cases:
+            raise ValueError(f"Unknown protocol '{protocol_class}'. Available: {sorted(cases)}")
+        for reactions in sizes:
+            results.append(measure_run(protocol_class, cases[protocol_class], reactions,
+                                       backend=backend, repeats=run_repeats))
+
+    generate_size = min(sizes)
+    results.append(measure_generate('assembly', sbol_input(generate_size), 'SBOL', generate_count))
+    results.append(measure_generate('transformation', transformation_input(generate_size),
+                                    count=generate_count))
+    results.append(measure_generate('plating', plating_input(generate_size), count=generate_count))
+
+    return {
+        'meta': {
+            'timestamp': datetime.now(timezone.utc).isoformat(),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'pudu': _package_version('pudupy'),
+            'opentrons': _package_version('opentrons'),
+            'backend': backend,
+            'sizes': list(sizes),
+        },
+        'results': results,
+    }
+
+
+def _result_key(record: Dict) -> tuple:
+    return record['benchmark'], record['name'], record.get('reactions'), record.get('backend')
+
+
+def compare_results(baseline: Dict, current: Dict, threshold: float = 0.2) -> List[Dict]:
+    """
+    Measurements in *current* that are worse than *baseline* by more than *threshold*.
+
+    Returns:
+        One dict per regression with the benchmark key, metric, both values and
+        the relative change.
+    """
+    baseline_records = {_result_key(record): record for record in baseline['results']}
+    regressions = []
+    for record in current['results']:
+        previous = baseline_records.get(_result_key(record))
+        if previous is None:
+            continue
+        for metric, larger_is_worse in COMPARED_METRICS.items():
+            if metric not in record or not previous.get(metric):
+                continue
+            change = (record[metric] - previous[metric]) / previous[metric]
+            if (change if larger_is_worse else -change) > threshold:
+                regressions.append({'benchmark': record['benchmark'], 'name': record['name'],
+                                    'reactions': record.get('reactions'), 'metric': metric,
+                                    'baseline': previous[metric], 'current': record[metric],
+                                    'change': change})
+    return regressions
+
+
+def _summary_line(record: Dict) -> str:
+    label = record['name'] + (f" x{record['reactions']}" if 'reactions' in record else '')
+    if 'skipped' in record:
+        return f"{record['benchmark']:<9} {label:<32} skipped: {record['skipped']}"
+    if 'error' in record:
+        return f"{record['benchmark']:<9} {label:<32} error: {record['error']}"
+    line = f"{record['benchmark']:<9} {label:<32} {record['seconds'] * 1000:9.2f} ms"
+    if 'peak_memory_bytes' in record:
+        line += f"  {record['peak_memory_bytes'] / 1e6:7.1f} MB"
+    if 'protocols_per_second' in record:
+        line += f"  {record['protocols_per_second']:7.1f} protocols/s"
+    return line
+
+
+def main(argv: Optional[List[str]] = None):
+    """Entry point for ``python -m pudu.benchmark``."""
+    parser = argparse.ArgumentParser(description='Benchmark PUDU import, simulation and generation')
+    parser.add_argument('-o', '--output', type=Path, default=None, help='Write results as JSON to this file')
+    parser.add_argument('--sizes', type=int, nargs='+', default=list(DEFAULT_SIZES),
+                        help='Reaction counts of the scaling inputs (default: 1 24 96 384)')
+    parser.add_argument('--backend', choices=['opentrons', 'dry_run'], default='opentrons',
+                        help='Simulation context for run() timings (default: opentrons)')
+    parser.add_argument('--protocols', nargs='+', default=None, help='Protocol classes to benchmark')
+    parser.add_argument('--compare', type=Path, default=None, help='Baseline results JSON to compare against')
+    parser.add_argument('--threshold', type=float, default=0.2,
+                        help='Relative slowdown reported as a regression (default: 0.2)')
+    args = parser.parse_args(argv)
+
+    results = run_benchmarks(sizes=args.sizes, backend=args.backend, protocols=args.protocols)
+    for record in results['results']:
+        print(_summary_line(record))
+
+    if args.output:
+        args.output.parent.mkdir(parents=True, exist_ok=True)
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
+        print(f"Results written to {args.output}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        regressions = compare_results(baseline, results, args.threshold)
+        for regression in regressions:
+            print(f"Regression: {regression['benchmark']} {regression['name']} "
+                  f"{regression['metric']} {regression['baseline']:.4g} -> {regression['current']:.4g} "
+                  f"({regression['change']:+.0%})", file=sys.stderr)
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -3,6 +3,7 @@ from opentrons import protocol_api
 from typing import List, Dict, Optional
 import xlsxwriter
 from pudu.utils import SmartPipette, Camera, colors
+from pudu.tip_budget import TipBudget
 
 class BaseCalibration(ABC):
     """
@@ -84,6 +85,7 @@ class BaseCalibration(ABC):
         self.buffer_positions = {}
         self.camera = Camera()
         self.smart_pipette = None
+        self.tip_budget = None
 
     @abstractmethod
     def _get_calibrant_layout(self) -> Dict:
@@ -105,6 +107,12 @@ class BaseCalibration(ABC):
         """Perform serial dilutions specific to this protocol"""
         pass
 
+    def _calculate_total_tips_needed(self) -> int:
+        """Tips for the buffers (one per buffer), the initial calibrants and each dilution series"""
+        layout = self._get_calibrant_layout()
+        initial_calibrant_wells = sum(len(wells) for wells in layout['calibrants'].values())
+        return 2 + initial_calibrant_wells + len(layout['dilution_series'])
+
     def _define_and_load_liquid(self, protocol, well, name: str, description: str = None,
                                 volume: float = 1000, color_index: int = None):
         """Define liquid and load it into specified well"""
@@ -124,8 +132,8 @@ class BaseCalibration(ABC):
 
     def _setup_hardware(self, protocol):
         """Setup shared hardware components"""
-        tiprack = protocol.load_labware(self.tiprack_labware, self.tiprack_position)
-        pipette = protocol.load_instrument(self.pipette, self.pipette_position, tip_racks=[tiprack])
+        self.tip_budget = TipBudget(self.tiprack_labware, [self.tiprack_position], self._calculate_total_tips_needed())
+        pipette = self.tip_budget.load_pipette(protocol, self.pipette, self.pipette_position)
         self.smart_pipette = SmartPipette(pipette, protocol)
         plate = protocol.load_labware(self.calibration_plate_labware, self.calibration_plate_position)
         tube_rack = protocol.load_labware(self.tube_rack_labware, self.tube_rack_position)
@@ -156,18 +164,19 @@ class BaseCalibration(ABC):
             buffers['pbs_sources'] = [pbs_falcon, pbs_falcon]
             buffers['water_sources'] = [water_falcon, water_falcon]
         else:
-            # Use individual tubes with liquid definition
+            # Use individual tubes with liquid definition. Each tube serves 11 wells
+            # of 100 µL plus the distribute disposal volume.
             pbs_1 = self._define_and_load_liquid(
-                protocol, tube_rack['A3'], "PBS Buffer 1", volume=1000, color_index=0
+                protocol, tube_rack['A3'], "PBS Buffer 1", volume=1400, color_index=0
             )
             pbs_2 = self._define_and_load_liquid(
-                protocol, tube_rack['A4'], "PBS Buffer 2", volume=1000, color_index=0
+                protocol, tube_rack['A4'], "PBS Buffer 2", volume=1400, color_index=0
             )
             water_1 = self._define_and_load_liquid(
-                protocol, tube_rack['A5'], "Deionized Water 1", volume=1000, color_index=1
+                protocol, tube_rack['A5'], "Deionized Water 1", volume=1400, color_index=1
             )
             water_2 = self._define_and_load_liquid(
-                protocol, tube_rack['A6'], "Deionized Water 2", volume=1000, color_index=1
+                protocol, tube_rack['A6'], "Deionized Water 2", volume=1400, color_index=1
             )
             buffers['pbs_sources'] = [pbs_1, pbs_2]
             buffers['water_sources'] = [water_1, water_2]
@@ -178,33 +187,31 @@ class BaseCalibration(ABC):
     def _dispense_dilution_buffers(self, protocol, pipette, plate, buffers, wells_layout):
         """Dispense PBS and water to designated wells"""
         # Dispense PBS
-        pipette.pick_up_tip()
+        self.tip_budget.pick_up_tip(protocol, pipette)
         for wells_range, source_idx in wells_layout['pbs']:
             target_wells = plate.wells()[wells_range[0]:wells_range[1]]
             source = buffers['pbs_sources'][source_idx]
             use_conical = self.use_falcon_tubes  # Enable conical tube handling for falcon tubes
 
-            for well in target_wells:
-                self.smart_pipette.liquid_transfer(
-                    volume=100, source=source, destination=well,
-                    asp_rate=self.aspiration_rate, disp_rate=self.dispense_rate,
-                    new_tip=False, drop_tip=False, use=use_conical
-                )
+            self.smart_pipette.distribute(
+                volume=100, source=source, destinations=target_wells,
+                asp_rate=self.aspiration_rate, disp_rate=self.dispense_rate,
+                new_tip=False, drop_tip=False, use=use_conical
+            )
         pipette.drop_tip()
 
         # Dispense water
-        pipette.pick_up_tip()
+        self.tip_budget.pick_up_tip(protocol, pipette)
         for wells_range, source_idx in wells_layout['water']:
             target_wells = plate.wells()[wells_range[0]:wells_range[1]]
             source = buffers['water_sources'][source_idx]
             use_conical = self.use_falcon_tubes  # Enable conical tube handling for falcon tubes
 
-            for well in target_wells:
-                self.smart_pipette.liquid_transfer(
-                    volume=100, source=source, destination=well,
-                    asp_rate=self.aspiration_rate, disp_rate=self.dispense_rate,
-                    new_tip=False, drop_tip=False, use=use_conical
-                )
+            self.smart_pipette.distribute(
+                volume=100, source=source, destinations=target_wells,
+                asp_rate=self.aspiration_rate, disp_rate=self.dispense_rate,
+                new_tip=False, drop_tip=False, use=use_conical
+            )
         pipette.drop_tip()
 
     def run(self, protocol: protocol_api.ProtocolContext):
@@ -283,6 +290,7 @@ class GFPODCalibration(BaseCalibration):
         """Dispense fluorescein and microspheres to starting wells"""
         # Fluorescein to A1, B1
         for well_name in ['A1', 'B1']:
+            self.tip_budget.before_pickup(protocol)
             self.smart_pipette.liquid_transfer(
                 volume=200, source=self.calibrant_positions['fluorescein_1x'],
                 destination=plate[well_name], asp_rate=self.aspiration_rate,
@@ -291,6 +299,7 @@ class GFPODCalibration(BaseCalibration):
 
         # Microspheres to C1, D1
         for well_name in ['C1', 'D1']:
+            self.tip_budget.before_pickup(protocol)
             self.smart_pipette.liquid_transfer(
                 volume=200, source=self.calibrant_positions['microspheres_1x'],
                 destination=plate[well_name], asp_rate=self.aspiration_rate,
@@ -302,7 +311,7 @@ class GFPODCalibration(BaseCalibration):
         layout = self._get_calibrant_layout()
 
         for start_idx, end_idx in layout['dilution_series']:
-            pipette.pick_up_tip()
+            self.tip_budget.pick_up_tip(protocol, pipette)
             for i in range(start_idx, end_idx):
                 source_well = plate.wells()[i]
                 dest_well = plate.wells()[i + 1]
@@ -343,6 +352,10 @@ class RGBODCalibration(BaseCalibration):
             ]
         }
 
+    def _calculate_total_tips_needed(self) -> int:
+        """Base count plus one PBS and one water tip to fill the wells to 200 µL"""
+        return super()._calculate_total_tips_needed() + 2
+
     def _load_calibrants(self, protocol, tube_rack) -> None:
         """Load all RGB calibrants and microspheres"""
         sulforhodamine_well = self._define_and_load_liquid(
@@ -375,24 +388,41 @@ class RGBODCalibration(BaseCalibration):
         })
 
     def _load_dilution_buffers(self, protocol, tube_rack, falcon_tube_rack) -> Dict:
-        """Extended buffer loading for RGB protocol"""
+        """
+        Extended buffer loading for RGB protocol.
+
+        Tubes 0-3 of each buffer feed the initial dispense and tubes 4-7 the
+        fill to 200 µL, so each 1.5 mL tube serves a single 11-well range.
+        """
         buffers = {}
 
         if self.use_falcon_tubes and falcon_tube_rack:
             # Use falcon tubes for all buffers
-            pbs_falcon = falcon_tube_rack['A1']
-            water_falcon = falcon_tube_rack['A2']
+            pbs_falcon = self._define_and_load_liquid(
+                protocol, falcon_tube_rack['A1'], "PBS Buffer",
+                "Phosphate Buffered Saline for dilutions", volume=15000, color_index=0
+            )
+            water_falcon = self._define_and_load_liquid(
+                protocol, falcon_tube_rack['A2'], "Deionized Water",
+                "Deionized Water for dilutions", volume=15000, color_index=1
+            )
             buffers['pbs_sources'] = [pbs_falcon] * 8
             buffers['water_sources'] = [water_falcon] * 8
         else:
-            # Use individual tubes
+            # Use individual tubes, each holding 11 wells of 100 µL plus the disposal volume
+            pbs_wells = ['A2', 'B2', 'C2', 'D2', 'A3', 'B3', 'C3', 'D3']
+            water_wells = ['A4', 'B4', 'C4', 'D4', 'A5', 'B5', 'C5', 'D5']
             buffers['pbs_sources'] = [
-                tube_rack['A2'], tube_rack['B2'], tube_rack['C2'], tube_rack['D2'],
-                tube_rack['A3'], tube_rack['B3'], tube_rack['C3'], tube_rack['D3']
+                self._define_and_load_liquid(
+                    protocol, tube_rack[well], f"PBS Buffer {i}", volume=1400, color_index=0
+                )
+                for i, well in enumerate(pbs_wells, start=1)
             ]
             buffers['water_sources'] = [
-                tube_rack['A4'], tube_rack['B4'], tube_rack['C4'], tube_rack['D4'],
-                tube_rack['A5'], tube_rack['B5'], tube_rack['C5'], tube_rack['D5']
+                self._define_and_load_liquid(
+                    protocol, tube_rack[well], f"Deionized Water {i}", volume=1400, color_index=1
+                )
+                for i, well in enumerate(water_wells, start=1)
             ]
 
         self.buffer_positions = buffers
@@ -412,6 +442,7 @@ class RGBODCalibration(BaseCalibration):
 
         for calibrant, well_names in calibrants_wells:
             for well_name in well_names:
+                self.tip_budget.before_pickup(protocol)
                 self.smart_pipette.liquid_transfer(
                     volume=200, source=self.calibrant_positions[calibrant],
                     destination=plate[well_name], asp_rate=self.aspiration_rate,
@@ -426,7 +457,7 @@ class RGBODCalibration(BaseCalibration):
         binit = self.calibrant_positions['binit']
 
         for start_idx, end_idx in layout['dilution_series']:
-            pipette.pick_up_tip()
+            self.tip_budget.pick_up_tip(protocol, pipette)
 
             # Serial dilutions
             for i in range(start_idx, end_idx):
@@ -455,27 +486,28 @@ class RGBODCalibration(BaseCalibration):
         layout = self._get_calibrant_layout()
         buffers = self.buffer_positions
         use_conical = self.use_falcon_tubes  # Enable conical tube handling for falcon tubes
+        offset = 4  # Second set of buffer tubes; the first set fed _dispense_dilution_buffers
 
         # Add PBS to calibrant wells
-        pipette.pick_up_tip()
+        self.tip_budget.pick_up_tip(protocol, pipette)
         for wells_range, source_idx in layout['pbs']:
             target_wells = plate.wells()[wells_range[0]:wells_range[1]]
-            source = buffers['pbs_sources'][source_idx]
-            for well in target_wells:
-                self.smart_pipette.liquid_transfer(
-                    protocol, pipette, 100, source, well,
-                    new_tip=False, drop_tip=False, use=use_conical
-                )
+            source = buffers['pbs_sources'][source_idx + offset]
+            self.smart_pipette.distribute(
+                volume=100, source=source, destinations=target_wells,
+                asp_rate=self.aspiration_rate, disp_rate=self.dispense_rate,
+                new_tip=False, drop_tip=False, use=use_conical
+            )
         pipette.drop_tip()
 
         # Add water to blank wells
-        pipette.pick_up_tip()
+        self.tip_budget.pick_up_tip(protocol, pipette)
         for wells_range, source_idx in layout['water']:
             target_wells = plate.wells()[wells_range[0]:wells_range[1]]
-            source = buffers['water_sources'][source_idx]
-            for well in target_wells:
-                self.smart_pipette.liquid_transfer(
-                    protocol, pipette, 100, source, well,
-                    new_tip=False, drop_tip=False, use=use_conical
-                )
+            source = buffers['water_sources'][source_idx + offset]
+            self.smart_pipette.distribute(
+                volume=100, source=source, destinations=target_wells,
+                asp_rate=self.aspiration_rate, disp_rate=self.dispense_rate,
+                new_tip=False, drop_tip=False, use=use_conical
+            )
         pipette.drop_tip()
\ No newline at end of file
@@ -0,0 +1,339 @@
+"""
+Assembly, transformation and plating in one OT-2 run.
+
+``AssemblyTransformationPlating`` runs ``SBOLLoopAssembly``,
+``HeatShockTransformation`` and ``Plating`` one after another in a single
+``run()``, so the robot is not restarted and re-homed between stages and no
+well map is transcribed by hand:
+
+* the thermocycler and its plate stay in place: the transformation takes the
+  DNA straight from the assembly wells and puts its reactions in the wells after
+  them, and the plating picks the bacteria up from the same plate;
+* the temperature module, the tip racks and the pipettes are shared, and each
+  stage continues the tip racks the previous one left partially used;
+* labware a stage no longer needs is moved off deck when the next stage needs
+  its slot, and the run pauses between stages for the operator to swap the
+  reagents.
+
+The stages hand their outputs to the next stage in memory, so a simulated run
+does not write the per-stage files (``transformation_input.json``,
+``plating_input.json``, the tip state and the Excel layouts).
+
+The stages share the deck through ``SharedDeck``. Before a run on the robot the
+whole run is dry-run first (``validate_deck``), so deck conflicts are reported
+before any liquid is moved.
+
+Example::
+
+    from pudu.consolidated import AssemblyTransformationPlating
+
+    def run(protocol):
+        AssemblyTransformationPlating(assemblies, strains).run(protocol)
+"""
+
+import contextlib
+import copy
+import io
+from typing import Dict, List, Optional
+
+from pudu.assembly import SBOLLoopAssembly
+from pudu.plating import Plating
+from pudu.runtime import OT2_SLOT_POSITIONS
+from pudu.tip_budget import updated_tip_state
+from pudu.transformation import HeatShockTransformation
+
+THERMOCYCLER_SLOT = '7'
+
+
+def _module_kind(module_name: str) -> str:
+    name = module_name.lower()
+    if 'thermocycler' in name:
+        return 'thermocycler'
+    if 'temperature' in name or 'tempdeck' in name:
+        return 'temperature'
+    return name
+
+
+class _SharedModule:
+    """Module handed to every stage; its labware is loaded once and then handed back."""
+
+    def __init__(self, module, kind: str):
+        self._module = module
+        self.kind = kind
+        self.labware_name = None
+        self.shared_labware = None
+
+    def __getattr__(self, name):
+        return getattr(self._module, name)
+
+    def load_labware(self, name, *args, **kwargs):
+        if self.shared_labware is None:
+            self.shared_labware = self._module.load_labware(name, *args, **kwargs)
+            self.labware_name = name
+        elif name != self.labware_name:
+            raise ValueError(f"The {self.kind} module already holds '{self.labware_name}' from an earlier "
+                             f"stage and cannot take '{name}'")
+        return self.shared_labware
+
+
+class SharedDeck:
+    """
+    ``ProtocolContext`` wrapper that lets consecutive protocol stages share one deck.
+
+    A module, module labware or labware loaded by an earlier stage is handed back
+    when a later stage loads the same thing in the same slot. That keeps the
+    thermocycler plate in place and reuses partially used tip racks. Labware an
+    earlier stage left in a slot the current stage needs for something else is
+    moved off deck. A pipette loaded on a mount an earlier stage used replaces
+    the earlier one. Everything else is forwarded to the wrapped context.
+
+    Attributes:
+        stage: Name of the stage being run.
+        layout: ``{stage: {slot: load name}}`` of what each stage placed on the deck.
+    """
+
+    def __init__(self, protocol):
+        self._protocol = protocol
+        self.stage = None
+        self.layout: Dict[str, Dict[str, str]] = {}
+        self._slots = {}  # slot -> [load name, labware or _SharedModule, stage that last used it]
+        self._aliases = {}
+        self._mounts = set()
+
+    def __getattr__(self, name):
+        return getattr(self._protocol, name)
+
+    def begin_stage(self, name: str):
+        """Start a stage: later loads are checked against what earlier stages placed."""
+        self.stage = name
+        self.layout[name] = {}
+        self._aliases = {}
+
+    def alias(self, slot, labware):
+        """Hand *labware* back when the current stage loads labware into *slot*."""
+        self._aliases[str(slot)] = labware
+
+    def module_labware(self, kind: str):
+        """Labware on the module of *kind* (``'thermocycler'`` or ``'temperature'``)."""
+        for _, item, _ in self._slots.values():
+            if isinstance(item, _SharedModule) and item.kind == kind:
+                return item.shared_labware
+        raise ValueError(f"No {kind} module has been loaded")
+
+    def _reuse(self, slot: str, load_name: str):
+        """The labware to hand back for *load_name* in *slot*, after clearing the slot if needed."""
+        occupant = self._slots.get(slot)
+        if occupant is None:
+            return None
+        name, item, stage = occupant
+        if stage == self.stage and name != load_name:
+            raise ValueError(f"Deck slot {slot} is used twice in the {self.stage} stage "
+                             f"('{name}' and '{load_name}')")
+        if isinstance(item, _SharedModule):
+            raise ValueError(f"Deck slot {slot} holds the {name} from the {stage} stage; "
+                             f"the {self.stage} stage cannot load '{load_name}' there")
+        if name == load_name:
+            return item
+        self._protocol.comment(f"Remove {name} ({stage} stage) from slot {slot}")
+        self._protocol.move_labware(labware=item, new_location=self._off_deck())
+        del self._slots[slot]
+        return None
+
+    @staticmethod
+    def _off_deck():
+        from opentrons import protocol_api
+
+        return protocol_api.OFF_DECK
+
+    def _record(self, slot: str, load_name: str, item):
+        self._slots[slot] = [load_name, item, self.stage]
+        self.layout[self.stage][slot] = load_name
+
+    def load_module(self, module_name: str, location=None, *args, **kwargs):
+        kind = _module_kind(module_name)
+        slot = THERMOCYCLER_SLOT if kind == 'thermocycler' else str(location)
+        occupant = self._slots.get(slot)
+        if occupant is not None and isinstance(occupant[1], _SharedModule) and occupant[1].kind == kind:
+            module = occupant[1]
+        else:
+            if occupant is not None:
+                raise ValueError(f"Deck slot {slot} holds '{occupant[0]}' from the {occupant[2]} stage; "
+                                 f"the {self.stage} stage cannot load the {module_name} there")
+            module = _SharedModule(self._protocol.load_module(module_name, location, *args, **kwargs), kind)
+        self._record(slot, module_name, module)
+        return module
+
+    def load_labware(self, load_name: str, location, *args, **kwargs):
+        slot = str(location)
+        if slot in self._aliases:
+            return self._aliases[slot]
+        if slot not in OT2_SLOT_POSITIONS:
+            # Off deck, or a location the wrapped context resolves itself
+            return self._protocol.load_labware(load_name, location, *args, **kwargs)
+        labware = self._reuse(slot, load_name)
+        if labware is None:
+            labware = self._protocol.load_labware(load_name, location, *args, **kwargs)
+        self._record(slot, load_name, labware)
+        return labware
+
+    def move_labware(self, labware, new_location, *args, **kwargs):
+        load_name = getattr(labware, 'load_name', None)
+        for slot, (name, item, _) in list(self._slots.items()):
+            if item is labware:
+                load_name = name
+                del self._slots[slot]
+        self._protocol.move_labware(labware=labware, new_location=new_location, *args, **kwargs)
+        if str(new_location) in OT2_SLOT_POSITIONS:
+            self._record(str(new_location), load_name, labware)
+
+    def load_instrument(self, instrument_name: str, mount: str, *args, **kwargs):
+        if mount in self._mounts:
+            kwargs['replace'] = True
+        self._mounts.add(mount)
+        return self._protocol.load_instrument(instrument_name, mount, *args, **kwargs)
+
+
+class AssemblyTransformationPlating:
+    """
+    SBOL loop assembly, heat-shock transformation and plating in one OT-2 run.
+
+    Unless the stage parameters say otherwise, the stages share the deck:
+
+    * the transformation and the plating use the assembly's thermocycler plate,
+      temperature module and 20 µL tip racks (slot 9 by default);
+    * the assembly tip racks sit in the transformation's p20 slot, further racks
+      are swapped in from off deck;
+    * the plating uses the transformation's 200 µL tip racks for LB.
+
+    Attributes:
+        assembly: ``SBOLLoopAssembly`` stage.
+        transformation: ``HeatShockTransformation`` stage, built in ``run()`` from
+            the assembly's plasmid wells.
+        plating: ``Plating`` stage, built in ``run()`` from the transformation's
+            bacterium locations.
+        transformation_data: Transformation list (``Strain``, ``Chassis``,
+            ``Plasmids``); the plasmids are assembly products.
+        transformation_params: Advanced parameters of the transformation stage.
+        plating_params: Advanced parameters of the plating stage.
+        tip_state: Partially used tip racks on the robot before the assembly.
+        deck_layout: ``{stage: {slot: load name}}``, filled by ``run()``.
+    """
+
+    def __init__(self, assembly_data, transformation_data: List[Dict],
+                 assembly_params: Optional[Dict] = None,
+                 transformation_params: Optional[Dict] = None,
+                 plating_params: Optional[Dict] = None,
+                 tip_state: Optional[Dict] = None):
+        assembly_params = dict({'tiprack_positions': ['9']}, **(assembly_params or {}))
+        self.assembly = SBOLLoopAssembly(assembly_data, json_params=assembly_params, tip_state=tip_state)
+        self.assembly.export_outputs = False
+        self.transformation_data = transformation_data
+        self.transformation_params = transformation_params or {}
+        self.plating_params = plating_params or {}
+        self.tip_state = tip_state
+        self.transformation = None
+        self.plating = None
+        self.deck_layout = {}
+        self._validated = False
+
+    def _transformation_params(self, thermocycler_plate, plasmid_locations: Dict) -> Dict:
+        """Transformation parameters sharing the assembly's modules and tip racks, reactions after its wells."""
+        wells = [well.well_name for well in thermocycler_plate.wells()]
+        assembly_wells = [well for well_names in plasmid_locations.values() for well in well_names]
+        next_well = max(wells.index(well) for well in assembly_wells) + 1
+
+        params = {
+            'thermocycler_labware': self.assembly.thermocycler_labware,
+            'temperature_module_labware': self.assembly.temperature_module_labware,
+            'temperature_module_position': self.assembly.temperature_module_position,
+            'tiprack_p20_labware': self.assembly.tiprack_labware,
+            'tiprack_p20_position': self.assembly.tiprack_positions[0],
+            'thermocycler_starting_well': next_well,
+        }
+        params.update(self.transformation_params)
+        if params['thermocycler_starting_well'] < next_well:
+            raise ValueError(f"thermocycler_starting_well {params['thermocycler_starting_well']} of the "
+                             f"transformation overlaps the assembly reactions, which end at well "
+                             f"{wells[next_well - 1]}. Use {next_well} or later")
+        return params
+
+    def _plating_params(self) -> Dict:
+        """Plating parameters sharing the thermocycler plate and the transformation tip racks."""
+        params = {
+            'thermocycler_labware': self.assembly.thermocycler_labware,
+            'small_tiprack': self.transformation.tiprack_p20_labware,
+            'small_tiprack_position': self.transformation.tiprack_p20_position,
+            'large_tiprack': self.transformation.tiprack_p200_labware,
+            'large_tiprack_position': self.transformation.tiprack_p200_position,
+        }
+        params.update(self.plating_params)
+        return params
+
+    def validate_deck(self) -> Dict[str, Dict[str, str]]:
+        """
+        Dry-run the whole run to check the stages fit on one deck.
+
+        Returns:
+            ``{stage: {slot: load name}}`` of the combined deck layout.
+
+        Raises:
+            ValueError: If a stage needs a slot held by a module or by its own
+                labware, or rejects the output of the previous stage.
+        """
+        from pudu.dry_run import dry_run
+
+        plan = copy.deepcopy(self)
+        plan._validated = True
+        # The stages print their location maps at the end of run()
+        with contextlib.redirect_stdout(io.StringIO()):
+            dry_run(plan, simulating=False)
+        return plan.deck_layout
+
+    def run(self, protocol: 'protocol_api.ProtocolContext'):
+        """
+        Run the assembly, transformation and plating stages on one deck.
+
+        The run pauses before the transformation and before the plating so the
+        operator can swap the reagents and place the plating labware.
+        """
+        if not self._validated:
+            self.validate_deck()
+            self._validated = True
+
+        deck = SharedDeck(protocol)
+
+        # Stage 1: assembly
+        deck.begin_stage('assembly')
+        protocol.comment("\n=== Stage 1/3: Loop assembly ===")
+        self.assembly.run(deck)
+        tip_state = updated_tip_state([self.assembly.tip_budget], self.tip_state, type(self.assembly).__name__)
+        plasmid_locations = {uri: list(wells) for uri, wells in self.assembly.product_uri_to_wells.items()}
+
+        # Stage 2: transformation, DNA taken straight from the assembly wells
+        thermocycler_plate = deck.module_labware('thermocycler')
+        self.transformation = HeatShockTransformation(
+            transformation_data=self.transformation_data,
+            plasmid_locations=plasmid_locations,
+            json_params=self._transformation_params(thermocycler_plate, plasmid_locations),
+            tip_state=tip_state)
+        self.transformation.export_outputs = False
+        protocol.pause("Assembly done. Replace the assembly reagents on the temperature module with the "
+                       "transformation reagents, then resume.")
+        deck.begin_stage('transformation')
+        deck.alias(self.transformation.dna_plate_position, thermocycler_plate)
+        protocol.comment("\n=== Stage 2/3: Heat shock transformation ===")
+        self.transformation.run(deck)
+        tip_state = updated_tip_state(self.transformation.tip_budgets.values(), tip_state,
+                                      type(self.transformation).__name__)
+
+        # Stage 3: plating from the same thermocycler plate
+        self.plating = Plating(plating_data=self.transformation.get_plating_input(),
+                               json_params=self._plating_params(), tip_state=tip_state)
+        self.plating.export_outputs = False
+        protocol.pause("Transformation done. Place the LB, dilution plate(s) and agar plate(s) for plating, "
+                       "then resume.")
+        deck.begin_stage('plating')
+        protocol.comment("\n=== Stage 3/3: Plating ===")
+        self.plating.run(deck)
+
+        self.deck_layout = deck.layout
@@ -0,0 +1,801 @@
+"""
+Lightweight stand-in for the Opentrons ``ProtocolContext``.
+
+:class:`DryRunContext` implements the subset of the Protocol API used by the
+PUDU protocol classes (labware, modules, pipettes, liquid tracking, tip
+tracking and ``move_labware``) without the Opentrons simulator. Every command
+is recorded as a plain dict in ``DryRunContext.command_log`` using the same
+record format as :class:`pudu.runtime.CommandRecorder`, so the stream can be
+fed straight to :func:`pudu.runtime.estimate_commands`.
+
+A dry run still catches the planning errors a simulation would: deck slot
+conflicts, running out of tips, aspirating without a tip or beyond the
+pipette's capacity.
+
+Example::
+
+    from pudu.dry_run import dry_run
+
+    context = dry_run(SBOLLoopAssembly(assemblies, output_xlsx=False), simulating=False)
+    print(len(context.command_log))
+"""
+
+import functools
+import math
+import re
+from collections import namedtuple
+from typing import Dict, List, Optional
+
+from pudu.runtime import CommandRecorder
+
+Point = namedtuple('Point', ['x', 'y', 'z'])
+
+# Front-left corner of each OT-2 deck slot in mm
+SLOT_ORIGINS = {
+    str(slot): Point(((slot - 1) % 3) * 132.5, ((slot - 1) // 3) * 90.5, 0.0) for slot in range(1, 12)
+}
+THERMOCYCLER_SLOTS = ('7', '8', '10', '11')
+OFF_DECK = 'off-deck'  # value of opentrons.protocol_api.OFF_DECK (OffDeckType.OFF_DECK)
+
+PIPETTE_SPECS = {
+    # name: (max_volume, min_volume, default flow rate in µL/s)
+    'p20_single_gen2': (20, 1, 7.56),
+    'p20_multi_gen2': (20, 1, 7.6),
+    'p300_single_gen2': (300, 20, 92.86),
+    'p300_multi_gen2': (300, 20, 94.0),
+    'p1000_single_gen2': (1000, 100, 274.7),
+}
+
+_LABWARE_GRIDS = {384: (16, 24), 96: (8, 12), 48: (6, 8), 24: (4, 6), 15: (3, 5), 12: (3, 4), 6: (2, 3), 1: (1, 1)}
+
+
+@functools.lru_cache(maxsize=None)
+def _labware_definition(load_name: str) -> Optional[Dict]:
+    """Load the Opentrons labware definition for *load_name*, if it is available."""
+    try:
+        from opentrons_shared_data.labware import load_definition
+    except ImportError:
+        return None
+    for version in range(1, 5):
+        try:
+            return load_definition(load_name, version)
+        except Exception:
+            continue
+    return None
+
+
+def _synthetic_definition(load_name: str) -> Dict:
+    """Build a regular well grid from the labware name when no definition is available."""
+    name = load_name.lower()
+    counts = [int(n) for n in re.findall(r'(?:^|_)(\d+)(?=_)', name)]
+    count = next((n for n in counts if n in _LABWARE_GRIDS), 96)
+    rows, columns = _LABWARE_GRIDS[count]
+    if 'reservoir' in name and count == 12:
+        rows, columns = 1, 12
+    volume_match = re.search(r'(\d+(?:\.\d+)?)(ul|ml)', name)
+    if volume_match:
+        volume = float(volume_match.group(1)) * (1000 if volume_match.group(2) == 'ml' else 1)
+    else:
+        volume = 200.0
+    pitch_x = 127.76 / (columns + 1)
+    pitch_y = 85.48 / (rows + 1)
+    ordering = []
+    wells = {}
+    for column in range(columns):
+        ordering.append([])
+        for row in range(rows):
+            well_name = f"{chr(ord('A') + row)}{column + 1}"
+            ordering[-1].append(well_name)
+            wells[well_name] = {
+                'depth': 10.0, 'diameter': min(pitch_x, pitch_y) * 0.8, 'totalLiquidVolume': volume,
+                'x': pitch_x * (column + 1), 'y': 85.48 - pitch_y * (row + 1), 'z': 5.0,
+            }
+    return {
+        'ordering': ordering,
+        'wells': wells,
+        'parameters': {'isTiprack': 'tip' in name, 'loadName': load_name},
+        'metadata': {'displayName': load_name},
+    }
+
+
+def _is_off_deck(location) -> bool:
+    return location is None or getattr(location, 'value', location) == OFF_DECK
+
+
+def _recorded(target_kind: str):
+    """Record calls to the decorated method in the owning context's command log."""
+    def decorator(method):
+        @functools.wraps(method)
+        def wrapper(self, *args, **kwargs):
+            context = self._context
+            context._depth += 1
+            try:
+                result = method(self, *args, **kwargs)
+            finally:
+                context._depth -= 1
+            if context._depth == 0:
+                entry = context.recorder.record(target_kind, self, method.__name__,
+                                                method.__get__(self), args, kwargs)
+                context.recorder.annotate(method.__name__, entry, result)
+            return result
+        return wrapper
+    return decorator
+
+
+class DryRunLiquid:
+    """Liquid defined with ``define_liquid``."""
+
+    def __init__(self, name: str, description: Optional[str] = None, display_color: Optional[str] = None):
+        self.name = name
+        self.description = description
+        self.display_color = display_color
+
+    def __repr__(self):
+        return f"DryRunLiquid({self.name!r})"
+
+
+class _LocationLabware:
+    """Mimics ``Location.labware`` so callers can use ``as_well()``/``as_labware()``."""
+
+    def __init__(self, obj):
+        self.object = obj
+
+    def as_well(self):
+        return self.object if isinstance(self.object, DryRunWell) else None
+
+    def as_labware(self):
+        if isinstance(self.object, DryRunWell):
+            return self.object.parent
+        return self.object
+
+
+class DryRunLocation:
+    """A point on the deck, optionally tied to a well (``well.top()``, ``well.bottom()``)."""
+
+    def __init__(self, point: Point, obj=None):
+        self.point = point
+        self.labware = _LocationLabware(obj)
+
+    def move(self, point):
+        return DryRunLocation(Point(self.point.x + point.x, self.point.y + point.y,
+                                    self.point.z + point.z), self.labware.object)
+
+    def __repr__(self):
+        return f"Location(point={self.point}, labware={self.labware.object})"
+
+
+class DryRunWell:
+    """Well with liquid tracking that mirrors ``current_liquid_volume`` of API 2.21."""
+
+    def __init__(self, labware, well_name: str, geometry: Dict):
+        self.parent = labware
+        self.well_name = well_name
+        self.max_volume = geometry.get('totalLiquidVolume', 0)
+        self.depth = geometry.get('depth', 0)
+        self.diameter = geometry.get('diameter')
+        self._offset = Point(geometry.get('x', 0), geometry.get('y', 0), geometry.get('z', 0))
+        self._volume = None
+        self.liquid = None
+        self.has_tip = bool(labware.is_tiprack)
+        # Liquid moved in and out by the pipettes, whether or not a volume was loaded
+        self.loaded_volume = None
+        self.net_change = 0.0
+        self.peak_withdrawal = 0.0
+
+    @property
+    def _origin(self) -> Point:
+        base = self.parent._origin
+        return Point(base.x + self._offset.x, base.y + self._offset.y, base.z + self._offset.z)
+
+    def top(self, z: float = 0.0) -> DryRunLocation:
+        origin = self._origin
+        return DryRunLocation(Point(origin.x, origin.y, origin.z + self.depth + z), self)
+
+    def bottom(self, z: float = 0.0) -> DryRunLocation:
+        origin = self._origin
+        return DryRunLocation(Point(origin.x, origin.y, origin.z + z), self)
+
+    def center(self) -> DryRunLocation:
+        return self.bottom(self.depth / 2)
+
+    def load_liquid(self, liquid, volume: float):
+        self.liquid = liquid
+        self._volume = float(volume)
+        self.loaded_volume = float(volume)
+
+    def load_empty(self):
+        self._volume = 0.0
+
+    def current_liquid_volume(self) -> float:
+        if self._volume is None:
+            raise RuntimeError(f"Must load liquid into {self} before reading its volume")
+        return self._volume
+
+    def current_liquid_height(self) -> float:
+        volume = self.current_liquid_volume()
+        if not self.diameter:
+            return self.depth * volume / self.max_volume if self.max_volume else 0.0
+        return volume / (math.pi * (self.diameter / 2) ** 2)
+
+    def _change_volume(self, delta: float):
+        self.net_change += delta
+        self.peak_withdrawal = max(self.peak_withdrawal, -self.net_change)
+        if self._volume is not None:
+            self._volume = max(self._volume + delta, 0.0)
+
+    def __repr__(self):
+        return f"{self.well_name} of {self.parent}"
+
+
+class DryRunLabware:
+    """Labware built from the Opentrons labware definition (or a regular grid fallback)."""
+
+    def __init__(self, context, load_name: str, parent, label: Optional[str] = None):
+        self._context = context
+        self.load_name = load_name
+        self.parent = parent
+        definition = _labware_definition(load_name) or _synthetic_definition(load_name)
+        self.is_tiprack = bool(definition['parameters'].get('isTiprack'))
+        self.name = label or definition['metadata'].get('displayName', load_name)
+        self._columns = [[DryRunWell(self, name, definition['wells'][name]) for name in column]
+                         for column in definition['ordering']]
+        self._wells = [well for column in self._columns for well in column]
+        self._wells_by_name = {well.well_name: well for well in self._wells}
+        context.all_labware.append(self)
+
+    @property
+    def _origin(self) -> Point:
+        parent = self.parent
+        if isinstance(parent, DryRunModule):
+            base = SLOT_ORIGINS.get(parent.parent, Point(0, 0, 0))
+            return Point(base.x, base.y, base.z + parent.labware_height)
+        return SLOT_ORIGINS.get(parent, Point(0, 0, 0))
+
+    def wells(self, *names) -> List[DryRunWell]:
+        if names:
+            return [self._wells_by_name[name] for name in names]
+        return list(self._wells)
+
+    def wells_by_name(self) -> Dict[str, DryRunWell]:
+        return dict(self._wells_by_name)
+
+    def columns(self) -> List[List[DryRunWell]]:
+        return [list(column) for column in self._columns]
+
+    def rows(self) -> List[List[DryRunWell]]:
+        return [list(row) for row in zip(*self._columns)]
+
+    def columns_by_name(self) -> Dict[str, List[DryRunWell]]:
+        return {str(index + 1): column for index, column in enumerate(self.columns())}
+
+    def rows_by_name(self) -> Dict[str, List[DryRunWell]]:
+        return {row[0].well_name[0]: row for row in self.rows()}
+
+    def well(self, index):
+        if isinstance(index, str):
+            return self._wells_by_name[index]
+        return self._wells[index]
+
+    def __getitem__(self, well_name: str) -> DryRunWell:
+        return self._wells_by_name[well_name]
+
+    def top(self, z: float = 0.0) -> DryRunLocation:
+        return self._wells[0].top(z)
+
+    def reset(self):
+        for well in self._wells:
+            well.has_tip = self.is_tiprack
+
+    def next_tip(self, num_tips: int = 1, starting_tip: Optional[DryRunWell] = None) -> Optional[DryRunWell]:
+        """First available tip at or after *starting_tip*; full columns only for 8 tips."""
+        started = starting_tip is None
+        for column in self._columns:
+            for index, well in enumerate(column):
+                if well is starting_tip:
+                    started = True
+                if not started:
+                    continue
+                if num_tips == 1 and well.has_tip:
+                    return well
+                if num_tips > 1 and index == 0 and all(tip.has_tip for tip in column[:num_tips]):
+                    return well
+        return None
+
+    def __repr__(self):
+        return f"{self.name} on {self.parent}"
+
+
+class DryRunModule:
+    """Generic hardware module; subclasses add temperature and thermocycler commands."""
+
+    labware_height = 0.0
+
+    def __init__(self, context, module_name: str, slot: str):
+        self._context = context
+        self.module_name = module_name
+        self.parent = slot
+        self.labware = None
+
+    @_recorded('module')
+    def load_labware(self, name: str, label: Optional[str] = None, namespace: Optional[str] = None,
+                     version: Optional[int] = None):
+        if self.labware is not None:
+            raise ValueError(f"{self} already has {self.labware} loaded")
+        self.labware = DryRunLabware(self._context, name, self, label)
+        return self.labware
+
+    def __repr__(self):
+        return f"{type(self).__name__} on {self.parent}"
+
+
+class DryRunTemperatureModule(DryRunModule):
+    labware_height = 80.0
+
+    def __init__(self, context, module_name: str, slot: str):
+        super().__init__(context, module_name, slot)
+        self.temperature = None
+        self.target = None
+
+    @_recorded('module')
+    def set_temperature(self, celsius: float):
+        self.target = celsius
+        self.temperature = celsius
+
+    @_recorded('module')
+    def start_set_temperature(self, celsius: float):
+        self.target = celsius
+
+    @_recorded('module')
+    def await_temperature(self, celsius: float):
+        self.temperature = celsius
+
+    @_recorded('module')
+    def deactivate(self):
+        self.target = None
+
+
+class DryRunThermocycler(DryRunModule):
+    labware_height = 100.0
+
+    def __init__(self, context, module_name: str, slot: str = '7'):
+        super().__init__(context, module_name, slot)
+        self.lid_position = 'open'
+        self.block_temperature = None
+        self.lid_temperature = None
+
+    @_recorded('module')
+    def open_lid(self):
+        self.lid_position = 'open'
+
+    @_recorded('module')
+    def close_lid(self):
+        self.lid_position = 'closed'
+
+    @_recorded('module')
+    def set_lid_temperature(self, temperature: float):
+        self.lid_temperature = temperature
+
+    @_recorded('module')
+    def set_block_temperature(self, temperature: float, hold_time_seconds: Optional[float] = None,
+                              hold_time_minutes: Optional[float] = None, ramp_rate: Optional[float] = None,
+                              block_max_volume: Optional[float] = None):
+        self.block_temperature = temperature
+
+    @_recorded('module')
+    def execute_profile(self, steps: List[Dict], repetitions: int, block_max_volume: Optional[float] = None):
+        if not steps:
+            raise ValueError("execute_profile requires at least one step")
+        for step in steps:
+            if 'temperature' not in step:
+                raise ValueError(f"Profile step {step} has no 'temperature'")
+        self.block_temperature = steps[-1]['temperature']
+
+    @_recorded('module')
+    def deactivate_lid(self):
+        self.lid_temperature = None
+
+    @_recorded('module')
+    def deactivate_block(self):
+        self.block_temperature = None
+
+    @_recorded('module')
+    def deactivate(self):
+        self.lid_temperature = None
+        self.block_temperature = None
+
+
+class _FlowRates:
+    def __init__(self, rate: float):
+        self.aspirate = rate
+        self.dispense = rate
+        self.blow_out = rate
+
+
+class DryRunPipette:
+    """Single- or multi-channel pipette with tip and volume tracking."""
+
+    def __init__(self, context, name: str, mount: str, tip_racks=None):
+        self._context = context
+        self.name = name
+        self.mount = mount
+        max_volume, min_volume, flow_rate = PIPETTE_SPECS.get(name, (20, 1, 7.56))
+        self.max_volume = max_volume
+        self.min_volume = min_volume
+        self.nozzles = 8 if 'multi' in name else 1
+        self.channels = self.nozzles
+        self.flow_rate = _FlowRates(flow_rate)
+        self.tip_racks = list(tip_racks or [])
+        self.starting_tip = None
+        self.has_tip = False
+        self.current_volume = 0.0
+        self._location = None
+        self._last_tip_picked_up_from = None
+
+    # -- helpers -------------------------------------------------------------
+
+    @staticmethod
+    def _well_of(location):
+        if isinstance(location, DryRunWell):
+            return location
+        if isinstance(location, DryRunLocation):
+            return location.labware.as_well()
+        return None
+
+    def _next_tip(self) -> DryRunWell:
+        racks = self.tip_racks
+        start = self.starting_tip
+        if start is not None and start.parent in racks:
+            racks = racks[racks.index(start.parent):]
+        else:
+            start = None
+        for rack in racks:
+            tip = rack.next_tip(num_tips=self.channels,
+                                starting_tip=start if start is not None and rack is start.parent else None)
+            if tip is not None:
+                return tip
+        raise RuntimeError(f"{self.name} has run out of tips: all {len(self.tip_racks)} tip rack(s) are empty")
+
+    def _channel_wells(self, well: DryRunWell) -> List[DryRunWell]:
+        """Wells reached by the nozzles when the first channel is over *well*."""
+        if self.channels == 1:
+            return [well]
+        column = next(column for column in well.parent._columns if well in column)
+        start = column.index(well)
+        return column[start:start + self.channels]
+
+    def _change_volume(self, location, volume: float):
+        well = self._well_of(location)
+        if well is None:
+            return
+        wells = self._channel_wells(well)
+        # Channels that do not land on their own well (e.g. a reservoir) share the first one
+        wells[0]._change_volume(volume * (self.channels - len(wells) + 1))
+        for other in wells[1:]:
+            other._change_volume(volume)
+
+    def _require_tip(self, action: str):
+        if not self.has_tip:
+            raise RuntimeError(f"Cannot {action} with {self.name}: no tip attached")
+
+    def configure_nozzle_layout(self, style, start: Optional[str] = None, end: Optional[str] = None,
+                                front_right: Optional[str] = None, back_left: Optional[str] = None,
+                                tip_racks=None):
+        """Switch between all nozzles (``ALL``) and one nozzle (``SINGLE``)."""
+        layout = getattr(style, 'value', style)
+        if layout not in ('ALL', 'SINGLE'):
+            raise ValueError(f"Nozzle layout {layout} is not supported by the dry run. Use ALL or SINGLE")
+        if self.has_tip:
+            raise RuntimeError(f"Cannot configure the nozzle layout of {self.name} while it has a tip attached")
+        self.channels = self.nozzles if layout == 'ALL' else 1
+        if tip_racks is not None:
+            self.tip_racks = list(tip_racks)
+
+    # -- recorded commands --------------------------------------------------
+
+    @_recorded('pipette')
+    def pick_up_tip(self, location=None):
+        if self.has_tip:
+            raise RuntimeError(f"Cannot pick up a tip with {self.name}: a tip is already attached")
+        tip = self._well_of(location) if location is not None else self._next_tip()
+        if _is_off_deck(tip.parent.parent):
+            raise RuntimeError(f"Cannot pick up tip {tip}: the tip rack is off deck")
+        for well in self._channel_wells(tip):
+            well.has_tip = False
+        self.has_tip = True
+        self._location = tip
+        self._last_tip_picked_up_from = tip
+        return self
+
+    @_recorded('pipette')
+    def drop_tip(self, location=None, home_after: Optional[bool] = None):
+        self._require_tip('drop tip')
+        self.has_tip = False
+        self.current_volume = 0.0
+        return self
+
+    @_recorded('pipette')
+    def return_tip(self, home_after: Optional[bool] = None):
+        self._require_tip('return tip')
+        self.has_tip = False
+        self.current_volume = 0.0
+        return self
+
+    @_recorded('pipette')
+    def aspirate(self, volume: Optional[float] = None, location=None, rate: float = 1.0):
+        self._require_tip('aspirate')
+        if volume is None:
+            volume = self.max_volume - self.current_volume
+        if self.current_volume + volume > self.max_volume + 1e-6:
+            raise ValueError(
+                f"Cannot aspirate {volume}µL with {self.name}: {self.current_volume}µL already in the tip "
+                f"and the maximum volume is {self.max_volume}µL")
+        self._change_volume(location if location is not None else self._location, -volume)
+        self.current_volume += volume
+        self._location = location if location is not None else self._location
+        return self
+
+    @_recorded('pipette')
+    def dispense(self, volume: Optional[float] = None, location=None, rate: float = 1.0,
+                 push_out: Optional[float] = None):
+        self._require_tip('dispense')
+        if volume is None or volume > self.current_volume:
+            volume = self.current_volume
+        self._change_volume(location if location is not None else self._location, volume)
+        self.current_volume -= volume
+        self._location = location if location is not None else self._location
+        return self
+
+    @_recorded('pipette')
+    def mix(self, repetitions: int = 1, volume: Optional[float] = None, location=None, rate: float = 1.0):
+        self._require_tip('mix')
+        if volume is not None and volume > self.max_volume:
+            raise ValueError(f"Cannot mix {volume}µL with {self.name} (maximum {self.max_volume}µL)")
+        if location is not None:
+            self._location = location
+        return self
+
+    @_recorded('pipette')
+    def blow_out(self, location=None):
+        self._require_tip('blow out')
+        self.current_volume = 0.0
+        return self
+
+    @_recorded('pipette')
+    def touch_tip(self, location=None, radius: float = 1.0, v_offset: float = -1.0, speed: float = 60.0):
+        self._require_tip('touch tip')
+        return self
+
+    @_recorded('pipette')
+    def air_gap(self, volume: Optional[float] = None, height: Optional[float] = None):
+        self._require_tip('air gap')
+        self.current_volume += volume or 0
+        return self
+
+    @_recorded('pipette')
+    def move_to(self, location, force_direct: bool = False, minimum_z_height: Optional[float] = None,
+                speed: Optional[float] = None):
+        self._location = location
+        return self
+
+    @_recorded('pipette')
+    def transfer(self, volume, source, dest, **kwargs):
+        return self._bulk_transfer('transfer', volume, source, dest, **kwargs)
+
+    @_recorded('pipette')
+    def distribute(self, volume, source, dest, **kwargs):
+        return self._bulk_transfer('distribute', volume, source, dest, **kwargs)
+
+    @_recorded('pipette')
+    def consolidate(self, volume, source, dest, **kwargs):
+        return self._bulk_transfer('consolidate', volume, source, dest, **kwargs)
+
+    def _bulk_transfer(self, mode: str, volume, source, dest, **kwargs):
+        """Replay ``transfer``/``distribute``/``consolidate`` as individual tip and liquid moves."""
+        sources = list(source) if isinstance(source, (list, tuple)) else [source]
+        destinations = list(dest) if isinstance(dest, (list, tuple)) else [dest]
+        pairs = max(len(sources), len(destinations))
+        sources = sources * pairs if len(sources) == 1 else sources
+        destinations = destinations * pairs if len(destinations) == 1 else destinations
+        volumes = list(volume) if isinstance(volume, (list, tuple)) else [volume] * pairs
+
+        new_tip = kwargs.get('new_tip', 'once')
+        air_gap = kwargs.get('air_gap') or 0
+        mix_after = kwargs.get('mix_after')
+        mix_before = kwargs.get('mix_before')
+
+        if new_tip == 'once':
+            self.pick_up_tip()
+        elif new_tip == 'never':
+            self._require_tip(mode)
+
+        if mode == 'distribute':
+            disposal = kwargs.get('disposal_volume')
+            disposal = self.min_volume if disposal is None else disposal
+            capacity = self.max_volume - disposal
+            index = 0
+            while index < pairs:
+                batch = []
+                total = 0.0
+                while index < pairs and (not batch or total + volumes[index] + air_gap <= capacity):
+                    batch.append(index)
+                    total += volumes[index] + air_gap
+                    index += 1
+                if new_tip == 'always':
+                    self.pick_up_tip()
+                if mix_before:
+                    self.mix(mix_before[0], mix_before[1], sources[batch[0]])
+                self.aspirate(sum(volumes[i] for i in batch) + disposal, sources[batch[0]])
+                for i in batch:
+                    self.dispense(volumes[i], destinations[i])
+                if disposal:
+                    self.blow_out()
+                if new_tip == 'always':
+                    self.drop_tip()
+        else:
+            for i in range(pairs):
+                if new_tip == 'always':
+                    self.pick_up_tip()
+                remaining = volumes[i]
+                trips = max(1, math.ceil(remaining / (self.max_volume - air_gap)))
+                for _ in range(trips):
+                    step = volumes[i] / trips
+                    if mix_before:
+                        self.mix(mix_before[0], mix_before[1], sources[i])
+                    self.aspirate(step, sources[i])
+                    self.dispense(step, destinations[i])
+                if mix_after:
+                    self.mix(mix_after[0], mix_after[1], destinations[i])
+                if kwargs.get('blow_out'):
+                    self.blow_out()
+                if kwargs.get('touch_tip'):
+                    self.touch_tip()
+                if new_tip == 'always':
+                    self.drop_tip()
+
+        if new_tip == 'once':
+            self.drop_tip()
+        return self
+
+    def reset_tipracks(self):
+        for rack in self.tip_racks:
+            rack.reset()
+
+    def __repr__(self):
+        return f"DryRunPipette({self.name!r} on {self.mount})"
+
+
+class DryRunContext:
+    """
+    Recording stand-in for ``opentrons.protocol_api.ProtocolContext``.
+
+    Attributes:
+        command_log: Recorded commands as plain dicts (see
+            :class:`pudu.runtime.CommandRecorder` for the record format).
+        deck: Mapping of occupied deck slot to the labware or module in it.
+    """
+
+    def __init__(self, subject=None, simulating: bool = True, api_level: str = '2.21'):
+        """
+        Args:
+            subject: Optional protocol class instance whose ``run()`` will use this
+                context; used to attribute commands to stages.
+            simulating: Value returned by ``is_simulating()``. Protocol classes only write
+                their output files (Excel/JSON) when this is ``True``, and skip temperature
+                and thermocycler steps in some cases.
+            api_level: Reported through ``api_version``.
+        """
+        self.recorder = CommandRecorder(subject)
+        self._simulating = simulating
+        self.api_version = api_level
+        self._context = self
+        self._depth = 0
+        self.deck: Dict[str, object] = {}
+        self.loaded_instruments: Dict[str, DryRunPipette] = {}
+        self.loaded_modules: Dict[str, DryRunModule] = {}
+        self.off_deck: List[DryRunLabware] = []
+        self.all_labware: List[DryRunLabware] = []
+        self.liquids: List[DryRunLiquid] = []
+        self.comments: List[str] = []
+
+    @property
+    def command_log(self) -> List[Dict]:
+        return self.recorder.commands
+
+    def is_simulating(self) -> bool:
+        return self._simulating
+
+    def _claim_slot(self, slot: str, item):
+        slot = str(slot)
+        if slot not in SLOT_ORIGINS:
+            raise ValueError(f"Invalid deck slot '{slot}'. OT-2 slots are 1-11")
+        if slot in self.deck:
+            raise ValueError(f"Deck slot {slot} is already occupied by {self.deck[slot]}")
+        self.deck[slot] = item
+        return slot
+
+    @_recorded('protocol')
+    def load_labware(self, load_name: str, location, label: Optional[str] = None,
+                     namespace: Optional[str] = None, version: Optional[int] = None):
+        if _is_off_deck(location):
+            labware = DryRunLabware(self, load_name, OFF_DECK, label)
+            self.off_deck.append(labware)
+            return labware
+        labware = DryRunLabware(self, load_name, str(location), label)
+        self._claim_slot(location, labware)
+        return labware
+
+    @_recorded('protocol')
+    def load_module(self, module_name: str, location=None, configuration: Optional[str] = None):
+        name = module_name.lower()
+        if 'thermocycler' in name:
+            module = DryRunThermocycler(self, module_name)
+            for slot in THERMOCYCLER_SLOTS:
+                self._claim_slot(slot, module)
+        elif 'temperature' in name or 'tempdeck' in name:
+            if location is None:
+                raise ValueError(f"Module '{module_name}' requires a deck slot")
+            module = DryRunTemperatureModule(self, module_name, str(location))
+            self._claim_slot(location, module)
+        else:
+            if location is None:
+                raise ValueError(f"Module '{module_name}' requires a deck slot")
+            module = DryRunModule(self, module_name, str(location))
+            self._claim_slot(location, module)
+        self.loaded_modules[module.parent] = module
+        return module
+
+    @_recorded('protocol')
+    def load_instrument(self, instrument_name: str, mount: str, tip_racks=None, replace: bool = False):
+        if mount in self.loaded_instruments and not replace:
+            raise ValueError(f"A pipette is already loaded on the {mount} mount")
+        pipette = DryRunPipette(self, instrument_name, mount, tip_racks)
+        self.loaded_instruments[mount] = pipette
+        return pipette
+
+    def define_liquid(self, name: str, description: Optional[str] = None,
+                      display_color: Optional[str] = None) -> DryRunLiquid:
+        liquid = DryRunLiquid(name, description, display_color)
+        self.liquids.append(liquid)
+        return liquid
+
+    @_recorded('protocol')
+    def move_labware(self, labware, new_location, use_gripper: bool = False,
+                     pick_up_offset=None, drop_offset=None):
+        if isinstance(labware.parent, str) and self.deck.get(labware.parent) is labware:
+            del self.deck[labware.parent]
+        elif labware in self.off_deck:
+            self.off_deck.remove(labware)
+        if _is_off_deck(new_location):
+            labware.parent = OFF_DECK
+            self.off_deck.append(labware)
+        else:
+            labware.parent = self._claim_slot(new_location, labware)
+
+    @_recorded('protocol')
+    def comment(self, msg: str):
+        self.comments.append(msg)
+
+    @_recorded('protocol')
+    def pause(self, msg: Optional[str] = None):
+        pass
+
+    @_recorded('protocol')
+    def delay(self, seconds: float = 0, minutes: float = 0, msg: Optional[str] = None):
+        pass
+
+    @_recorded('protocol')
+    def home(self):
+        pass
+
+
+def dry_run(protocol_obj, simulating: bool = True) -> DryRunContext:
+    """
+    Run *protocol_obj* against a fresh :class:`DryRunContext` and return the context.
+
+    Args:
+        protocol_obj: Any PUDU protocol class instance with a ``run(protocol)`` method.
+        simulating: Value returned by ``is_simulating()`` (see :class:`DryRunContext`).
+    """
+    context = DryRunContext(subject=protocol_obj, simulating=simulating)
+    protocol_obj.run(context)
+    return context
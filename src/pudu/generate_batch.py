@@ -0,0 +1,309 @@
+"""
+Batch protocol generation for PUDU
+==================================
+
+Generates many protocol files in one process. ``python -m pudu.generate_protocol``
+handles one input per invocation and pays for importing ``pudu`` and opentrons
+on every call. ``generate_batch`` imports the protocol classes once per worker
+process and builds each class' parameter reference block only once. It then
+spreads the input files over a process pool.
+
+Inputs are given as a directory or as a manifest.
+
+**Directory** — every ``*.json`` file in the directory is an input. The protocol
+type is auto-detected (see :func:`pudu.generate_protocol.detect_protocol_type`)
+and the shared ``--params`` and ``--metadata`` files apply to all of them::
+
+    python -m pudu.generate_batch designs/ -o protocols/ --params params.json
+
+**Manifest** — a JSON list with one entry per protocol. Paths are relative to
+the manifest file. Only ``input`` is required::
+
+    [
+        {"input": "library_a.json", "json_params": "params_2reps.json"},
+        {"input": "library_b.json", "output": "library_b_assembly.py",
+         "protocol_type": "assembly", "assembly_type": "Manual"},
+        {"input": "strains.json", "protocol_type": "transformation",
+         "plasmid_locations": "transformation_input.json", "tip_state": "tip_state.json"}
+    ]
+
+Run it with::
+
+    python -m pudu.generate_batch manifest.json -o protocols/ --workers 8
+
+Each protocol is written to ``<output dir>/<input stem>.py`` unless the entry
+sets ``output``. Entries that reuse an input without setting ``output`` are
+written to ``<input stem>_<params stem>.py``, or ``<input stem>_<entry number>.py``
+if that name is taken too. A failing input is reported and the remaining inputs are
+still generated; the exit status is 1 if any input failed.
+
+Python API::
+
+    from pudu.generate_batch import load_jobs, generate_batch
+
+    results = generate_batch(load_jobs('designs/'), 'protocols')
+    failed = [result for result in results if result.error]
+"""
+
+import argparse
+import json
+import sys
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+from typing import List, Optional
+
+from pudu.generate_protocol import (PROTOCOL_CONFIGS, detect_protocol_type, generate_protocol,
+                                    generate_param_reference)
+
+
+@dataclass
+class BatchJob:
+    """
+    One protocol to generate.
+
+    Attributes:
+        input: Path to the protocol data JSON file.
+        output: File name or path of the generated protocol. Relative paths are
+            resolved against the output directory. Defaults to ``<input stem>.py``
+            (see :func:`generate_batch` for inputs used by several jobs).
+        json_params: Path to an advanced parameters JSON file.
+        metadata: Path to a metadata JSON file.
+        protocol_type: ``'assembly'``, ``'transformation'`` or ``'plating'``.
+            Auto-detected when ``None``.
+        assembly_type: ``'SBOL'``, ``'Manual'`` or ``'Domestication'``.
+            Auto-detected when ``None``.
+        plasmid_locations: Path to a ``transformation_input.json`` (transformation only).
+        tip_state: Path to the ``tip_state.json`` of the previous protocol on the robot.
+    """
+    input: str
+    output: Optional[str] = None
+    json_params: Optional[str] = None
+    metadata: Optional[str] = None
+    protocol_type: Optional[str] = None
+    assembly_type: Optional[str] = None
+    plasmid_locations: Optional[str] = None
+    tip_state: Optional[str] = None
+
+
+@dataclass
+class BatchResult:
+    """Outcome of one ``BatchJob``; ``error`` is ``None`` on success."""
+    input: str
+    output: Optional[str] = None
+    protocol_type: Optional[str] = None
+    assembly_type: Optional[str] = None
+    error: Optional[str] = None
+
+
+MANIFEST_PATH_FIELDS = ('input', 'json_params', 'metadata', 'plasmid_locations', 'tip_state')
+
+
+def load_jobs(source, json_params: Optional[str] = None,
+              metadata: Optional[str] = None) -> List[BatchJob]:
+    """
+    Build the job list from a directory of inputs or a manifest file.
+
+    Args:
+        source: Directory whose ``*.json`` files are inputs, or a manifest file.
+            The shared *json_params* and *metadata* files are skipped when they
+            sit in that directory.
+        json_params: Advanced parameters file for jobs that do not set their own.
+        metadata: Metadata file for jobs that do not set their own.
+
+    Returns:
+        Jobs in directory (sorted by name) or manifest order.
+
+    Raises:
+        ValueError: If the manifest is not a list of entries with an ``input``,
+            or an entry has unknown keys.
+    """
+    source = Path(source)
+    if source.is_dir():
+        shared = {Path(path).resolve() for path in (json_params, metadata) if path}
+        jobs = [BatchJob(input=str(path)) for path in sorted(source.glob('*.json'))
+                if path.resolve() not in shared]
+    else:
+        with open(source) as f:
+            manifest = json.load(f)
+        if not isinstance(manifest, list):
+            raise ValueError(f"Manifest {source} must be a JSON list of jobs, got {type(manifest).__name__}")
+        known = set(BatchJob.__dataclass_fields__)
+        jobs = []
+        for index, entry in enumerate(manifest):
+            if not isinstance(entry, dict) or 'input' not in entry:
+                raise ValueError(f"Manifest entry {index + 1} must be an object with an 'input' path")
+            unknown = set(entry) - known
+            if unknown:
+                raise ValueError(f"Manifest entry {index + 1} has unknown keys: {sorted(unknown)}. "
+                                 f"Valid keys: {sorted(known)}")
+            entry = dict(entry)
+            for name in MANIFEST_PATH_FIELDS:
+                if entry.get(name):
+                    entry[name] = str(source.parent / entry[name])
+            jobs.append(BatchJob(**entry))
+
+    for job in jobs:
+        job.json_params = job.json_params or json_params
+        job.metadata = job.metadata or metadata
+    return jobs
+
+
+def _load_json(path: Optional[str]):
+    if path is None:
+        return None
+    with open(path) as f:
+        return json.load(f)
+
+
+def _warm_up():
+    """Import every protocol class and build its parameter reference once per worker."""
+    for protocol_type, config in PROTOCOL_CONFIGS.items():
+        class_names = config['class_map'].values() if 'class_map' in config else [config['class_name']]
+        for class_name in class_names:
+            generate_param_reference(protocol_type, class_name, config['module'])
+
+
+def _output_paths(jobs: List[BatchJob], output_dir: Path) -> List[Path]:
+    """
+    Output path of every job, unique within the batch.
+
+    A job without ``output`` whose ``<input stem>.py`` is shared with another job
+    gets ``<input stem>_<params stem>.py``, or ``<input stem>_<job number>.py``
+    when that is taken as well.
+
+    Raises:
+        ValueError: If two jobs set the same ``output``.
+    """
+    explicit = [output_dir / job.output if job.output else None for job in jobs]
+    taken = Counter(path.resolve() for path in explicit if path is not None)
+    for path, count in taken.items():
+        if count > 1:
+            raise ValueError(f"{count} jobs write their protocol to {path}. Give them different 'output' names")
+
+    defaults = [output_dir / f"{Path(job.input).stem}.py" for job in jobs]
+    default_counts = Counter(path.resolve() for path in defaults)
+    paths = []
+    for number, (job, path, default) in enumerate(zip(jobs, explicit, defaults), start=1):
+        if path is None:
+            path = default
+            if default_counts[default.resolve()] > 1 or default.resolve() in taken:
+                stem = Path(job.input).stem
+                if job.json_params:
+                    path = output_dir / f"{stem}_{Path(job.json_params).stem}.py"
+                if not job.json_params or path.resolve() in taken:
+                    path = output_dir / f"{stem}_{number}.py"
+                if path.resolve() in taken:
+                    raise ValueError(f"Cannot derive a unique output name for {job.input}. Set 'output'")
+            taken[path.resolve()] += 1
+        paths.append(path)
+    return paths
+
+
+def _run_job(job: BatchJob, output: Path) -> BatchResult:
+    """Generate one protocol file; errors are returned, not raised."""
+    result = BatchResult(input=job.input)
+    try:
+        protocol_data = _load_json(job.input)
+        protocol_type, assembly_type = job.protocol_type, job.assembly_type
+        if protocol_type is None:
+            protocol_type, detected_subtype = detect_protocol_type(protocol_data)
+            assembly_type = assembly_type or detected_subtype
+        elif protocol_type == 'assembly' and assembly_type is None:
+            _, assembly_type = detect_protocol_type(protocol_data)
+
+        code = generate_protocol(
+            protocol_data=protocol_data,
+            json_params=_load_json(job.json_params),
+            metadata=_load_json(job.metadata),
+            protocol_type=protocol_type,
+            assembly_subtype=assembly_type,
+            plasmid_locations=_load_json(job.plasmid_locations),
+            tip_state=_load_json(job.tip_state)
+        )
+
+        output.parent.mkdir(parents=True, exist_ok=True)
+        output.write_text(code)
+
+        result.output = str(output)
+        result.protocol_type = protocol_type
+        result.assembly_type = assembly_type
+    except Exception as e:
+        result.error = f"{type(e).__name__}: {e}"
+    return result
+
+
+def generate_batch(jobs: List[BatchJob], output_dir='.', workers: Optional[int] = None) -> List[BatchResult]:
+    """
+    Generate a protocol file for every job.
+
+    Args:
+        jobs: Jobs from :func:`load_jobs` (or built directly).
+        output_dir: Directory for the generated files; created if missing.
+        workers: Number of worker processes. ``None`` uses one per CPU and ``1``
+            generates everything in the calling process.
+
+    Returns:
+        One ``BatchResult`` per job, in job order. Jobs without ``output`` that
+        share an input are written to distinct files (see the module docstring).
+
+    Raises:
+        ValueError: If two jobs set the same ``output``.
+    """
+    output_dir = Path(output_dir)
+    outputs = _output_paths(jobs, output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+
+    if workers == 1 or len(jobs) <= 1:
+        _warm_up()
+        return [_run_job(job, output) for job, output in zip(jobs, outputs)]
+
+    with ProcessPoolExecutor(max_workers=workers, initializer=_warm_up) as pool:
+        return list(pool.map(_run_job, jobs, outputs, chunksize=max(1, len(jobs) // 64)))
+
+
+def main(argv: Optional[List[str]] = None):
+    """Entry point for ``python -m pudu.generate_batch``."""
+    parser = argparse.ArgumentParser(
+        description='Generate Opentrons protocol files for a directory or manifest of JSON inputs'
+    )
+    parser.add_argument('source', type=Path,
+                        help='Directory of protocol data JSON files, or a JSON manifest of jobs')
+    parser.add_argument('-o', '--output-dir', type=Path, required=True,
+                        help='Directory for the generated protocol files')
+    parser.add_argument('--params', type=Path, default=None,
+                        help='Advanced parameters JSON file for jobs that do not set json_params')
+    parser.add_argument('--metadata', type=Path, default=None,
+                        help='Metadata JSON file for jobs that do not set metadata')
+    parser.add_argument('--workers', type=int, default=None,
+                        help='Number of worker processes (default: one per CPU)')
+    args = parser.parse_args(argv)
+
+    try:
+        jobs = load_jobs(args.source,
+                         json_params=str(args.params) if args.params else None,
+                         metadata=str(args.metadata) if args.metadata else None)
+    except (OSError, ValueError) as e:
+        print(f"Error: {e}", file=sys.stderr)
+        sys.exit(1)
+    if not jobs:
+        print(f"Error: No inputs found in {args.source}", file=sys.stderr)
+        sys.exit(1)
+
+    try:
+        results = generate_batch(jobs, args.output_dir, workers=args.workers)
+    except ValueError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        sys.exit(1)
+
+    failed = [result for result in results if result.error]
+    for result in failed:
+        print(f"✗ {result.input}: {result.error}", file=sys.stderr)
+    print(f"✓ Generated {len(results) - len(failed)} of {len(results)} protocols in {args.output_dir}")
+    if failed:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
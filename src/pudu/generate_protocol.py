@@ -170,6 +170,39 @@ This writes ``plating_input.json`` in the current directory.
 This writes ``plating_layout.json`` and ``plating_layout.xlsx`` showing which
 well on which agar plate receives which construct at which dilution.
 
+**Chaining tip racks** — simulating with ``--simulate`` (below) also writes
+``tip_state.json`` next to the protocol, recording the partially used tip racks
+the protocol leaves on the robot; a protocol generated with
+``--tip-state-output tip_state.json`` writes it when run under
+``opentrons_simulate``. Pass it to the next stage with ``--tip-state`` and that
+protocol continues those racks from the next unused tip instead of starting
+fresh ones (an explicit ``initial_tip`` parameter still wins)::
+
+    python -m pudu.generate_protocol \
+        plating_input.json \
+        -o plating_protocol.py \
+        --protocol-type plating \
+        --tip-state tip_state.json
+
+**Cached simulation** — instead of ``opentrons_simulate``, pass ``--simulate``
+to dry-run the protocol and write its output files next to the generated
+``.py`` file. Results are cached on the protocol inputs (see
+:mod:`pudu.simulation_cache`), so regenerating an unchanged stage is instant::
+
+    python -m pudu.generate_protocol \\
+        transformation_spec.json \\
+        -o transformation_protocol.py \\
+        --protocol-type transformation \\
+        --plasmid-locations transformation_input.json \\
+        --simulate
+
+**All three stages in one call** — :mod:`pudu.workflow` plans the assembly,
+transformation and plating in one process, passing the location maps and tip
+racks between the stages as Python objects, and writes the three protocol files
+with a combined report::
+
+    python -m pudu.workflow assembly_input.json transformation_spec.json -o run_1
+
 
 Manual (bench) protocol generation
 ------------------------------------
@@ -262,6 +295,35 @@ Named flags:
     positions instead of sequentially from the temperature module.  Only
     applicable with ``--protocol-type transformation``.
 
+``--tip-state``
+    Path to the ``tip_state.json`` produced by simulating the previous
+    protocol in the chain.  Pipettes whose initial tip is not set start from
+    the next unused tip of the partially used rack of the same labware.
+
+``--tip-state-output``
+    Path the generated protocol writes its ``tip_state.json`` to when it is
+    simulated (e.g. with ``opentrons_simulate``).  Without it, only
+    ``--simulate`` writes the tip state.
+
+``--profile``
+    Time every pipette, module and labware command when the protocol runs and
+    write one JSON line per command (step, wells, volume, tip, duration) to
+    ``protocol_events.jsonl`` (see :mod:`pudu.instrumentation`).
+
+``--profile-sink``
+    With ``--profile``, the path the events are written to instead of
+    ``protocol_events.jsonl`` in the working directory of the run, e.g.
+    ``/data/protocol_events.jsonl`` on the robot.  If the file cannot be
+    written, the run goes on and the failure is reported in a comment.
+
+``--simulate``
+    Dry-run the generated protocol and write the files it exports
+    (``transformation_input.json``, ``plating_input.json``, layouts,
+    ``tip_state.json``) to the directory of ``--output``.  Unchanged inputs reuse the cached result.
+
+``--no-cache``
+    With ``--simulate``, always re-simulate and refresh the cached result.
+
 ``--metadata``
     Path to a JSON file with Opentrons protocol metadata.  Valid keys:
     ``protocolName``, ``author``, ``description``, ``apiLevel``.  Any key
@@ -286,10 +348,14 @@ Pass ``--protocol-type`` explicitly when the auto-detection is ambiguous.
 
 import json
 import argparse
+import functools
+import importlib
 import sys
 from pathlib import Path
 from typing import Dict, List, Optional, Any
 
+from pudu.tip_budget import TIP_STATE_FILE
+
 # Default metadata that can be overridden
 DEFAULT_METADATA = {
     'protocolName': 'PUDU Protocol',
@@ -461,6 +527,7 @@ def _format_annotation(ann) -> str:
     return str(ann).replace('typing.', '')
 
 
+@functools.lru_cache(maxsize=None)
 def generate_param_reference(protocol_type: str, class_name: str, module_str: str) -> str:
     """
     Generate a commented parameter reference block for the end of the protocol file.
@@ -468,7 +535,8 @@ def generate_param_reference(protocol_type: str, class_name: str, module_str: st
     Dynamically imports the protocol class and uses inspect to extract the full
     __init__ signature and class docstrings, formatted as comments so users can
     see all available parameters when making last-minute edits before running on
-    the robot.
+    the robot. The block only depends on the class, so it is built once per
+    process and reused for every generated file.
 
     Args:
         protocol_type: Protocol type string (e.g. 'transformation')
@@ -571,7 +639,11 @@ def generate_protocol(
     metadata: Optional[Dict] = None,
     protocol_type: str = 'assembly',
     assembly_subtype: Optional[str] = None,
-    plasmid_locations: Optional[Dict] = None
+    plasmid_locations: Optional[Dict] = None,
+    tip_state: Optional[Dict] = None,
+    profile: bool = False,
+    tip_state_output: Optional[str] = None,
+    profile_sink: Optional[str] = None
 ) -> str:
     """
     Generate a complete Opentrons protocol file as a Python source string.
@@ -583,6 +655,7 @@ def generate_protocol(
     * The protocol data embedded as a Python literal.
     * An optional ``json_params`` dict (when provided) embedded as a literal.
     * An optional ``plasmid_locations`` dict (transformation only).
+    * An optional ``tip_state`` dict of partially used tip racks.
     * A ``metadata`` dict for the Opentrons App.
     * A ``run()`` function that instantiates the correct PUDU class and calls
       its ``.run()`` method.
@@ -610,6 +683,15 @@ def generate_protocol(
             transformation protocol sources DNA from the assembly output plate
             at its fixed positions instead of sequentially from the temp
             module.  Ignored for non-transformation protocol types.
+        tip_state: Dict of partially used tip racks, as written by simulating
+            the previous protocol in the chain (``tip_state.json``).  When
+            provided, the generated protocol continues those racks.
+        profile: If ``True``, the generated ``run()`` times every command and
+            writes it to ``protocol_events.jsonl`` (see :mod:`pudu.instrumentation`).
+        tip_state_output: If given, the generated protocol writes the tip
+            state it leaves behind to this path when simulated.
+        profile_sink: With ``profile``, the path the events are written to
+            instead of ``protocol_events.jsonl``.
 
     Returns:
         The complete protocol file as a Python source string.
@@ -656,6 +738,8 @@ def generate_protocol(
 
     # Imports
     lines.append(f"from {module} import {class_name}")
+    if profile:
+        lines.append("from pudu.instrumentation import profile_run")
     lines.append("from opentrons import protocol_api")
     lines.append("")
     lines.append("")
@@ -671,6 +755,12 @@ def generate_protocol(
         lines.append(f"plasmid_locations = {format_python_value(plasmid_locations)}")
         lines.append("")
 
+    # Tip state (partially used tip racks from the previous protocol)
+    if tip_state is not None:
+        lines.append("# Partially used tip racks from the previous protocol")
+        lines.append(f"tip_state = {format_python_value(tip_state)}")
+        lines.append("")
+
     # Advanced params (if provided)
     if json_params:
         lines.append("# Advanced parameters for protocol customization")
@@ -696,6 +786,10 @@ def generate_protocol(
     constructor_args = [f"{data_param}={data_key}"]
     if plasmid_locations is not None:
         constructor_args.append("plasmid_locations=plasmid_locations")
+    if tip_state is not None:
+        constructor_args.append("tip_state=tip_state")
+    if tip_state_output is not None:
+        constructor_args.append(f"tip_state_output={format_python_value(str(tip_state_output))}")
     if json_params:
         constructor_args.append("json_params=json_params")
 
@@ -708,7 +802,13 @@ def generate_protocol(
     else:
         lines.append(f"    protocol_instance = {class_name}({constructor_args[0]})")
 
-    lines.append("    protocol_instance.run(protocol)")
+    if profile:
+        if profile_sink is not None:
+            lines.append(f"    profile_run(protocol_instance, protocol, sink={format_python_value(str(profile_sink))})")
+        else:
+            lines.append("    profile_run(protocol_instance, protocol)")
+    else:
+        lines.append("    protocol_instance.run(protocol)")
     lines.append("")
 
     # Parameter reference block — appended as comments for last-minute editing
@@ -718,6 +818,100 @@ def generate_protocol(
 
     return '\n'.join(lines)
 
+def build_protocol(
+    protocol_data: Any,
+    json_params: Optional[Dict] = None,
+    protocol_type: str = 'assembly',
+    assembly_subtype: Optional[str] = None,
+    plasmid_locations: Optional[Dict] = None,
+    tip_state: Optional[Dict] = None,
+    tip_state_output: Optional[str] = None
+):
+    """
+    Construct the protocol class instance :func:`generate_protocol` would write for these inputs.
+
+    The instance is built exactly as in the generated ``run()`` function.
+
+    Args:
+        protocol_data, json_params, protocol_type, assembly_subtype, plasmid_locations, tip_state,
+        tip_state_output: As for :func:`generate_protocol`.
+
+    Raises:
+        ValueError: As for :func:`generate_protocol`, or if the protocol class rejects the inputs.
+    """
+    if protocol_type not in PROTOCOL_CONFIGS:
+        raise ValueError(f"Unknown protocol type: {protocol_type}")
+    config = PROTOCOL_CONFIGS[protocol_type]
+
+    if protocol_type == 'assembly':
+        if assembly_subtype is None:
+            raise ValueError("assembly_subtype required for assembly protocols")
+        class_name = config['class_map'].get(assembly_subtype, 'SBOLLoopAssembly')
+        if isinstance(protocol_data, dict) and 'assemblies' in protocol_data:
+            protocol_data = protocol_data['assemblies']
+    else:
+        class_name = config['class_name']
+
+    kwargs = {config['data_param']: protocol_data}
+    if plasmid_locations is not None:
+        kwargs['plasmid_locations'] = plasmid_locations
+    if tip_state is not None:
+        kwargs['tip_state'] = tip_state
+    if tip_state_output is not None:
+        kwargs['tip_state_output'] = tip_state_output
+    if json_params:
+        kwargs['json_params'] = json_params
+
+    protocol_class = getattr(importlib.import_module(config['module']), class_name)
+    return protocol_class(**kwargs)
+
+
+def simulate_protocol(
+    protocol_data: Any,
+    json_params: Optional[Dict] = None,
+    protocol_type: str = 'assembly',
+    assembly_subtype: Optional[str] = None,
+    plasmid_locations: Optional[Dict] = None,
+    tip_state: Optional[Dict] = None,
+    tip_state_output: Optional[str] = TIP_STATE_FILE,
+    output_dir=None,
+    cache=None,
+    use_cache: bool = True
+):
+    """
+    Simulate the protocol :func:`generate_protocol` would write for these inputs.
+
+    The protocol class is constructed with :func:`build_protocol`, exactly as in the
+    generated ``run()`` function, and dry-run through
+    :func:`pudu.simulation_cache.simulate_cached`, so an unchanged stage of the
+    assembly -> transformation -> plating chain is read from the cache instead of
+    being simulated again.
+
+    Args:
+        protocol_data, json_params, protocol_type, assembly_subtype, plasmid_locations, tip_state:
+            As for :func:`generate_protocol`.
+        tip_state_output: Name the tip state is exported under, or ``None`` to
+            skip it.
+        output_dir: If given, the exported files (``transformation_input.json``,
+            ``plating_input.json``, layouts, the tip state) are written there.
+        cache: :class:`pudu.simulation_cache.SimulationCache` to use. Defaults to
+            the user cache directory.
+        use_cache: If ``False``, always simulate and refresh the cached result.
+
+    Returns:
+        :class:`pudu.simulation_cache.SimulationResult`.
+
+    Raises:
+        ValueError: As for :func:`generate_protocol`.
+    """
+    from pudu.simulation_cache import simulate_cached
+
+    protocol_obj = build_protocol(protocol_data, json_params=json_params, protocol_type=protocol_type,
+                                  assembly_subtype=assembly_subtype, plasmid_locations=plasmid_locations,
+                                  tip_state=tip_state, tip_state_output=tip_state_output)
+    return simulate_cached(protocol_obj, cache=cache, output_dir=output_dir, use_cache=use_cache)
+
+
 def main():
     """
     Entry point for ``python -m pudu.generate_protocol``.
@@ -744,6 +938,12 @@ Examples:
   # Generate plating protocol
   python -m pudu.generate_protocol plating.json -o protocol.py --protocol-type plating
 
+  # Continue the tip racks left partially used by the previous protocol
+  python -m pudu.generate_protocol plating.json -o protocol.py --protocol-type plating --tip-state tip_state.json
+
+  # Write the tip state when the protocol is run with opentrons_simulate
+  python -m pudu.generate_protocol data.json -o protocol.py --tip-state-output tip_state.json
+
   # Auto-detect protocol type
   python -m pudu.generate_protocol data.json -o protocol.py
 
@@ -794,6 +994,45 @@ Examples:
         help='Path to plasmid locations JSON file from assembly simulation (transformation protocols only)'
     )
 
+    parser.add_argument(
+        '--tip-state',
+        type=Path,
+        default=None,
+        help='Path to tip state JSON file from the previous protocol simulation (continues partially used tip racks)'
+    )
+
+    parser.add_argument(
+        '--tip-state-output',
+        type=Path,
+        default=None,
+        help='Path the generated protocol writes its tip state to when simulated (for the next protocol)'
+    )
+
+    parser.add_argument(
+        '--profile',
+        action='store_true',
+        help='Time every command of the run and write it to protocol_events.jsonl'
+    )
+
+    parser.add_argument(
+        '--profile-sink',
+        type=Path,
+        default=None,
+        help='With --profile, write the events to this path (e.g. /data/protocol_events.jsonl)'
+    )
+
+    parser.add_argument(
+        '--simulate',
+        action='store_true',
+        help='Dry-run the protocol and write its output files next to the protocol (cached)'
+    )
+
+    parser.add_argument(
+        '--no-cache',
+        action='store_true',
+        help='With --simulate, re-simulate even if a cached result exists'
+    )
+
     parser.add_argument(
         '--metadata',
         type=Path,
@@ -840,6 +1079,19 @@ Examples:
             print(f"Error: Invalid JSON in plasmid locations file: {e}", file=sys.stderr)
             sys.exit(1)
 
+    # Load tip state if provided
+    tip_state = None
+    if args.tip_state:
+        try:
+            with open(args.tip_state, 'r') as f:
+                tip_state = json.load(f)
+        except FileNotFoundError:
+            print(f"Error: Tip state file not found: {args.tip_state}", file=sys.stderr)
+            sys.exit(1)
+        except json.JSONDecodeError as e:
+            print(f"Error: Invalid JSON in tip state file: {e}", file=sys.stderr)
+            sys.exit(1)
+
     # Load metadata if provided
     metadata = None
     if args.metadata:
@@ -886,7 +1138,11 @@ Examples:
             metadata=metadata,
             protocol_type=protocol_type,
             assembly_subtype=assembly_subtype,
-            plasmid_locations=plasmid_locations
+            plasmid_locations=plasmid_locations,
+            tip_state=tip_state,
+            profile=args.profile or args.profile_sink is not None,
+            tip_state_output=args.tip_state_output,
+            profile_sink=args.profile_sink
         )
     except Exception as e:
         print(f"Error generating protocol: {e}", file=sys.stderr)
@@ -906,5 +1162,26 @@ Examples:
         print(f"Error writing output file: {e}", file=sys.stderr)
         sys.exit(1)
 
+    # Simulate (cached) to produce the inputs of the next stage
+    if args.simulate:
+        try:
+            result = simulate_protocol(
+                protocol_data=protocol_data,
+                json_params=json_params,
+                protocol_type=protocol_type,
+                assembly_subtype=assembly_subtype,
+                plasmid_locations=plasmid_locations,
+                tip_state=tip_state,
+                output_dir=args.output.parent,
+                use_cache=not args.no_cache
+            )
+        except Exception as e:
+            print(f"Error simulating protocol: {e}", file=sys.stderr)
+            sys.exit(1)
+        source = "cache" if result.cache_hit else "simulation"
+        print(f"✓ Simulated ({source}): {len(result.command_log)} commands")
+        for name in sorted(result.outputs):
+            print(f"  Wrote {args.output.parent / name}")
+
 if __name__ == '__main__':
     main()
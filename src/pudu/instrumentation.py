@@ -0,0 +1,179 @@
+"""
+Per-step timing of protocol runs.
+
+``profile_run`` runs a PUDU protocol object (assembly, transformation, plating,
+calibration or sample preparation) against an instrumented ``ProtocolContext``.
+Every pipette, module and protocol command (including ``move_labware``) is
+timed and written as one JSON line to ``protocol_events.jsonl``::
+
+    {"time": "2026-03-02T14:05:11.412+00:00", "seconds": 6.021, "step": "transfer DNA",
+     "command": "aspirate", "target": "pipette", "name": "p20_single_gen2",
+     "volume": 2, "source": {"well": "A1", "labware": "...", "slot": "2"}, ...}
+
+``step`` is the protocol method that issued the command, as in
+:mod:`pudu.runtime`. On the robot ``seconds`` is the measured duration of the
+command, so the log shows which steps dominate a run; under simulation the
+durations are those of the simulator. Lines are flushed as they are written, so
+an aborted run keeps the events up to the failure. Pass a ``sink`` path the
+robot can write to (e.g. under ``/data``); if the sink cannot be opened or
+written, a warning is logged, the events are kept in memory only and the run
+goes on.
+
+Example::
+
+    from pudu.instrumentation import profile_run
+
+    def run(protocol):
+        profiler = profile_run(SBOLLoopAssembly(assemblies), protocol)
+        print(profiler.summary())
+
+or generate the protocol file with ``python -m pudu.generate_protocol ... --profile``.
+"""
+
+import json
+import logging
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from pudu.runtime import CommandRecorder, describe_location
+
+logger = logging.getLogger(__name__)
+
+EVENTS_FILE = 'protocol_events.jsonl'
+# Location parameter of single-well pipette commands, reported as the event's source or dest
+SOURCE_COMMANDS = {'aspirate'}
+DEST_COMMANDS = {'dispense', 'blow_out'}
+
+
+class CommandProfiler(CommandRecorder):
+    """
+    ``CommandRecorder`` that times every command and streams it to a JSONL sink.
+
+    Attributes:
+        sink: Path of the JSONL file, an open text file, or ``None`` to keep the
+            events in memory only.
+        events: Events written so far, one dict per command.
+        sink_error: Error that stopped writing to the sink, or ``None``.
+    """
+
+    def __init__(self, subject=None, sink=EVENTS_FILE, simulating: Optional[bool] = None):
+        """
+        Args:
+            subject: Protocol class instance whose ``run()`` issues the commands,
+                used to name the step of each command.
+            sink: Path of the JSONL file, an open text file, or ``None``.
+            simulating: If not ``None``, the value returned by ``is_simulating()``
+                on the wrapped context.
+        """
+        super().__init__(subject, simulating=simulating)
+        self.sink = sink
+        self.events: List[Dict] = []
+        self.sink_error: Optional[Exception] = None
+        self._file = None
+
+    def start_timer(self):
+        return time.time(), time.perf_counter()
+
+    def stop_timer(self, entry: Dict, started):
+        wall, counter = started
+        entry['time'] = datetime.fromtimestamp(wall, timezone.utc).isoformat(timespec='milliseconds')
+        entry['seconds'] = round(time.perf_counter() - counter, 3)
+
+    def record(self, target_kind: str, target, command: str, method, args, kwargs) -> Dict:
+        entry = super().record(target_kind, target, command, method, args, kwargs)
+        if command == 'pick_up_tip' and not entry['params'].get('location'):
+            # The Opentrons API keeps the tip the pipette took from the next tip in its racks
+            entry['params']['tip'] = describe_location(getattr(target, '_last_tip_picked_up_from', None))
+        return entry
+
+    def on_result(self, command: str, entry: Dict, result):
+        result = super().on_result(command, entry, result)
+        self._write(self.event(entry))
+        return result
+
+    @staticmethod
+    def event(entry: Dict) -> Dict:
+        """Flatten a timed command record into an event line."""
+        params = entry['params']
+        event = {
+            'time': entry.get('time'),
+            'seconds': entry.get('seconds'),
+            'step': entry['stage'],
+            'command': entry['command'],
+            'target': entry['target'],
+            'name': entry['name'],
+        }
+        command = entry['command']
+        if 'volume' in params:
+            event['volume'] = params['volume']
+        if 'source' in params or command in SOURCE_COMMANDS:
+            event['source'] = params.get('source', params.get('location'))
+        if 'dest' in params or command in DEST_COMMANDS:
+            event['dest'] = params.get('dest', params.get('location'))
+        if command == 'pick_up_tip':
+            event['tip'] = params.get('location') or params.get('tip')
+        event['params'] = params
+        return event
+
+    def _write(self, event: Dict):
+        self.events.append(event)
+        if self.sink is None or self.sink_error is not None:
+            return
+        try:
+            if self._file is None:
+                self._file = open(self.sink, 'w') if isinstance(self.sink, (str, Path)) else self.sink
+            self._file.write(json.dumps(event) + '\n')
+            self._file.flush()
+        except (OSError, ValueError) as e:
+            # A profiling sink must never stop the protocol: keep the events in memory
+            self.sink_error = e
+            logger.warning("Could not write protocol events to %s, keeping them in memory only: %s",
+                           self.sink, e)
+
+    def close(self):
+        """Close the JSONL file if the profiler opened it."""
+        if self._file is not None and isinstance(self.sink, (str, Path)):
+            try:
+                self._file.close()
+            except OSError as e:
+                logger.warning("Could not close protocol events file %s: %s", self.sink, e)
+        self._file = None
+
+    def step_seconds(self) -> Dict[str, float]:
+        """Measured seconds per step, slowest first."""
+        totals = {}
+        for event in self.events:
+            totals[event['step']] = totals.get(event['step'], 0.0) + (event['seconds'] or 0.0)
+        return dict(sorted(totals.items(), key=lambda item: item[1], reverse=True))
+
+    def summary(self, top: int = 5) -> str:
+        """The *top* slowest steps and the total measured time."""
+        totals = self.step_seconds()
+        lines = [f"Measured {sum(totals.values()):.1f} s over {len(self.events)} commands"]
+        for step, seconds in list(totals.items())[:top]:
+            lines.append(f"  {step}: {seconds:.1f} s")
+        return '\n'.join(lines)
+
+
+def profile_run(protocol_obj, protocol, sink=EVENTS_FILE) -> CommandProfiler:
+    """
+    Run *protocol_obj* on *protocol*, timing every command.
+
+    The events are written to *sink* (see ``CommandProfiler``) and the slowest
+    steps are added as a protocol comment at the end of the run. A sink that
+    cannot be written is reported in a comment; the run is not interrupted.
+
+    Returns:
+        The ``CommandProfiler`` holding the events.
+    """
+    profiler = CommandProfiler(protocol_obj, sink=sink)
+    try:
+        protocol_obj.run(profiler.wrap(protocol))
+    finally:
+        profiler.close()
+    if profiler.sink_error is not None:
+        protocol.comment(f"Could not write protocol events to {sink}: {profiler.sink_error}")
+    protocol.comment(profiler.summary())
+    return profiler
@@ -0,0 +1,147 @@
+"""
+Well names and indices of standard plate formats.
+
+The protocols address wells both by name (``'B3'``, as in location maps and
+Excel layouts) and by index (as in ``labware.wells()[i]``, tip racks and
+starting-well parameters). ``plate_geometry`` builds both lookups once per plate
+format and well order and caches them, so converting is a tuple index or a dict
+lookup instead of string parsing:
+
+* column-major order (``'column'``) is the Opentrons ``wells()`` order and the
+  order tips are picked up: A1, B1, ..., H1, A2, ...;
+* row-major order (``'row'``) is the reading order of a plate map: A1, A2, ...,
+  A12, B1, ...
+
+Example::
+
+    from pudu.plate_geometry import plate_geometry
+
+    geometry = plate_geometry(384)
+    geometry.well_name(17)          # 'B2'
+    geometry.well_index('P24')      # 383
+"""
+
+import functools
+from typing import Dict, Tuple
+
+PLATE_FORMATS = {
+    # wells: (rows, columns)
+    24: (4, 6),
+    96: (8, 12),
+    384: (16, 24),
+}
+
+COLUMN_MAJOR = 'column'
+ROW_MAJOR = 'row'
+
+
+def _normalized_name(well_name) -> str:
+    """``'b03'`` -> ``'B3'``; anything that is not a row letter and a number is returned as given."""
+    name = str(well_name).strip()
+    try:
+        return f"{name[0].upper()}{int(name[1:])}"
+    except (IndexError, ValueError):
+        return name
+
+
+class PlateGeometry:
+    """
+    Precomputed index <-> name tables of one plate format and well order.
+
+    Attributes:
+        rows: Number of rows (A, B, ...).
+        columns: Number of columns (1, 2, ...).
+        order: ``'column'`` (Opentrons ``wells()`` order) or ``'row'``.
+        names: Well names, indexed by well index.
+        indices: Well index of every well name.
+    """
+
+    def __init__(self, rows: int, columns: int, order: str = COLUMN_MAJOR):
+        if order not in (COLUMN_MAJOR, ROW_MAJOR):
+            raise ValueError(f"Unknown well order '{order}'. Use '{COLUMN_MAJOR}' or '{ROW_MAJOR}'")
+        self.rows = rows
+        self.columns = columns
+        self.order = order
+        row_letters = [chr(ord('A') + row) for row in range(rows)]
+        if order == COLUMN_MAJOR:
+            self.names: Tuple[str, ...] = tuple(f"{row}{column + 1}"
+                                                for column in range(columns) for row in row_letters)
+        else:
+            self.names = tuple(f"{row}{column + 1}" for row in row_letters for column in range(columns))
+        self.indices: Dict[str, int] = {name: index for index, name in enumerate(self.names)}
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def __repr__(self) -> str:
+        return f"PlateGeometry({self.rows}x{self.columns}, order='{self.order}')"
+
+    def well_name(self, index: int) -> str:
+        """
+        Name of the well at *index*.
+
+        Raises:
+            ValueError: If *index* is outside the plate.
+        """
+        if not 0 <= index < len(self.names):
+            raise ValueError(f"Well index {index} is outside a {len(self.names)}-well plate "
+                             f"(0-{len(self.names) - 1})")
+        return self.names[index]
+
+    def well_index(self, well_name: str) -> int:
+        """
+        Index of *well_name*; lowercase rows and zero-padded columns (``'b03'``) are accepted.
+
+        Raises:
+            ValueError: If *well_name* is not a well of the plate.
+        """
+        index = self.indices.get(well_name)
+        if index is None:
+            index = self.indices.get(_normalized_name(well_name))
+        if index is None:
+            raise ValueError(f"Invalid well name: '{well_name}'. Wells of a {len(self.names)}-well plate "
+                             f"are A1-{self.names[-1]}")
+        return index
+
+    def row_of(self, index: int) -> int:
+        """0-based row of the well at *index*."""
+        return index % self.rows if self.order == COLUMN_MAJOR else index // self.columns
+
+    def column_of(self, index: int) -> int:
+        """0-based column of the well at *index*."""
+        return index // self.rows if self.order == COLUMN_MAJOR else index % self.columns
+
+    def convert(self, index: int, other: 'PlateGeometry') -> int:
+        """Index in *other* (e.g. the other well order) of the well at *index*."""
+        return other.indices[self.well_name(index)]
+
+
+def plate_geometry(wells: int = 96, order: str = COLUMN_MAJOR) -> PlateGeometry:
+    """
+    Cached geometry of a standard plate format.
+
+    Raises:
+        ValueError: If *wells* is not a format in ``PLATE_FORMATS`` or *order*
+            is not ``'column'`` or ``'row'``.
+    """
+    # Positional arguments so every spelling of a call shares one cache entry
+    return _cached_geometry(wells, order)
+
+
+@functools.lru_cache(maxsize=None)
+def _cached_geometry(wells: int, order: str) -> PlateGeometry:
+    if wells not in PLATE_FORMATS:
+        raise ValueError(f"Unknown plate format: {wells} wells. "
+                         f"Supported formats: {', '.join(str(size) for size in PLATE_FORMATS)}")
+    rows, columns = PLATE_FORMATS[wells]
+    return PlateGeometry(rows, columns, order)
+
+
+def well_name(index: int, wells: int = 96, order: str = COLUMN_MAJOR) -> str:
+    """Name of the well at *index* of a *wells*-well plate (see ``PlateGeometry.well_name``)."""
+    return plate_geometry(wells, order).well_name(index)
+
+
+def well_index(name: str, wells: int = 96, order: str = COLUMN_MAJOR) -> int:
+    """Index of well *name* of a *wells*-well plate (see ``PlateGeometry.well_index``)."""
+    return plate_geometry(wells, order).well_index(name)
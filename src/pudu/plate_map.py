@@ -0,0 +1,234 @@
+"""
+Agar plate maps of plating runs.
+
+``PlateMap`` lays out every agar spot of a plating run (construct × replicate ×
+dilution step) as index-aligned arrays: entry ``i`` is plated on plate
+``plate[i]``, well ``well[i]`` (column-major well index), from dilution step
+``dilution[i]``, construct ``construct[i]`` and replicate ``replicate[i]``. The
+arrays are computed once by index arithmetic, and a per-plate grid of entry
+indices is built from them, so the JSON, Excel and Markdown renderers read
+every well of every plate exactly once, for 96- or 384-well agar layouts and
+any number of plates.
+
+Spots fill each dilution step construct by construct, replicates in adjacent
+wells, in the Opentrons ``wells()`` order. With two dilution steps that fit in
+half a plate each, both share a plate (dilution 2 starts halfway); otherwise
+each step starts on a plate of its own. A step that does not fit on one plate
+continues on the next.
+
+Example::
+
+    from pudu.plate_map import PlateMap
+
+    plate_map = PlateMap([('A1', 'GFP'), ('B1', 'RFP')], replicates=2,
+                         ratios=['1/10', '1/100'], wells=384)
+    print(plate_map.render_markdown())
+"""
+
+from typing import Dict, List, Sequence, Tuple
+
+from pudu.plate_geometry import PLATE_FORMATS, plate_geometry
+
+EMPTY = -1  # grid value of a well without a spot
+
+
+def plate_format(load_name: str, default: int = 96) -> int:
+    """Number of wells of a plate, read from its labware load name (``'corning_384_wellplate...'``)."""
+    for wells in sorted(PLATE_FORMATS, reverse=True):
+        if str(wells) in load_name:
+            return wells
+    return default
+
+
+class PlateMap:
+    """
+    Spot-by-spot agar plate layout.
+
+    Attributes:
+        constructs: ``(source_well, construct_name)`` of every construct.
+        replicates: Spots per construct and dilution step.
+        ratios: Dilution ratio label of every dilution step (``'1/10'``).
+        geometry: ``PlateGeometry`` of the agar plates.
+        plate, well, dilution, construct, replicate: Index arrays, one entry per
+            spot (all 0-based).
+        grid: Per plate, the entry index of every well (column-major), ``EMPTY``
+            for wells without a spot.
+    """
+
+    def __init__(self, constructs: Sequence[Tuple[str, str]], replicates: int,
+                 ratios: Sequence[str], wells: int = 96):
+        """
+        Args:
+            constructs: ``(source_well, construct_name)`` of every construct, in plating order.
+            replicates: Spots per construct and dilution step.
+            ratios: Dilution ratio label of every dilution step.
+            wells: Wells per agar plate, a format of ``PLATE_FORMATS``.
+
+        Raises:
+            ValueError: If *replicates* is less than 1 or *wells* is not a known plate format.
+        """
+        if replicates < 1:
+            raise ValueError(f"replicates must be at least 1, got {replicates}")
+        self.constructs = list(constructs)
+        self.replicates = replicates
+        self.ratios = list(ratios)
+        self.geometry = plate_geometry(wells)
+
+        per_dilution = len(self.constructs) * replicates
+        half = wells // 2
+        if len(self.ratios) == 2 and per_dilution <= half:
+            first_plates = [0, 0]
+            first_wells = [0, half]
+        else:
+            plates_per_dilution = -(-per_dilution // wells)
+            first_plates = [step * plates_per_dilution for step in range(len(self.ratios))]
+            first_wells = [0] * len(self.ratios)
+
+        spots = range(per_dilution * len(self.ratios))
+        self.dilution: List[int] = [spot // per_dilution for spot in spots]
+        offsets = [spot % per_dilution for spot in spots]
+        self.construct: List[int] = [offset // replicates for offset in offsets]
+        self.replicate: List[int] = [offset % replicates for offset in offsets]
+        absolute = [first_wells[step] + offset for step, offset in zip(self.dilution, offsets)]
+        self.plate: List[int] = [first_plates[step] + index // wells
+                                 for step, index in zip(self.dilution, absolute)]
+        self.well: List[int] = [index % wells for index in absolute]
+
+        number_plates = self.plate[-1] + 1 if self.plate else 0
+        self.grid: List[List[int]] = [[EMPTY] * wells for _ in range(number_plates)]
+        for entry, (plate, well) in enumerate(zip(self.plate, self.well)):
+            self.grid[plate][well] = entry
+
+    def __len__(self) -> int:
+        return len(self.well)
+
+    @property
+    def number_plates(self) -> int:
+        return len(self.grid)
+
+    def plate_dilutions(self, plate: int) -> List[int]:
+        """Dilution steps (0-based) spotted on *plate*, in order."""
+        return sorted({self.dilution[entry] for entry in self.grid[plate] if entry != EMPTY})
+
+    def label(self, entry: int) -> str:
+        """Cell label of a spot: the first part of the construct name and, with replicates, ``R<n>``."""
+        label = self.constructs[self.construct[entry]][1].split(', ')[0]
+        if self.replicates > 1:
+            label += f"\nR{self.replicate[entry] + 1}"
+        return label
+
+    def rows(self, plate: int):
+        """Row letter and the entry index of every well, row by row, of *plate*."""
+        geometry = self.geometry
+        cells = self.grid[plate]
+        for row in range(geometry.rows):
+            yield chr(ord('A') + row), [cells[column * geometry.rows + row] for column in range(geometry.columns)]
+
+    def _title(self, plate: int) -> str:
+        ratio_parts = [f"Dilution {step + 1}: {self.ratios[step]}" for step in self.plate_dilutions(plate)]
+        return f"Plate {plate + 1} · " + " | ".join(ratio_parts)
+
+    def to_dict(self) -> Dict:
+        """
+        Nested mapping ``plate_<n>`` -> ``dilution_<n>`` -> ``{'ratio', 'wells'}``,
+        where ``wells`` maps well names to ``{'construct', 'source_well', 'replicate'}``.
+        """
+        names = self.geometry.names
+        plates: Dict = {}
+        for entry in range(len(self)):
+            step = self.dilution[entry]
+            dilutions = plates.setdefault(f'plate_{self.plate[entry] + 1}', {})
+            dilution = dilutions.setdefault(f'dilution_{step + 1}', {'ratio': self.ratios[step], 'wells': {}})
+            source_well, name = self.constructs[self.construct[entry]]
+            dilution['wells'][names[self.well[entry]]] = {
+                'construct': name,
+                'source_well': source_well,
+                'replicate': self.replicate[entry] + 1,
+            }
+        return plates
+
+    def render_markdown(self) -> str:
+        """One Markdown table per plate; each spot reads ``construct R<n> (<ratio>)``."""
+        columns = range(1, self.geometry.columns + 1)
+        lines = ["# Agar Plate Layout", ""]
+        for plate in range(self.number_plates):
+            lines.extend([
+                f"## {self._title(plate)}",
+                "",
+                "| | " + " | ".join(str(column) for column in columns) + " |",
+                "| --- |" + " --- |" * len(columns),
+            ])
+            for row_letter, entries in self.rows(plate):
+                cells = [self.label(entry).replace('\n', ' ') + f" ({self.ratios[self.dilution[entry]]})"
+                         if entry != EMPTY else '' for entry in entries]
+                lines.append(f"| {row_letter} | " + " | ".join(cells) + " |")
+            lines.append("")
+        return "\n".join(lines)
+
+    def write_excel(self, output_path: str) -> None:
+        """
+        Write the plates as colour-coded grids (blue for dilution 1, orange for
+        dilution 2) to an ``.xlsx`` file.
+
+        Raises:
+            ImportError: If ``xlsxwriter`` is not installed.
+        """
+        try:
+            import xlsxwriter
+        except ImportError:
+            raise ImportError("xlsxwriter is required. Install with: pip install xlsxwriter")
+
+        workbook = xlsxwriter.Workbook(output_path)
+        worksheet = workbook.add_worksheet('Agar Plates')
+
+        title_fmt = workbook.add_format({
+            'bold': True, 'font_size': 12,
+            'bg_color': '#4472C4', 'font_color': 'white',
+            'align': 'center', 'valign': 'vcenter', 'border': 1,
+        })
+        header_fmt = workbook.add_format({
+            'bold': True, 'bg_color': '#D9E1F2',
+            'align': 'center', 'valign': 'vcenter', 'border': 1,
+        })
+        well_fmts = [
+            workbook.add_format({
+                'align': 'center', 'valign': 'vcenter', 'text_wrap': True,
+                'bg_color': '#BDD7EE', 'border': 1,
+            }),
+            workbook.add_format({
+                'align': 'center', 'valign': 'vcenter', 'text_wrap': True,
+                'bg_color': '#FCE4D6', 'border': 1,
+            }),
+        ]
+        empty_fmt = workbook.add_format({'bg_color': '#F2F2F2', 'border': 1})
+
+        columns = self.geometry.columns
+        worksheet.set_column(0, 0, 4)
+        worksheet.set_column(1, columns, 20)
+
+        current_row = 0
+        for plate in range(self.number_plates):
+            if plate > 0:
+                current_row += 3
+
+            worksheet.merge_range(current_row, 0, current_row, columns, self._title(plate), title_fmt)
+            worksheet.set_row(current_row, 20)
+            current_row += 1
+
+            worksheet.write(current_row, 0, '', header_fmt)
+            for col in range(1, columns + 1):
+                worksheet.write(current_row, col, col, header_fmt)
+            current_row += 1
+
+            for row_letter, entries in self.rows(plate):
+                worksheet.write(current_row, 0, row_letter, header_fmt)
+                worksheet.set_row(current_row, 30)
+                for col, entry in enumerate(entries, start=1):
+                    if entry == EMPTY:
+                        worksheet.write(current_row, col, '', empty_fmt)
+                    else:
+                        well_fmt = well_fmts[min(self.dilution[entry], len(well_fmts) - 1)]
+                        worksheet.write(current_row, col, self.label(entry), well_fmt)
+                current_row += 1
+
+        workbook.close()
@@ -1,8 +1,15 @@
 import json
-from typing import Optional, Dict, List
+import math
+import os
+from typing import Optional, Dict, List, TYPE_CHECKING
 from dataclasses import dataclass
-from pudu import colors, SmartPipette
-from opentrons import protocol_api
+from pudu.utils import colors, SmartPipette, is_multichannel, column_heads
+from pudu.tip_budget import TipBudget, apply_tip_state, export_tip_state
+from pudu.plate_geometry import plate_geometry
+from pudu.plate_map import PlateMap, plate_format
+
+if TYPE_CHECKING:
+    from opentrons import protocol_api
 
 class Plating():
     """
@@ -39,6 +46,17 @@ class Plating():
         bacterium_locations: Dict mapping thermocycler well names to construct
             identifiers, e.g. ``{'A1': 'GFP_construct', 'B1': ['RFP', 'v2']}``.
         protocol_name: Base name for output files (JSON and Excel).
+        multichannel: ``True`` when ``large_pipette`` is a multi-channel model
+            (e.g. ``'p300_multi_gen2'``). LB is then loaded into ``reservoir`` in
+            place of the tube rack and dispensed 8 wells at a time to every
+            dilution-plate column that holds a dilution well; the spare wells of
+            a partly used column also receive LB and are left unused.
+        tip_state: Tip state written by the previous protocol run on the robot
+            (``tip_state.json``). Pipettes without ``initial_small_tip`` /
+            ``initial_large_tip`` continue the partially used racks it records.
+        tip_state_output: If given, the tip state after plating is written to this
+            path (relative to ``output_dir``) during simulation, for the next protocol
+            in the chain. By default, no tip state file is written.
     """
     def __init__(self,
                  plating_data: Optional[Dict] = None,
@@ -76,11 +94,14 @@ class Plating():
                  tube_rack: str = 'opentrons_15_tuberack_falcon_15ml_conical',
                  tube_rack_position: str = '4',
                  lb_tube_position: int = 0,
+                 reservoir: str = 'nest_12_reservoir_15ml',
 
                  aspiration_rate: float = 0.5,
                  dispense_rate: float = 1,
                  bacterium_locations: Optional[Dict] = None,
                  protocol_name: str = 'plating_layout',
+                 tip_state: Optional[Dict] = None,
+                 tip_state_output: Optional[str] = None,
                  **kwargs):
 
         # Collect kwargs for merging
@@ -114,6 +135,7 @@ class Plating():
             'tube_rack': tube_rack,
             'tube_rack_position': tube_rack_position,
             'lb_tube_position': lb_tube_position,
+            'reservoir': reservoir,
             'aspiration_rate': aspiration_rate,
             'dispense_rate': dispense_rate,
             'bacterium_locations': bacterium_locations,
@@ -160,12 +182,19 @@ class Plating():
         self.tube_rack = self._merged_params['tube_rack']
         self.tube_rack_position = self._merged_params['tube_rack_position']
         self.lb_tube_position = self._merged_params['lb_tube_position']
+        self.reservoir = self._merged_params['reservoir']
+        self.multichannel = is_multichannel(self.large_pipette)
         self.aspiration_rate = self._merged_params['aspiration_rate']
         self.dispense_rate = self._merged_params['dispense_rate']
         self.bacterium_locations = self._merged_params['bacterium_locations']
         self.number_constructs = len(self.bacterium_locations)
         self.max_colonies = self._merged_params['max_colonies']
         self.protocol_name = self._merged_params['protocol_name']
+        self.tip_budgets = {}  # 'small' / 'large' -> TipBudget, set up in run()
+        self.tip_state = tip_state  # tip rack labware -> partially used rack, from the previous protocol
+        self.tip_state_output = tip_state_output  # path the tip state is exported to during simulation
+        self.export_outputs = True  # simulation writes the plate map files and the tip state
+        self.output_dir = '.'  # directory the exported files are written to
 
         self.total_colonies = self.number_constructs * self.number_dilutions * self.replicates
 
@@ -234,6 +263,7 @@ class Plating():
             'tube_rack': 'opentrons_15_tuberack_falcon_15ml_conical',
             'tube_rack_position': '4',
             'lb_tube_position': 0,
+            'reservoir': 'nest_12_reservoir_15ml',
             'aspiration_rate': 0.5,
             'dispense_rate': 1,
             'bacterium_locations': None,
@@ -288,7 +318,8 @@ class Plating():
         Args:
             protocol: Protocol context (used for comments)
             plate1: Primary labware object
-            plate2: Optional secondary labware object, required when wells_per_dilution > 48
+            plate2: Optional secondary labware object, required when wells_per_dilution is
+                more than half the wells of plate1 (48 on a 96-well plate)
             wells_per_dilution: Number of wells needed per dilution step. Defaults to
                 number_constructs * replicates (original behaviour). Pass
                 number_constructs for dilution plates and number_constructs * replicates
@@ -299,13 +330,14 @@ class Plating():
         """
         if wells_per_dilution is None:
             wells_per_dilution = self.number_constructs * self.replicates
+        half = len(plate1.wells()) // 2
 
         layout = {
             'dilution_1': {'plate': 1, 'wells': []},
             'dilution_2': {'plate': 1, 'wells': []} if self.number_dilutions == 2 else None
         }
 
-        if self.number_dilutions == 2 and wells_per_dilution > 48:
+        if self.number_dilutions == 2 and wells_per_dilution > half:
             if plate2 is None:
                 raise ValueError("Two plates required but plate2 not provided")
             # Each dilution step gets its own plate
@@ -313,10 +345,10 @@ class Plating():
             layout['dilution_2']['plate'] = 2
             layout['dilution_2']['wells'] = plate2.wells()[:wells_per_dilution]
             protocol.comment(f"Using 2 plates: {wells_per_dilution} wells per dilution exceeds single-plate half capacity")
-        elif self.number_dilutions == 2 and wells_per_dilution <= 48:
+        elif self.number_dilutions == 2 and wells_per_dilution <= half:
             # Both dilution steps fit on one plate (each in one half)
             layout['dilution_1']['wells'] = plate1.wells()[:wells_per_dilution]
-            layout['dilution_2']['wells'] = plate1.wells()[48:48 + wells_per_dilution]
+            layout['dilution_2']['wells'] = plate1.wells()[half:half + wells_per_dilution]
             protocol.comment(f"Using one plate: {wells_per_dilution} wells per dilution fits in each half")
         else:
             # Single dilution step
@@ -325,9 +357,7 @@ class Plating():
 
     @staticmethod
     def _well_name_from_index(idx: int) -> str:
-        row = idx % 8
-        col = idx // 8
-        return f"{'ABCDEFGH'[row]}{col + 1}"
+        return plate_geometry(96).well_name(idx)
 
     @staticmethod
     def _format_construct_name(construct_names) -> str:
@@ -340,6 +370,21 @@ class Plating():
         factor_int = int(factor) if float(factor).is_integer() else factor
         return f"1/{factor_int}"
 
+    def build_plate_map(self) -> PlateMap:
+        """
+        Spot-by-spot agar plate layout (see ``pudu.plate_map``).
+
+        The agar plate format (96 or 384 wells) is read from the ``agar_plate``
+        load name.
+        """
+        return PlateMap(
+            [(source_well, self._format_construct_name(names))
+             for source_well, names in self.bacterium_locations.items()],
+            self.replicates,
+            [self._dilution_ratio_label(step) for step in range(1, self.number_dilutions + 1)],
+            wells=plate_format(self.agar_plate),
+        )
+
     def build_agar_plate_map(self) -> Dict:
         """
         Build a nested mapping of agar plate wells to construct metadata.
@@ -349,55 +394,14 @@ class Plating():
         contains ``'ratio'`` (e.g. ``'1/10'``) and ``'wells'``, a dict mapping
         well names (e.g. ``'A1'``) to ``{'construct', 'source_well', 'replicate'}``.
 
-        When both dilutions fit on a single 96-well plate (≤ 48 wells per
-        dilution), they are placed in the top and bottom halves respectively.
-        When a dilution exceeds 48 wells, each step gets its own physical plate.
+        When both dilutions fit on a single plate (≤ 48 wells per dilution on a
+        96-well plate), they are placed in the first and second halves
+        respectively. Otherwise each dilution step starts on a plate of its own.
 
         Returns:
             Nested dict describing the complete agar plate layout.
         """
-        constructs = list(self.bacterium_locations.items())
-        agar_wells_per = self.number_constructs * self.replicates
-        plates: Dict = {}
-
-        for dilution_step in range(1, self.number_dilutions + 1):
-            ratio = self._dilution_ratio_label(dilution_step)
-            dilution_key = f'dilution_{dilution_step}'
-
-            if self.number_dilutions == 2 and agar_wells_per > 48:
-                # Each dilution gets its own plate starting at index 0
-                base_plate = dilution_step
-                base_idx = 0
-            else:
-                # Both dilutions share plate_1; dilution_2 starts at the halfway point
-                base_plate = 1
-                base_idx = 0 if dilution_step == 1 else 48
-
-            for construct_idx, (source_well, construct_names) in enumerate(constructs):
-                name_str = self._format_construct_name(construct_names)
-                for replicate in range(self.replicates):
-                    absolute_idx = base_idx + construct_idx * self.replicates + replicate
-
-                    if absolute_idx < 96:
-                        plate_key = f'plate_{base_plate}'
-                        mapped_idx = absolute_idx
-                    else:
-                        plate_key = f'plate_{base_plate + 1}'
-                        mapped_idx = absolute_idx - 96
-
-                    if plate_key not in plates:
-                        plates[plate_key] = {}
-                    if dilution_key not in plates[plate_key]:
-                        plates[plate_key][dilution_key] = {'ratio': ratio, 'wells': {}}
-
-                    well_name = self._well_name_from_index(mapped_idx)
-                    plates[plate_key][dilution_key]['wells'][well_name] = {
-                        'construct': name_str,
-                        'source_well': source_well,
-                        'replicate': replicate + 1,
-                    }
-
-        return plates
+        return self.build_plate_map().to_dict()
 
     def get_plates_json(self) -> Dict:
         """Return the full agar plate map wrapped under an ``'agar_plates'`` key."""
@@ -422,7 +426,7 @@ class Plating():
         """
         Write a colour-coded Excel representation of the agar plate map.
 
-        Each physical plate becomes a 8 × 12 grid in the worksheet, with cells
+        Each physical plate becomes a grid (8 × 12 or 16 × 24) in the worksheet, with cells
         colour-coded by dilution step (blue for dilution 1, orange for dilution 2)
         and labelled with the construct name and replicate number.
 
@@ -432,85 +436,14 @@ class Plating():
         Raises:
             ImportError: If ``xlsxwriter`` is not installed.
         """
-        try:
-            import xlsxwriter
-        except ImportError:
-            raise ImportError("xlsxwriter is required. Install with: pip install xlsxwriter")
-
-        plates_data = self.build_agar_plate_map()
-        workbook = xlsxwriter.Workbook(output_path)
-        worksheet = workbook.add_worksheet('Agar Plates')
-
-        title_fmt = workbook.add_format({
-            'bold': True, 'font_size': 12,
-            'bg_color': '#4472C4', 'font_color': 'white',
-            'align': 'center', 'valign': 'vcenter', 'border': 1,
-        })
-        header_fmt = workbook.add_format({
-            'bold': True, 'bg_color': '#D9E1F2',
-            'align': 'center', 'valign': 'vcenter', 'border': 1,
-        })
-        well_fmts = {
-            1: workbook.add_format({
-                'align': 'center', 'valign': 'vcenter', 'text_wrap': True,
-                'bg_color': '#BDD7EE', 'border': 1,
-            }),
-            2: workbook.add_format({
-                'align': 'center', 'valign': 'vcenter', 'text_wrap': True,
-                'bg_color': '#FCE4D6', 'border': 1,
-            }),
-        }
-        empty_fmt = workbook.add_format({'bg_color': '#F2F2F2', 'border': 1})
-
-        worksheet.set_column(0, 0, 4)
-        worksheet.set_column(1, 12, 20)
-
-        current_row = 0
-
-        for plate_idx, (plate_key, dilutions) in enumerate(plates_data.items()):
-            if plate_idx > 0:
-                current_row += 3
-
-            plate_num = plate_key.split('_')[1]
-            ratio_parts = [
-                f"Dilution {dk.split('_')[1]}: {dd['ratio']}"
-                for dk, dd in dilutions.items()
-            ]
-            title = f"Plate {plate_num} · " + " | ".join(ratio_parts)
-
-            worksheet.merge_range(current_row, 0, current_row, 12, title, title_fmt)
-            worksheet.set_row(current_row, 20)
-            current_row += 1
-
-            worksheet.write(current_row, 0, '', header_fmt)
-            for col in range(1, 13):
-                worksheet.write(current_row, col, col, header_fmt)
-            current_row += 1
-
-            for row_letter in 'ABCDEFGH':
-                worksheet.write(current_row, 0, row_letter, header_fmt)
-                worksheet.set_row(current_row, 30)
-                for col_num in range(1, 13):
-                    well_name = f"{row_letter}{col_num}"
-                    cell_written = False
-                    for dilution_key, dilution_data in dilutions.items():
-                        if well_name in dilution_data['wells']:
-                            w = dilution_data['wells'][well_name]
-                            dilution_num = int(dilution_key.split('_')[1])
-                            well_fmt = well_fmts.get(dilution_num, well_fmts[1])
-                            label = w['construct'].split(', ')[0]
-                            if self.replicates > 1:
-                                label += f"\nR{w['replicate']}"
-                            worksheet.write(current_row, col_num, label, well_fmt)
-                            cell_written = True
-                            break
-                    if not cell_written:
-                        worksheet.write(current_row, col_num, '', empty_fmt)
-                current_row += 1
-
-        workbook.close()
-
-    def run(self, protocol: protocol_api.ProtocolContext):
+        self.build_plate_map().write_excel(output_path)
+
+    def write_plates_markdown(self, output_path: str) -> None:
+        """Write the agar plate map as Markdown tables, one per plate."""
+        with open(output_path, 'w', encoding='utf-8') as handle:
+            handle.write(self.build_plate_map().render_markdown())
+
+    def run(self, protocol: 'protocol_api.ProtocolContext'):
         """
         Execute the automated plating protocol on the OT-2.
 
@@ -518,19 +451,23 @@ class Plating():
             - Slot 7/8/10/11: Thermocycler module (source bacteria in PCR plate)
             - Slot 1: Large tip rack (200 µL, for LB distribution)
             - Slot 9: Small tip rack (20 µL, for bacteria and agar transfers)
-            - Slot 4: Tube rack with LB stock tube
+              Further racks are loaded off deck and swapped into slots 1 and 9 as
+              the racks on deck run out (see ``pudu.tip_budget``).
+            - Slot 4: Tube rack with LB stock tube (reservoir in multi-channel mode)
             - Slot 2 (and 3 if needed): Dilution plate(s)
             - Slot 5 (and 6 if needed): Agar plate(s)
 
         Protocol steps:
             1. Distribute LB into all dilution wells using a single large-pipette
-               tip (one aspiration height adjustment per 8-well chunk).
+               tip (one aspiration height adjustment per 8-well chunk). With a
+               multi-channel large pipette, every column holding a dilution well
+               is filled 8 wells at a time.
             2. For each construct: transfer bacteria → dilution 1, mix, seed
                dilution 2 (if requested), then spot dilution 1 onto agar.
             3. With a fresh tip, spot dilution 2 onto agar.
 
         On simulation, writes ``{protocol_name}.json`` and ``{protocol_name}.xlsx``
-        describing the agar plate layout.
+        describing the agar plate layout to ``output_dir``.
 
         Args:
             protocol: Opentrons ``ProtocolContext`` provided by the OT-2 runtime.
@@ -539,21 +476,12 @@ class Plating():
         #Load the thermocycler module, its default location is on slots 7, 8, 10 and 11
         thermocycler = protocol.load_module('thermocyclerModuleV1')
         thermocycler_plate = thermocycler.load_labware(self.thermocycler_labware)
-        #Load the tipracks
-        small_tiprack = protocol.load_labware(self.small_tiprack, self.small_tiprack_position)
-        large_tiprack = protocol.load_labware(self.large_tiprack, self.large_tiprack_position)
-        #Load the pipettes
-        small_pipette = protocol.load_instrument(self.small_pipette, self.small_pipette_position, tip_racks=[small_tiprack])
-        if self.initial_small_tip:
-            small_pipette.starting_tip = small_tiprack[self.initial_small_tip]
-        large_pipette = protocol.load_instrument(self.large_pipette, self.large_pipette_position, tip_racks=[large_tiprack])
-        if self.initial_large_tip:
-            large_pipette.starting_tip = large_tiprack[self.initial_large_tip]
-        #SmartPipette Wrapper to avoid dunking into the LB
-        smart_pipette = SmartPipette(large_pipette,protocol)
-        #Load the tube rack
-        tube_rack = protocol.load_labware(self.tube_rack, self.tube_rack_position)
-        lb_tube = tube_rack.wells()[self.lb_tube_position]
+        #Load the tube rack, or a reservoir the 8 channels can reach in multi-channel mode
+        if self.multichannel:
+            lb_labware = protocol.load_labware(self.reservoir, self.tube_rack_position)
+        else:
+            lb_labware = protocol.load_labware(self.tube_rack, self.tube_rack_position)
+        lb_tube = lb_labware.wells()[self.lb_tube_position]
         #load liquids
         liquid_broth = protocol.define_liquid(
             name="liquid_broth",
@@ -601,40 +529,60 @@ class Plating():
             agar_layout = self.calculate_plate_layout(protocol, agar_plate1,
                                                       wells_per_dilution=self.number_constructs * self.replicates)
 
+        # Get all wells that will receive LB (both dilutions if applicable)
+        all_dilution_wells = dilution_layout['dilution_1']['wells'][:]
+        if self.number_dilutions == 2 and dilution_layout['dilution_2']:
+            all_dilution_wells.extend(dilution_layout['dilution_2']['wells'])
+
+        #Load the tipracks, with extra racks off deck when one is not enough, and the pipettes
+        tips_needed = self._calculate_tips_needed()
+        self.tip_budgets = {
+            'small': TipBudget(self.small_tiprack, [self.small_tiprack_position], tips_needed['small'],
+                               initial_tip=self.initial_small_tip),
+            'large': TipBudget(self.large_tiprack, [self.large_tiprack_position], tips_needed['large'],
+                               initial_tip=self.initial_large_tip, channels=8 if self.multichannel else 1),
+        }
+        apply_tip_state(protocol, self.tip_budgets.values(), self.tip_state)
+        small_pipette = self.tip_budgets['small'].load_pipette(protocol, self.small_pipette, self.small_pipette_position)
+        large_pipette = self.tip_budgets['large'].load_pipette(protocol, self.large_pipette, self.large_pipette_position)
+        #SmartPipette Wrapper to avoid dunking into the LB
+        smart_pipette = SmartPipette(large_pipette,protocol)
 
         thermocycler.set_block_temperature(4)
         thermocycler.open_lid()
 
         #Load the Liquid Broth into the dilution wells
         protocol.comment("\n=== Step 1: Distributing LB to dilution wells ===")
-        # Get all wells that will receive LB (both dilutions if applicable)
-        all_dilution_wells = dilution_layout['dilution_1']['wells'][:]
-        if self.number_dilutions == 2 and dilution_layout['dilution_2']:
-            all_dilution_wells.extend(dilution_layout['dilution_2']['wells'])
-        # Distribute LB using a single tip for the entire step
-        # Process in chunks of 8 wells to update aspiration height as the tube empties
-        chunk_size = 8
-        large_pipette.pick_up_tip()
-        for i in range(0, len(all_dilution_wells), chunk_size):
-            chunk_wells = all_dilution_wells[i:i + chunk_size]
-
-            # Get current aspiration location before each chunk
-            aspiration_location = smart_pipette.get_aspiration_location(lb_tube)
-            protocol.comment(f"Distributing to wells {i + 1}-{min(i + chunk_size, len(all_dilution_wells))}")
-
-            # Distribute without picking up a new tip each chunk
-            large_pipette.distribute(
-                volume=self.volume_lb_transfer,
-                source=aspiration_location,
-                dest=chunk_wells,
-                disposal_volume=4,
-                new_tip='never'
-            )
-
-            # Load liquid tracking for dilution wells
-            for well in chunk_wells:
+        if self.multichannel:
+            self._distribute_lb_multichannel(protocol, large_pipette, lb_tube, all_dilution_wells)
+            for well in all_dilution_wells:
                 well.load_liquid(liquid=liquid_broth, volume=self.volume_lb_transfer)
-        large_pipette.drop_tip()
+        else:
+            # Distribute LB using a single tip for the entire step
+            # Process in chunks of 8 wells to update aspiration height as the tube empties
+            chunk_size = 8
+            self.tip_budgets['large'].pick_up_tip(protocol, large_pipette)
+            for i in range(0, len(all_dilution_wells), chunk_size):
+                chunk_wells = all_dilution_wells[i:i + chunk_size]
+
+                # Get current aspiration location before each chunk
+                aspiration_location = smart_pipette.get_aspiration_location(lb_tube)
+                protocol.comment(f"Distributing to wells {i + 1}-{min(i + chunk_size, len(all_dilution_wells))}")
+
+                # Distribute without picking up a new tip each chunk
+                large_pipette.distribute(
+                    volume=self.volume_lb_transfer,
+                    source=aspiration_location,
+                    dest=chunk_wells,
+                    disposal_volume=4,
+                    new_tip='never'
+                )
+                smart_pipette.record(lb_tube, -self.volume_lb_transfer * len(chunk_wells))
+
+                # Load liquid tracking for dilution wells
+                for well in chunk_wells:
+                    well.load_liquid(liquid=liquid_broth, volume=self.volume_lb_transfer)
+            large_pipette.drop_tip()
 
         #Transfer bacteria to first dilution and process
         protocol.comment("\n=== Step 2: Transferring bacteria and plating ===")
@@ -646,7 +594,7 @@ class Plating():
             protocol.comment(f"\nProcessing construct {construct_idx + 1}: {construct_names}")
 
             # === Tip 1: set up dilutions + plate all dilution-1 replicates ===
-            small_pipette.pick_up_tip()
+            self.tip_budgets['small'].pick_up_tip(protocol, small_pipette)
 
             # Transfer bacteria → dilution1, mix
             small_pipette.aspirate(self.volume_bacteria_transfer, source_well, rate=self.aspiration_rate)
@@ -671,7 +619,7 @@ class Plating():
 
             # === Tip 2: plate all dilution-2 replicates with a clean tip ===
             if self.number_dilutions == 2:
-                small_pipette.pick_up_tip()
+                self.tip_budgets['small'].pick_up_tip(protocol, small_pipette)
                 for replicate in range(self.replicates):
                     agar2_well = agar_layout['dilution_2']['wells'][construct_idx * self.replicates + replicate]
                     small_pipette.aspirate(self.volume_colony, dilution2_well, rate=self.aspiration_rate)
@@ -687,16 +635,89 @@ class Plating():
         protocol.comment(f"Plated {self.number_constructs} constructs with {self.replicates} replicates")
         protocol.comment(f"Created a total of {self.total_colonies} colonies")
 
-        if protocol.is_simulating():
+        if protocol.is_simulating() and self.export_outputs:
             try:
                 output_path = f'{self.protocol_name}.json'
-                self.write_plates_json(output_path)
+                self.write_plates_json(os.path.join(self.output_dir, output_path))
                 protocol.comment(f"Generated {output_path}")
                 excel_path = f'{self.protocol_name}.xlsx'
-                self.write_plates_excel(excel_path)
+                self.write_plates_excel(os.path.join(self.output_dir, excel_path))
                 protocol.comment(f"Generated {excel_path}")
             except Exception as e:
                 protocol.comment(f"Could not export plating layout: {e}")
+            if self.tip_state_output:
+                try:
+                    export_tip_state(protocol, self.tip_budgets.values(), self.tip_state, type(self).__name__,
+                                     os.path.join(self.output_dir, self.tip_state_output))
+                except Exception as e:
+                    protocol.comment(f"Could not export tip state: {e}")
+
+    def _calculate_tips_needed(self) -> Dict[str, int]:
+        """
+        Tip pickups per pipette (``'small'``, ``'large'``) for the whole run.
+
+        Returns:
+            Dict of pickups; a multi-channel pickup counts once (it takes a column of tips).
+        """
+        # Step 2: one tip per construct and dilution step
+        return {'small': self.number_constructs * self.number_dilutions, 'large': 1}
+
+    def _distribute_lb_multichannel(self, protocol, large_pipette, lb_well, dilution_wells):
+        """
+        Distribute LB column-wise with a multi-channel large pipette.
+
+        Every dilution-plate column that holds a dilution well receives LB 8 wells
+        at a time with one ``distribute`` and a single column of tips. A dilution
+        step starts at the top of a column of its own plate half, so the spare
+        wells below a partly used column are never used by the protocol; filling
+        them keeps the run on all 8 nozzles, as a single nozzle cannot reach the
+        reservoir or the dilution plate without passing over neighbouring labware.
+
+        Args:
+            protocol: Opentrons ``ProtocolContext``.
+            large_pipette: Multi-channel pipette instrument.
+            lb_well: Reservoir well containing LB.
+            dilution_wells: All dilution wells that receive LB.
+
+        Raises:
+            ValueError: If the dilution plate columns do not match the pipette
+                channels, the LB does not fit in the reservoir well, or the loaded
+                ``volume_lb`` does not cover every filled well.
+        """
+        heads = column_heads(dilution_wells)
+        if any(len(head.parent.columns()[0]) != large_pipette.channels for head in heads):
+            raise ValueError(
+                f'{self.dilution_plate} columns do not fit the {large_pipette.channels} channels of '
+                f'{self.large_pipette}. Please modify the protocol and try again.'
+            )
+
+        # Every aspiration of every channel carries a 4 µL disposal volume
+        disposal_volume = 4
+        doses_per_trip = int((large_pipette.max_volume - disposal_volume) // self.volume_lb_transfer)
+        filled_wells = len(heads) * large_pipette.channels
+        aspirations = math.ceil(len(heads) / doses_per_trip) * large_pipette.channels
+        required = filled_wells * self.volume_lb_transfer + aspirations * disposal_volume
+        if self.volume_lb > lb_well.max_volume:
+            raise ValueError(
+                f'{self.volume_lb} µL of LB exceeds the {lb_well.max_volume} µL capacity of reservoir well '
+                f'{lb_well.well_name}. Please modify the protocol and try again.'
+            )
+        if required > self.volume_lb:
+            raise ValueError(
+                f'LB for {filled_wells} dilution plate wells ({required:.0f} µL) exceeds the {self.volume_lb} µL '
+                f'loaded in reservoir well {lb_well.well_name}. Please modify the protocol and try again.'
+            )
+
+        protocol.comment(f"Distributing to {len(heads)} columns with {self.large_pipette} "
+                         f"({filled_wells - len(dilution_wells)} spare wells)")
+        self.tip_budgets['large'].before_pickup(protocol)
+        large_pipette.distribute(
+            volume=self.volume_lb_transfer,
+            source=lb_well,
+            dest=heads,
+            disposal_volume=disposal_volume,
+            new_tip='once'
+        )
 
 
 @dataclass
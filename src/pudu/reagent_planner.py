@@ -0,0 +1,188 @@
+"""
+Reagent volumes a protocol needs, tube by tube.
+
+``plan_reagent_volumes`` dry-runs a protocol object (see :mod:`pudu.dry_run`)
+and reads back how much liquid the pipettes drew from every well. The volume a
+tube needs is the most it is drawn down at any point of the run (liquid the
+robot dispenses into a tube first, like a master mix, is credited), plus the
+dead volume of its labware: the liquid a tip cannot reach at the bottom of a
+tube or reservoir. Wells whose loaded volume (``well.load_liquid``) is below
+that are flagged as running dry, before the run aborts halfway or an expensive
+enzyme is wasted.
+
+Example::
+
+    from pudu.reagent_planner import plan_reagent_volumes
+
+    plan = plan_reagent_volumes(SBOLLoopAssembly(assemblies))
+    print(plan.summary())
+    for tube in plan.dry:
+        print(f"{tube.liquid}: load {tube.required} µL, not {tube.loaded} µL")
+"""
+
+import contextlib
+import copy
+import io
+import json
+import math
+from dataclasses import asdict, dataclass
+from typing import Dict, List, Optional
+
+# (substring of the labware load name, dead volume in µL); the first match wins
+DEAD_VOLUMES = (
+    ('nest_1_reservoir', 5000),
+    ('reservoir', 1500),
+    ('50ml', 3000),
+    ('15ml', 1000),
+    ('2ml', 30),
+    ('1.5ml', 20),
+    ('pcr', 5),
+    ('wellplate', 10),
+)
+DEFAULT_DEAD_VOLUME = 10
+REAGENT_VOLUMES_FILE = 'reagent_volumes.json'
+
+
+def dead_volume(load_name: str, dead_volumes: Optional[Dict[str, float]] = None) -> float:
+    """
+    Dead volume in µL of a well of *load_name*.
+
+    *dead_volumes* maps load names to dead volumes and takes precedence over
+    ``DEAD_VOLUMES``.
+    """
+    if dead_volumes and load_name in dead_volumes:
+        return dead_volumes[load_name]
+    for pattern, volume in DEAD_VOLUMES:
+        if pattern in load_name:
+            return volume
+    return DEFAULT_DEAD_VOLUME
+
+
+@dataclass
+class TubeRequirement:
+    """
+    Liquid one well must hold at the start of the run.
+
+    Attributes:
+        labware: Load name of the labware.
+        slot: Deck slot of the labware (of its module for module labware).
+        well: Well name.
+        liquid: Name of the liquid loaded in the well, ``None`` if none was defined.
+        used: Most liquid drawn from the well at any point of the run, in µL.
+        dead_volume: Dead volume of the labware, in µL.
+        loaded: Volume loaded with ``load_liquid``, ``None`` if none was loaded.
+    """
+    labware: str
+    slot: Optional[str]
+    well: str
+    liquid: Optional[str]
+    used: float
+    dead_volume: float
+    loaded: Optional[float] = None
+
+    @property
+    def required(self) -> float:
+        """Volume to load, rounded up to the µL."""
+        return float(math.ceil(round(self.used + self.dead_volume, 6)))
+
+    @property
+    def runs_dry(self) -> bool:
+        """``True`` if the loaded volume does not cover ``required``."""
+        return self.loaded is not None and self.loaded < self.required
+
+    def to_dict(self) -> Dict:
+        data = asdict(self)
+        data.update(required=self.required, runs_dry=self.runs_dry)
+        return data
+
+
+class ReagentPlan:
+    """
+    Required volume of every tube a dry-run protocol draws liquid from.
+
+    Attributes:
+        tubes: One ``TubeRequirement`` per source well, in load order.
+    """
+
+    def __init__(self, tubes: List[TubeRequirement]):
+        self.tubes = tubes
+
+    @classmethod
+    def from_context(cls, context, dead_volumes: Optional[Dict[str, float]] = None) -> 'ReagentPlan':
+        """Plan from a ``DryRunContext`` the protocol has already run on."""
+        tubes = []
+        for labware in context.all_labware:
+            if labware.is_tiprack:
+                continue
+            parent = labware.parent
+            slot = parent if isinstance(parent, str) else getattr(parent, 'parent', None)
+            for well in labware.wells():
+                if well.peak_withdrawal <= 0:
+                    continue
+                tubes.append(TubeRequirement(
+                    labware=labware.load_name,
+                    slot=slot,
+                    well=well.well_name,
+                    liquid=getattr(well.liquid, 'name', None),
+                    used=round(well.peak_withdrawal, 3),
+                    dead_volume=dead_volume(labware.load_name, dead_volumes),
+                    loaded=well.loaded_volume,
+                ))
+        return cls(tubes)
+
+    @property
+    def dry(self) -> List[TubeRequirement]:
+        """Tubes whose loaded volume is below the required volume."""
+        return [tube for tube in self.tubes if tube.runs_dry]
+
+    def by_liquid(self) -> Dict[str, float]:
+        """Total required volume per liquid, over all its tubes."""
+        totals = {}
+        for tube in self.tubes:
+            name = tube.liquid or f"{tube.labware} {tube.well}"
+            totals[name] = totals.get(name, 0.0) + tube.required
+        return totals
+
+    def summary(self) -> str:
+        lines = [f"{'Liquid':<40} {'Well':<10} {'Used':>9} {'Dead':>7} {'Load':>9}"]
+        for tube in self.tubes:
+            location = f"{tube.slot}:{tube.well}"
+            line = (f"{(tube.liquid or tube.labware)[:40]:<40} {location:<10} {tube.used:>7.1f}µL "
+                    f"{tube.dead_volume:>5.0f}µL {tube.required:>7.0f}µL")
+            if tube.runs_dry:
+                line += f"  RUNS DRY (loaded {tube.loaded:.0f}µL)"
+            lines.append(line)
+        return '\n'.join(lines)
+
+    def to_dict(self) -> Dict:
+        return {
+            'tubes': [tube.to_dict() for tube in self.tubes],
+            'by_liquid': self.by_liquid(),
+            'runs_dry': [f"{tube.slot}:{tube.well}" for tube in self.dry],
+        }
+
+    def write(self, path=REAGENT_VOLUMES_FILE):
+        """Write the plan as JSON."""
+        with open(path, 'w') as f:
+            json.dump(self.to_dict(), f, indent=2)
+
+
+def plan_reagent_volumes(protocol_obj, dead_volumes: Optional[Dict[str, float]] = None) -> ReagentPlan:
+    """
+    Dry-run *protocol_obj* and plan the volume of every tube it draws from.
+
+    The protocol object is deep-copied first so the caller's instance is left
+    untouched, and run as on the robot (``is_simulating() == False``) so no
+    output files are written.
+
+    Args:
+        protocol_obj: Any PUDU protocol class instance with a ``run(protocol)`` method.
+        dead_volumes: Dead volume in µL per labware load name, overriding ``DEAD_VOLUMES``.
+    """
+    from pudu.dry_run import dry_run
+
+    subject = copy.deepcopy(protocol_obj)
+    # The protocol classes print their location maps at the end of run()
+    with contextlib.redirect_stdout(io.StringIO()):
+        context = dry_run(subject, simulating=False)
+    return ReagentPlan.from_context(context, dead_volumes)
@@ -0,0 +1,742 @@
+"""
+Offline run-time estimation for PUDU protocols.
+
+The estimator runs a protocol class' ``run()`` against a recording wrapper of
+a ``ProtocolContext`` and adds up the time every command would take on an
+OT-2: aspirate/dispense at the requested ``rate``, gantry moves between deck
+positions, tip pickup and drop, mixes, temperature module ramps and
+thermocycler holds, ramps and lid moves.
+
+Commands are grouped into stages. A stage is the protocol method called from
+``run()`` that issued the command (e.g. ``_transfer_DNA``). Module commands
+issued directly inside ``run()`` are reported as ``temperature control``, and
+other commands issued by ``run()`` fall under the last ``=== Step ... ===``
+heading written with ``protocol.comment``.
+
+Example::
+
+    from pudu import SBOLLoopAssembly
+    from pudu.runtime import estimate_runtime
+
+    estimate = estimate_runtime(SBOLLoopAssembly(assemblies))
+    print(estimate.summary())
+"""
+
+import copy
+import inspect
+import math
+import re
+import sys
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+
+# Approximate deck position (x, y) of the front-left corner of each OT-2 slot in mm.
+OT2_SLOT_POSITIONS = {
+    str(slot): (((slot - 1) % 3) * 132.5, ((slot - 1) // 3) * 90.5) for slot in range(1, 13)
+}
+# Footprint of an SBS labware, used to find the centre of a slot.
+SLOT_CENTER_OFFSET = (63.88, 42.74)
+
+PIPETTE_COMMANDS = {
+    'aspirate', 'dispense', 'mix', 'blow_out', 'touch_tip', 'air_gap', 'pick_up_tip',
+    'drop_tip', 'return_tip', 'distribute', 'transfer', 'consolidate', 'move_to',
+}
+MODULE_COMMANDS = {
+    'set_temperature', 'start_set_temperature', 'await_temperature', 'deactivate',
+    'open_lid', 'close_lid', 'set_lid_temperature', 'set_block_temperature',
+    'execute_profile', 'deactivate_lid', 'deactivate_block', 'load_labware',
+}
+PROTOCOL_COMMANDS = {
+    'load_labware', 'load_module', 'load_instrument', 'move_labware', 'delay', 'pause',
+    'comment', 'home',
+}
+
+_HEADING_PATTERN = re.compile(r'^=+\s*([^=].*?)\s*=+$')
+
+
+@dataclass
+class RuntimeModel:
+    """
+    Timing constants used to convert commands into seconds.
+
+    Default flow rates are the OT-2 GEN2 defaults in µL/s. They are only used
+    when the recorded pipette does not report its own ``flow_rate``.
+    """
+    gantry_speed: float = 400.0             # mm/s, XY travel between positions
+    move_overhead: float = 1.5              # s, retract/plunge and acceleration per move
+    aspirate_overhead: float = 0.5          # s, settle time after each aspirate/dispense
+    tip_pickup: float = 4.0                 # s
+    tip_drop: float = 3.0                   # s
+    blow_out: float = 1.0                   # s
+    touch_tip: float = 2.5                  # s
+    temperature_module_rate: float = 0.06   # °C/s, GEN2 temperature module ramp
+    block_heating_rate: float = 4.0         # °C/s, thermocycler block
+    block_cooling_rate: float = 2.0         # °C/s, thermocycler block
+    lid_heating_rate: float = 0.35          # °C/s, thermocycler lid
+    lid_motion: float = 20.0                # s, open or close the thermocycler lid
+    manual_labware_move: float = 30.0       # s, operator moving labware by hand
+    manual_pause: float = 60.0              # s, operator resuming a paused protocol
+    home: float = 10.0                      # s
+    ambient_temperature: float = 25.0       # °C
+    default_flow_rates: Dict[str, float] = field(default_factory=lambda: {
+        'p20_single_gen2': 7.56,
+        'p20_multi_gen2': 7.6,
+        'p300_single_gen2': 92.86,
+        'p300_multi_gen2': 94.0,
+        'p1000_single_gen2': 274.7,
+    })
+
+
+@dataclass
+class RuntimeEstimate:
+    """Estimated run time of one protocol, broken down by stage and by category."""
+    total_seconds: float = 0.0
+    stages: Dict[str, float] = field(default_factory=dict)
+    categories: Dict[str, float] = field(default_factory=dict)
+    command_count: int = 0
+
+    @property
+    def total_minutes(self) -> float:
+        return self.total_seconds / 60
+
+    def add(self, stage: str, category: str, seconds: float):
+        """Add *seconds* to the running totals of *stage* and *category*."""
+        if seconds <= 0:
+            return
+        self.total_seconds += seconds
+        self.stages[stage] = self.stages.get(stage, 0.0) + seconds
+        self.categories[category] = self.categories.get(category, 0.0) + seconds
+
+    def to_dict(self) -> Dict:
+        return {
+            'total_seconds': round(self.total_seconds, 1),
+            'total_minutes': round(self.total_minutes, 1),
+            'command_count': self.command_count,
+            'stages': {k: round(v, 1) for k, v in self.stages.items()},
+            'categories': {k: round(v, 1) for k, v in self.categories.items()},
+        }
+
+    def summary(self) -> str:
+        """Human-readable report with one line per stage and per category."""
+        lines = ['Estimated run time by stage:']
+        for stage, seconds in self.stages.items():
+            lines.append(f"  {stage:<45} {_format_duration(seconds)}")
+        lines.append('Estimated run time by category:')
+        for category, seconds in self.categories.items():
+            lines.append(f"  {category:<45} {_format_duration(seconds)}")
+        lines.append(f"Total: {_format_duration(self.total_seconds)} "
+                     f"({self.command_count} commands)")
+        return "\n".join(lines)
+
+
+def _format_duration(seconds: float) -> str:
+    minutes, secs = divmod(int(round(seconds)), 60)
+    hours, minutes = divmod(minutes, 60)
+    return f"{hours:d}:{minutes:02d}:{secs:02d}"
+
+
+# ---------------------------------------------------------------------------
+# Command recording
+# ---------------------------------------------------------------------------
+
+def _slot_of(labware) -> Optional[str]:
+    """Walk up the parent chain of a labware (or module) until a deck slot name is found."""
+    parent = labware
+    for _ in range(4):
+        parent = getattr(parent, 'parent', None)
+        if parent is None:
+            return None
+        if isinstance(parent, str):
+            return parent
+    return None
+
+
+def describe_location(obj) -> Optional[Dict]:
+    """
+    Convert a well, labware or ``Location`` into a plain dict.
+
+    Returns:
+        Dict with any of ``well``, ``labware``, ``slot`` and ``point`` (x, y, z in mm),
+        or ``None`` if *obj* is not a location.
+    """
+    well = None
+    labware = None
+    point = None
+    if hasattr(obj, 'point') and hasattr(obj, 'labware'):
+        point = obj.point
+        try:
+            well = obj.labware.as_well()
+        except Exception:
+            well = None
+        if well is None:
+            try:
+                labware = obj.labware.as_labware()
+            except Exception:
+                labware = None
+    elif hasattr(obj, 'well_name'):
+        well = obj
+    elif hasattr(obj, 'wells') and hasattr(obj, 'load_name'):
+        labware = obj
+        wells = obj.wells()
+        well = wells[0] if wells else None
+    else:
+        return None
+
+    description = {}
+    if well is not None:
+        labware = labware or well.parent
+        if point is None:
+            try:
+                point = well.top().point
+            except Exception:
+                point = None
+        if not hasattr(obj, 'load_name'):
+            description['well'] = well.well_name
+    if labware is not None:
+        description['labware'] = getattr(labware, 'load_name', str(labware))
+        description['slot'] = _slot_of(labware)
+    if point is not None:
+        description['point'] = [round(point.x, 2), round(point.y, 2), round(point.z, 2)]
+    return description
+
+
+def _plain(value):
+    """Convert command arguments to JSON-friendly data."""
+    if value is None or isinstance(value, (bool, int, float, str)):
+        return value
+    if isinstance(value, dict):
+        return {str(k): _plain(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_plain(v) for v in value]
+    location = describe_location(value)
+    if location is not None:
+        return location
+    return str(value)
+
+
+class CommandRecorder:
+    """
+    Record the command stream issued by a protocol object as plain dicts.
+
+    ``wrap(protocol)`` returns a stand-in for the ``ProtocolContext`` that forwards
+    every call to the real context and appends a record for each command listed in
+    ``PIPETTE_COMMANDS``, ``MODULE_COMMANDS`` and ``PROTOCOL_COMMANDS``. Pipettes and
+    modules loaded through the stand-in are wrapped as well.
+
+    Each record has the keys ``command``, ``target`` (``'protocol'``, ``'pipette'`` or
+    ``'module'``), ``name`` (pipette or module name), ``stage`` and ``params``.
+    """
+
+    def __init__(self, subject=None, simulating: Optional[bool] = None):
+        """
+        Args:
+            subject: Protocol class instance whose ``run()`` issues the commands. Used to
+                attribute each command to a stage. When ``None`` every command is
+                attributed to the last heading comment.
+            simulating: If not ``None``, the value returned by ``is_simulating()`` on the
+                wrapped context.
+        """
+        self.subject = subject
+        self.simulating = simulating
+        self.commands: List[Dict] = []
+        self._heading = None
+        self._signatures = {}
+
+    def wrap(self, protocol):
+        return _RecordingProxy(protocol, self, 'protocol', PROTOCOL_COMMANDS)
+
+    def current_stage(self, target_kind: str = 'protocol') -> str:
+        """
+        Name of the protocol method called from ``run()`` that is currently executing.
+
+        Commands issued directly by ``run()`` fall back to ``'temperature control'`` for
+        module commands, then to the last heading comment, then to ``'run'``.
+        """
+        chain = []
+        if self.subject is not None:
+            frame = sys._getframe(1)
+            while frame is not None:
+                if frame.f_locals.get('self') is self.subject:
+                    chain.append(frame.f_code.co_name)
+                frame = frame.f_back
+        if len(chain) >= 2:
+            return chain[-2].strip('_').replace('_', ' ')
+        if target_kind == 'module':
+            return 'temperature control'
+        return self._heading or 'run'
+
+    def _bind(self, method, args, kwargs) -> Dict:
+        key = getattr(method, '__qualname__', None)
+        signature = self._signatures.get(key)
+        if signature is None:
+            try:
+                signature = inspect.signature(method)
+            except (TypeError, ValueError):
+                signature = False
+            self._signatures[key] = signature
+        if signature:
+            try:
+                bound = signature.bind(*args, **kwargs)
+                arguments = dict(bound.arguments)
+                extra = arguments.pop('kwargs', None)
+                if isinstance(extra, dict):
+                    arguments.update(extra)
+                arguments.pop('args', None)
+                return arguments
+            except TypeError:
+                pass
+        arguments = {f'arg{i}': value for i, value in enumerate(args)}
+        arguments.update(kwargs)
+        return arguments
+
+    def record(self, target_kind: str, target, command: str, method, args, kwargs) -> Dict:
+        params = self._bind(method, args, kwargs)
+        if command == 'comment':
+            match = _HEADING_PATTERN.match(str(params.get('msg', '')).strip())
+            if match:
+                self._heading = match.group(1)
+        entry = {
+            'command': command,
+            'target': target_kind,
+            'name': _target_name(target_kind, target),
+            'stage': self.current_stage(target_kind),
+            'params': {k: _plain(v) for k, v in params.items()},
+        }
+        self.commands.append(entry)
+        return entry
+
+    def start_timer(self):
+        """Called before each wrapped command; the value is passed to ``stop_timer``."""
+        return None
+
+    def stop_timer(self, entry: Dict, started):
+        """Called after each wrapped command is recorded. Timing recorders add to *entry* here."""
+
+    def annotate(self, command: str, entry: Dict, result):
+        """Add static information about loaded pipettes and modules to their load records."""
+        if command == 'load_instrument':
+            entry['params']['max_volume'] = getattr(result, 'max_volume', None)
+            entry['params']['min_volume'] = getattr(result, 'min_volume', None)
+            flow_rate = getattr(result, 'flow_rate', None)
+            if flow_rate is not None:
+                entry['params']['flow_rate'] = {
+                    'aspirate': flow_rate.aspirate,
+                    'dispense': flow_rate.dispense,
+                    'blow_out': flow_rate.blow_out,
+                }
+            entry['name'] = getattr(result, 'name', entry['name'])
+        elif command == 'load_module':
+            entry['params']['slot'] = _slot_of(result)
+            entry['name'] = _module_type(result)
+
+    def on_result(self, command: str, entry: Dict, result):
+        """Annotate load records and wrap loaded pipettes/modules so their commands are recorded."""
+        self.annotate(command, entry, result)
+        if command == 'load_instrument':
+            return _RecordingProxy(result, self, 'pipette', PIPETTE_COMMANDS)
+        if command == 'load_module':
+            return _RecordingProxy(result, self, 'module', MODULE_COMMANDS)
+        return result
+
+
+def _module_type(module) -> str:
+    name = type(module).__name__.lower()
+    if 'thermocycler' in name:
+        return 'thermocycler'
+    if 'temperature' in name:
+        return 'temperature module'
+    return name.replace('context', '')
+
+
+def _target_name(target_kind: str, target) -> str:
+    if target_kind == 'pipette':
+        return getattr(target, 'name', 'pipette')
+    if target_kind == 'module':
+        return _module_type(target)
+    return 'protocol'
+
+
+class _RecordingProxy:
+    """Forward attribute access to *target*, recording calls to the listed commands."""
+
+    def __init__(self, target, recorder: CommandRecorder, target_kind: str, commands):
+        object.__setattr__(self, '_target', target)
+        object.__setattr__(self, '_recorder', recorder)
+        object.__setattr__(self, '_target_kind', target_kind)
+        object.__setattr__(self, '_commands', commands)
+
+    def __getattr__(self, name):
+        attribute = getattr(self._target, name)
+        if name == 'is_simulating' and self._recorder.simulating is not None:
+            return lambda: self._recorder.simulating
+        if name not in self._commands or not callable(attribute):
+            return attribute
+
+        def recorded(*args, **kwargs):
+            started = self._recorder.start_timer()
+            result = attribute(*args, **kwargs)
+            entry = self._recorder.record(self._target_kind, self._target, name,
+                                          attribute, args, kwargs)
+            self._recorder.stop_timer(entry, started)
+            return self._recorder.on_result(name, entry, result)
+
+        return recorded
+
+    def __setattr__(self, name, value):
+        setattr(self._target, name, value)
+
+    def __repr__(self):
+        return f"Recording({self._target!r})"
+
+
+# ---------------------------------------------------------------------------
+# Time model
+# ---------------------------------------------------------------------------
+
+def _xy(location) -> Optional[tuple]:
+    """Deck (x, y) of a plain location dict, falling back to the slot centre."""
+    if not isinstance(location, dict):
+        return None
+    point = location.get('point')
+    if point:
+        return point[0], point[1]
+    slot = location.get('slot')
+    if slot in OT2_SLOT_POSITIONS:
+        x, y = OT2_SLOT_POSITIONS[slot]
+        return x + SLOT_CENTER_OFFSET[0], y + SLOT_CENTER_OFFSET[1]
+    return None
+
+
+class _RuntimeState:
+    """Mutable state threaded through the estimate: head position, instruments, temperatures."""
+
+    def __init__(self, model: RuntimeModel):
+        self.model = model
+        self.head = None
+        self.instruments = {}
+        self.temperatures = {}
+        trash = OT2_SLOT_POSITIONS['12']
+        self.trash = (trash[0] + SLOT_CENTER_OFFSET[0], trash[1] + SLOT_CENTER_OFFSET[1])
+
+    def travel(self, location) -> float:
+        target = location if isinstance(location, tuple) else _xy(location)
+        if target is None:
+            return 0.0
+        if self.head is None:
+            self.head = target
+            return self.model.move_overhead
+        distance = math.hypot(target[0] - self.head[0], target[1] - self.head[1])
+        self.head = target
+        if distance < 1.0:
+            return 0.0
+        return self.model.move_overhead + distance / self.model.gantry_speed
+
+    def flow_rate(self, instrument: str, direction: str) -> float:
+        info = self.instruments.get(instrument, {})
+        rates = info.get('flow_rate') or {}
+        rate = rates.get(direction)
+        if not rate:
+            rate = self.model.default_flow_rates.get(instrument, 7.56)
+        return rate
+
+    def liquid_time(self, instrument: str, direction: str, volume, rate) -> float:
+        if not volume:
+            return self.model.aspirate_overhead
+        rate = rate or 1.0
+        return volume / (self.flow_rate(instrument, direction) * rate) + self.model.aspirate_overhead
+
+    def ramp(self, key: str, target, rate: float) -> float:
+        if target is None:
+            return 0.0
+        current = self.temperatures.get(key, self.model.ambient_temperature)
+        self.temperatures[key] = target
+        return abs(target - current) / rate
+
+
+def _volume_list(volume, count: int) -> List[float]:
+    if isinstance(volume, list):
+        return [v or 0 for v in volume] or [0] * count
+    return [volume or 0] * count
+
+
+def _as_locations(value) -> List:
+    if value is None:
+        return []
+    if isinstance(value, list):
+        flattened = []
+        for item in value:
+            flattened.extend(_as_locations(item))
+        return flattened
+    return [value]
+
+
+def _estimate_pipette(entry: Dict, state: _RuntimeState, estimate: RuntimeEstimate):
+    model = state.model
+    stage = entry['stage']
+    instrument = entry['name']
+    params = entry['params']
+    command = entry['command']
+    info = state.instruments.get(instrument, {})
+
+    if command in ('aspirate', 'dispense'):
+        estimate.add(stage, 'gantry', state.travel(params.get('location')))
+        estimate.add(stage, 'pipetting', state.liquid_time(
+            instrument, command, params.get('volume'), params.get('rate')))
+    elif command == 'mix':
+        estimate.add(stage, 'gantry', state.travel(params.get('location')))
+        repetitions = params.get('repetitions') or 1
+        volume = params.get('volume') or info.get('max_volume') or 0
+        rate = params.get('rate')
+        cycle = (state.liquid_time(instrument, 'aspirate', volume, rate) +
+                 state.liquid_time(instrument, 'dispense', volume, rate))
+        estimate.add(stage, 'pipetting', repetitions * cycle)
+    elif command == 'air_gap':
+        estimate.add(stage, 'pipetting', state.liquid_time(
+            instrument, 'aspirate', params.get('volume'), 1.0))
+    elif command == 'blow_out':
+        estimate.add(stage, 'gantry', state.travel(params.get('location')))
+        estimate.add(stage, 'pipetting', model.blow_out)
+    elif command == 'touch_tip':
+        estimate.add(stage, 'pipetting', model.touch_tip)
+    elif command == 'move_to':
+        estimate.add(stage, 'gantry', state.travel(params.get('location')))
+    elif command == 'pick_up_tip':
+        estimate.add(stage, 'gantry', state.travel(params.get('location') or info.get('tip_rack')))
+        estimate.add(stage, 'tips', model.tip_pickup)
+    elif command in ('drop_tip', 'return_tip'):
+        location = params.get('location') if isinstance(params.get('location'), dict) else None
+        estimate.add(stage, 'gantry', state.travel(location or state.trash))
+        estimate.add(stage, 'tips', model.tip_drop)
+    elif command in ('distribute', 'transfer', 'consolidate'):
+        _estimate_bulk_transfer(entry, state, estimate)
+
+
+def _estimate_bulk_transfer(entry: Dict, state: _RuntimeState, estimate: RuntimeEstimate):
+    """
+    Approximate ``distribute``/``transfer``/``consolidate`` as the aspirate/dispense
+    sequence the Opentrons API would generate for them.
+    """
+    model = state.model
+    stage = entry['stage']
+    instrument = entry['name']
+    params = entry['params']
+    info = state.instruments.get(instrument, {})
+    command = entry['command']
+
+    sources = _as_locations(params.get('source'))
+    destinations = _as_locations(params.get('dest'))
+    pairs = max(len(sources), len(destinations), 1)
+    if len(sources) == 1:
+        sources = sources * pairs
+    if len(destinations) == 1:
+        destinations = destinations * pairs
+    volumes = _volume_list(params.get('volume'), pairs)
+    if len(volumes) < pairs:
+        volumes = (volumes * pairs)[:pairs]
+
+    new_tip = params.get('new_tip', 'once')
+    if new_tip in ('once', 'always'):
+        tip_changes = pairs if new_tip == 'always' else 1
+        for _ in range(tip_changes):
+            estimate.add(stage, 'gantry', state.travel(info.get('tip_rack')))
+            estimate.add(stage, 'tips', model.tip_pickup)
+            estimate.add(stage, 'gantry', state.travel(state.trash))
+            estimate.add(stage, 'tips', model.tip_drop)
+
+    air_gap = params.get('air_gap') or 0
+    max_volume = info.get('max_volume') or 20
+    if command in ('transfer', 'consolidate'):
+        for source, destination, volume in zip(sources, destinations, volumes):
+            trips = max(1, math.ceil(volume / max(max_volume - air_gap, 1)))
+            for _ in range(trips):
+                estimate.add(stage, 'gantry', state.travel(source))
+                estimate.add(stage, 'pipetting', state.liquid_time(instrument, 'aspirate', volume / trips, 1.0))
+                estimate.add(stage, 'gantry', state.travel(destination))
+                estimate.add(stage, 'pipetting', state.liquid_time(instrument, 'dispense', volume / trips, 1.0))
+        return
+
+    disposal = params.get('disposal_volume')
+    if disposal is None:
+        disposal = info.get('min_volume') or 0
+    capacity = max(max_volume - disposal, 1)
+    trip_volume = 0.0
+    trip_start = True
+    for index, volume in enumerate(volumes):
+        if trip_volume + volume + air_gap > capacity or trip_start:
+            if not trip_start:
+                estimate.add(stage, 'pipetting', model.blow_out)
+            source = sources[index]
+            batch = _volumes_in_trip(volumes[index:], capacity, air_gap)
+            estimate.add(stage, 'gantry', state.travel(source))
+            estimate.add(stage, 'pipetting', state.liquid_time(
+                instrument, 'aspirate', batch + disposal, 1.0))
+            trip_volume = 0.0
+            trip_start = False
+        trip_volume += volume + air_gap
+        if air_gap:
+            estimate.add(stage, 'pipetting', state.liquid_time(instrument, 'aspirate', air_gap, 1.0))
+        estimate.add(stage, 'gantry', state.travel(destinations[index]))
+        estimate.add(stage, 'pipetting', state.liquid_time(
+            instrument, 'dispense', volume + air_gap, 1.0))
+    estimate.add(stage, 'pipetting', model.blow_out)
+
+
+def _volumes_in_trip(volumes: List[float], capacity: float, air_gap: float) -> float:
+    total = 0.0
+    for volume in volumes:
+        if total + volume + air_gap > capacity and total > 0:
+            break
+        total += volume
+    return total
+
+
+def _profile_time(steps, repetitions, key: str, state: _RuntimeState) -> float:
+    seconds = 0.0
+    for _ in range(repetitions or 1):
+        for step in steps or []:
+            seconds += _block_ramp(step.get('temperature'), key, state)
+            seconds += (step.get('hold_time_seconds') or 0) + 60 * (step.get('hold_time_minutes') or 0)
+    return seconds
+
+
+def _block_ramp(target, key: str, state: _RuntimeState) -> float:
+    current = state.temperatures.get(key, state.model.ambient_temperature)
+    if target is None:
+        return 0.0
+    rate = state.model.block_heating_rate if target > current else state.model.block_cooling_rate
+    return state.ramp(key, target, rate)
+
+
+def _estimate_module(entry: Dict, state: _RuntimeState, estimate: RuntimeEstimate):
+    model = state.model
+    stage = entry['stage']
+    params = entry['params']
+    command = entry['command']
+    key = entry['name']
+
+    if command == 'set_temperature':
+        estimate.add(stage, 'temperature', state.ramp(
+            key, params.get('celsius'), model.temperature_module_rate))
+    elif command == 'await_temperature':
+        pending = state.temperatures.pop(f'{key} target', None)
+        if pending is not None:
+            estimate.add(stage, 'temperature', state.ramp(key, pending, model.temperature_module_rate))
+    elif command == 'start_set_temperature':
+        state.temperatures[f'{key} target'] = params.get('celsius')
+    elif command in ('open_lid', 'close_lid'):
+        estimate.add(stage, 'temperature', model.lid_motion)
+    elif command == 'set_lid_temperature':
+        estimate.add(stage, 'temperature', state.ramp(
+            f'{key} lid', params.get('temperature'), model.lid_heating_rate))
+    elif command == 'set_block_temperature':
+        seconds = _block_ramp(params.get('temperature'), key, state)
+        seconds += (params.get('hold_time_seconds') or 0) + 60 * (params.get('hold_time_minutes') or 0)
+        estimate.add(stage, 'temperature', seconds)
+    elif command == 'execute_profile':
+        estimate.add(stage, 'temperature', _profile_time(
+            params.get('steps'), params.get('repetitions'), key, state))
+    elif command in ('deactivate', 'deactivate_block'):
+        state.temperatures.pop(key, None)
+    elif command == 'deactivate_lid':
+        state.temperatures.pop(f'{key} lid', None)
+
+
+def _estimate_protocol(entry: Dict, state: _RuntimeState, estimate: RuntimeEstimate):
+    model = state.model
+    stage = entry['stage']
+    params = entry['params']
+    command = entry['command']
+
+    if command == 'load_instrument':
+        tip_racks = params.get('tip_racks') or []
+        state.instruments[entry['name']] = {
+            'max_volume': params.get('max_volume'),
+            'min_volume': params.get('min_volume'),
+            'flow_rate': params.get('flow_rate'),
+            'tip_rack': tip_racks[0] if tip_racks else None,
+        }
+    elif command == 'move_labware':
+        if params.get('use_gripper'):
+            estimate.add(stage, 'gantry', model.manual_labware_move / 2)
+        else:
+            estimate.add(stage, 'manual', model.manual_labware_move)
+    elif command == 'pause':
+        estimate.add(stage, 'manual', model.manual_pause)
+    elif command == 'delay':
+        estimate.add(stage, 'delay', (params.get('seconds') or 0) + 60 * (params.get('minutes') or 0))
+    elif command == 'home':
+        state.head = None
+        estimate.add(stage, 'gantry', model.home)
+
+
+def estimate_commands(commands: List[Dict], model: Optional[RuntimeModel] = None) -> RuntimeEstimate:
+    """
+    Estimate the run time of a recorded command stream.
+
+    Args:
+        commands: Records as produced by :class:`CommandRecorder`.
+        model: Timing constants. Defaults to :class:`RuntimeModel`.
+
+    Returns:
+        :class:`RuntimeEstimate` with per-stage and per-category seconds.
+    """
+    state = _RuntimeState(model or RuntimeModel())
+    estimate = RuntimeEstimate(command_count=len(commands))
+    for entry in commands:
+        if entry['target'] == 'pipette':
+            _estimate_pipette(entry, state, estimate)
+        elif entry['target'] == 'module':
+            _estimate_module(entry, state, estimate)
+        else:
+            _estimate_protocol(entry, state, estimate)
+    return estimate
+
+
+def record_commands(protocol_obj, protocol=None, api_level: str = '2.21',
+                    simulating: Optional[bool] = False) -> List[Dict]:
+    """
+    Run *protocol_obj* and return its recorded command stream.
+
+    The protocol object is deep-copied first so the caller's instance is left untouched,
+    and its camera is disabled. By default the wrapped context reports
+    ``is_simulating() == False`` so temperature and thermocycling steps that the protocol
+    classes skip during simulation are part of the stream (and no output files are written).
+
+    Args:
+        protocol_obj: Any PUDU protocol class instance with a ``run(protocol)`` method.
+        protocol: ``ProtocolContext`` to run against. When ``None`` a simulated context is
+            created with ``opentrons.simulate.get_protocol_api``.
+        api_level: API level used when creating the simulated context.
+        simulating: Value reported by ``is_simulating()``; ``None`` forwards the real value.
+    """
+    subject = copy.deepcopy(protocol_obj)
+    for attribute in ('take_picture', 'take_video'):
+        if getattr(subject, attribute, False):
+            setattr(subject, attribute, False)
+
+    if protocol is None:
+        from opentrons import simulate
+        protocol = simulate.get_protocol_api(api_level)
+
+    recorder = CommandRecorder(subject, simulating=simulating)
+    subject.run(recorder.wrap(protocol))
+    return recorder.commands
+
+
+def estimate_runtime(protocol_obj, protocol=None, api_level: str = '2.21',
+                     model: Optional[RuntimeModel] = None) -> RuntimeEstimate:
+    """
+    Estimate how long *protocol_obj* will take on an OT-2.
+
+    Args:
+        protocol_obj: Any PUDU protocol class instance (assembly, transformation, plating,
+            calibration or sample preparation).
+        protocol: Optional ``ProtocolContext`` to run against (see :func:`record_commands`).
+        api_level: API level used when creating the simulated context.
+        model: Timing constants. Defaults to :class:`RuntimeModel`.
+
+    Returns:
+        :class:`RuntimeEstimate` with per-stage, per-category and total seconds.
+    """
+    commands = record_commands(protocol_obj, protocol=protocol, api_level=api_level)
+    return estimate_commands(commands, model)
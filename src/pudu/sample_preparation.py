@@ -3,6 +3,7 @@ from typing import List, Union, Optional, Tuple
 from abc import ABC, abstractmethod
 import math
 from pudu.utils import colors
+from pudu.tip_budget import TipBudget
 
 
 class SamplePreparation(ABC):
@@ -61,19 +62,24 @@ class SamplePreparation(ABC):
         # Protocol tracking
         self.result_dict = {}
         self.liquid_tracker = {}
+        self.tip_budget = None
 
     @abstractmethod
     def run(self, protocol: protocol_api.ProtocolContext):
         """Abstract method that must be implemented by subclasses."""
         pass
 
-    def _load_standard_labware(self, protocol: protocol_api.ProtocolContext):
-        """Load standard labware common to all protocols."""
-        tiprack = protocol.load_labware(self.tiprack_labware, self.tiprack_position)
-        pipette = protocol.load_instrument(self.pipette, self.pipette_position, tip_racks=[tiprack])
+    @abstractmethod
+    def _calculate_total_tips_needed(self) -> int:
+        """Tip pickups for the whole run - protocol-specific"""
+        pass
 
-        if self.starting_tip:
-            pipette.starting_tip = tiprack[self.starting_tip]
+    def _load_standard_labware(self, protocol: protocol_api.ProtocolContext):
+        """Load standard labware common to all protocols, with extra tip racks off deck if needed."""
+        self.tip_budget = TipBudget(self.tiprack_labware, [self.tiprack_position],
+                                    self._calculate_total_tips_needed(), initial_tip=self.starting_tip)
+        pipette = self.tip_budget.load_pipette(protocol, self.pipette, self.pipette_position)
+        tiprack = self.tip_budget.on_deck_racks[0]
 
         plate = protocol.load_labware(self.test_labware, self.test_position)
 
@@ -230,6 +236,7 @@ class PlateSamples(SamplePreparation):
         slot_counter = self.starting_slot - 1
         for source_well, sample in sample_wells:
             dest_wells = slots[slot_counter][:self.replicates]
+            self.tip_budget.before_pickup(protocol)
             pipette.distribute(
                 volume=self.sample_volume,
                 source=source_well,
@@ -249,6 +256,10 @@ class PlateSamples(SamplePreparation):
         print(f'Source positions: {self.source_positions}')
         print(f'Plate layout: {self.plate_layout}')
 
+    def _calculate_total_tips_needed(self) -> int:
+        """One tip per sample"""
+        return len(self.samples)
+
     def _load_samples(self, protocol: protocol_api.ProtocolContext, source_rack):
         """Load samples into source rack with liquid tracking."""
         sample_wells = []
@@ -385,6 +396,10 @@ class PlateWithGradient(SamplePreparation):
             'inducer': math.ceil(total_inducer * safety_factor)
         }
 
+    def _calculate_total_tips_needed(self) -> int:
+        """Per replicate: one tip to pre-fill, two for the initial mix and one per dilution step"""
+        return self.replicates * (3 + self.dilution_steps)
+
     def _row_letter_to_index(self, letter: str) -> int:
         """Convert row letter to 0-based index."""
         return ord(letter.upper()) - ord('A')
@@ -412,10 +427,10 @@ class PlateWithGradient(SamplePreparation):
         start_row_idx = self._row_letter_to_index(self.starting_row)
 
         # Pre-fill wells with sample (diluent)
-        self._prefill_wells(pipette, plate, sample_well, start_row_idx)
+        self._prefill_wells(protocol, pipette, plate, sample_well, start_row_idx)
 
         # Create initial mixes and perform serial dilutions
-        self._create_gradients(pipette, plate, sample_well, inducer_well, start_row_idx)
+        self._create_gradients(protocol, pipette, plate, sample_well, inducer_well, start_row_idx)
 
         # Store results
         self.result_dict = {
@@ -448,7 +463,7 @@ class PlateWithGradient(SamplePreparation):
         inducer_well.load_liquid(liquid=inducer_liquid, volume=self.inducer_stock_volume)
         self.source_positions[self.inducer_name] = inducer_well.well_name
 
-    def _prefill_wells(self, pipette, plate, sample_well, start_row_idx):
+    def _prefill_wells(self, protocol, pipette, plate, sample_well, start_row_idx):
         """Pre-fill wells with sample to serve as diluent."""
         diluent_volume = self.final_well_volume - self.transfer_volume
 
@@ -459,6 +474,7 @@ class PlateWithGradient(SamplePreparation):
             # Pre-fill wells 2 through dilution_steps+1 (skip first well for initial mix)
             dest_wells = row[1:self.dilution_steps + 1]
 
+            self.tip_budget.before_pickup(protocol)
             pipette.distribute(
                 volume=diluent_volume,
                 source=sample_well,
@@ -466,7 +482,7 @@ class PlateWithGradient(SamplePreparation):
                 disposal_volume=0
             )
 
-    def _create_gradients(self, pipette, plate, sample_well, inducer_well, start_row_idx):
+    def _create_gradients(self, protocol, pipette, plate, sample_well, inducer_well, start_row_idx):
         """Create initial mixes and perform serial dilutions."""
 
         # Calculate initial mix volumes
@@ -481,6 +497,7 @@ class PlateWithGradient(SamplePreparation):
             first_well = row[0]
 
             # Add sample to first well
+            self.tip_budget.before_pickup(protocol)
             pipette.transfer(
                 volume=initial_sample_vol,
                 source=sample_well,
@@ -489,6 +506,7 @@ class PlateWithGradient(SamplePreparation):
             )
 
             # Add inducer to first well and mix
+            self.tip_budget.before_pickup(protocol)
             pipette.transfer(
                 volume=initial_inducer_vol,
                 source=inducer_well,
@@ -502,6 +520,7 @@ class PlateWithGradient(SamplePreparation):
                 source_well = row[step]
                 dest_well = row[step + 1]
 
+                self.tip_budget.before_pickup(protocol)
                 pipette.transfer(
                     volume=self.transfer_volume,
                     source=source_well,
@@ -0,0 +1,157 @@
+"""
+Pipetting work scheduled into thermocycler holds.
+
+On the OT-2, ``ThermocyclerContext.execute_profile`` blocks until the whole
+profile has run, so the pipettes sit idle through incubations that can last
+hours. A ``HoldScheduler`` runs queued work (pipetting for the next stage or
+for another plate) during those holds instead. Each step of a single-repetition
+profile is split into ``set_block_temperature`` (which returns once the block
+reaches the temperature), the queued work that fits in the hold, and a
+``protocol.delay`` for the rest of the hold. Cycling profiles
+(``repetitions > 1``) leave no room for other work and run unchanged.
+
+Only steps the caller marks with ``'schedulable': True`` (see ``schedulable``)
+host work; the other steps of the profile hold on the thermocycler as usual, so
+a step whose timing matters, like a heat shock, is never lengthened by work
+that overruns its estimate. Work is queued with the number of seconds it takes
+(``pudu.runtime`` can estimate it) and runs in the first schedulable hold long
+enough for it. Work that never fits runs when ``run_pending`` is called. Work
+must not touch the thermocycler plate: its lid is closed during the holds.
+
+Example::
+
+    from pudu.scheduling import HoldScheduler
+
+    scheduler = HoldScheduler(protocol, thermocycler)
+    scheduler.add('Pre-fill dilution plate with LB', lambda protocol: prefill(protocol), seconds=600)
+    scheduler.execute_profile([schedulable({'temperature': 37, 'hold_time_minutes': 60})],
+                              repetitions=1, block_max_volume=30)
+    scheduler.run_pending()
+"""
+
+import time
+from dataclasses import dataclass
+from typing import Callable, Dict, Iterable, List, Optional
+
+
+@dataclass
+class HoldTask:
+    """
+    Pipetting work waiting for a thermocycler hold.
+
+    Attributes:
+        name: Description written as a protocol comment when the work starts.
+        work: Called with the ``ProtocolContext`` to issue the commands.
+        seconds: Estimated duration, used to choose a hold the work fits in.
+
+    Raises:
+        ValueError: If *seconds* is negative.
+    """
+    name: str
+    work: Callable
+    seconds: float
+
+    def __post_init__(self):
+        if self.seconds < 0:
+            raise ValueError(f"Estimated duration of '{self.name}' must not be negative, got {self.seconds}")
+
+
+def schedulable(step: Dict) -> Dict:
+    """Copy of a profile step marked to host queued work during its hold."""
+    return dict(step, schedulable=True)
+
+
+def _thermocycler_step(step: Dict) -> Dict:
+    """*step* without the scheduling mark, as passed to the thermocycler."""
+    return {key: value for key, value in step.items() if key != 'schedulable'}
+
+
+def hold_seconds(step: Dict) -> float:
+    """Hold time of a profile step (``hold_time_seconds`` and/or ``hold_time_minutes``)."""
+    return (step.get('hold_time_seconds') or 0) + (step.get('hold_time_minutes') or 0) * 60
+
+
+class HoldScheduler:
+    """
+    Runs queued pipetting work while the thermocycler holds a temperature.
+
+    Attributes:
+        protocol: Opentrons ``ProtocolContext``.
+        thermocycler: Thermocycler module context the profiles run on.
+        enabled: When ``False``, profiles run unchanged and queued work waits for
+            ``run_pending``.
+        pending: Work not run yet, in the order it was queued.
+        completed: ``(task name, hold description)`` for each work item run, with
+            ``None`` as the hold for work run by ``run_pending``.
+    """
+
+    def __init__(self, protocol, thermocycler, enabled: bool = True, tasks: Iterable[HoldTask] = ()):
+        self.protocol = protocol
+        self.thermocycler = thermocycler
+        self.enabled = enabled
+        self.pending: List[HoldTask] = list(tasks)
+        self.completed = []
+
+    def add(self, name: str, work: Callable, seconds: float):
+        """
+        Queue *work* for the next hold of at least *seconds*.
+
+        Raises:
+            ValueError: If *seconds* is negative.
+        """
+        self.pending.append(HoldTask(name, work, seconds))
+
+    def execute_profile(self, steps: List[Dict], repetitions: int, block_max_volume: Optional[float] = None):
+        """
+        Run a thermocycler profile, filling the holds of its schedulable steps with queued work.
+
+        Without queued work, for a cycling profile, or when no step is marked
+        schedulable, this is ``thermocycler.execute_profile``. Steps that are not
+        schedulable hold on the thermocycler itself.
+        """
+        if (not self.enabled or not self.pending or repetitions != 1
+                or not any(step.get('schedulable') for step in steps)):
+            self.thermocycler.execute_profile(steps=[_thermocycler_step(step) for step in steps],
+                                              repetitions=repetitions, block_max_volume=block_max_volume)
+            return
+        for step in steps:
+            if step.get('schedulable'):
+                self.thermocycler.set_block_temperature(step['temperature'], block_max_volume=block_max_volume)
+                self.hold(hold_seconds(step), f"{step['temperature']}°C hold")
+            else:
+                self.thermocycler.set_block_temperature(step['temperature'], hold_time_seconds=hold_seconds(step),
+                                                        block_max_volume=block_max_volume)
+
+    def hold(self, seconds: float, description: str = 'hold'):
+        """
+        Hold for *seconds*, running the queued work that fits first.
+
+        On the robot the remaining hold is measured with the clock, so work that
+        takes longer than estimated shortens the delay; during simulation the
+        estimates are used.
+        """
+        start = time.monotonic()
+        planned = 0.0
+        for task in list(self.pending):
+            if planned + task.seconds > seconds:
+                continue
+            self.pending.remove(task)
+            self.protocol.comment(f"During the {description}: {task.name}")
+            task.work(self.protocol)
+            self.completed.append((task.name, description))
+            planned += task.seconds
+
+        elapsed = planned if self.protocol.is_simulating() else time.monotonic() - start
+        remaining = seconds - elapsed
+        if remaining < 0:
+            self.protocol.comment(f"Work during the {description} ran {-remaining:.0f} s over the hold")
+        elif remaining > 0:
+            self.protocol.delay(seconds=remaining, msg=f"Remaining {description}")
+
+    def run_pending(self):
+        """Run the work no hold had room for, one item after another."""
+        while self.pending:
+            task = self.pending.pop(0)
+            self.protocol.comment(f"Running scheduled work: {task.name}")
+            task.work(self.protocol)
+            self.completed.append((task.name, None))
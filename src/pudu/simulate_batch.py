@@ -0,0 +1,224 @@
+"""
+Simulate many protocol files concurrently.
+
+Every protocol file is simulated with ``opentrons_simulate`` in its own
+subprocess and its own working directory under the report directory. Files the
+protocol exports (``transformation_input.json``, ``plating_input.json``, xlsx
+layouts) therefore do not overwrite each other. Input files a protocol reads
+by a relative path (``inputs``) are copied into every working directory at that
+path. Up to ``workers`` simulations
+run at the same time, so the wall-clock time of validating a batch of
+protocols scales with the number of cores.
+
+For every protocol the runner keeps the return code, the run log (stdout), the
+stderr and the exported files. It writes them to ``<report dir>/<protocol>/``
+together with a ``summary.json`` for the whole batch::
+
+    {
+        "total": 19, "passed": 18, "failed": 1, "wall_seconds": 41.2,
+        "protocols": [
+            {"protocol": "scripts/libre/run_Plating_libre.py", "returncode": 0,
+             "seconds": 12.9, "artifacts": ["plating_input.json"], ...},
+            ...
+        ]
+    }
+
+Example::
+
+    python -m pudu.simulate_batch scripts/automated_ot2 scripts/libre -o simulation_report --workers 8 \
+        --input scripts/output.json
+
+or from Python::
+
+    from pudu.simulate_batch import simulate_files, find_protocols
+
+    reports = simulate_files(find_protocols(['protocols/']), 'simulation_report')
+    failed = [report for report in reports if not report.passed]
+"""
+
+import argparse
+import json
+import os
+import shutil
+import subprocess
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field, asdict
+from pathlib import Path
+from typing import List, Optional, Sequence
+
+DEFAULT_COMMAND = ('opentrons_simulate',)
+RUN_LOG = 'run.log'
+STDERR_LOG = 'stderr.log'
+SUMMARY_FILE = 'summary.json'
+
+
+@dataclass
+class SimulationReport:
+    """
+    Outcome of simulating one protocol file.
+
+    Attributes:
+        protocol: Path of the simulated protocol file.
+        workdir: Working directory of the simulation; holds the logs and artifacts.
+        returncode: Exit status of the simulator (127 if it could not be started,
+            -1 if it timed out).
+        seconds: Wall-clock duration of the simulation.
+        stderr: Standard error of the simulator.
+        artifacts: Names of the files the protocol wrote to its working directory.
+    """
+    protocol: str
+    workdir: str
+    returncode: int
+    seconds: float
+    stderr: str = ''
+    artifacts: List[str] = field(default_factory=list)
+
+    @property
+    def passed(self) -> bool:
+        return self.returncode == 0
+
+
+def find_protocols(sources: Sequence) -> List[Path]:
+    """Protocol files in *sources*: ``.py`` files, or the ``*.py`` files of directories."""
+    protocols = []
+    for source in sources:
+        source = Path(source)
+        if source.is_dir():
+            protocols.extend(sorted(source.glob('*.py'), key=lambda path: path.name.lower()))
+        else:
+            protocols.append(source)
+    return protocols
+
+
+def _workdir_names(protocols: Sequence[Path]) -> List[str]:
+    """One directory name per protocol, prefixed with its parent when stems collide."""
+    stems = [protocol.stem for protocol in protocols]
+    return [f"{protocol.parent.name}_{protocol.stem}" if stems.count(protocol.stem) > 1 else protocol.stem
+            for protocol in protocols]
+
+
+def _copy_inputs(inputs: Sequence[Path], workdir: Path):
+    """Copy *inputs* into *workdir* at their relative paths."""
+    for path in inputs:
+        if path.is_absolute():
+            raise ValueError(f"Input files must be relative paths, got {path}")
+        target = workdir / path
+        target.parent.mkdir(parents=True, exist_ok=True)
+        shutil.copyfile(path, target)
+
+
+def _simulate_file(protocol: Path, workdir: Path, command: Sequence[str],
+                   timeout: Optional[float], inputs: Sequence[Path] = ()) -> SimulationReport:
+    workdir.mkdir(parents=True, exist_ok=True)
+    _copy_inputs(inputs, workdir)
+    start = time.perf_counter()
+    try:
+        completed = subprocess.run([*command, str(protocol.resolve())], cwd=workdir,
+                                   capture_output=True, text=True, timeout=timeout)
+        returncode, stdout, stderr = completed.returncode, completed.stdout, completed.stderr
+    except FileNotFoundError as e:
+        returncode, stdout, stderr = 127, '', f"Could not start {command[0]}: {e}"
+    except subprocess.TimeoutExpired as e:
+        returncode = -1
+        stdout = e.stdout.decode() if isinstance(e.stdout, bytes) else (e.stdout or '')
+        stderr = f"Simulation timed out after {timeout} s"
+    seconds = time.perf_counter() - start
+
+    artifacts = sorted(path.name for path in workdir.iterdir()
+                       if path.is_file() and path.name not in (RUN_LOG, STDERR_LOG))
+    (workdir / RUN_LOG).write_text(stdout)
+    (workdir / STDERR_LOG).write_text(stderr)
+    return SimulationReport(protocol=str(protocol), workdir=str(workdir), returncode=returncode,
+                            seconds=seconds, stderr=stderr, artifacts=artifacts)
+
+
+def simulate_files(protocols: Sequence, report_dir='simulation_report', workers: Optional[int] = None,
+                   command: Sequence[str] = DEFAULT_COMMAND,
+                   timeout: Optional[float] = None, inputs: Sequence = ()) -> List[SimulationReport]:
+    """
+    Simulate *protocols* concurrently and write a summary report.
+
+    Each simulation is a separate simulator process; the pool only dispatches
+    them, so up to *workers* simulations run in parallel on separate cores.
+
+    Args:
+        protocols: Protocol files to simulate.
+        report_dir: Directory for the per-protocol working directories and
+            ``summary.json``; created if missing.
+        workers: Maximum number of simultaneous simulations. Defaults to the
+            number of CPUs.
+        command: Simulator command; the protocol path is appended.
+        timeout: Seconds after which a simulation is stopped and reported as failed.
+        inputs: Files the protocols read by a relative path (e.g.
+            ``scripts/output.json``), copied into every working directory at
+            that path. Paths are relative to the current directory.
+
+    Returns:
+        One ``SimulationReport`` per protocol, in input order.
+    """
+    protocols = [Path(protocol) for protocol in protocols]
+    inputs = [Path(path) for path in inputs]
+    report_dir = Path(report_dir)
+    report_dir.mkdir(parents=True, exist_ok=True)
+    workdirs = [report_dir / name for name in _workdir_names(protocols)]
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=workers or os.cpu_count() or 1) as pool:
+        reports = list(pool.map(lambda args: _simulate_file(*args, command, timeout, inputs),
+                                zip(protocols, workdirs)))
+    write_summary(reports, report_dir / SUMMARY_FILE, wall_seconds=time.perf_counter() - start)
+    return reports
+
+
+def write_summary(reports: Sequence[SimulationReport], path, wall_seconds: Optional[float] = None):
+    """Write the batch summary (totals and one entry per protocol) as JSON."""
+    passed = sum(report.passed for report in reports)
+    summary = {
+        'total': len(reports),
+        'passed': passed,
+        'failed': len(reports) - passed,
+        'wall_seconds': wall_seconds,
+        'protocols': [dict(asdict(report), passed=report.passed) for report in reports],
+    }
+    with open(path, 'w') as f:
+        json.dump(summary, f, indent=2)
+    return summary
+
+
+def main(argv: Optional[List[str]] = None):
+    """Entry point for ``python -m pudu.simulate_batch``."""
+    parser = argparse.ArgumentParser(description='Simulate many Opentrons protocol files in parallel')
+    parser.add_argument('sources', nargs='+', type=Path,
+                        help='Protocol files, or directories whose *.py files are simulated')
+    parser.add_argument('-o', '--report-dir', type=Path, default=Path('simulation_report'),
+                        help='Directory for logs, artifacts and summary.json (default: simulation_report)')
+    parser.add_argument('--workers', type=int, default=None,
+                        help='Maximum number of simultaneous simulations (default: one per CPU)')
+    parser.add_argument('--timeout', type=float, default=None,
+                        help='Seconds after which a simulation is reported as failed')
+    parser.add_argument('--input', dest='inputs', type=Path, action='append', default=[],
+                        help='File the protocols read by a relative path, copied into every working '
+                             'directory (repeatable)')
+    args = parser.parse_args(argv)
+
+    protocols = find_protocols(args.sources)
+    if not protocols:
+        print("Error: No protocol files found", file=sys.stderr)
+        sys.exit(1)
+
+    reports = simulate_files(protocols, args.report_dir, workers=args.workers, timeout=args.timeout,
+                             inputs=args.inputs)
+    for report in reports:
+        status = '✓' if report.passed else '✗'
+        print(f"{status} {report.protocol} ({report.seconds:.1f} s)")
+    failed = [report for report in reports if not report.passed]
+    print(f"{len(reports) - len(failed)} of {len(reports)} protocols passed; "
+          f"report in {args.report_dir / SUMMARY_FILE}")
+    if failed:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,295 @@
+"""
+On-disk cache of protocol simulation results.
+
+Simulating a protocol runs it against a ``DryRunContext`` (see ``pudu.dry_run``)
+with ``is_simulating() == True``. This records the command log and writes the
+files the protocol exports for the next stage: ``transformation_input.json``,
+``plating_input.json``, the plating layout and the xlsx summaries.
+Re-simulating an unchanged assembly -> transformation -> plating chain repeats
+that work for every stage.
+
+``simulate_cached`` keys each simulation on a hash of:
+
+* the protocol class,
+* its state after construction, which holds the
+  ``assembly_data``/``transformation_data``/``plating_data`` and the merged
+  parameters,
+* the installed pudu and opentrons_shared_data versions.
+
+The dry run reads labware definitions (well geometry, maximum volumes and the
+capacity checks built on them) from ``opentrons_shared_data``, so upgrading it
+invalidates the cached results. The protocol writes its files to a scratch ``output_dir``; the working
+directory of the process is never changed, so simulations can run from several
+threads at once.
+
+A cache hit restores the command log and writes the stored output files
+without running the protocol. Entries live in one directory each under
+``cache_dir`` (default ``$PUDU_CACHE_DIR`` or ``~/.cache/pudu/simulations``).
+When the cache grows past ``max_bytes``, the least recently used entries are
+evicted.
+
+Example::
+
+    from pudu.simulation_cache import simulate_cached
+
+    result = simulate_cached(SBOLLoopAssembly(assemblies), output_dir='run_1')
+    print(result.cache_hit, sorted(result.outputs))
+"""
+
+import contextlib
+import copy
+import hashlib
+import json
+import os
+import shutil
+import sys
+import tempfile
+import threading
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from pudu.dry_run import dry_run
+
+DEFAULT_MAX_BYTES = 512 * 1024 * 1024
+COMMANDS_FILE = 'commands.json'
+OUTPUTS_DIR = 'outputs'
+
+# Runtime-only attributes that do not change what a simulation produces
+_IGNORED_ATTRIBUTES = {'camera', 'output_dir'}
+
+# sys.stdout is shared by all threads: the first simulation to start silences it,
+# the last one to finish restores it
+_quiet_lock = threading.Lock()
+_quiet_depth = 0
+_saved_stdout = None
+_devnull = None
+
+
+@dataclass
+class SimulationResult:
+    """
+    Result of simulating one protocol.
+
+    Attributes:
+        key: Cache key of the simulation inputs.
+        command_log: Recorded commands (see ``pudu.runtime.CommandRecorder``).
+        outputs: Contents of the files the protocol wrote, keyed by file name.
+        cache_hit: Whether the result was read from the cache.
+    """
+    key: str
+    command_log: List[Dict]
+    outputs: Dict[str, bytes] = field(default_factory=dict)
+    cache_hit: bool = False
+
+    def write_outputs(self, output_dir='.') -> List[Path]:
+        """Write the exported files to *output_dir* and return their paths."""
+        output_dir = Path(output_dir)
+        output_dir.mkdir(parents=True, exist_ok=True)
+        written = []
+        for name, content in sorted(self.outputs.items()):
+            path = output_dir / name
+            path.write_bytes(content)
+            written.append(path)
+        return written
+
+
+def _package_version(name: str) -> Optional[str]:
+    try:
+        from importlib import metadata
+    except ImportError:  # Python 3.7
+        try:
+            import importlib_metadata as metadata
+        except ImportError:
+            return None
+    try:
+        return metadata.version(name)
+    except metadata.PackageNotFoundError:
+        return None
+
+
+def _canonical(value):
+    """JSON-compatible form of *value* with a stable ordering."""
+    if isinstance(value, dict):
+        return {str(k): _canonical(v) for k, v in sorted(value.items(), key=lambda item: str(item[0]))}
+    if isinstance(value, (list, tuple)):
+        return [_canonical(v) for v in value]
+    if isinstance(value, (set, frozenset)):
+        return sorted((_canonical(v) for v in value), key=lambda v: json.dumps(v, sort_keys=True))
+    if value is None or isinstance(value, (bool, int, float, str)):
+        return value
+    if hasattr(value, '__dict__'):
+        return {'__class__': type(value).__qualname__, **_canonical(vars(value))}
+    return repr(value)
+
+
+def simulation_key(protocol_obj) -> str:
+    """
+    Content hash of everything that determines a simulation of *protocol_obj*.
+
+    Call this on a freshly constructed protocol object. Running it fills the
+    tracking dictionaries and changes the key.
+    """
+    state = {name: value for name, value in vars(protocol_obj).items() if name not in _IGNORED_ATTRIBUTES}
+    payload = {
+        'class': f"{type(protocol_obj).__module__}.{type(protocol_obj).__qualname__}",
+        'state': _canonical(state),
+        'opentrons_shared_data': _package_version('opentrons_shared_data'),
+        'pudu': _package_version('pudupy'),
+    }
+    encoded = json.dumps(payload, sort_keys=True, default=repr).encode('utf-8')
+    return hashlib.sha256(encoded).hexdigest()
+
+
+class SimulationCache:
+    """
+    Size-bounded LRU cache of simulation results on disk.
+
+    Each entry is a directory named after its key holding ``commands.json`` and
+    the exported files under ``outputs/``. Reading an entry refreshes its
+    modification time, and eviction removes the entries with the oldest times
+    first.
+
+    Args:
+        cache_dir: Cache directory. Defaults to ``$PUDU_CACHE_DIR`` or
+            ``~/.cache/pudu/simulations``.
+        max_bytes: Total size the cache is trimmed to after every store.
+    """
+
+    def __init__(self, cache_dir=None, max_bytes: int = DEFAULT_MAX_BYTES):
+        if cache_dir is None:
+            cache_dir = os.environ.get('PUDU_CACHE_DIR') or Path.home() / '.cache' / 'pudu' / 'simulations'
+        if max_bytes <= 0:
+            raise ValueError(f"max_bytes must be positive, got {max_bytes}")
+        self.cache_dir = Path(cache_dir)
+        self.max_bytes = max_bytes
+
+    def _entry(self, key: str) -> Path:
+        return self.cache_dir / key
+
+    def get(self, key: str) -> Optional[SimulationResult]:
+        """Stored result for *key*, or ``None`` on a miss."""
+        entry = self._entry(key)
+        try:
+            with open(entry / COMMANDS_FILE) as f:
+                command_log = json.load(f)
+            outputs = {path.name: path.read_bytes() for path in sorted((entry / OUTPUTS_DIR).iterdir())}
+        except (OSError, ValueError):
+            return None
+        now = time.time()
+        os.utime(entry, (now, now))
+        return SimulationResult(key=key, command_log=command_log, outputs=outputs, cache_hit=True)
+
+    def put(self, result: SimulationResult):
+        """Store *result* and evict least recently used entries beyond ``max_bytes``."""
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        staging = Path(tempfile.mkdtemp(prefix='.tmp-', dir=self.cache_dir))
+        try:
+            with open(staging / COMMANDS_FILE, 'w') as f:
+                json.dump(result.command_log, f)
+            (staging / OUTPUTS_DIR).mkdir()
+            for name, content in result.outputs.items():
+                (staging / OUTPUTS_DIR / name).write_bytes(content)
+            entry = self._entry(result.key)
+            if entry.exists():
+                shutil.rmtree(entry)
+            staging.rename(entry)
+        finally:
+            if staging.exists():
+                shutil.rmtree(staging)
+        self.evict()
+
+    def entries(self) -> List[Path]:
+        """Entry directories, least recently used first."""
+        if not self.cache_dir.is_dir():
+            return []
+        entries = [path for path in self.cache_dir.iterdir() if path.is_dir() and not path.name.startswith('.')]
+        return sorted(entries, key=lambda path: path.stat().st_mtime)
+
+    def size(self) -> int:
+        """Total size of all entries in bytes."""
+        return sum(_directory_size(entry) for entry in self.entries())
+
+    def evict(self):
+        """Remove least recently used entries until the cache fits ``max_bytes``."""
+        entries = [(entry, _directory_size(entry)) for entry in self.entries()]
+        total = sum(size for _, size in entries)
+        for entry, size in entries:
+            if total <= self.max_bytes:
+                break
+            shutil.rmtree(entry, ignore_errors=True)
+            total -= size
+
+    def clear(self):
+        """Remove every entry."""
+        for entry in self.entries():
+            shutil.rmtree(entry, ignore_errors=True)
+
+
+def _directory_size(path: Path) -> int:
+    return sum(file.stat().st_size for file in path.rglob('*') if file.is_file())
+
+
+@contextlib.contextmanager
+def _quiet_stdout():
+    """Discard what the protocols print while any simulation of this process runs."""
+    global _quiet_depth, _saved_stdout, _devnull
+    with _quiet_lock:
+        if _quiet_depth == 0:
+            _saved_stdout, _devnull = sys.stdout, open(os.devnull, 'w')
+            sys.stdout = _devnull
+        _quiet_depth += 1
+    try:
+        yield
+    finally:
+        with _quiet_lock:
+            _quiet_depth -= 1
+            if _quiet_depth == 0:
+                sys.stdout = _saved_stdout
+                _devnull.close()
+                _saved_stdout = _devnull = None
+
+
+def _simulate(protocol_obj, key: str) -> SimulationResult:
+    """Run *protocol_obj* with its output directory in a scratch directory and collect the files it writes."""
+    subject = copy.deepcopy(protocol_obj)
+    for attribute in ('take_picture', 'take_video'):
+        if getattr(subject, attribute, False):
+            setattr(subject, attribute, False)
+
+    with tempfile.TemporaryDirectory() as scratch:
+        subject.output_dir = scratch
+        with _quiet_stdout():
+            context = dry_run(subject, simulating=True)
+        outputs = {path.name: path.read_bytes() for path in Path(scratch).iterdir() if path.is_file()}
+    return SimulationResult(key=key, command_log=context.command_log, outputs=outputs)
+
+
+def simulate_cached(protocol_obj, cache: Optional[SimulationCache] = None,
+                    output_dir=None, use_cache: bool = True) -> SimulationResult:
+    """
+    Simulate *protocol_obj*, reusing a cached result when its inputs are unchanged.
+
+    The protocol runs on a deep copy that writes its files to a scratch
+    directory, so the caller's object and working directory are left untouched
+    and several threads may simulate at once.
+
+    Args:
+        protocol_obj: Freshly constructed PUDU protocol class instance.
+        cache: Cache to use. Defaults to ``SimulationCache()``.
+        output_dir: If given, the exported files are written there.
+        use_cache: If ``False``, always simulate and store the fresh result.
+
+    Returns:
+        ``SimulationResult`` with the command log and exported files.
+    """
+    cache = cache or SimulationCache()
+    key = simulation_key(protocol_obj)
+    result = cache.get(key) if use_cache else None
+    if result is None:
+        result = _simulate(protocol_obj, key)
+        cache.put(result)
+    if output_dir is not None:
+        result.write_outputs(output_dir)
+    return result
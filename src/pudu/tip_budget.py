@@ -0,0 +1,309 @@
+"""
+Tip rack budgeting shared by the protocol classes.
+
+A protocol counts the tip pickups each pipette will make before anything is
+loaded, and a ``TipBudget`` per pipette turns that count into tip racks: as
+many as fit on the pipette's deck slots are loaded there, the rest are loaded
+off deck. Every pickup goes through ``TipBudget.pick_up_tip`` (or
+``TipBudget.before_pickup`` when Opentrons picks the tip up itself, as in
+``distribute(new_tip='once')``), which moves the exhausted on-deck racks off the
+deck and the next batch on once the current batch runs out.
+
+Counts are in pickups: a multi-channel pickup takes a whole column of tips, so
+a 96-tip rack holds 12 of them.
+
+When protocols are chained on one robot, the partially used racks carry over
+through a tip state (``tip_state.json``, keyed by tip rack labware): each
+protocol starts from the recorded next tip with ``apply_tip_state`` and, when
+given a ``tip_state_output`` path, writes the racks it leaves behind with
+``export_tip_state`` at the end of a simulation. One partially used rack is
+recorded per labware, so two pipettes of one protocol cannot both leave a rack
+of the same labware behind.
+
+Example::
+
+    from pudu.tip_budget import TipBudget
+
+    budget = TipBudget('opentrons_96_tiprack_20ul', ['9'], tips_needed=250)
+    pipette = budget.load_pipette(protocol, 'p20_single_gen2', 'left')
+    budget.pick_up_tip(protocol, pipette)        # swaps racks when needed
+    budget.before_pickup(protocol)                # before pipette.distribute(new_tip='once')
+    pipette.distribute(5, source, dests, new_tip='once')
+"""
+
+import json
+from typing import Dict, Iterable, List, Optional
+
+from pudu.plate_geometry import plate_geometry
+
+TIPS_PER_RACK = 96
+ROWS_PER_RACK = 8
+TIP_STATE_FILE = 'tip_state.json'
+
+
+def tip_index(well_name: str) -> int:
+    """
+    Column-major index of a tip rack well, the order in which tips are picked up.
+
+    Raises:
+        ValueError: If *well_name* is not a well of a 96-tip rack (``A1``-``H12``).
+    """
+    return plate_geometry(TIPS_PER_RACK).well_index(well_name)
+
+
+def tip_well_name(index: int) -> str:
+    """Well name of the tip at column-major *index* (the inverse of ``tip_index``)."""
+    return plate_geometry(TIPS_PER_RACK).well_name(index)
+
+
+def budget_for(budgets: Iterable['TipBudget'], pipette) -> 'TipBudget':
+    """
+    The budget whose ``load_pipette`` loaded *pipette*.
+
+    Raises:
+        ValueError: If none of *budgets* belongs to *pipette*.
+    """
+    for budget in budgets:
+        if budget.pipette is pipette:
+            return budget
+    raise ValueError(f"No tip budget was set up for pipette {pipette}")
+
+
+class TipBudget:
+    """
+    Tip racks for one pipette, sized from a precomputed number of pickups.
+
+    Attributes:
+        tiprack_labware: Opentrons labware definition string for the tip racks.
+        positions: Deck slots the racks of this pipette occupy; one batch fills them all.
+        tips_needed: Number of tip pickups the protocol will make with this pipette.
+        initial_tip: Well of the first tip to use on the first rack, or ``None`` for ``A1``.
+        channels: Pipette channels; a pickup takes ``channels`` tips.
+        all_racks: Every loaded rack, in the order the pipette uses them.
+        on_deck_racks: Racks of the current batch.
+        off_deck_racks: Racks still waiting off deck.
+        tips_used: Pickups made so far.
+        current_batch: Number of the batch on deck, starting at 1.
+        pipette: Pipette loaded by ``load_pipette``, or ``None``.
+    """
+
+    def __init__(self, tiprack_labware: str, positions: List[str], tips_needed: int,
+                 initial_tip: Optional[str] = None, channels: int = 1):
+        if not positions:
+            raise ValueError(f"At least one deck slot is needed for '{tiprack_labware}' tip racks")
+        if channels not in (1, ROWS_PER_RACK):
+            raise ValueError(f"Unsupported number of pipette channels: {channels}. Use 1 or {ROWS_PER_RACK}")
+        self.tiprack_labware = tiprack_labware
+        self.positions = [str(position) for position in positions]
+        self.tips_needed = tips_needed
+        self.initial_tip = initial_tip
+        self.channels = channels
+
+        self.all_racks = []
+        self.on_deck_racks = []
+        self.off_deck_racks = []
+        self.tips_used = 0
+        self.current_batch = 1
+        self.pipette = None
+
+    @property
+    def pickups_per_rack(self) -> int:
+        """Pickups a full rack provides."""
+        return TIPS_PER_RACK // self.channels
+
+    @property
+    def first_rack_pickups(self) -> int:
+        """Pickups left on the first rack when starting from ``initial_tip``."""
+        if not self.initial_tip:
+            return self.pickups_per_rack
+        try:
+            start = tip_index(self.initial_tip)
+        except ValueError as e:
+            raise ValueError(f"Error with initial tip '{self.initial_tip}': {e}")
+        if self.channels > 1 and start % ROWS_PER_RACK:
+            raise ValueError(f"Initial tip '{self.initial_tip}' must be in row A for a "
+                             f"{self.channels}-channel pipette")
+        return (TIPS_PER_RACK - start) // self.channels
+
+    @property
+    def racks_needed(self) -> int:
+        """Racks needed for ``tips_needed`` pickups, at least one."""
+        first = self.first_rack_pickups
+        if self.tips_needed <= first:
+            return 1
+        return 1 + (self.tips_needed - first + self.pickups_per_rack - 1) // self.pickups_per_rack
+
+    @property
+    def first_batch_pickups(self) -> int:
+        """Pickups available before the first swap; short by the tips already used on the first rack."""
+        return len(self.positions) * self.pickups_per_rack - (self.pickups_per_rack - self.first_rack_pickups)
+
+    @property
+    def total_batches(self) -> int:
+        """Number of batches, including the one loaded on deck at the start."""
+        return (self.racks_needed + len(self.positions) - 1) // len(self.positions)
+
+    @property
+    def racks_used(self) -> int:
+        """Racks tips have been picked up from so far."""
+        if self.tips_used == 0:
+            return 0
+        first = self.first_rack_pickups
+        if self.tips_used <= first:
+            return 1
+        return 1 + (self.tips_used - first + self.pickups_per_rack - 1) // self.pickups_per_rack
+
+    @property
+    def next_tip(self) -> Optional[str]:
+        """
+        Next unused tip on the rack in use, or ``None`` when that rack is untouched
+        or used up, so the next protocol can start from a fresh rack.
+        """
+        first = self.first_rack_pickups
+        if self.tips_used < first:
+            index = TIPS_PER_RACK - (first - self.tips_used) * self.channels
+        else:
+            index = (self.tips_used - first) % self.pickups_per_rack * self.channels
+        return tip_well_name(index) if 0 < index < TIPS_PER_RACK else None
+
+    def load(self, protocol) -> List:
+        """
+        Load the racks: the first batch on the deck slots, the rest off deck.
+
+        Returns:
+            All racks in pickup order, to pass as the pipette's ``tip_racks``.
+        """
+        racks_needed = self.racks_needed
+        protocol.comment(f"{self.tiprack_labware}: {self.tips_needed} tip pickups ({racks_needed} racks)")
+
+        for position in self.positions[:racks_needed]:
+            rack = protocol.load_labware(self.tiprack_labware, position)
+            self.all_racks.append(rack)
+            self.on_deck_racks.append(rack)
+
+        if racks_needed > len(self.positions):
+            from opentrons import protocol_api
+
+            for _ in range(len(self.positions), racks_needed):
+                rack = protocol.load_labware(self.tiprack_labware, protocol_api.OFF_DECK)
+                self.all_racks.append(rack)
+                self.off_deck_racks.append(rack)
+            protocol.comment(f"Will perform {self.total_batches - 1} tip rack batch swaps")
+
+        return self.all_racks
+
+    def load_pipette(self, protocol, instrument_name: str, mount: str):
+        """Load the racks and a pipette that uses them, starting from ``initial_tip``."""
+        pipette = protocol.load_instrument(instrument_name, mount, tip_racks=self.load(protocol))
+        if self.initial_tip:
+            pipette.starting_tip = self.on_deck_racks[0][self.initial_tip]
+        self.pipette = pipette
+        return pipette
+
+    def swap_needed(self) -> bool:
+        """Whether the on-deck batch is used up and another batch is waiting off deck."""
+        tips_after_first_batch = self.tips_used - self.first_batch_pickups
+        return (tips_after_first_batch >= 0 and
+                tips_after_first_batch % (len(self.positions) * self.pickups_per_rack) == 0 and
+                len(self.off_deck_racks) > 0)
+
+    def swap_batch(self, protocol):
+        """Move the exhausted on-deck racks off deck and the next batch onto the deck slots."""
+        from opentrons import protocol_api
+
+        for rack in self.on_deck_racks:
+            protocol.move_labware(labware=rack, new_location=protocol_api.OFF_DECK)
+
+        new_on_deck_racks = []
+        for position in self.positions[:len(self.off_deck_racks)]:
+            rack = self.off_deck_racks.pop(0)
+            protocol.move_labware(labware=rack, new_location=position)
+            new_on_deck_racks.append(rack)
+
+        self.on_deck_racks = new_on_deck_racks
+        self.current_batch += 1
+        protocol.comment(f"Tip rack batch {self.current_batch} ready!")
+
+    def before_pickup(self, protocol):
+        """Account for one pickup, swapping in the next batch first if needed."""
+        if self.swap_needed():
+            self.swap_batch(protocol)
+        self.tips_used += 1
+
+    def pick_up_tip(self, protocol, pipette):
+        """Pick up a tip with *pipette*, swapping in the next batch first if needed."""
+        self.before_pickup(protocol)
+        try:
+            pipette.pick_up_tip()
+        except Exception as e:
+            protocol.comment(f"Tip pickup failed with error: {e}")
+            raise
+
+
+def apply_tip_state(protocol, budgets: Iterable[TipBudget], tip_state: Optional[Dict]):
+    """
+    Start budgets from the partially used racks recorded in *tip_state*.
+
+    Budgets with an explicit ``initial_tip`` keep it. Each recorded rack is
+    continued by the first budget using its labware, and a multi-channel budget
+    only continues a rack whose next tip is in row A.
+    """
+    if not tip_state:
+        return
+    continued = set()
+    for budget in budgets:
+        next_tip = (tip_state.get(budget.tiprack_labware) or {}).get('next_tip')
+        if budget.initial_tip or not next_tip or budget.tiprack_labware in continued:
+            continue
+        if budget.channels > 1 and tip_index(next_tip) % ROWS_PER_RACK:
+            continue
+        budget.initial_tip = next_tip
+        continued.add(budget.tiprack_labware)
+        protocol.comment(f"Place the partially used {budget.tiprack_labware} rack in slot {budget.positions[0]}: "
+                         f"starting from tip {next_tip}")
+
+
+def updated_tip_state(budgets: Iterable[TipBudget], tip_state: Optional[Dict] = None,
+                      protocol_name: str = '') -> Dict:
+    """
+    Tip state after a run: *tip_state* with the racks the budgets leave behind.
+
+    Each entry is keyed by tip rack labware and records the next tip, the tips
+    already consumed from that rack, the racks used and the pipette. Racks a
+    budget used up are removed; labware the run did not use is carried over.
+
+    Raises:
+        ValueError: If two budgets leave a partially used rack of the same
+            labware, which one entry cannot record.
+    """
+    state = {labware: dict(entry) for labware, entry in (tip_state or {}).items()}
+    recorded = {}
+    for budget in budgets:
+        next_tip = budget.next_tip
+        if next_tip is None:
+            if budget.tips_used and budget.tiprack_labware not in recorded:
+                state.pop(budget.tiprack_labware, None)
+            continue
+        if budget.tiprack_labware in recorded:
+            raise ValueError(f"Two pipettes leave a partially used '{budget.tiprack_labware}' rack "
+                             f"(slots {recorded[budget.tiprack_labware]} and {budget.positions[0]}); "
+                             f"use different tip rack labware to chain both")
+        recorded[budget.tiprack_labware] = budget.positions[0]
+        state[budget.tiprack_labware] = {
+            'next_tip': next_tip,
+            'tips_consumed': tip_index(next_tip),
+            'racks_used': budget.racks_used,
+            'pipette': getattr(budget.pipette, 'name', None),
+            'protocol': protocol_name,
+        }
+    return state
+
+
+def export_tip_state(protocol, budgets: Iterable[TipBudget], tip_state: Optional[Dict] = None,
+                     protocol_name: str = '', output_path: str = TIP_STATE_FILE) -> Dict:
+    """Write ``updated_tip_state`` to *output_path* for the next protocol in the chain and return it."""
+    state = updated_tip_state(budgets, tip_state, protocol_name)
+    with open(output_path, 'w') as f:
+        json.dump(state, f, indent=2)
+    protocol.comment(f"Generated {output_path} with {len(state)} partially used tip rack(s)")
+    return state
@@ -1,9 +1,14 @@
+import os
 from itertools import groupby
-from opentrons import protocol_api
-from typing import List, Dict, Optional
-from pudu.utils import colors
+from typing import List, Dict, Optional, TYPE_CHECKING
+from pudu.utils import colors, is_multichannel, split_full_columns, single_nozzle
+from pudu.scheduling import HoldScheduler, HoldTask, schedulable
+from pudu.tip_budget import TipBudget, apply_tip_state, budget_for, export_tip_state
 from dataclasses import dataclass
 
+if TYPE_CHECKING:
+    from opentrons import protocol_api
+
 
 class Transformation():
     '''
@@ -56,6 +61,11 @@ class Transformation():
         Mount for the p20 pipette ('left' or 'right'). By default, 'left'.
     pipette_p300 : str
         Pipette model for the p300 single-channel. By default, 'p300_single_gen2'.
+        A multi-channel model (e.g. 'p300_multi_gen2') enables multi-channel mode:
+        recovery media is loaded into a reservoir and dispensed 8 wells at a time to
+        every complete thermocycler column and with a single nozzle to partial
+        columns (API level 2.20 or later), while competent cells and DNA are
+        handled by the p20.
     pipette_p300_position : str
         Mount for the p300 pipette ('left' or 'right'). By default, 'right'.
     aspiration_rate : float
@@ -84,6 +94,24 @@ class Transformation():
         By default, 'opentrons_24_tuberack_eppendorf_1.5ml_safelock_snapcap'.
     tube_rack_position : str
         Deck slot for the tube rack. By default, '3'.
+    reservoir_labware : str
+        Labware type for the recovery media reservoir used in multi-channel mode.
+        By default, 'nest_12_reservoir_15ml'.
+    reservoir_position : str
+        Deck slot for the recovery media reservoir. By default, '5'.
+    schedule_holds : bool
+        If True, ramp the temperature module while the thermocycler block cools,
+        and run the work queued with schedule_during_holds during the thermocycler
+        holds (cold incubations, recovery; never the heat shock) instead of after them. See
+        pudu.scheduling. By default, False.
+    tip_state : dict, optional
+        Tip state written by the previous protocol run on the robot (tip_state.json).
+        Pipettes without initial_tip_p20 / initial_tip_p300 continue the partially
+        used racks it records. By default, None.
+    tip_state_output : str, optional
+        If given, the tip state after this protocol is written to this path (relative
+        to output_dir) during simulation, for the next protocol in the chain. By
+        default, None (no file).
     '''
     def __init__(self,
                  transformation_data: Optional[List] = None,
@@ -114,6 +142,11 @@ class Transformation():
                  initial_tip_p300:Optional[str] = None,
                  tube_rack_labware:str = 'opentrons_24_tuberack_eppendorf_1.5ml_safelock_snapcap',
                  tube_rack_position:str = '3',
+                 reservoir_labware:str = 'nest_12_reservoir_15ml',
+                 reservoir_position:str = '5',
+                 schedule_holds:bool = False,
+                 tip_state:Optional[Dict] = None,
+                 tip_state_output:Optional[str] = None,
                  **kwargs
                  ):
 
@@ -142,7 +175,10 @@ class Transformation():
             'initial_tip_p20': initial_tip_p20,
             'initial_tip_p300': initial_tip_p300,
             'tube_rack_labware': tube_rack_labware,
-            'tube_rack_position': tube_rack_position
+            'tube_rack_position': tube_rack_position,
+            'reservoir_labware': reservoir_labware,
+            'reservoir_position': reservoir_position,
+            'schedule_holds': schedule_holds
         }
         kwargs_params.update(kwargs)
 
@@ -153,6 +189,10 @@ class Transformation():
             raise ValueError("Must provide transformation_data as a list of transformation dictionaries")
 
         self.plasmid_locations = plasmid_locations  # URI -> [well, well, ...] from assembly output
+        self.tip_state = tip_state  # tip rack labware -> partially used rack, from the previous protocol
+        self.tip_state_output = tip_state_output  # path the tip state is exported to during simulation
+        self.export_outputs = True  # simulation writes plating_input.json and the tip state
+        self.output_dir = '.'  # directory the exported files are written to
         self.transformations, self.all_plasmids, self.all_chassis = self._parse_transformation_data(transformation_data)
 
         # Set all attributes from merged parameters
@@ -189,6 +229,28 @@ class Transformation():
         self.initial_tip_p300 = self._merged_params['initial_tip_p300']
         self.tube_rack_labware = self._merged_params['tube_rack_labware']
         self.tube_rack_position = self._merged_params['tube_rack_position']
+        self.reservoir_labware = self._merged_params['reservoir_labware']
+        self.reservoir_position = self._merged_params['reservoir_position']
+        self.schedule_holds = self._merged_params['schedule_holds']
+        self.hold_tasks = []  # work for the thermocycler holds, see schedule_during_holds
+        self.hold_scheduler = None
+        self.multichannel = is_multichannel(self.pipette_p300)
+
+    def schedule_during_holds(self, name: str, work, seconds: float):
+        """
+        Queue pipetting work to run during the thermocycler holds of run().
+
+        With schedule_holds the work runs in the first cold incubation or recovery
+        hold long enough for it (never in the heat shock), otherwise (or when no
+        hold fits) after the recovery incubation. work is
+        called with the protocol context and must not touch the thermocycler plate.
+
+        Parameters:
+        - name: Description written as a protocol comment when the work starts
+        - work: Callable taking the protocol context
+        - seconds: Estimated duration of the work
+        """
+        self.hold_tasks.append(HoldTask(name, work, seconds))
 
     def _extract_name_from_uri(self, uri: str) -> str:
         """Extract name from SBOL URI"""
@@ -330,6 +392,9 @@ class Transformation():
             'initial_tip_p300': None,
             'tube_rack_labware': 'opentrons_24_tuberack_eppendorf_1.5ml_safelock_snapcap',
             'tube_rack_position': '3',
+            'reservoir_labware': 'nest_12_reservoir_15ml',
+            'reservoir_position': '5',
+            'schedule_holds': False,
             # HeatShockTransformation-specific parameters
             'transfer_volume_dna': 2,
             'transfer_volume_competent_cell': 20,
@@ -459,6 +524,16 @@ class HeatShockTransformation(Transformation):
         self.transfer_volume_recovery_media = self._merged_params['transfer_volume_recovery_media']
         self.tube_volume_recovery_media = self._merged_params['tube_volume_recovery_media']
 
+        # In multi-channel mode the p20 is the only single-channel pipette left on the deck
+        if self.multichannel:
+            for name, volume in (('transfer_volume_competent_cell', self.transfer_volume_competent_cell),
+                                 ('transfer_volume_dna', self.transfer_volume_dna)):
+                if volume > 20:
+                    raise ValueError(
+                        f"{name} ({volume} µL) must be at most 20 µL when pipette_p300 is the multi-channel "
+                        f"'{self.pipette_p300}': single-well transfers are done with the p20."
+                    )
+
         cold_incubation1 = self._merged_params['cold_incubation1']
         heat_shock = self._merged_params['heat_shock']
         cold_incubation2 = self._merged_params['cold_incubation2']
@@ -487,7 +562,20 @@ class HeatShockTransformation(Transformation):
         self.dict_of_parts_in_thermocycler = {}
         self.dict_of_parts_in_dna_plate = {}
         self.dict_of_parts_in_tube_rack = {}
+        self.dict_of_parts_in_reservoir = {}
         self.plasmid_name_to_wells = {}  # plasmid name -> [well_obj, ...], populated during loading
+        self.tip_budgets = {}  # 'p20' / 'p300' -> TipBudget, set up in run()
+
+    def get_plating_input(self) -> Dict:
+        """
+        Plating protocol input for the transformed bacteria, available after run().
+
+        Returns:
+            {'bacterium_locations': {thermocycler well: construct names}}
+        """
+        return {
+            'bacterium_locations': dict(self.dict_of_parts_in_thermocycler)
+        }
 
     def _export_plating_input(self, protocol):
         """
@@ -497,12 +585,10 @@ class HeatShockTransformation(Transformation):
         """
         import json
 
-        plating_input = {
-            'bacterium_locations': self.dict_of_parts_in_thermocycler
-        }
+        plating_input = self.get_plating_input()
 
         output_path = 'plating_input.json'
-        with open(output_path, 'w') as f:
+        with open(os.path.join(self.output_dir, output_path), 'w') as f:
             json.dump(plating_input, f, indent=2)
 
         protocol.comment("\n" + "="*70)
@@ -517,7 +603,7 @@ class HeatShockTransformation(Transformation):
                         mix_reps: int = 3, new_tip: bool = True,
                         remove_air:bool = True, drop_tip: bool = True):
         if new_tip:
-            pipette.pick_up_tip()
+            budget_for(self.tip_budgets.values(), pipette).pick_up_tip(protocol, pipette)
 
         if mix_before > 0:
             pipette.mix(mix_reps, mix_before, source)
@@ -542,7 +628,7 @@ class HeatShockTransformation(Transformation):
         if drop_tip:
             pipette.drop_tip()
 
-    def run(self, protocol: protocol_api.ProtocolContext):
+    def run(self, protocol: 'protocol_api.ProtocolContext'):
         # Force water testing mode during simulation
         if protocol.is_simulating():
             self.water_testing = True
@@ -554,42 +640,56 @@ class HeatShockTransformation(Transformation):
         # Load the thermocycler module, its default location is on slots 7, 8, 10 and 11
         thermocycler_module = protocol.load_module('thermocycler module')
         pcr_plate = thermocycler_module.load_labware(self.thermocycler_labware)
+        self.hold_scheduler = HoldScheduler(protocol, thermocycler_module, enabled=self.schedule_holds,
+                                            tasks=self.hold_tasks)
         #If using the 96-well pcr plate as a dna construct source
         if self.use_dna_96plate:
             dna_plate = protocol.load_labware(self.dna_plate, self.dna_plate_position)
         # Load the tube rack for competent cells and recovery media
         tube_rack = protocol.load_labware(self.tube_rack_labware, self.tube_rack_position)
-        # Load the tiprack
-        tiprack_p20 = protocol.load_labware(self.tiprack_p20_labware, self.tiprack_p20_position)
-        tiprack_p200 = protocol.load_labware(self.tiprack_p200_labware, self.tiprack_p200_position)
-        # Load the pipette
-        pipette_p20 = protocol.load_instrument(self.pipette_p20, self.pipette_p20_position, tip_racks=[tiprack_p20])
-        if self.initial_tip_p20:
-            pipette_p20.starting_tip = tiprack_p20[self.initial_tip_p20]
-        pipette_p300 = protocol.load_instrument(self.pipette_p300, self.pipette_p300_position, tip_racks=[tiprack_p200])
-        if self.initial_tip_p300:
-            pipette_p300.starting_tip = tiprack_p200[self.initial_tip_p300]
+        # In multi-channel mode recovery media comes from a reservoir the 8 channels can reach
+        if self.multichannel:
+            reservoir = protocol.load_labware(self.reservoir_labware, self.reservoir_position)
         #Validate protocol
         self._validate_protocol(protocol, alumblock, tube_rack)
+        # Load the tipracks, with extra racks off deck when one is not enough, and the pipettes
+        tips_needed = self._calculate_tips_needed()
+        self.tip_budgets = {
+            'p20': TipBudget(self.tiprack_p20_labware, [self.tiprack_p20_position], tips_needed['p20'],
+                             initial_tip=self.initial_tip_p20, channels=8 if is_multichannel(self.pipette_p20) else 1),
+            'p300': TipBudget(self.tiprack_p200_labware, [self.tiprack_p200_position], tips_needed['p300'],
+                              initial_tip=self.initial_tip_p300, channels=8 if self.multichannel else 1),
+        }
+        apply_tip_state(protocol, self.tip_budgets.values(), self.tip_state)
+        pipette_p20 = self.tip_budgets['p20'].load_pipette(protocol, self.pipette_p20, self.pipette_p20_position)
+        pipette_p300 = self.tip_budgets['p300'].load_pipette(protocol, self.pipette_p300, self.pipette_p300_position)
 
         #Load Reagents (also populates self.plasmid_name_to_wells)
         if self.use_dna_96plate:
             competent_cell_wells_by_chassis, media_wells = self._load_reagents_96plate(protocol, dna_plate, alumblock, tube_rack)
         else:
             competent_cell_wells_by_chassis, media_wells = self._load_reagents_temp_module(protocol, alumblock, tube_rack)
+        if self.multichannel:
+            media_wells = self._load_media_reservoir(protocol, reservoir)
 
         #Set Temperature module and Thermocycler module to 4
         thermocycler_module.open_lid()
         if not self.water_testing:
-            temperature_module.set_temperature(4)
-            thermocycler_module.set_block_temperature(4)
-
-        #Load competent cells into the thermocycler
-        pipette = pipette_p300
+            if self.schedule_holds:
+                # Ramp the temperature module while the thermocycler block cools
+                temperature_module.start_set_temperature(4)
+                thermocycler_module.set_block_temperature(4)
+                temperature_module.await_temperature(4)
+            else:
+                temperature_module.set_temperature(4)
+                thermocycler_module.set_block_temperature(4)
+
+        #Load competent cells into the thermocycler (from tubes, so single-channel only)
+        pipette = pipette_p20 if self.multichannel else pipette_p300
         self._transfer_competent_cells(protocol, pipette, pcr_plate, competent_cell_wells_by_chassis, self.transfer_volume_competent_cell, self.thermocycler_starting_well)
 
         #Load DNA into the thermocycler
-        if self.transfer_volume_dna > 20:
+        if self.transfer_volume_dna > 20 and not self.multichannel:
             pipette = pipette_p300
         else:
             pipette = pipette_p20
@@ -597,33 +697,45 @@ class HeatShockTransformation(Transformation):
 
         # Cold Incubation
         thermocycler_module.close_lid()
+        # Queued work may only run during the cold incubations, never during the heat shock
         profile = [
-            self.cold_incubation1,  # 1st cold incubation (long)
+            schedulable(self.cold_incubation1),  # 1st cold incubation (long)
             self.heat_shock,  # Heat shock
-            self.cold_incubation2  # 2nd cold incubation (short)
+            schedulable(self.cold_incubation2)  # 2nd cold incubation (short)
         ]
         if not self.water_testing:
-            thermocycler_module.execute_profile(steps=profile, repetitions=1, block_max_volume=30)
+            self.hold_scheduler.execute_profile(steps=profile, repetitions=1, block_max_volume=30)
         thermocycler_module.open_lid()
 
         #Load liquid broth
         pipette = pipette_p300
-        self._transfer_liquid_broth(protocol, pipette, pcr_plate, media_wells, self.transfer_volume_recovery_media, self.thermocycler_starting_well)
+        if self.multichannel:
+            self._transfer_liquid_broth_multichannel(protocol, pipette, pcr_plate, media_wells[0],
+                                                     self.transfer_volume_recovery_media, self.thermocycler_starting_well)
+        else:
+            self._transfer_liquid_broth(protocol, pipette, pcr_plate, media_wells, self.transfer_volume_recovery_media, self.thermocycler_starting_well)
 
         # Recovery Incubation
         thermocycler_module.close_lid()
         recovery = [
-            self.recovery_incubation
+            schedulable(self.recovery_incubation)
         ]
         if not self.water_testing:
-            thermocycler_module.execute_profile(steps=recovery, repetitions=1, block_max_volume=30)
+            self.hold_scheduler.execute_profile(steps=recovery, repetitions=1, block_max_volume=30)
+        self.hold_scheduler.run_pending()
 
         # Export plating input for next protocol (simulation only)
-        if protocol.is_simulating():
+        if protocol.is_simulating() and self.export_outputs:
             try:
                 self._export_plating_input(protocol)
             except Exception as e:
                 protocol.comment(f"Could not export plating input: {e}")
+            if self.tip_state_output:
+                try:
+                    export_tip_state(protocol, self.tip_budgets.values(), self.tip_state, type(self).__name__,
+                                     os.path.join(self.output_dir, self.tip_state_output))
+                except Exception as e:
+                    protocol.comment(f"Could not export tip state: {e}")
 
         # output
         if self.use_dna_96plate:
@@ -634,6 +746,9 @@ class HeatShockTransformation(Transformation):
             print(self.dict_of_parts_in_temp_mod_position)
         print('Competent cells and media in tube rack')
         print(self.dict_of_parts_in_tube_rack)
+        if self.multichannel:
+            print('Media in reservoir')
+            print(self.dict_of_parts_in_reservoir)
         print('Genetically modified organisms in thermocycler')
         print(self.dict_of_parts_in_thermocycler)
 
@@ -700,7 +815,11 @@ class HeatShockTransformation(Transformation):
             total_competent_cell_tubes += tubes_needed
 
         self.transformations_per_media_tube = self.tube_volume_recovery_media // self.transfer_volume_recovery_media
-        self.media_tubes_needed = (self.total_transformations + self.transformations_per_media_tube - 1) // self.transformations_per_media_tube
+        if self.multichannel:
+            # Media is loaded into the reservoir instead of tubes (see _load_media_reservoir)
+            self.media_tubes_needed = 0
+        else:
+            self.media_tubes_needed = (self.total_transformations + self.transformations_per_media_tube - 1) // self.transformations_per_media_tube
 
         # Tube rack capacity: cells and media always live here
         if total_competent_cell_tubes + self.media_tubes_needed > tube_rack_wells:
@@ -723,6 +842,45 @@ class HeatShockTransformation(Transformation):
                 )
 
 
+    def _calculate_tips_needed(self) -> Dict[str, int]:
+        """
+        Tip pickups per pipette (``'p20'``, ``'p300'``) for the whole run, mirroring the
+        pipette choices in run(). Uses the counts set by _validate_protocol().
+
+        A multi-channel pickup counts once (it takes a column of tips).
+        """
+        tips = {'p20': 0, 'p300': 0}
+
+        # Competent cells: one tip per consecutive block of wells served by the same tube
+        cells_pipette = 'p20' if self.multichannel else 'p300'
+        chassis_reaction_count = {chassis: 0 for chassis in self.all_chassis}
+        previous_tube = None
+        for transformation in self.transformations:
+            chassis = transformation['chassis']
+            for _ in range(self.location_replicates * self.replicates):
+                tube = (chassis, chassis_reaction_count[chassis] // self.transformations_per_cell_tube)
+                if tube != previous_tube:
+                    tips[cells_pipette] += 1
+                    previous_tube = tube
+                chassis_reaction_count[chassis] += 1
+
+        # DNA: one tip per plasmid per well
+        dna_pipette = 'p300' if self.transfer_volume_dna > 20 and not self.multichannel else 'p20'
+        tips[dna_pipette] += sum(len(transformation['plasmids']) for transformation in self.transformations) \
+            * self.location_replicates * self.replicates
+
+        # Recovery media: one tip per media tube, or per column block / partial-column block
+        if self.multichannel:
+            first = self.thermocycler_starting_well
+            last = first + self.total_transformations - 1
+            full_columns = sum(1 for column in range(first // 8, last // 8 + 1)
+                               if column * 8 >= first and column * 8 + 7 <= last)
+            tips['p300'] += int(full_columns > 0) + int(full_columns * 8 < self.total_transformations)
+        else:
+            tips['p300'] += self.media_tubes_needed
+
+        return tips
+
     def _load_reagents_96plate(self, protocol, dna_plate, alumblock, tube_rack):
         """
         Load all reagents for the 96-well plate workflow (plasmid_locations provided).
@@ -775,13 +933,15 @@ class HeatShockTransformation(Transformation):
         current_color = 0
         name_to_uri = {self._extract_name_from_uri(uri): uri for uri in self.plasmid_locations}
 
+        dna_wells_by_name = dna_plate.wells_by_name()
+
         for construct_name in self.all_plasmids:
             uri = name_to_uri[construct_name]
             well_names = self.plasmid_locations[uri]
             well_objects = []
 
             for i, well_name in enumerate(well_names):
-                well = dna_plate.wells_by_name()[well_name]
+                well = dna_wells_by_name[well_name]
                 well_objects.append(well)
                 if i == 0:
                     liquid = protocol.define_liquid(
@@ -844,9 +1004,10 @@ class HeatShockTransformation(Transformation):
         - alumblock: Temperature module labware object
         """
         current_color = 0
+        block_wells = alumblock.wells()
 
         for i, construct_name in enumerate(self.all_plasmids):
-            well = alumblock.wells()[self.initial_dna_well + i]
+            well = block_wells[self.initial_dna_well + i]
             liquid = protocol.define_liquid(
                 name=construct_name,
                 description=f"{construct_name} DNA construct",
@@ -880,8 +1041,9 @@ class HeatShockTransformation(Transformation):
             tracking_dict = self.dict_of_parts_in_temp_mod_position
         wells = []
         current_color = color_index if color_index is not None else 0
+        labware_wells = labware.wells()
         for i in range(tube_count):
-            well = labware.wells()[initial_well+i]
+            well = labware_wells[initial_well+i]
             wells.append(well)
             name = f"{reagent_name}_{i+1}"
 
@@ -895,6 +1057,33 @@ class HeatShockTransformation(Transformation):
             current_color += 1
         return wells
 
+    def _load_media_reservoir(self, protocol, reservoir):
+        """
+        Load all recovery media into the first reservoir well (multi-channel mode).
+
+        Parameters:
+        - protocol: Protocol context
+        - reservoir: Reservoir labware object
+
+        Returns:
+        - Single-element list with the media well, mirroring the tube-based media_wells
+
+        Raises ValueError if the media for all transformations does not fit in the well.
+        """
+        well = reservoir.wells()[0]
+        volume = self.total_transformations * self.transfer_volume_recovery_media
+        if volume > well.max_volume:
+            raise ValueError(
+                f'Recovery media for {self.total_transformations} transformations ({volume} µL) exceeds the '
+                f'{well.max_volume} µL capacity of reservoir well {well.well_name}. '
+                f'Please modify the protocol and try again.'
+            )
+
+        liquid = protocol.define_liquid(name="Media_1", display_color=colors[0])
+        well.load_liquid(liquid, volume=volume)
+        self.dict_of_parts_in_reservoir["Media_1"] = well.well_name
+        return [well]
+
     def _transfer_competent_cells(self, protocol, pipette, pcr_plate, competent_cell_wells_by_chassis,
                                   transfer_volume_competent_cell, thermocycler_starting_well):
         """
@@ -920,13 +1109,14 @@ class HeatShockTransformation(Transformation):
         transfers = []
         well_index = thermocycler_starting_well
         chassis_reaction_count = {chassis: 0 for chassis in self.all_chassis}
+        pcr_wells = pcr_plate.wells()
 
         for transformation in self.transformations:
             chassis = transformation['chassis']
             cell_wells = competent_cell_wells_by_chassis[chassis]
 
             for _ in range(self.location_replicates * self.replicates):
-                dest_well = pcr_plate.wells()[well_index]
+                dest_well = pcr_wells[well_index]
                 tube_index = chassis_reaction_count[chassis] // self.transformations_per_cell_tube
                 source_well = cell_wells[tube_index]
                 transfers.append((source_well, dest_well, chassis, transformation['strain']))
@@ -940,11 +1130,12 @@ class HeatShockTransformation(Transformation):
         for source_well, group in groupby(transfers, key=lambda t: t[0]):
             group_list = list(group)
             dest_wells = [t[1] for t in group_list]
+            budget_for(self.tip_budgets.values(), pipette).before_pickup(protocol)
             pipette.distribute(
                 volume=transfer_volume_competent_cell,
                 source=source_well,
                 dest=dest_wells,
-                mix_before=(3, 50),
+                mix_before=(3, min(50, pipette.max_volume)),
                 disposal_volume=0,
                 new_tip='once'
             )
@@ -971,13 +1162,14 @@ class HeatShockTransformation(Transformation):
         - thermocycler_starting_well: Starting well index in thermocycler
         """
         well_index = thermocycler_starting_well
+        pcr_wells = pcr_plate.wells()
 
         for transformation in self.transformations:
             plasmids = transformation['plasmids']
 
             for loc_idx in range(self.location_replicates):
                 for replicate in range(self.replicates):
-                    dest_well = pcr_plate.wells()[well_index]
+                    dest_well = pcr_wells[well_index]
 
                     for plasmid_name in plasmids:
                         source_well = self.plasmid_name_to_wells[plasmid_name][loc_idx]
@@ -1017,6 +1209,7 @@ class HeatShockTransformation(Transformation):
         - thermocycler_starting_well: Starting well index in thermocycler plate
         """
         well_index = thermocycler_starting_well
+        pcr_wells = pcr_plate.wells()
 
         for tube_index, source_well in enumerate(media_wells):
             #Calculate how many wells this media tube will fill
@@ -1024,9 +1217,10 @@ class HeatShockTransformation(Transformation):
             wells_to_fill = min(self.transformations_per_media_tube, remaining_transformations)
 
             # Get destination wells for this tube using .top() to avoid contamination
-            dest_wells = [pcr_plate.wells()[well_index+i].top(2) for i in range(int(wells_to_fill))]
+            dest_wells = [pcr_wells[well_index+i].top(2) for i in range(int(wells_to_fill))]
 
             #Distribute recovery media
+            budget_for(self.tip_budgets.values(), pipette).before_pickup(protocol)
             pipette.distribute(
                 volume=transfer_volume_recovery_media,
                 source=source_well,
@@ -1039,13 +1233,64 @@ class HeatShockTransformation(Transformation):
             #Track in dictionary
             media_name = f"Media_{tube_index+1}"
             for i in range(int(wells_to_fill)):
-                well_name = pcr_plate.wells()[well_index + i].well_name
+                well_name = pcr_wells[well_index + i].well_name
                 if well_name not in self.dict_of_parts_in_thermocycler:
                     self.dict_of_parts_in_thermocycler[well_name] = []
                 self.dict_of_parts_in_thermocycler[well_name].append(media_name)
 
             well_index += wells_to_fill
 
+    def _transfer_liquid_broth_multichannel(self, protocol, pipette, pcr_plate, media_well,
+                                            transfer_volume_recovery_media, thermocycler_starting_well):
+        """
+        Dispense recovery media column-wise with a multi-channel pipette.
+        Complete thermocycler columns are filled 8 wells at a time with a single distribute();
+        wells in partial columns (e.g. when thermocycler_starting_well is not at the top of a
+        column) get a second distribute() from a single nozzle of the same pipette.
+
+        Parameters:
+        - protocol: Protocol context
+        - pipette: Multi-channel pipette instrument (p300 multi)
+        - pcr_plate: Thermocycler plate labware
+        - media_well: Reservoir well containing recovery media
+        - transfer_volume_recovery_media: Volume to dispense per well in µL
+        - thermocycler_starting_well: Starting well index in thermocycler plate
+        """
+        dest_wells = pcr_plate.wells()[thermocycler_starting_well:thermocycler_starting_well + self.total_transformations]
+        column_heads, partial_wells = split_full_columns(dest_wells, channels=pipette.channels)
+
+        if column_heads:
+            protocol.comment(f"Dispensing media to {len(column_heads)} full columns with {self.pipette_p300}")
+            budget_for(self.tip_budgets.values(), pipette).before_pickup(protocol)
+            pipette.distribute(
+                volume=transfer_volume_recovery_media,
+                source=media_well,
+                dest=[well.top(2) for well in column_heads],
+                disposal_volume=0,
+                new_tip='once',
+                air_gap=10
+            )
+
+        if partial_wells:
+            protocol.comment(f"Dispensing media to {len(partial_wells)} wells in partial columns with one nozzle "
+                             f"of {self.pipette_p300}")
+            budget_for(self.tip_budgets.values(), pipette).before_pickup(protocol)
+            with single_nozzle(pipette):
+                pipette.distribute(
+                    volume=transfer_volume_recovery_media,
+                    source=media_well,
+                    dest=[well.top(2) for well in partial_wells],
+                    disposal_volume=0,
+                    new_tip='never',
+                    air_gap=10
+                )
+
+        #Track in dictionary
+        for well in dest_wells:
+            if well.well_name not in self.dict_of_parts_in_thermocycler:
+                self.dict_of_parts_in_thermocycler[well.well_name] = []
+            self.dict_of_parts_in_thermocycler[well.well_name].append("Media_1")
+
 
 @dataclass
 class ManualTransformationRecord:
@@ -1,6 +1,8 @@
+import math
 import subprocess
 import time
-from typing import Optional
+from contextlib import contextmanager
+from typing import List, Optional, Tuple
 
 colors = [
     "#4040BF",   # Blue
@@ -29,6 +31,103 @@ colors = [
     "#BF40A6"    # Purple-magenta
 ]
 
+def is_multichannel(pipette_name: str) -> bool:
+    """Return ``True`` for multi-channel pipette models (e.g. ``'p300_multi_gen2'``)."""
+    return 'multi' in pipette_name
+
+
+def split_full_columns(wells: List, channels: int = 8) -> Tuple[List, List]:
+    """
+    Split wells into complete labware columns and leftover wells.
+
+    A column is complete when every one of its wells is in *wells* and the column
+    has exactly *channels* wells, so a multi-channel pipette can fill it in one
+    dispense without touching wells outside the selection.
+
+    Args:
+        wells: Destination wells, in dispensing order.
+        channels: Number of pipette channels.
+
+    Returns:
+        Tuple ``(column_heads, leftover)``: the top well of each complete column, in
+        the order the columns first appear, and the remaining wells in their original
+        order.
+    """
+    columns_by_labware = {}
+    selected = {(id(well.parent), well.well_name) for well in wells}
+    covered = set()
+    column_heads = []
+
+    for well in wells:
+        key = (id(well.parent), well.well_name)
+        if key in covered:
+            continue
+        if id(well.parent) not in columns_by_labware:
+            columns_by_labware[id(well.parent)] = {
+                member.well_name: column for column in well.parent.columns() for member in column}
+        column = columns_by_labware[id(well.parent)][well.well_name]
+        column_keys = [(id(member.parent), member.well_name) for member in column]
+        if len(column) == channels and all(member in selected for member in column_keys):
+            column_heads.append(column[0])
+            covered.update(column_keys)
+
+    leftover = [well for well in wells if (id(well.parent), well.well_name) not in covered]
+    return column_heads, leftover
+
+
+def column_heads(wells: List) -> List:
+    """
+    Top well of every labware column that holds at least one of *wells*.
+
+    Args:
+        wells: Destination wells, in dispensing order.
+
+    Returns:
+        The top well of each column, in the order the columns first appear.
+    """
+    heads = []
+    seen = set()
+    for well in wells:
+        column = next(column for column in well.parent.columns() if well in column)
+        key = (id(well.parent), column[0].well_name)
+        if key not in seen:
+            seen.add(key)
+            heads.append(column[0])
+    return heads
+
+
+@contextmanager
+def single_nozzle(pipette):
+    """
+    Use only the back (``A1``) nozzle of multi-channel *pipette* inside the block.
+
+    One tip is picked up on entry from row A of the next complete tip column, so
+    the idle nozzles hang over that column and not over the neighbouring slot, and
+    it is dropped on exit before the full nozzle layout is restored. Commands inside
+    the block must not change tips (``new_tip='never'``). The idle nozzles also hang
+    forward of the source and destination wells, so the slots in front of those
+    must be free. The pickup uses up a whole tip column, like a multi-channel
+    pickup in a ``TipBudget``. Partial tip pickup on the OT-2 needs API level 2.20
+    or later.
+
+    Raises:
+        RuntimeError: If no tip rack of *pipette* has a complete tip column left.
+    """
+    from opentrons.protocol_api import ALL, SINGLE
+
+    for rack in pipette.tip_racks:
+        tip = rack.next_tip(num_tips=8)
+        if tip is not None:
+            break
+    else:
+        raise RuntimeError(f"{pipette} has no complete tip column left for a single-nozzle pickup")
+    pipette.configure_nozzle_layout(style=SINGLE, start='A1', tip_racks=pipette.tip_racks)
+    pipette.pick_up_tip(tip)
+    yield pipette
+    pipette.drop_tip()
+    pipette.configure_nozzle_layout(style=ALL, tip_racks=pipette.tip_racks)
+
+
 class Camera:
     """
     Camera class for handling picture and video capture during Opentrons protocols.
@@ -164,6 +263,52 @@ class Camera:
         # Clear active process if it was the one we stopped
         self._active_video_process = None
 
+# Height in mm of the conical bottom of common tubes. Tubes not listed get a cone
+# height derived from their labware definition (see ``cone_height``).
+CONE_HEIGHTS = {
+    '15ml': 22.0,
+    '50ml': 15.0,
+}
+
+
+def cone_height(well) -> float:
+    """
+    Height in mm of the conical bottom of a tube well.
+
+    Known tube sizes come from ``CONE_HEIGHTS``. Otherwise the tube is taken as a
+    cylinder of the well diameter on a cone, sized so the well depth holds its
+    ``max_volume``: a cylinder of depth *H* on a cone of height *h* holds
+    ``π r² (H - 2h/3)``.
+    """
+    load_name = well.parent.load_name.lower()
+    for size, height in CONE_HEIGHTS.items():
+        if size in load_name:
+            return min(height, well.depth)
+    if not well.diameter or not well.max_volume:
+        return 0.0
+    area = math.pi * (well.diameter / 2) ** 2
+    return min(max(1.5 * (well.depth - well.max_volume / area), 0.0), well.depth)
+
+
+def conical_liquid_height(well, volume: float) -> float:
+    """
+    Height in mm above the bottom of the tube of *volume* µL in a cone-bottomed tube.
+
+    The liquid fills the cone first (height grows with the cube root of the
+    volume), then the cylinder above it. Rectangular wells, which have no
+    diameter, fall back to a height proportional to the volume.
+    """
+    volume = max(volume, 0.0)
+    if not well.diameter:
+        return well.depth * volume / well.max_volume if well.max_volume else 0.0
+    area = math.pi * (well.diameter / 2) ** 2
+    tip = cone_height(well)
+    cone_volume = area * tip / 3
+    if tip and volume <= cone_volume:
+        return (3 * volume * tip ** 2 / area) ** (1 / 3)
+    return min(tip + (volume - cone_volume) / area, well.depth)
+
+
 class SmartPipette:
     """
     Opentrons pipette wrapper that uses the API's liquid-tracking system to
@@ -171,9 +316,14 @@ class SmartPipette:
 
     For standard flat-bottom or round-bottom wells, ``SmartPipette`` behaves
     identically to the underlying pipette. For conical tubes (detected by labware
-    name or the ``use`` flag), it queries the current liquid volume via
-    ``well.current_liquid_volume()`` and converts that to a millimetre height,
-    keeping the tip above the meniscus and away from the narrow tip of the cone.
+    name or the ``use`` flag), it converts the current liquid volume to a
+    millimetre height with a cone-plus-cylinder model of the tube, keeping the tip
+    below the meniscus and away from the narrow tip of the cone.
+
+    Volumes are kept in a per-well ledger that is updated on every aspirate and
+    dispense made through ``liquid_transfer`` (and ``record``), and re-read from
+    ``well.current_liquid_volume()`` every ``reconcile_every`` operations on the
+    well, so long distributions do not query the API on every transfer.
 
     This prevents the pipette tip from plunging into an empty tube or aspirating
     air when a tube is nearly empty — a common failure mode in protocols that
@@ -181,7 +331,7 @@ class SmartPipette:
     during plating).
     """
 
-    def __init__(self, pipette, protocol):
+    def __init__(self, pipette, protocol, reconcile_every: int = 10, verbose: bool = False):
         """
         Initialize SmartPipette.
 
@@ -189,15 +339,24 @@ class SmartPipette:
             pipette: A loaded Opentrons pipette instrument object.
             protocol: The active ``ProtocolContext``. Must support
                 ``define_liquid`` (API level ≥ 2.14).
+            reconcile_every: Operations on a well after which its ledger volume
+                is re-read from the API.
+            verbose: If ``True``, comment every aspiration height calculation.
 
         Raises:
             RuntimeError: If the protocol context does not expose liquid
                 tracking (API level too old).
+            ValueError: If *reconcile_every* is less than 1.
         """
         self.pipette = pipette
         self.protocol = protocol
         if not hasattr(protocol, 'define_liquid'):
             raise RuntimeError("This class requires API with liquid tracking support")
+        if reconcile_every < 1:
+            raise ValueError(f"reconcile_every must be at least 1, got {reconcile_every}")
+        self.reconcile_every = reconcile_every
+        self.verbose = verbose
+        self._ledger = {}  # (labware id, well name) -> [volume in µL, operations since the last API read]
 
     def is_conical_tube(self, well, use: bool = False) -> bool:
         """Check if the well is from a conical tube labware or manually set as true"""
@@ -223,54 +382,66 @@ class SmartPipette:
             self.protocol.comment(f"ERROR reading height from {well.well_name}: {e}")
             return None
 
+    def tracked_volume(self, well) -> Optional[float]:
+        """
+        Volume in *well* from the ledger, re-read from the API when the well is
+        new or has had ``reconcile_every`` operations since the last read.
+        """
+        key = (id(well.parent), well.well_name)
+        entry = self._ledger.get(key)
+        if entry is None or entry[1] >= self.reconcile_every:
+            volume = self.get_well_volume(well)
+            if volume is None:
+                self._ledger.pop(key, None)
+                return None
+            entry = self._ledger[key] = [volume, 0]
+        return entry[0]
+
+    def record(self, well, delta: float):
+        """Add *delta* µL (negative when aspirating) to the ledger volume of *well*."""
+        entry = self._ledger.get((id(well.parent), well.well_name))
+        if entry is not None:
+            entry[0] = max(entry[0] + delta, 0.0)
+            entry[1] += 1
+
     def get_conical_tube_aspiration_height(self, well) -> float:
         """
-        Calculate safe aspiration height for conical tubes using proven method
-        Uses API liquid tracking to get current volume
+        Calculate safe aspiration height for conical tubes from the tracked volume
+        and the cone-plus-cylinder geometry of the tube.
         """
-        # Get current volume from API
-        try:
-            current_volume = well.current_liquid_volume()
-            if current_volume is None:
-                raise ValueError("API returned None for liquid volume")
-        except Exception as e:
-            self.protocol.comment(f"ERROR: Could not get liquid volume from API: {e}")
+        current_volume = self.tracked_volume(well)
+        if current_volume is None:
+            self.protocol.comment("ERROR: Could not get liquid volume from API")
             return 10.0  # Safe fallback height
 
-        max_volume = well.max_volume
-        tube_depth = well.depth - 10  # Account for threads
         min_safe_height = 3  # mm minimum to prevent tip damage
         meniscus_offset = 10  # mm below liquid surface
 
-        # Calculate liquid height based on current volume
-        liquid_height = (current_volume / max_volume) * tube_depth
+        liquid_height = conical_liquid_height(well, current_volume)
         aspiration_height = max(liquid_height - meniscus_offset, min_safe_height)
 
-        self.protocol.comment(
-            f"Conical calculation: {current_volume:.0f}µL remaining = {aspiration_height:.1f}mm height")
+        if self.verbose:
+            self.protocol.comment(
+                f"Conical calculation: {current_volume:.0f}µL remaining = {aspiration_height:.1f}mm height")
         return aspiration_height
 
     def get_aspiration_location(self, well, use: bool = False) -> float:
         """
-        Get intelligent aspiration location using API volume data and proven height calculation
+        Get intelligent aspiration location from the tracked volume and the tube geometry
         """
         if not self.is_conical_tube(well, use=use):
             return well
 
-        try:
-            current_volume = well.current_liquid_volume()
-            if current_volume is None or current_volume < well.max_volume * 0.2:
-                # Less than 20% remaining - use standard aspiration
+        current_volume = self.tracked_volume(well)
+        if current_volume is None or current_volume < well.max_volume * 0.2:
+            # Less than 20% remaining - use standard aspiration
+            if self.verbose:
                 self.protocol.comment("Low volume detected - using standard aspiration")
-                return well
-
-            # Use conical tube calculation
-            safe_height = self.get_conical_tube_aspiration_height(well)
-            return well.bottom(safe_height)
+            return well
 
-        except Exception as e:
-            self.protocol.comment(f"ERROR getting volume from API: {e}")
-            return well  # Fallback to standard aspiration
+        # Use conical tube calculation
+        safe_height = self.get_conical_tube_aspiration_height(well)
+        return well.bottom(safe_height)
 
     def liquid_transfer(self, volume: float, source, destination,
                  asp_rate: float = 0.5, disp_rate: float = 1.0,
@@ -278,31 +449,25 @@ class SmartPipette:
                  mix_before: float = 0.0, mix_after: float = 0.0,
                  mix_reps: int = 3, new_tip: bool = True, drop_tip: bool = True, use:bool = False) -> bool:
         """
-        Transfer liquid using pure API liquid tracking for volume management
+        Transfer liquid, checking the tracked source volume first
 
         Returns:
             bool: True if transfer was successful, False if insufficient volume
         """
-        # Check volume using API methods only
-        try:
-            current_volume = source.current_liquid_volume()
-            if current_volume is None:
-                self.protocol.comment("WARNING: API returned None for source volume")
-                return False
-
-            if current_volume < volume:
-                self.protocol.comment(f"WARNING: Insufficient volume. "
-                                      f"Requested: {volume}µL, Available: {current_volume:.0f}µL")
-                return False
+        current_volume = self.tracked_volume(source)
+        if current_volume is None:
+            self.protocol.comment("WARNING: API returned None for source volume")
+            return False
 
-        except Exception as e:
-            self.protocol.comment(f"ERROR: Could not check source volume: {e}")
+        if current_volume < volume:
+            self.protocol.comment(f"WARNING: Insufficient volume. "
+                                  f"Requested: {volume}µL, Available: {current_volume:.0f}µL")
             return False
 
         if new_tip:
             self.pipette.pick_up_tip()
 
-        # Get aspiration location using API data + proven calculation
+        # Get aspiration location from the tracked volume
         aspiration_location = self.get_aspiration_location(source,use)
 
         # Mix before if requested
@@ -316,9 +481,11 @@ class SmartPipette:
 
         # Aspirate
         self.pipette.aspirate(volume, aspiration_location, rate=asp_rate)
+        self.record(source, -volume)
 
         # Dispense
         self.pipette.dispense(volume, destination.center(), rate=disp_rate)
+        self.record(destination, volume)
 
         # Mix after if requested
         if mix_after > 0:
@@ -333,3 +500,64 @@ class SmartPipette:
         if drop_tip:
             self.pipette.drop_tip()
         return True
+
+    def distribute(self, volume: float, source, destinations: List,
+                   asp_rate: float = 0.5, disp_rate: float = 1.0,
+                   disposal_volume: Optional[float] = None, blow_out: bool = True,
+                   new_tip: bool = True, drop_tip: bool = True, use: bool = False) -> bool:
+        """
+        Distribute *volume* µL from *source* to every well of *destinations*,
+        aspirating as many doses as the pipette holds per trip.
+
+        The aspiration height is recomputed from the tracked source volume before
+        every aspiration, so the tip follows the meniscus down a conical tube.
+        ``disposal_volume`` is aspirated on top of the doses of each trip, so the
+        last dose is as accurate as the first, and blown out back into the source
+        at the end of the trip. As in the Opentrons ``distribute``, it defaults to
+        the pipette's minimum volume; with ``disposal_volume=0``, *blow_out* blows
+        out in the last well of the trip.
+
+        Returns:
+            bool: True if all wells were filled, False if the source ran out first
+
+        Raises:
+            ValueError: If *volume* plus *disposal_volume* exceeds the pipette capacity.
+        """
+        if disposal_volume is None:
+            disposal_volume = self.pipette.min_volume
+        capacity = self.pipette.max_volume - disposal_volume
+        if volume > capacity:
+            raise ValueError(f"Cannot distribute {volume}µL with a {disposal_volume}µL disposal volume: "
+                             f"the pipette holds {self.pipette.max_volume}µL")
+        per_trip = int(capacity // volume)
+
+        if new_tip:
+            self.pipette.pick_up_tip()
+
+        filled = True
+        for start in range(0, len(destinations), per_trip):
+            trip = destinations[start:start + per_trip]
+            trip_volume = volume * len(trip) + disposal_volume
+            current_volume = self.tracked_volume(source)
+            if current_volume is None or current_volume < trip_volume:
+                available = 'unknown' if current_volume is None else f"{current_volume:.0f}µL"
+                self.protocol.comment(f"WARNING: Insufficient volume. {len(destinations) - start} wells left "
+                                      f"unfilled. Requested: {trip_volume}µL, Available: {available}")
+                filled = False
+                break
+
+            self.pipette.aspirate(trip_volume, self.get_aspiration_location(source, use), rate=asp_rate)
+            self.record(source, -trip_volume)
+            for well in trip:
+                self.pipette.dispense(volume, well.center(), rate=disp_rate)
+                self.record(well, volume)
+
+            if disposal_volume > 0:
+                self.pipette.blow_out(source.top())
+                self.record(source, disposal_volume)
+            elif blow_out:
+                self.pipette.blow_out()
+
+        if drop_tip:
+            self.pipette.drop_tip()
+        return filled
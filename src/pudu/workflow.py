@@ -0,0 +1,256 @@
+"""
+Assembly -> transformation -> plating in one call
+=================================================
+
+The stages of a design iteration normally hand over through files: simulating
+the assembly protocol writes ``transformation_input.json``, simulating the
+transformation protocol writes ``plating_input.json``, and every simulation is
+a separate ``opentrons_simulate`` launch. ``Workflow`` plans the three stages in
+one process instead. Each stage is dry-run (see :mod:`pudu.dry_run`) and the
+location map it produces is passed to the next stage as a Python object,
+together with the partially used tip racks (see :mod:`pudu.tip_budget`). The
+three protocol files are then generated from exactly those inputs, next to a
+combined report (``workflow_report.json``).
+
+Example::
+
+    from pudu.workflow import Workflow
+
+    workflow = Workflow(assemblies, strains, transformation_params={'replicates': 1})
+    paths = workflow.write('run_1')
+
+or from the command line::
+
+    python -m pudu.workflow assembly_input.json strains.json -o run_1 \\
+        --transformation-params transformation_params.json
+
+``strains.json`` lists the transformations (``Strain``, ``Chassis`` and
+``Plasmids``), whose plasmids are assembly products.
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import sys
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from pudu.dry_run import dry_run
+from pudu.generate_protocol import build_protocol, detect_protocol_type, generate_protocol
+from pudu.reagent_planner import ReagentPlan
+from pudu.runtime import estimate_commands
+from pudu.tip_budget import updated_tip_state
+
+STAGES = ('assembly', 'transformation', 'plating')
+REPORT_FILE = 'workflow_report.json'
+
+
+@dataclass
+class WorkflowStage:
+    """
+    One planned stage of a ``Workflow``.
+
+    Attributes:
+        name: ``'assembly'``, ``'transformation'`` or ``'plating'``.
+        spec: Arguments of ``generate_protocol`` (and ``build_protocol``) for the stage.
+        protocol: The protocol class instance, after its dry run.
+        command_log: Commands recorded by the dry run.
+        outputs: Location map handed to the next stage: plasmid wells after
+            assembly, bacterium locations after transformation, the agar plate
+            map after plating.
+        tip_state: Partially used tip racks left on the robot after the stage.
+        reagents: Volume every source tube of the stage needs (see :mod:`pudu.reagent_planner`).
+    """
+    name: str
+    spec: Dict[str, Any]
+    protocol: Any
+    command_log: List[Dict]
+    outputs: Dict
+    tip_state: Dict = field(default_factory=dict)
+    reagents: Optional[ReagentPlan] = None
+
+    def summary(self) -> Dict:
+        """JSON-compatible summary of the stage for the combined report."""
+        return {
+            'stage': self.name,
+            'class': type(self.protocol).__name__,
+            'commands': len(self.command_log),
+            'estimated_minutes': round(estimate_commands(self.command_log).total_minutes, 1),
+            'tip_pickups': {budget.tiprack_labware: budget.tips_used for budget in _tip_budgets(self.protocol)},
+            'outputs': self.outputs,
+            'tip_state': self.tip_state,
+            'reagents': self.reagents.to_dict() if self.reagents is not None else None,
+        }
+
+
+def _tip_budgets(protocol_obj) -> List:
+    """Tip budgets of a planned protocol (one per pipette)."""
+    budgets = getattr(protocol_obj, 'tip_budgets', None)
+    if budgets is not None:
+        return list(budgets.values())
+    return [protocol_obj.tip_budget]
+
+
+class Workflow:
+    """
+    Plans assembly, transformation and plating in one process.
+
+    Attributes:
+        assembly_data: Assembly protocol data (list of assemblies, or a dict with ``'assemblies'``).
+        transformation_data: Transformation list (``Strain``, ``Chassis``, ``Plasmids``);
+            the plasmids are assembly products.
+        assembly_params: Advanced parameters of the assembly protocol.
+        transformation_params: Advanced parameters of the transformation protocol.
+        plating_params: Advanced parameters of the plating protocol.
+        assembly_subtype: ``'SBOL'``, ``'Manual'`` or ``'Domestication'``; auto-detected when ``None``.
+        metadata: Opentrons metadata merged into every protocol file.
+        tip_state: Partially used tip racks on the robot before the assembly.
+        chain_tip_racks: If ``True``, each stage continues the racks the previous
+            stage left partially used.
+        stages: Planned stages, filled by ``plan``.
+    """
+
+    def __init__(self, assembly_data, transformation_data: List[Dict],
+                 assembly_params: Optional[Dict] = None,
+                 transformation_params: Optional[Dict] = None,
+                 plating_params: Optional[Dict] = None,
+                 assembly_subtype: Optional[str] = None,
+                 metadata: Optional[Dict] = None,
+                 tip_state: Optional[Dict] = None,
+                 chain_tip_racks: bool = True):
+        self.assembly_data = assembly_data
+        self.transformation_data = transformation_data
+        self.assembly_params = assembly_params
+        self.transformation_params = transformation_params
+        self.plating_params = plating_params
+        self.assembly_subtype = assembly_subtype or detect_protocol_type(assembly_data)[1]
+        self.metadata = metadata
+        self.tip_state = tip_state
+        self.chain_tip_racks = chain_tip_racks
+        self.stages: List[WorkflowStage] = []
+
+    def _plan_stage(self, name: str, protocol_data, json_params: Optional[Dict], tip_state: Optional[Dict],
+                    **kwargs) -> WorkflowStage:
+        spec = dict(protocol_data=protocol_data, json_params=json_params, protocol_type=name,
+                    tip_state=tip_state if self.chain_tip_racks else None, **kwargs)
+        protocol_obj = build_protocol(**spec)
+        # The protocol classes print their location maps at the end of run()
+        with contextlib.redirect_stdout(io.StringIO()):
+            context = dry_run(protocol_obj, simulating=False)
+        stage = WorkflowStage(name=name, spec=spec, protocol=protocol_obj, command_log=context.command_log,
+                              outputs={}, reagents=ReagentPlan.from_context(context))
+        stage.tip_state = updated_tip_state(_tip_budgets(protocol_obj), tip_state, type(protocol_obj).__name__)
+        return stage
+
+    def plan(self) -> List[WorkflowStage]:
+        """
+        Dry-run the three stages, passing each stage's outputs to the next.
+
+        Raises:
+            ValueError: If a stage rejects its inputs, e.g. a transformation
+                plasmid that is not an assembly product.
+        """
+        assembly = self._plan_stage('assembly', self.assembly_data, self.assembly_params, self.tip_state,
+                                    assembly_subtype=self.assembly_subtype)
+        assembly.outputs = {uri: list(wells) for uri, wells in assembly.protocol.product_uri_to_wells.items()}
+
+        transformation = self._plan_stage('transformation', self.transformation_data, self.transformation_params,
+                                          assembly.tip_state, plasmid_locations=assembly.outputs)
+        transformation.outputs = transformation.protocol.get_plating_input()
+
+        plating = self._plan_stage('plating', transformation.outputs, self.plating_params,
+                                   transformation.tip_state)
+        plating.outputs = plating.protocol.get_plates_json()
+
+        self.stages = [assembly, transformation, plating]
+        return self.stages
+
+    def report(self) -> Dict:
+        """Combined report of the planned stages, planning them first if needed."""
+        if not self.stages:
+            self.plan()
+        summaries = [stage.summary() for stage in self.stages]
+        return {
+            'stages': summaries,
+            'estimated_minutes': round(sum(summary['estimated_minutes'] for summary in summaries), 1),
+            'tip_state': self.stages[-1].tip_state,
+        }
+
+    def write(self, output_dir='.') -> List[Path]:
+        """
+        Write ``<stage>_protocol.py`` for every stage and the combined report.
+
+        Returns:
+            Paths of the three protocol files followed by the report.
+        """
+        report = self.report()
+        output_dir = Path(output_dir)
+        output_dir.mkdir(parents=True, exist_ok=True)
+
+        paths = []
+        for stage, summary in zip(self.stages, report['stages']):
+            path = output_dir / f'{stage.name}_protocol.py'
+            path.write_text(generate_protocol(metadata=self.metadata, **stage.spec))
+            summary['protocol_file'] = path.name
+            paths.append(path)
+
+        report_path = output_dir / REPORT_FILE
+        with open(report_path, 'w') as f:
+            json.dump(report, f, indent=2)
+        paths.append(report_path)
+        return paths
+
+
+def _load_json(path: Optional[Path]):
+    if path is None:
+        return None
+    with open(path) as f:
+        return json.load(f)
+
+
+def main(argv: Optional[List[str]] = None):
+    """Entry point for ``python -m pudu.workflow``."""
+    parser = argparse.ArgumentParser(
+        description='Plan assembly, transformation and plating in one process and generate all three protocols'
+    )
+    parser.add_argument('assembly_input', type=Path, help='Assembly protocol data JSON file')
+    parser.add_argument('transformation_input', type=Path,
+                        help='Transformation list JSON file (strains whose plasmids are assembly products)')
+    parser.add_argument('-o', '--output-dir', type=Path, required=True,
+                        help='Directory for the protocol files and the combined report')
+    parser.add_argument('--assembly-type', choices=['SBOL', 'Manual', 'Domestication'], default=None,
+                        help='Assembly subtype (default: auto-detect)')
+    parser.add_argument('--assembly-params', type=Path, default=None,
+                        help='Advanced parameters JSON file for the assembly protocol')
+    parser.add_argument('--transformation-params', type=Path, default=None,
+                        help='Advanced parameters JSON file for the transformation protocol')
+    parser.add_argument('--plating-params', type=Path, default=None,
+                        help='Advanced parameters JSON file for the plating protocol')
+    parser.add_argument('--metadata', type=Path, default=None,
+                        help='Metadata JSON file applied to every protocol')
+    parser.add_argument('--tip-state', type=Path, default=None,
+                        help='Tip state JSON file of the racks on the robot before the assembly')
+    args = parser.parse_args(argv)
+
+    try:
+        workflow = Workflow(_load_json(args.assembly_input), _load_json(args.transformation_input),
+                            assembly_params=_load_json(args.assembly_params),
+                            transformation_params=_load_json(args.transformation_params),
+                            plating_params=_load_json(args.plating_params),
+                            assembly_subtype=args.assembly_type,
+                            metadata=_load_json(args.metadata),
+                            tip_state=_load_json(args.tip_state))
+        paths = workflow.write(args.output_dir)
+    except (OSError, ValueError) as e:
+        print(f"Error: {e}", file=sys.stderr)
+        sys.exit(1)
+
+    for path in paths:
+        print(f"✓ Wrote {path}")
+    print(f"  Estimated robot time: {workflow.report()['estimated_minutes']} min")
+
+
+if __name__ == '__main__':
+    main()
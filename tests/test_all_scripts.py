@@ -1,30 +1,32 @@
 import pathlib
 import subprocess
+import tempfile
 import unittest
 
+from pudu.simulate_batch import find_protocols, simulate_files
+
 AUTOMATED_SCRIPTS_DIR = pathlib.Path("scripts/automated_ot2")
 LIBRE_SCRIPTS_DIR = pathlib.Path("scripts/libre")
 MANUAL_SCRIPTS_DIR = pathlib.Path("scripts/manual")
+# Files the scripts read relative to the repository root
+SCRIPT_INPUTS = [pathlib.Path("scripts/output.json")]
 
 
 class TestAllScripts(unittest.TestCase):
     def test_all_scripts_with_simulator(self):
         for scripts_dir in (AUTOMATED_SCRIPTS_DIR, LIBRE_SCRIPTS_DIR):
             self.assertTrue(scripts_dir.exists(), f"Scripts dir not found: {scripts_dir}")
-            script_files = sorted(scripts_dir.glob("*.py"), key=lambda p: p.name.lower())
-
-            for script_path in script_files:
-                with self.subTest(script=str(script_path)):
-                    print(f"\n=== Simulating: {script_path} ===")
-                    result = subprocess.run(
-                        ["opentrons_simulate", str(script_path)],
-                        capture_output=True,
-                        text=True,
-                    )
+
+        with tempfile.TemporaryDirectory() as report_dir:
+            # Each script runs in its own working directory with a copy of the inputs it reads
+            reports = simulate_files(find_protocols([AUTOMATED_SCRIPTS_DIR, LIBRE_SCRIPTS_DIR]), report_dir,
+                                     inputs=SCRIPT_INPUTS)
+            for report in reports:
+                with self.subTest(script=report.protocol):
                     self.assertEqual(
-                        result.returncode,
+                        report.returncode,
                         0,
-                        msg=f"Simulation failed for {script_path}:\n{result.stderr}",
+                        msg=f"Simulation failed for {report.protocol}:\n{report.stderr}",
                     )
 
 
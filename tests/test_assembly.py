@@ -0,0 +1,317 @@
+"""
+Unit tests for the automated Loop Assembly protocols (pudu.assembly).
+
+Tests are split into:
+  - TestReagentFirst : one tip per common reagent source instead of one per transfer
+  - TestMasterMix    : per-enzyme master mix prepared on the temperature module
+  - TestCombinations : lazy combination counting and windowed selection
+  - TestPartRounds   : part tube swaps when an SBOL library exceeds the temperature module
+"""
+
+import contextlib
+import io
+import unittest
+
+from pudu.dry_run import dry_run
+from pudu.assembly import (BaseAssembly, SBOLLoopAssembly, Domestication, ManualLoopAssembly,
+                           DEFAULT_DOMESTICATION_ASSEMBLY, DEFAULT_MANUAL_ASSEMBLIES)
+
+
+# ---------------------------------------------------------------------------
+# Shared fixtures
+# ---------------------------------------------------------------------------
+
+ASSEMBLIES = [
+    {
+        "Product": "https://SBOL2Build.org/composite_1/1",
+        "Backbone": "https://sbolcanvas.org/pSB1C3/1",
+        "PartsList": [
+            "https://sbolcanvas.org/J23101/1",
+            "https://sbolcanvas.org/GFP/1",
+        ],
+        "Restriction Enzyme": "https://SBOL2Build.org/BsaI/1",
+    },
+    {
+        "Product": "https://SBOL2Build.org/composite_2/1",
+        "Backbone": "https://sbolcanvas.org/pOdd1/1",
+        "PartsList": [
+            "https://sbolcanvas.org/composite_1/1",
+        ],
+        "Restriction Enzyme": "https://SBOL2Build.org/SapI/1",
+    },
+]
+
+
+def run_assembly(assembly):
+    """Run an assembly against DryRunContext and return its command log."""
+    with contextlib.redirect_stdout(io.StringIO()):
+        return dry_run(assembly, simulating=False).command_log
+
+
+def count_commands(command_log, command):
+    return sum(1 for record in command_log if record['command'] == command)
+
+
+# ---------------------------------------------------------------------------
+# 1. Reagent-first dispensing
+# ---------------------------------------------------------------------------
+
+class TestReagentFirst(unittest.TestCase):
+
+    def test_tip_count_matches_prediction(self):
+        protocols = [
+            lambda **kwargs: SBOLLoopAssembly(assemblies=ASSEMBLIES, replicates=3, **kwargs),
+            lambda **kwargs: Domestication(DEFAULT_DOMESTICATION_ASSEMBLY, replicates=2, **kwargs),
+            lambda **kwargs: ManualLoopAssembly(DEFAULT_MANUAL_ASSEMBLIES, replicates=2, **kwargs),
+        ]
+        for make_protocol in protocols:
+            for reagent_first in (False, True):
+                assembly = make_protocol(output_xlsx=False, reagent_first=reagent_first)
+                with self.subTest(protocol=type(assembly).__name__, reagent_first=reagent_first):
+                    command_log = run_assembly(assembly)
+                    self.assertEqual(count_commands(command_log, 'pick_up_tip'),
+                                     assembly._calculate_total_tips_needed())
+
+    def test_common_reagents_use_one_tip_per_source(self):
+        assembly = SBOLLoopAssembly(assemblies=ASSEMBLIES, replicates=3, output_xlsx=False,
+                                    reagent_first=True)
+        command_log = run_assembly(assembly)
+        # water, buffer, ligase, BsaI and SapI, then 3 parts × 3 + 2 parts × 3
+        self.assertEqual(count_commands(command_log, 'pick_up_tip'), 5 + 15)
+
+    def test_reactions_receive_the_same_volumes(self):
+        volumes = {}
+        for reagent_first in (False, True):
+            assembly = SBOLLoopAssembly(assemblies=ASSEMBLIES, replicates=2, output_xlsx=False,
+                                        reagent_first=reagent_first)
+            command_log = run_assembly(assembly)
+            dispensed = {}
+            for record in command_log:
+                if record['command'] == 'dispense' and record['params']['volume'] != 20:
+                    well = record['params']['location']['well']
+                    dispensed[well] = dispensed.get(well, 0) + record['params']['volume']
+            volumes[reagent_first] = dispensed
+        self.assertEqual(volumes[False], volumes[True])
+        self.assertEqual(set(volumes[True].values()), {20})
+
+    def test_reagent_first_keeps_well_tracking(self):
+        default = SBOLLoopAssembly(assemblies=ASSEMBLIES, output_xlsx=False)
+        reagent_first = SBOLLoopAssembly(assemblies=ASSEMBLIES, output_xlsx=False, reagent_first=True)
+        run_assembly(default)
+        run_assembly(reagent_first)
+        self.assertEqual(default.dict_of_parts_in_thermocycler, reagent_first.dict_of_parts_in_thermocycler)
+        self.assertEqual(default.product_uri_to_wells, reagent_first.product_uri_to_wells)
+
+
+# ---------------------------------------------------------------------------
+# 2. Master mix
+# ---------------------------------------------------------------------------
+
+class TestMasterMix(unittest.TestCase):
+
+    def test_tip_count_matches_prediction(self):
+        protocols = [
+            lambda: SBOLLoopAssembly(assemblies=ASSEMBLIES, replicates=3, output_xlsx=False, master_mix=True),
+            lambda: Domestication(DEFAULT_DOMESTICATION_ASSEMBLY, replicates=2, output_xlsx=False, master_mix=True),
+            lambda: ManualLoopAssembly(DEFAULT_MANUAL_ASSEMBLIES, replicates=2, output_xlsx=False, master_mix=True),
+        ]
+        for make_protocol in protocols:
+            assembly = make_protocol()
+            with self.subTest(protocol=type(assembly).__name__):
+                command_log = run_assembly(assembly)
+                self.assertEqual(count_commands(command_log, 'pick_up_tip'),
+                                 assembly._calculate_total_tips_needed())
+
+    def test_one_distribute_per_enzyme(self):
+        assembly = SBOLLoopAssembly(assemblies=ASSEMBLIES, replicates=3, output_xlsx=False, master_mix=True)
+        command_log = run_assembly(assembly)
+        distributes = [record for record in command_log if record['command'] == 'distribute']
+        self.assertEqual(len(distributes), 2)
+        for record in distributes:
+            self.assertEqual(len(record['params']['dest']), 3)
+
+    def test_master_mix_tubes_recorded(self):
+        assembly = SBOLLoopAssembly(assemblies=ASSEMBLIES, output_xlsx=False, master_mix=True)
+        run_assembly(assembly)
+        positions = assembly.dict_of_parts_in_temp_mod_position
+        self.assertIn('Master Mix BsaI', positions)
+        self.assertIn('Master Mix SapI', positions)
+        self.assertEqual(len(set(positions.values())), len(positions))
+
+    def test_recipe_includes_overage_and_dead_volume(self):
+        assembly = SBOLLoopAssembly(assemblies=ASSEMBLIES, output_xlsx=False, master_mix=True,
+                                    master_mix_overage=0.1, master_mix_dead_volume=16)
+        recipe = assembly._master_mix_recipe(number_of_reactions=10, water_volume=8)
+        # 16µL per reaction × (10 × 1.1) + 16µL dead volume = 192µL
+        self.assertAlmostEqual(sum(recipe.values()), 192)
+        self.assertAlmostEqual(recipe['ligase'], 48)
+
+    def test_mix_larger_than_tube_raises(self):
+        assembly = SBOLLoopAssembly(assemblies=ASSEMBLIES, replicates=3, output_xlsx=False, master_mix=True,
+                                    master_mix_dead_volume=2000)
+        with self.assertRaises(ValueError):
+            run_assembly(assembly)
+
+    def test_master_mix_counts_towards_block_capacity(self):
+        parts = [f"part{i}" for i in range(19)]
+        assembly_data = [{"parts": parts, "backbone": "acceptor", "restriction_enzyme": "BsaI"}]
+        Domestication(assembly_data, output_xlsx=False).process_assemblies()
+        with self.assertRaises(ValueError):
+            Domestication(assembly_data, output_xlsx=False, master_mix=True).process_assemblies()
+
+    def test_uniform_water_goes_into_the_mix(self):
+        assembly = SBOLLoopAssembly(assemblies=ASSEMBLIES, output_xlsx=False, master_mix=True)
+        command_log = run_assembly(assembly)
+        distributed = sorted(record['params']['volume'] for record in command_log
+                             if record['command'] == 'distribute')
+        # Reagents (8µL) plus water: 6µL for the 3-part BsaI reaction, 8µL for the 2-part SapI one
+        self.assertEqual(distributed, [14, 16])
+
+
+# ---------------------------------------------------------------------------
+# 3. Combinatorial libraries
+# ---------------------------------------------------------------------------
+
+# Ten roles with ten variants each: 10**10 theoretical combinations
+LARGE_LIBRARY = [dict({f'role_{r}': [f'part_{r}_{v}' for v in range(10)] for r in range(10)},
+                      receiver='Odd_1')]
+
+MIXED_LIBRARY = [
+    {'promoter': ['J23101', 'J23106'], 'cds': ['GFP', 'RFP'], 'receiver': 'Odd_1'},
+    {'promoter': ['J23101'], 'cds': ['GFP', 'RFP', 'BFP'], 'receiver': 'Even_1'},
+]
+
+
+class TestCombinations(unittest.TestCase):
+
+    def test_large_library_is_counted_not_generated(self):
+        assembly = ManualLoopAssembly(LARGE_LIBRARY, output_xlsx=False,
+                                      volume_total_reaction=40, volume_part=1, max_combinations=4)
+        assembly.process_assemblies()
+        self.assertEqual(assembly.total_combinations, 10 ** 10)
+        self.assertEqual(assembly._selected_combination_count(), 4)
+
+    def test_large_library_without_window_raises(self):
+        assembly = ManualLoopAssembly(LARGE_LIBRARY, output_xlsx=False,
+                                      volume_total_reaction=40, volume_part=1)
+        with self.assertRaises(ValueError):
+            assembly.process_assemblies()
+
+    def test_combinations_follow_product_order(self):
+        assembly = ManualLoopAssembly(LARGE_LIBRARY, output_xlsx=False,
+                                      volume_total_reaction=40, volume_part=1,
+                                      combination_offset=12345678, max_combinations=2)
+        assembly.process_assemblies()
+        combinations = list(assembly._iter_combinations(assembly.odd_slices))
+        self.assertEqual(combinations[0], tuple(f'part_{r}_{d}' for r, d in enumerate('0012345678')) + ('Odd_1',))
+        self.assertEqual(combinations[1][-2], 'part_9_9')
+
+    def test_only_selected_parts_are_loaded(self):
+        assembly = ManualLoopAssembly(LARGE_LIBRARY, output_xlsx=False,
+                                      volume_total_reaction=40, volume_part=1, max_combinations=3)
+        assembly.process_assemblies()
+        self.assertEqual(len(assembly.parts_set), 13)
+
+    def test_window_spans_odd_and_even_libraries(self):
+        assembly = ManualLoopAssembly(MIXED_LIBRARY, output_xlsx=False,
+                                      combination_offset=3, max_combinations=3)
+        assembly.process_assemblies()
+        self.assertTrue(assembly.has_odd)
+        self.assertTrue(assembly.has_even)
+        self.assertEqual(list(assembly._iter_combinations(assembly.odd_slices)), [('J23106', 'RFP', 'Odd_1')])
+        self.assertEqual(list(assembly._iter_combinations(assembly.even_slices)),
+                         [('J23101', 'GFP', 'Even_1'), ('J23101', 'RFP', 'Even_1')])
+
+    def test_window_skipping_a_library_drops_its_enzyme(self):
+        assembly = ManualLoopAssembly(MIXED_LIBRARY, output_xlsx=False, combination_offset=4)
+        run_assembly(assembly)
+        self.assertFalse(assembly.has_odd)
+        self.assertNotIn('Restriction Enzyme BSAI', assembly.dict_of_parts_in_temp_mod_position)
+        self.assertEqual(len(assembly.dict_of_parts_in_thermocycler), 3)
+
+    def test_tip_count_matches_run(self):
+        assembly = ManualLoopAssembly(MIXED_LIBRARY, output_xlsx=False, replicates=2)
+        command_log = run_assembly(assembly)
+        self.assertEqual(count_commands(command_log, 'pick_up_tip'), assembly._calculate_total_tips_needed())
+
+    def test_offset_past_end_raises(self):
+        assembly = ManualLoopAssembly(MIXED_LIBRARY, output_xlsx=False, combination_offset=7)
+        with self.assertRaises(ValueError):
+            assembly.process_assemblies()
+
+
+# ---------------------------------------------------------------------------
+# 4. Part rounds
+# ---------------------------------------------------------------------------
+
+# Every construct brings a new promoter; 24 positions minus 4 reagents, the
+# backbone and 7 CDSs leave room for 12 promoters per round
+UNIQUE_PROMOTER_LIBRARY = [
+    {
+        "Product": f"https://SBOL2Build.org/composite_{i}/1",
+        "Backbone": "https://sbolcanvas.org/pSB1C3/1",
+        "PartsList": [f"https://sbolcanvas.org/promoter_{i}/1", f"https://sbolcanvas.org/cds_{i % 7}/1"],
+        "Restriction Enzyme": "https://SBOL2Build.org/BsaI/1",
+    }
+    for i in range(30)
+]
+
+
+class TestPartRounds(unittest.TestCase):
+
+    def pauses(self, command_log):
+        return [r['params']['msg'] for r in command_log if r['command'] == 'pause']
+
+    def test_library_split_into_rounds(self):
+        assembly = SBOLLoopAssembly(UNIQUE_PROMOTER_LIBRARY, output_xlsx=False, allow_part_swaps=True)
+        command_log = run_assembly(assembly)
+        self.assertEqual([len(indices) for indices in assembly.part_rounds], [12, 12, 6])
+        self.assertEqual(len(self.pauses(command_log)), 2)
+        self.assertEqual(len(assembly.dict_of_parts_in_thermocycler), 30)
+
+    def test_every_reaction_gets_its_own_parts(self):
+        assembly = SBOLLoopAssembly(UNIQUE_PROMOTER_LIBRARY, output_xlsx=False, allow_part_swaps=True)
+        run_assembly(assembly)
+        for round_index, indices in enumerate(assembly.part_rounds):
+            contents = set(assembly.block_contents[round_index].values())
+            for index in indices:
+                self.assertTrue(set(assembly.assembly_combinations[index]['parts']) <= contents)
+
+    def test_swaps_keep_shared_tubes_in_place(self):
+        assembly = SBOLLoopAssembly(UNIQUE_PROMOTER_LIBRARY, output_xlsx=False, allow_part_swaps=True)
+        command_log = run_assembly(assembly)
+        second_round = self.pauses(command_log)[0]
+        self.assertNotIn('pSB1C3', second_round)
+        self.assertNotIn('cds_', second_round)
+        self.assertIn('remove promoter_0 from', second_round)
+
+    def test_new_tubes_fill_empty_positions_first(self):
+        contents = BaseAssembly._plan_block_contents([['a', 'b'], ['b', 'c'], ['c', 'd']],
+                                                     first_slot=4, number_of_slots=3)
+        self.assertEqual(contents, [{4: 'a', 5: 'b'}, {4: 'a', 5: 'b', 6: 'c'}, {4: 'd', 5: 'b', 6: 'c'}])
+
+    def test_oversized_library_without_swaps_raises(self):
+        assembly = SBOLLoopAssembly(UNIQUE_PROMOTER_LIBRARY, output_xlsx=False)
+        with self.assertRaises(ValueError):
+            assembly.process_assemblies()
+
+    def test_single_round_unchanged(self):
+        baseline = run_assembly(SBOLLoopAssembly(ASSEMBLIES, output_xlsx=False))
+        swapping = run_assembly(SBOLLoopAssembly(ASSEMBLIES, output_xlsx=False, allow_part_swaps=True))
+        self.assertEqual(baseline, swapping)
+        self.assertEqual(self.pauses(swapping), [])
+
+    def test_part_swaps_rejected_by_other_assemblies(self):
+        with self.assertRaises(ValueError):
+            Domestication(DEFAULT_DOMESTICATION_ASSEMBLY, output_xlsx=False, allow_part_swaps=True)
+        with self.assertRaises(ValueError):
+            ManualLoopAssembly(DEFAULT_MANUAL_ASSEMBLIES, json_params={'allow_part_swaps': True})
+
+    def test_tip_count_matches_run(self):
+        assembly = SBOLLoopAssembly(UNIQUE_PROMOTER_LIBRARY, output_xlsx=False, allow_part_swaps=True)
+        command_log = run_assembly(assembly)
+        self.assertEqual(count_commands(command_log, 'pick_up_tip'), assembly._calculate_total_tips_needed())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,119 @@
+"""
+Unit tests for splitting assembly libraries into plate runs (pudu.batching).
+
+Tests are split into:
+  - TestPlanBatches     : plate capacity, temperature module capacity, tip continuation
+  - TestWriteBatches    : generated protocol files and combined transformation input
+"""
+
+import json
+import tempfile
+import unittest
+from pathlib import Path
+
+from pudu.batching import plan_assembly_batches, write_assembly_batches, combined_transformation_input
+
+
+# ---------------------------------------------------------------------------
+# Shared fixtures
+# ---------------------------------------------------------------------------
+
+def sbol_library(number_of_constructs, number_of_promoters=5):
+    """SBOL assemblies sharing a backbone, with a few promoters and CDSs."""
+    return [
+        {
+            "Product": f"https://SBOL2Build.org/composite_{i}/1",
+            "Backbone": "https://sbolcanvas.org/pSB1C3/1",
+            "PartsList": [
+                f"https://sbolcanvas.org/promoter_{i % number_of_promoters}/1",
+                f"https://sbolcanvas.org/cds_{i % 7}/1",
+            ],
+            "Restriction Enzyme": "https://SBOL2Build.org/BsaI/1",
+        }
+        for i in range(number_of_constructs)
+    ]
+
+
+SHARED_PARAMS = {'output_xlsx': False}
+
+
+# ---------------------------------------------------------------------------
+# 1. Planning
+# ---------------------------------------------------------------------------
+
+class TestPlanBatches(unittest.TestCase):
+
+    def test_library_split_into_full_plates(self):
+        batches = plan_assembly_batches(sbol_library(200), 'SBOL', SHARED_PARAMS)
+        self.assertEqual([len(batch.assemblies) for batch in batches], [96, 96, 8])
+        self.assertEqual([batch.params['protocol_name'] for batch in batches],
+                         ['assembly_plate_1', 'assembly_plate_2', 'assembly_plate_3'])
+
+    def test_starting_well_applies_to_first_plate_only(self):
+        params = dict(SHARED_PARAMS, thermocycler_starting_well=90, replicates=2)
+        batches = plan_assembly_batches(sbol_library(60), 'SBOL', params)
+        self.assertEqual([len(batch.assemblies) for batch in batches], [3, 48, 9])
+        self.assertEqual(batches[0].params['thermocycler_starting_well'], 90)
+        self.assertEqual(batches[1].params['thermocycler_starting_well'], 0)
+        self.assertEqual(batches[1].product_uri_to_wells['https://SBOL2Build.org/composite_3/1'],
+                         ['A1', 'B1'])
+
+    def test_temperature_module_capacity_starts_new_plate(self):
+        # Every construct brings a new promoter; 24 positions minus 4 reagents,
+        # the backbone and 7 CDSs leave room for 12 promoters
+        batches = plan_assembly_batches(sbol_library(30, number_of_promoters=30), 'SBOL', SHARED_PARAMS)
+        self.assertEqual([len(batch.assemblies) for batch in batches], [12, 12, 6])
+
+    def test_tips_continue_across_plates(self):
+        params = dict(SHARED_PARAMS, initial_tip='A2')
+        batches = plan_assembly_batches(sbol_library(100), 'SBOL', params)
+        self.assertEqual(batches[0].params['initial_tip'], 'A2')
+        next_tip = (8 + batches[0].tips_used) % 96
+        expected = f"{'ABCDEFGH'[next_tip % 8]}{next_tip // 8 + 1}" if next_tip else None
+        self.assertEqual(batches[1].params['initial_tip'], expected)
+
+    def test_domestication_parts_split(self):
+        domestication = [{'parts': [f'part_{i}' for i in range(30)], 'backbone': 'pUPD2',
+                          'restriction_enzyme': 'BsmbI'}]
+        params = dict(SHARED_PARAMS, replicates=4)
+        batches = plan_assembly_batches(domestication, 'Domestication', params)
+        self.assertEqual([len(batch.assemblies[0]['parts']) for batch in batches], [19, 11])
+        self.assertEqual(batches[1].assemblies[0]['backbone'], 'pUPD2')
+
+    def test_manual_assemblies_rejected(self):
+        with self.assertRaises(ValueError):
+            plan_assembly_batches([{'promoter': 'J23101', 'receiver': 'Odd_1'}], 'Manual')
+
+    def test_assembly_that_never_fits_raises(self):
+        too_many_parts = [dict(sbol_library(1)[0], PartsList=[
+            f"https://sbolcanvas.org/part_{i}/1" for i in range(25)])]
+        with self.assertRaises(ValueError):
+            plan_assembly_batches(too_many_parts, 'SBOL', SHARED_PARAMS)
+
+
+# ---------------------------------------------------------------------------
+# 2. Output files
+# ---------------------------------------------------------------------------
+
+class TestWriteBatches(unittest.TestCase):
+
+    def test_protocols_and_combined_input_written(self):
+        batches = plan_assembly_batches(sbol_library(100), 'SBOL', SHARED_PARAMS)
+        with tempfile.TemporaryDirectory() as output_dir:
+            paths = write_assembly_batches(batches, output_dir, metadata={'protocolName': 'Library'})
+            self.assertEqual([path.name for path in paths],
+                             ['assembly_plate_1.py', 'assembly_plate_2.py', 'transformation_input.json'])
+            code = Path(paths[1]).read_text()
+            self.assertIn("'protocol_name': 'assembly_plate_2'", code)
+            self.assertIn("Library (plate 2)", code)
+            with open(paths[-1]) as f:
+                combined = json.load(f)
+        self.assertEqual(combined, combined_transformation_input(batches))
+        self.assertEqual(combined['plate_2'], {'https://SBOL2Build.org/composite_96/1': ['A1'],
+                                               'https://SBOL2Build.org/composite_97/1': ['B1'],
+                                               'https://SBOL2Build.org/composite_98/1': ['C1'],
+                                               'https://SBOL2Build.org/composite_99/1': ['D1']})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,145 @@
+"""
+Unit tests for the benchmark suite (pudu.benchmark).
+
+Tests are split into:
+  - TestScalingInputs   : generated inputs have the requested number of reactions
+  - TestRunBenchmarks   : result records and their JSON form
+  - TestCompareResults  : regression detection between two result sets
+"""
+
+import json
+import os
+import tempfile
+import unittest
+
+from pudu.benchmark import (run_benchmarks, compare_results, measure_run, sbol_input, manual_input,
+                            plating_input, _protocol_cases)
+
+
+# ---------------------------------------------------------------------------
+# Shared fixtures
+# ---------------------------------------------------------------------------
+
+class FailingProtocol:
+    def run(self, protocol):
+        raise ValueError("volume out of range")
+
+
+class OversizedProtocol:
+    def run(self, protocol):
+        self._validate_protocol()
+
+    def _validate_protocol(self):
+        raise ValueError("Too many reactions. Use fewer")
+
+
+def results_with(**values):
+    """A result set holding one run record with the given metrics."""
+    record = {'benchmark': 'run', 'name': 'SBOLLoopAssembly', 'reactions': 24, 'backend': 'dry_run'}
+    record.update(values)
+    return {'meta': {}, 'results': [record]}
+
+
+# ---------------------------------------------------------------------------
+# 1. Inputs
+# ---------------------------------------------------------------------------
+
+class TestScalingInputs(unittest.TestCase):
+
+    def test_sizes(self):
+        self.assertEqual(len(sbol_input(24)), 24)
+        self.assertEqual(len({assembly['Product'] for assembly in sbol_input(24)}), 24)
+        self.assertEqual(len(plating_input(96)['bacterium_locations']), 96)
+
+    def test_manual_library_has_enough_combinations(self):
+        library = manual_input(96)[0]
+        combinations = 1
+        for role in ('promoter', 'rbs', 'cds'):
+            combinations *= len(library[role])
+        self.assertGreaterEqual(combinations, 96)
+
+
+# ---------------------------------------------------------------------------
+# 2. Measurements
+# ---------------------------------------------------------------------------
+
+class TestRunBenchmarks(unittest.TestCase):
+
+    def test_records_are_json_serialisable(self):
+        results = run_benchmarks(sizes=[1], import_repeats=1, run_repeats=1, generate_count=2,
+                                 protocols=['SBOLLoopAssembly'])
+        json.dumps(results)
+        kinds = {record['benchmark'] for record in results['results']}
+        self.assertEqual(kinds, {'import', 'run', 'generate'})
+
+        run = next(record for record in results['results'] if record['benchmark'] == 'run')
+        self.assertGreater(run['seconds'], 0)
+        self.assertGreater(run['peak_memory_bytes'], 0)
+        self.assertGreater(run['commands'], 0)
+        self.assertEqual(results['meta']['sizes'], [1])
+
+    def test_oversized_input_is_skipped(self):
+        record = measure_run('SBOLLoopAssembly', _protocol_cases()['SBOLLoopAssembly'], 384, repeats=1)
+        self.assertIn('96', record['skipped'])
+        self.assertNotIn('seconds', record)
+
+    def test_value_error_during_run_is_an_error(self):
+        record = measure_run('Failing', lambda reactions: FailingProtocol(), 1, repeats=1)
+        self.assertEqual(record['error'], 'ValueError: volume out of range')
+        self.assertNotIn('skipped', record)
+
+    def test_validation_in_run_is_skipped(self):
+        record = measure_run('Oversized', lambda reactions: OversizedProtocol(), 1, repeats=1)
+        self.assertEqual(record['skipped'], 'Too many reactions')
+        self.assertNotIn('error', record)
+
+    def test_opentrons_run_writes_no_files(self):
+        cwd = os.getcwd()
+        with tempfile.TemporaryDirectory() as tmp:
+            os.chdir(tmp)
+            try:
+                record = measure_run('Plating', _protocol_cases()['Plating'], 1, repeats=1)
+            finally:
+                os.chdir(cwd)
+            self.assertEqual(os.listdir(tmp), [])
+        self.assertEqual(record['backend'], 'opentrons')
+        self.assertGreater(record['commands'], 0)
+
+    def test_calibration_and_sample_preparation_cases(self):
+        cases = _protocol_cases()
+        for name in ('GFPODCalibration', 'RGBODCalibration', 'PlateSamples', 'PlateWithGradient'):
+            with self.subTest(protocol=name):
+                record = measure_run(name, cases[name], 1, backend='dry_run', repeats=1)
+                self.assertGreater(record['commands'], 0)
+
+    def test_fixed_layout_only_runs_at_one_reaction(self):
+        record = measure_run('GFPODCalibration', _protocol_cases()['GFPODCalibration'], 24, repeats=1)
+        self.assertEqual(record['skipped'], 'Fixed plate layout, benchmarked at 1 reaction only')
+
+    def test_unknown_protocol_raises(self):
+        with self.assertRaises(ValueError):
+            run_benchmarks(sizes=[1], import_repeats=1, protocols=['NotAProtocol'])
+
+
+# ---------------------------------------------------------------------------
+# 3. Comparison
+# ---------------------------------------------------------------------------
+
+class TestCompareResults(unittest.TestCase):
+
+    def test_slowdown_beyond_threshold_reported(self):
+        regressions = compare_results(results_with(seconds=1.0), results_with(seconds=1.5), threshold=0.2)
+        self.assertEqual([(r['metric'], r['change']) for r in regressions], [('seconds', 0.5)])
+
+    def test_small_change_and_speedup_ignored(self):
+        self.assertEqual(compare_results(results_with(seconds=1.0), results_with(seconds=1.1)), [])
+        self.assertEqual(compare_results(results_with(seconds=1.0), results_with(seconds=0.5)), [])
+
+    def test_lower_throughput_is_a_regression(self):
+        regressions = compare_results(results_with(protocols_per_second=100),
+                                      results_with(protocols_per_second=50))
+        self.assertEqual(regressions[0]['metric'], 'protocols_per_second')
+
+
+if __name__ == '__main__':
+    unittest.main()
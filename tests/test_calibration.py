@@ -0,0 +1,81 @@
+"""
+Unit tests for the calibration protocols (pudu.calibration).
+
+Tests are split into:
+  - TestCalibrationBuffers  : PBS/water fills of the GFP and RGB calibrations
+"""
+
+import collections
+import contextlib
+import io
+import unittest
+
+from pudu.dry_run import dry_run
+from pudu.calibration import GFPODCalibration, RGBODCalibration
+
+
+# ---------------------------------------------------------------------------
+# Shared fixtures
+# ---------------------------------------------------------------------------
+
+def buffer_volumes(protocol_obj):
+    """
+    Run *protocol_obj* against DryRunContext and return the buffer volume
+    dispensed into each plate well, the number of buffer aspirations and the
+    insufficient-volume warnings.
+    """
+    with contextlib.redirect_stdout(io.StringIO()):
+        context = dry_run(protocol_obj, simulating=False)
+    buffer_tubes = {(well.parent.load_name, well.well_name)
+                    for key in ('pbs_sources', 'water_sources')
+                    for well in protocol_obj.buffer_positions[key]}
+
+    volumes = collections.Counter()
+    aspirations = 0
+    from_buffer = False
+    for record in context.command_log:
+        location = record['params'].get('location') or {}
+        if record['command'] == 'aspirate':
+            from_buffer = (location.get('labware'), location.get('well')) in buffer_tubes
+            aspirations += from_buffer
+        elif record['command'] == 'dispense' and from_buffer:
+            volumes[location['well']] += record['params']['volume']
+
+    warnings = [record['params']['msg'] for record in context.command_log
+                if record['command'] == 'comment' and 'Insufficient volume' in record['params']['msg']]
+    return volumes, aspirations, warnings
+
+
+# ---------------------------------------------------------------------------
+# 1. Buffers
+# ---------------------------------------------------------------------------
+
+class TestCalibrationBuffers(unittest.TestCase):
+
+    def test_rgb_fills_every_buffer_well_to_200ul(self):
+        volumes, aspirations, warnings = buffer_volumes(RGBODCalibration())
+        self.assertEqual(warnings, [])
+        # 88 buffer wells, 100 µL from each of the two fills
+        self.assertEqual(len(volumes), 88)
+        self.assertEqual(set(volumes.values()), {200})
+        # Two doses plus the 20 µL disposal per p300 trip: 6 trips per 11-well range,
+        # 8 ranges per fill, two fills
+        self.assertEqual(aspirations, 2 * 8 * 6)
+
+    def test_gfp_fills_every_buffer_well(self):
+        volumes, aspirations, warnings = buffer_volumes(GFPODCalibration())
+        self.assertEqual(warnings, [])
+        self.assertEqual(len(volumes), 44)
+        self.assertEqual(set(volumes.values()), {100})
+        self.assertEqual(aspirations, 4 * 6)
+
+    def test_rgb_falcon_buffers_fill_every_well(self):
+        volumes, aspirations, warnings = buffer_volumes(RGBODCalibration(use_falcon_tubes=True))
+        self.assertEqual(warnings, [])
+        self.assertEqual(len(volumes), 88)
+        self.assertEqual(set(volumes.values()), {200})
+        self.assertEqual(aspirations, 2 * 8 * 6)
+
+
+if __name__ == '__main__':
+    unittest.main()
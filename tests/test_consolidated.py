@@ -0,0 +1,145 @@
+"""
+Unit tests for the consolidated assembly, transformation and plating run (pudu.consolidated).
+
+Tests are split into:
+  - TestSharedDeck                    : modules, labware and slots shared between stages
+  - TestAssemblyTransformationPlating : the three stages in one run
+"""
+
+import contextlib
+import io
+import os
+import tempfile
+import unittest
+
+from pudu.assembly import DEFAULT_SBOL_ASSEMBLIES
+from pudu.consolidated import AssemblyTransformationPlating, SharedDeck
+from pudu.dry_run import OFF_DECK, DryRunContext, dry_run
+
+
+# ---------------------------------------------------------------------------
+# Shared fixtures
+# ---------------------------------------------------------------------------
+
+STRAINS = [
+    {'Strain': 'https://SBOL2Build.org/strain_1/1',
+     'Chassis': 'https://sbolcanvas.org/DH5alpha/1',
+     'Plasmids': ['https://SBOL2Build.org/composite_1/1']}
+]
+
+
+def consolidated(**kwargs):
+    return AssemblyTransformationPlating(DEFAULT_SBOL_ASSEMBLIES, STRAINS,
+                                         assembly_params={'output_xlsx': False}, **kwargs)
+
+
+def run_quietly(protocol_obj, simulating=False):
+    with contextlib.redirect_stdout(io.StringIO()):
+        return dry_run(protocol_obj, simulating=simulating)
+
+
+@contextlib.contextmanager
+def in_temporary_directory():
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory() as tmpdir:
+        os.chdir(tmpdir)
+        try:
+            yield tmpdir
+        finally:
+            os.chdir(cwd)
+
+
+# ---------------------------------------------------------------------------
+# 1. Shared deck
+# ---------------------------------------------------------------------------
+
+class TestSharedDeck(unittest.TestCase):
+
+    def setUp(self):
+        self.context = DryRunContext(simulating=False)
+        self.deck = SharedDeck(self.context)
+        self.deck.begin_stage('first')
+
+    def test_modules_and_their_labware_are_reused(self):
+        thermocycler = self.deck.load_module('thermocycler module')
+        plate = thermocycler.load_labware('nest_96_wellplate_100ul_pcr_full_skirt')
+        self.deck.begin_stage('second')
+        again = self.deck.load_module('thermocyclerModuleV1')
+        self.assertIs(again.load_labware('nest_96_wellplate_100ul_pcr_full_skirt'), plate)
+        self.assertIs(self.deck.module_labware('thermocycler'), plate)
+        with self.assertRaises(ValueError):
+            again.load_labware('biorad_96_wellplate_200ul_pcr')
+
+    def test_same_labware_is_reused_and_other_labware_moved_off_deck(self):
+        rack = self.deck.load_labware('opentrons_96_tiprack_20ul', '9')
+        tubes = self.deck.load_labware('opentrons_24_tuberack_eppendorf_1.5ml_safelock_snapcap', '3')
+        self.deck.begin_stage('second')
+        self.assertIs(self.deck.load_labware('opentrons_96_tiprack_20ul', '9'), rack)
+        self.deck.load_labware('opentrons_15_tuberack_falcon_15ml_conical', '3')
+        self.assertEqual(tubes.parent, OFF_DECK)
+        self.assertEqual(self.deck.layout['second'], {'9': 'opentrons_96_tiprack_20ul',
+                                                      '3': 'opentrons_15_tuberack_falcon_15ml_conical'})
+
+    def test_slot_used_twice_in_a_stage_raises(self):
+        self.deck.load_labware('opentrons_96_tiprack_20ul', '9')
+        with self.assertRaises(ValueError):
+            self.deck.load_labware('opentrons_15_tuberack_falcon_15ml_conical', '9')
+
+    def test_later_stage_replaces_pipette_on_the_same_mount(self):
+        self.deck.load_instrument('p20_single_gen2', 'left')
+        self.deck.begin_stage('second')
+        self.deck.load_instrument('p20_single_gen2', 'left')
+
+
+# ---------------------------------------------------------------------------
+# 2. Consolidated run
+# ---------------------------------------------------------------------------
+
+class TestAssemblyTransformationPlating(unittest.TestCase):
+
+    def test_stages_share_the_thermocycler_plate(self):
+        run = consolidated()
+        context = run_quietly(run)
+        self.assertEqual(run.transformation.thermocycler_starting_well, 1)
+        self.assertEqual(run.transformation.get_plating_input()['bacterium_locations'],
+                         run.plating.bacterium_locations)
+        self.assertEqual(len([record for record in context.command_log if record['command'] == 'pause']), 2)
+
+    def test_tip_racks_continue_between_stages(self):
+        run = consolidated()
+        run_quietly(run)
+        self.assertEqual(run.transformation.tiprack_p20_position, '9')
+        self.assertIsNotNone(run.transformation.tip_budgets['p20'].initial_tip)
+        self.assertEqual(run.plating.small_tiprack_position, '9')
+
+    def test_deck_layout_is_reported(self):
+        layout = consolidated().validate_deck()
+        self.assertEqual(list(layout), ['assembly', 'transformation', 'plating'])
+        for stage in layout.values():
+            self.assertIn('7', stage)
+
+    def test_transformation_overlapping_assembly_wells_raises(self):
+        with self.assertRaises(ValueError):
+            run_quietly(consolidated(transformation_params={'thermocycler_starting_well': 0}))
+
+    def test_labware_moved_off_deck_between_stages(self):
+        run = consolidated(plating_params={'tube_rack_position': '3'})
+        self.assertEqual(run.validate_deck()['plating']['3'], 'opentrons_15_tuberack_falcon_15ml_conical')
+        context = run_quietly(run)
+        moves = [record for record in context.command_log if record['command'] == 'move_labware']
+        self.assertEqual(len(moves), 1)
+        self.assertEqual(moves[0]['stage'], 'Stage 3/3: Plating')
+
+    def test_simulation_writes_no_stage_files(self):
+        with in_temporary_directory() as tmpdir:
+            run_quietly(consolidated(), simulating=True)
+            self.assertEqual(os.listdir(tmpdir), [])
+
+    def test_deck_conflict_raises_before_running(self):
+        run = consolidated(transformation_params={'tube_rack_position': '9'})
+        with self.assertRaises(ValueError):
+            run.validate_deck()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,220 @@
+"""
+Unit tests for the recording ProtocolContext stand-in (pudu.dry_run).
+
+Tests are split into:
+  - TestDryRunDeck          : labware/module loading and deck conflicts
+  - TestDryRunPipette       : tip and liquid tracking
+  - TestDryRunProtocols     : run() of every protocol class against DryRunContext
+"""
+
+import contextlib
+import io
+import unittest
+
+from opentrons import protocol_api
+
+from pudu.dry_run import OFF_DECK, DryRunContext, dry_run
+from pudu.runtime import record_commands
+from pudu.assembly import (SBOLLoopAssembly, Domestication, ManualLoopAssembly,
+                           DEFAULT_DOMESTICATION_ASSEMBLY, DEFAULT_MANUAL_ASSEMBLIES)
+from pudu.transformation import HeatShockTransformation
+from pudu.plating import Plating
+from pudu.calibration import GFPODCalibration, RGBODCalibration
+from pudu.sample_preparation import PlateSamples, PlateWithGradient
+
+
+# ---------------------------------------------------------------------------
+# Shared fixtures
+# ---------------------------------------------------------------------------
+
+ASSEMBLIES = [
+    {
+        "Product": "https://SBOL2Build.org/composite_1/1",
+        "Backbone": "https://sbolcanvas.org/pSB1C3/1",
+        "PartsList": [
+            "https://sbolcanvas.org/J23101/1",
+            "https://sbolcanvas.org/GFP/1",
+        ],
+        "Restriction Enzyme": "https://SBOL2Build.org/BsaI/1",
+    }
+]
+
+TRANSFORMATION_DATA = [
+    {
+        'Strain': 'https://SBOL2Build.org/strain_1/1',
+        'Chassis': 'https://sbolcanvas.org/DH5alpha/1',
+        'Plasmids': ['https://SBOL2Build.org/composite_1/1']
+    }
+]
+
+BACTERIUM_LOCATIONS = {'A1': ['composite_1'], 'B1': ['composite_2']}
+
+
+def quiet_dry_run(protocol_obj, **kwargs):
+    """Run a protocol against DryRunContext without printing its summary."""
+    with contextlib.redirect_stdout(io.StringIO()):
+        return dry_run(protocol_obj, **kwargs)
+
+
+# ---------------------------------------------------------------------------
+# 1. Deck
+# ---------------------------------------------------------------------------
+
+class TestDryRunDeck(unittest.TestCase):
+
+    def test_labware_uses_opentrons_definition(self):
+        context = DryRunContext()
+        rack = context.load_labware('opentrons_24_aluminumblock_nest_1.5ml_snapcap', '1')
+        self.assertEqual(len(rack.wells()), 24)
+        self.assertEqual(rack.wells()[1].well_name, 'B1')
+        self.assertEqual(rack['A1'].max_volume, 1500)
+
+    def test_unknown_labware_falls_back_to_grid(self):
+        context = DryRunContext()
+        plate = context.load_labware('custom_384_wellplate_50ul', '2')
+        self.assertEqual(len(plate.wells()), 384)
+        self.assertEqual(len(plate.rows()), 16)
+
+    def test_slot_conflict_raises(self):
+        context = DryRunContext()
+        context.load_module('thermocycler module')
+        with self.assertRaises(ValueError):
+            context.load_labware('opentrons_96_tiprack_20ul', '8')
+
+    def test_commands_are_recorded_as_plain_data(self):
+        context = DryRunContext()
+        context.load_labware('opentrons_96_tiprack_20ul', '2')
+        record = context.command_log[0]
+        self.assertEqual(record['command'], 'load_labware')
+        self.assertEqual(record['params']['load_name'], 'opentrons_96_tiprack_20ul')
+        self.assertEqual(record['params']['location'], '2')
+
+    def test_off_deck_load_and_move(self):
+        context = DryRunContext()
+        spare = context.load_labware('opentrons_96_tiprack_20ul', protocol_api.OFF_DECK)
+        self.assertEqual(spare.parent, OFF_DECK)
+        self.assertEqual(context.off_deck, [spare])
+        rack = context.load_labware('opentrons_96_tiprack_20ul', '9')
+        context.move_labware(labware=rack, new_location=protocol_api.OFF_DECK)
+        context.move_labware(labware=spare, new_location='9')
+        self.assertIs(context.deck['9'], spare)
+        self.assertEqual(context.off_deck, [rack])
+        self.assertEqual(rack.parent, OFF_DECK)
+
+    def test_tips_of_an_off_deck_rack_cannot_be_picked_up(self):
+        context = DryRunContext()
+        rack = context.load_labware('opentrons_96_tiprack_20ul', protocol_api.OFF_DECK)
+        pipette = context.load_instrument('p20_single_gen2', 'left', tip_racks=[rack])
+        with self.assertRaises(RuntimeError):
+            pipette.pick_up_tip(rack['A1'])
+
+
+# ---------------------------------------------------------------------------
+# 2. Pipette
+# ---------------------------------------------------------------------------
+
+class TestDryRunPipette(unittest.TestCase):
+
+    def setUp(self):
+        self.context = DryRunContext()
+        self.rack = self.context.load_labware('opentrons_96_tiprack_20ul', '2')
+        self.tubes = self.context.load_labware('opentrons_24_tuberack_nest_1.5ml_snapcap', '1')
+        self.pipette = self.context.load_instrument('p20_single_gen2', 'left', tip_racks=[self.rack])
+
+    def test_liquid_tracking(self):
+        liquid = self.context.define_liquid('water')
+        source, dest = self.tubes.wells()[:2]
+        source.load_liquid(liquid, 100)
+        dest.load_empty()
+        self.pipette.pick_up_tip()
+        self.pipette.aspirate(15, source)
+        self.pipette.dispense(15, dest)
+        self.assertEqual(source.current_liquid_volume(), 85)
+        self.assertEqual(dest.current_liquid_volume(), 15)
+
+    def test_unloaded_well_volume_raises(self):
+        with self.assertRaises(RuntimeError):
+            self.tubes.wells()[0].current_liquid_volume()
+
+    def test_starting_tip_and_running_out_of_tips(self):
+        self.pipette.starting_tip = self.rack['H12']
+        self.pipette.pick_up_tip()
+        self.pipette.drop_tip()
+        with self.assertRaises(RuntimeError):
+            self.pipette.pick_up_tip()
+
+    def test_aspirate_requires_tip_and_capacity(self):
+        with self.assertRaises(RuntimeError):
+            self.pipette.aspirate(5, self.tubes.wells()[0])
+        self.pipette.pick_up_tip()
+        with self.assertRaises(ValueError):
+            self.pipette.aspirate(25, self.tubes.wells()[0])
+
+    def test_distribute_is_recorded_once(self):
+        destinations = self.tubes.wells()[1:5]
+        self.pipette.distribute(4, self.tubes.wells()[0], destinations)
+        commands = [record['command'] for record in self.context.command_log]
+        self.assertEqual(commands.count('distribute'), 1)
+        self.assertNotIn('aspirate', commands)
+        self.assertFalse(self.rack['A1'].has_tip)
+
+    def test_single_nozzle_uses_up_a_column(self):
+        rack = self.context.load_labware('opentrons_96_tiprack_300ul', '3')
+        multi = self.context.load_instrument('p300_multi_gen2', 'right', tip_racks=[rack])
+        multi.configure_nozzle_layout(style=protocol_api.SINGLE, start='A1', tip_racks=[rack])
+        multi.pick_up_tip(rack['A1'])
+        with self.assertRaises(RuntimeError):
+            multi.configure_nozzle_layout(style=protocol_api.ALL)
+        multi.drop_tip()
+        self.assertFalse(rack['A1'].has_tip)
+        self.assertTrue(rack['B1'].has_tip)
+        multi.configure_nozzle_layout(style=protocol_api.ALL)
+        multi.pick_up_tip()
+        # Column 1 is no longer complete, so all 8 nozzles move on to column 2
+        self.assertTrue(rack['H1'].has_tip)
+        self.assertFalse(any(rack[f'{row}2'].has_tip for row in 'ABCDEFGH'))
+
+
+# ---------------------------------------------------------------------------
+# 3. Protocol classes
+# ---------------------------------------------------------------------------
+
+class TestDryRunProtocols(unittest.TestCase):
+
+    def test_every_protocol_class_runs(self):
+        protocols = [
+            SBOLLoopAssembly(assemblies=ASSEMBLIES, output_xlsx=False),
+            Domestication(DEFAULT_DOMESTICATION_ASSEMBLY, output_xlsx=False),
+            ManualLoopAssembly(DEFAULT_MANUAL_ASSEMBLIES, output_xlsx=False),
+            HeatShockTransformation(transformation_data=TRANSFORMATION_DATA,
+                                    plasmid_locations={'https://SBOL2Build.org/composite_1/1': ['A1']}),
+            Plating(bacterium_locations=BACTERIUM_LOCATIONS),
+            GFPODCalibration(),
+            RGBODCalibration(),
+            PlateSamples(samples=['sample_1', 'sample_2']),
+            PlateWithGradient(sample_name='sample', inducer_name='inducer'),
+        ]
+        for protocol_obj in protocols:
+            with self.subTest(protocol=type(protocol_obj).__name__):
+                context = quiet_dry_run(protocol_obj, simulating=False)
+                commands = [record['command'] for record in context.command_log]
+                self.assertIn('load_instrument', commands)
+                self.assertTrue({'aspirate', 'distribute', 'transfer'} & set(commands))
+
+    def test_assembly_command_stream_matches_opentrons_simulation(self):
+        with contextlib.redirect_stdout(io.StringIO()):
+            simulated = record_commands(SBOLLoopAssembly(assemblies=ASSEMBLIES, output_xlsx=False),
+                                        simulating=False)
+        context = quiet_dry_run(SBOLLoopAssembly(assemblies=ASSEMBLIES, output_xlsx=False),
+                                simulating=False)
+        self.assertEqual([(r['command'], r['stage']) for r in simulated],
+                         [(r['command'], r['stage']) for r in context.command_log])
+
+    def test_protocol_state_is_populated(self):
+        assembly = SBOLLoopAssembly(assemblies=ASSEMBLIES, output_xlsx=False)
+        quiet_dry_run(assembly, simulating=False)
+        self.assertEqual(assembly.product_uri_to_wells, {'https://SBOL2Build.org/composite_1/1': ['A1']})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,156 @@
+"""
+Unit tests for batch protocol generation (pudu.generate_batch).
+
+Tests are split into:
+  - TestLoadJobs       : directory and manifest inputs
+  - TestGenerateBatch  : generated files, per-input errors and the process pool
+"""
+
+import json
+import tempfile
+import unittest
+from pathlib import Path
+
+from pudu.generate_batch import BatchJob, load_jobs, generate_batch, main
+from pudu.generate_protocol import generate_protocol, generate_param_reference
+from pudu.assembly import DEFAULT_MANUAL_ASSEMBLIES
+
+
+# ---------------------------------------------------------------------------
+# Shared fixtures
+# ---------------------------------------------------------------------------
+
+SBOL_ASSEMBLY = [{
+    "Product": "https://SBOL2Build.org/composite_1/1",
+    "Backbone": "https://sbolcanvas.org/pSB1C3/1",
+    "PartsList": ["https://sbolcanvas.org/J23101/1", "https://sbolcanvas.org/GFP/1"],
+    "Restriction Enzyme": "https://SBOL2Build.org/BsaI/1",
+}]
+TRANSFORMATION = [{'Strain': 'https://SBOL2Build.org/strain_1/1',
+                   'Chassis': 'https://sbolcanvas.org/DH5alpha/1',
+                   'Plasmids': ['https://SBOL2Build.org/plasmid_1/1']}]
+PLATING = {'bacterium_locations': {'strain_1': ['A1']}}
+
+
+class BatchTestCase(unittest.TestCase):
+
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.root = Path(tmp.name)
+        self.inputs = self.root / 'inputs'
+        self.inputs.mkdir()
+        self.output_dir = self.root / 'protocols'
+
+    def write(self, name, data, directory=None):
+        path = (directory or self.inputs) / name
+        path.write_text(json.dumps(data))
+        return path
+
+
+# ---------------------------------------------------------------------------
+# 1. Job lists
+# ---------------------------------------------------------------------------
+
+class TestLoadJobs(BatchTestCase):
+
+    def test_directory_inputs_sorted_and_shared_files_skipped(self):
+        self.write('b_assembly.json', SBOL_ASSEMBLY)
+        self.write('a_plating.json', PLATING)
+        params = self.write('params.json', {'replicates': 3})
+        jobs = load_jobs(self.inputs, json_params=str(params))
+        self.assertEqual([Path(job.input).name for job in jobs], ['a_plating.json', 'b_assembly.json'])
+        self.assertTrue(all(job.json_params == str(params) for job in jobs))
+
+    def test_manifest_paths_relative_to_manifest(self):
+        manifest = self.write('manifest.json', [
+            {'input': 'assembly.json', 'output': 'custom.py', 'json_params': 'params.json'},
+        ], directory=self.root)
+        jobs = load_jobs(manifest, json_params='shared.json')
+        self.assertEqual(jobs[0].input, str(self.root / 'assembly.json'))
+        self.assertEqual(jobs[0].json_params, str(self.root / 'params.json'))
+        self.assertEqual(jobs[0].output, 'custom.py')
+
+    def test_manifest_unknown_key_raises(self):
+        manifest = self.write('manifest.json', [{'input': 'a.json', 'replicates': 2}], directory=self.root)
+        with self.assertRaises(ValueError):
+            load_jobs(manifest)
+
+
+# ---------------------------------------------------------------------------
+# 2. Generation
+# ---------------------------------------------------------------------------
+
+class TestGenerateBatch(BatchTestCase):
+
+    def test_matches_single_file_generation(self):
+        params = {'replicates': 3}
+        self.write('assembly.json', SBOL_ASSEMBLY)
+        self.write('params.json', params, directory=self.root)
+        jobs = load_jobs(self.inputs, json_params=str(self.root / 'params.json'))
+        results = generate_batch(jobs, self.output_dir, workers=1)
+        self.assertIsNone(results[0].error)
+        self.assertEqual((results[0].protocol_type, results[0].assembly_type), ('assembly', 'SBOL'))
+        expected = generate_protocol(SBOL_ASSEMBLY, json_params=params, protocol_type='assembly',
+                                     assembly_subtype='SBOL')
+        self.assertEqual((self.output_dir / 'assembly.py').read_text(), expected)
+
+    def test_parameter_reference_built_once(self):
+        generate_param_reference.cache_clear()
+        jobs = [BatchJob(input=str(self.write(f'manual_{i}.json', DEFAULT_MANUAL_ASSEMBLIES))) for i in range(3)]
+        generate_batch(jobs, self.output_dir, workers=1)
+        info = generate_param_reference.cache_info()
+        self.assertEqual(info.currsize, 5)  # every protocol class, built during warm-up
+        self.assertGreaterEqual(info.hits, 3)
+
+    def test_failing_input_does_not_stop_batch(self):
+        self.write('a_broken.json', {'unknown': True})
+        self.write('b_transformation.json', TRANSFORMATION)
+        results = generate_batch(load_jobs(self.inputs), self.output_dir, workers=1)
+        self.assertIn('ValueError', results[0].error)
+        self.assertIsNone(results[1].error)
+        self.assertTrue((self.output_dir / 'b_transformation.py').exists())
+
+    def test_process_pool_output_matches_in_process(self):
+        for i in range(4):
+            self.write(f'plating_{i}.json', PLATING)
+            self.write(f'transformation_{i}.json', TRANSFORMATION)
+        jobs = load_jobs(self.inputs)
+        serial = generate_batch(jobs, self.root / 'serial', workers=1)
+        pooled = generate_batch(jobs, self.output_dir, workers=2)
+        self.assertEqual([r.input for r in serial], [r.input for r in pooled])
+        for result in serial:
+            name = Path(result.output).name
+            self.assertEqual(Path(result.output).read_text(), (self.output_dir / name).read_text())
+
+    def test_reused_input_gets_one_file_per_params(self):
+        self.write('assembly.json', SBOL_ASSEMBLY, directory=self.root)
+        self.write('two_reps.json', {'replicates': 2}, directory=self.root)
+        self.write('three_reps.json', {'replicates': 3}, directory=self.root)
+        manifest = self.write('manifest.json', [
+            {'input': 'assembly.json', 'json_params': 'two_reps.json'},
+            {'input': 'assembly.json', 'json_params': 'three_reps.json'},
+            {'input': 'assembly.json'},
+        ], directory=self.root)
+        results = generate_batch(load_jobs(manifest), self.output_dir, workers=1)
+        self.assertEqual([Path(result.output).name for result in results],
+                         ['assembly_two_reps.py', 'assembly_three_reps.py', 'assembly_3.py'])
+        self.assertNotEqual((self.output_dir / 'assembly_two_reps.py').read_text(),
+                            (self.output_dir / 'assembly_three_reps.py').read_text())
+
+    def test_duplicate_explicit_output_raises(self):
+        jobs = [BatchJob(input=str(self.write(f'plating_{i}.json', PLATING)), output='plating.py')
+                for i in range(2)]
+        with self.assertRaises(ValueError):
+            generate_batch(jobs, self.output_dir, workers=1)
+        self.assertFalse(self.output_dir.exists())
+
+    def test_cli_exit_status_on_failure(self):
+        self.write('broken.json', {'unknown': True})
+        with self.assertRaises(SystemExit) as raised:
+            main([str(self.inputs), '-o', str(self.output_dir), '--workers', '1'])
+        self.assertEqual(raised.exception.code, 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
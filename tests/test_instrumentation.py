@@ -0,0 +1,125 @@
+"""
+Unit tests for per-step command timing (pudu.instrumentation).
+
+Tests are split into:
+  - TestCommandProfiler : timed events for pipette, module and labware commands
+  - TestProfileRun      : whole protocol runs written to a JSONL file
+"""
+
+import contextlib
+import io
+import json
+import tempfile
+import unittest
+from pathlib import Path
+
+from pudu.assembly import SBOLLoopAssembly, DEFAULT_SBOL_ASSEMBLIES
+from pudu.dry_run import DryRunContext
+from pudu.generate_protocol import generate_protocol
+from pudu.instrumentation import CommandProfiler, profile_run
+
+
+# ---------------------------------------------------------------------------
+# Shared fixtures
+# ---------------------------------------------------------------------------
+
+def events_by_command(profiler, command):
+    return [event for event in profiler.events if event['command'] == command]
+
+
+# ---------------------------------------------------------------------------
+# 1. Profiler
+# ---------------------------------------------------------------------------
+
+class TestCommandProfiler(unittest.TestCase):
+
+    def setUp(self):
+        self.sink = io.StringIO()
+        self.profiler = CommandProfiler(sink=self.sink)
+        self.protocol = self.profiler.wrap(DryRunContext(simulating=True))
+        tiprack = self.protocol.load_labware('opentrons_96_tiprack_20ul', '4')
+        self.tubes = self.protocol.load_labware('opentrons_24_tuberack_eppendorf_1.5ml_safelock_snapcap', '1')
+        self.pipette = self.protocol.load_instrument('p20_single_gen2', 'left', tip_racks=[tiprack])
+
+    def test_pipetting_events_have_wells_volume_and_tip(self):
+        self.pipette.pick_up_tip()
+        self.pipette.aspirate(5, self.tubes['A1'])
+        self.pipette.dispense(5, self.tubes['B1'])
+
+        pickup, = events_by_command(self.profiler, 'pick_up_tip')
+        self.assertEqual(pickup['tip']['well'], 'A1')
+        aspirate, = events_by_command(self.profiler, 'aspirate')
+        self.assertEqual((aspirate['volume'], aspirate['source']['well']), (5, 'A1'))
+        dispense, = events_by_command(self.profiler, 'dispense')
+        self.assertEqual(dispense['dest']['well'], 'B1')
+        for event in self.profiler.events:
+            self.assertGreaterEqual(event['seconds'], 0)
+            self.assertIn('T', event['time'])
+
+    def test_modules_and_labware_moves_are_recorded(self):
+        module = self.protocol.load_module('temperature module', '3')
+        module.set_temperature(4)
+        self.protocol.move_labware(self.tubes, '2')
+        self.assertEqual(len(events_by_command(self.profiler, 'set_temperature')), 1)
+        move, = events_by_command(self.profiler, 'move_labware')
+        self.assertEqual(move['params']['new_location'], '2')
+
+    def test_events_are_streamed_as_json_lines(self):
+        lines = self.sink.getvalue().splitlines()
+        self.assertEqual(len(lines), len(self.profiler.events))
+        self.assertEqual(json.loads(lines[-1])['command'], 'load_instrument')
+
+    def test_step_seconds(self):
+        self.profiler.events = [{'step': 'a', 'seconds': 1.0}, {'step': 'b', 'seconds': 3.0},
+                                {'step': 'a', 'seconds': 1.5}]
+        self.assertEqual(list(self.profiler.step_seconds().items()), [('b', 3.0), ('a', 2.5)])
+        self.assertIn('b: 3.0 s', self.profiler.summary())
+
+
+# ---------------------------------------------------------------------------
+# 2. Whole runs
+# ---------------------------------------------------------------------------
+
+class TestProfileRun(unittest.TestCase):
+
+    def test_assembly_steps_are_timed(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            sink = Path(tmp) / 'events.jsonl'
+            context = DryRunContext(simulating=False)
+            with contextlib.redirect_stdout(io.StringIO()):
+                profiler = profile_run(SBOLLoopAssembly(DEFAULT_SBOL_ASSEMBLIES, output_xlsx=False), context,
+                                       sink=sink)
+            lines = sink.read_text().splitlines()
+
+        self.assertEqual(len(lines), len(profiler.events))
+        steps = {json.loads(line)['step'] for line in lines}
+        self.assertIn('process assembly combinations', steps)
+        self.assertIn('Measured', context.command_log[-1]['params']['msg'])
+
+    def test_unwritable_sink_does_not_stop_the_run(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            sink = Path(tmp) / 'missing' / 'events.jsonl'
+            context = DryRunContext(simulating=False)
+            with contextlib.redirect_stdout(io.StringIO()), self.assertLogs('pudu.instrumentation', 'WARNING'):
+                profiler = profile_run(SBOLLoopAssembly(DEFAULT_SBOL_ASSEMBLIES, output_xlsx=False), context,
+                                       sink=sink)
+
+        self.assertIsInstance(profiler.sink_error, OSError)
+        self.assertGreater(len(profiler.events), 0)
+        messages = [record['params']['msg'] for record in context.command_log if record['command'] == 'comment']
+        self.assertTrue(any(message.startswith('Could not write protocol events') for message in messages))
+
+    def test_generated_protocol_can_profile(self):
+        code = generate_protocol(DEFAULT_SBOL_ASSEMBLIES, assembly_subtype='SBOL', profile=True)
+        self.assertIn('from pudu.instrumentation import profile_run', code)
+        self.assertIn('profile_run(protocol_instance, protocol)', code)
+        self.assertNotIn('profile_run', generate_protocol(DEFAULT_SBOL_ASSEMBLIES, assembly_subtype='SBOL'))
+
+    def test_generated_protocol_writes_to_the_given_sink(self):
+        code = generate_protocol(DEFAULT_SBOL_ASSEMBLIES, assembly_subtype='SBOL', profile=True,
+                                 profile_sink='/data/protocol_events.jsonl')
+        self.assertIn("profile_run(protocol_instance, protocol, sink='/data/protocol_events.jsonl')", code)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,118 @@
+"""
+Unit tests for lazy loading of the protocol classes (pudu/__init__.py).
+
+Each check runs in a fresh interpreter where ``opentrons`` and ``xlsxwriter``
+cannot be imported, so a stray top-level import fails the test.
+
+Tests are split into:
+  - TestWithoutOpentrons : CLI helpers and manual Markdown generators
+  - TestLazyAttributes   : package attributes resolve to the submodule objects
+"""
+
+import subprocess
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+import pudu
+
+
+# ---------------------------------------------------------------------------
+# Shared fixtures
+# ---------------------------------------------------------------------------
+
+BLOCK_ROBOT_PACKAGES = """
+import sys
+sys.modules['opentrons'] = None
+sys.modules['xlsxwriter'] = None
+"""
+
+MANUAL_DIR = Path(__file__).resolve().parent.parent / 'scripts' / 'manual'
+
+
+def run_without_robot_packages(code: str) -> subprocess.CompletedProcess:
+    """Run *code* in a new interpreter that cannot import opentrons or xlsxwriter."""
+    return subprocess.run([sys.executable, '-c', BLOCK_ROBOT_PACKAGES + code],
+                          capture_output=True, text=True)
+
+
+# ---------------------------------------------------------------------------
+# 1. No opentrons
+# ---------------------------------------------------------------------------
+
+class TestWithoutOpentrons(unittest.TestCase):
+
+    def assertRuns(self, code):
+        result = run_without_robot_packages(code)
+        self.assertEqual(result.returncode, 0, msg=result.stderr)
+        return result.stdout
+
+    def test_import_pudu_loads_no_protocol_modules(self):
+        stdout = self.assertRuns(
+            "import pudu\n"
+            "from pudu.generate_protocol import detect_protocol_type\n"
+            "print(detect_protocol_type({'bacterium_locations': {}})[0])\n"
+            "print('pudu.assembly' in sys.modules)\n"
+        )
+        self.assertEqual(stdout.split(), ['plating', 'False'])
+
+    def test_manual_markdown_generators(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            code = f"""
+import json
+from pudu import ManualAssembly, ManualTransformation, ManualPlating
+manual_dir = {str(MANUAL_DIR)!r}
+tmp = {tmp!r}
+
+assembly = ManualAssembly(assemblies=json.load(open(manual_dir + '/manual_assembly_input.json')))
+assembly.process_assemblies()
+assembly.write_markdown(tmp + '/assembly.md')
+
+transformation = ManualTransformation(
+    transformation_data=json.load(open(manual_dir + '/manual_transformation_input.json')))
+transformation.process_transformations()
+transformation.write_markdown(tmp + '/transformation.md')
+
+plating = ManualPlating(plating_data=json.load(open(manual_dir + '/manual_plating_input.json')))
+plating.process_bacterium_locations()
+plating.write_markdown(tmp + '/plating.md')
+"""
+            self.assertRuns(code)
+            for name in ('assembly.md', 'transformation.md', 'plating.md'):
+                self.assertGreater((Path(tmp) / name).stat().st_size, 0)
+
+    def test_robot_class_needs_opentrons_only_to_run(self):
+        self.assertRuns(
+            "from pudu import SBOLLoopAssembly, DEFAULT_SBOL_ASSEMBLIES\n"
+            "SBOLLoopAssembly(DEFAULT_SBOL_ASSEMBLIES, output_xlsx=False).process_assemblies()\n"
+        )
+
+
+# ---------------------------------------------------------------------------
+# 2. Package attributes
+# ---------------------------------------------------------------------------
+
+class TestLazyAttributes(unittest.TestCase):
+
+    def test_attributes_are_submodule_objects(self):
+        from pudu.assembly import SBOLLoopAssembly
+        from pudu.utils import colors
+        self.assertIs(pudu.SBOLLoopAssembly, SBOLLoopAssembly)
+        self.assertIs(pudu.colors, colors)
+
+    def test_star_import_exports_public_names(self):
+        namespace = {}
+        exec('from pudu import *', namespace)
+        self.assertIn('HeatShockTransformation', namespace)
+        self.assertIn('GFPODCalibration', namespace)
+        self.assertNotIn('protocol_api', namespace)
+
+    def test_unknown_attribute_raises(self):
+        with self.assertRaises(AttributeError):
+            pudu.NotAProtocol
+        self.assertIn('Plating', dir(pudu))
+
+
+if __name__ == '__main__':
+    unittest.main()
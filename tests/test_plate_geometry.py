@@ -0,0 +1,77 @@
+"""
+Unit tests for the precomputed well tables (pudu.plate_geometry).
+
+Tests are split into:
+  - TestPlateGeometry : index <-> name tables of the standard formats and orders
+  - TestWellLookups   : module-level helpers and their callers
+"""
+
+import unittest
+
+from pudu.plate_geometry import COLUMN_MAJOR, ROW_MAJOR, PLATE_FORMATS, plate_geometry, well_index, well_name
+from pudu.plating import Plating
+from pudu.tip_budget import tip_index, tip_well_name
+
+
+# ---------------------------------------------------------------------------
+# 1. Geometry tables
+# ---------------------------------------------------------------------------
+
+class TestPlateGeometry(unittest.TestCase):
+
+    def test_standard_formats(self):
+        for wells, (rows, columns) in PLATE_FORMATS.items():
+            geometry = plate_geometry(wells)
+            self.assertEqual(len(geometry), wells)
+            self.assertEqual(geometry.names[-1], f"{chr(ord('A') + rows - 1)}{columns}")
+
+    def test_column_major_matches_opentrons_order(self):
+        geometry = plate_geometry(96, COLUMN_MAJOR)
+        self.assertEqual(geometry.names[:9], ('A1', 'B1', 'C1', 'D1', 'E1', 'F1', 'G1', 'H1', 'A2'))
+        self.assertEqual((geometry.row_of(9), geometry.column_of(9)), (1, 1))
+
+    def test_row_major_is_reading_order(self):
+        geometry = plate_geometry(384, ROW_MAJOR)
+        self.assertEqual(geometry.well_name(24), 'B1')
+        self.assertEqual(geometry.well_index('P24'), 383)
+        self.assertEqual((geometry.row_of(25), geometry.column_of(25)), (1, 1))
+        self.assertEqual(plate_geometry(384).convert(1, geometry), 24)
+
+    def test_tables_are_cached(self):
+        self.assertIs(plate_geometry(96), plate_geometry(96, COLUMN_MAJOR))
+
+    def test_names_and_indices_invert(self):
+        geometry = plate_geometry(384)
+        for index, name in enumerate(geometry.names):
+            self.assertEqual(geometry.well_index(name), index)
+
+    def test_invalid_input_raises(self):
+        with self.assertRaises(ValueError):
+            plate_geometry(48)
+        with self.assertRaises(ValueError):
+            plate_geometry(96, 'diagonal')
+        with self.assertRaises(ValueError):
+            plate_geometry(24).well_index('E1')
+        with self.assertRaises(ValueError):
+            plate_geometry(96).well_name(96)
+
+
+# ---------------------------------------------------------------------------
+# 2. Lookups
+# ---------------------------------------------------------------------------
+
+class TestWellLookups(unittest.TestCase):
+
+    def test_helpers(self):
+        self.assertEqual(well_name(8), 'A2')
+        self.assertEqual(well_index('A2', order=ROW_MAJOR), 1)
+        self.assertEqual(well_index('b03'), 17)
+
+    def test_callers_share_the_tables(self):
+        self.assertEqual(tip_index('H12'), 95)
+        self.assertEqual(tip_well_name(8), 'A2')
+        self.assertEqual(Plating._well_name_from_index(48), 'A7')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,128 @@
+"""
+Unit tests for the array-based agar plate maps (pudu.plate_map).
+
+Tests are split into:
+  - TestPlateMapLayout  : index arrays, plate assignment and 384-well layouts
+  - TestPlateMapOutputs : JSON, Markdown and Excel renderers and their Plating wrappers
+"""
+
+import os
+import tempfile
+import unittest
+import zipfile
+
+from pudu.plate_map import EMPTY, PlateMap, plate_format
+from pudu.plating import Plating
+
+
+# ---------------------------------------------------------------------------
+# Shared fixtures
+# ---------------------------------------------------------------------------
+
+def constructs(number):
+    return [(f'W{i}', f'construct_{i}, plasmid') for i in range(number)]
+
+
+RATIOS = ['1/10', '1/100']
+
+
+# ---------------------------------------------------------------------------
+# 1. Layout
+# ---------------------------------------------------------------------------
+
+class TestPlateMapLayout(unittest.TestCase):
+
+    def test_index_arrays(self):
+        plate_map = PlateMap(constructs(3), replicates=2, ratios=RATIOS)
+        self.assertEqual(len(plate_map), 12)
+        self.assertEqual(plate_map.construct[:6], [0, 0, 1, 1, 2, 2])
+        self.assertEqual(plate_map.replicate[:6], [0, 1, 0, 1, 0, 1])
+        self.assertEqual(plate_map.dilution, [0] * 6 + [1] * 6)
+        # Both dilution steps share a plate, the second starting halfway
+        self.assertEqual(plate_map.plate, [0] * 12)
+        self.assertEqual(plate_map.well[6:], list(range(48, 54)))
+
+    def test_grid_points_back_to_the_entries(self):
+        plate_map = PlateMap(constructs(3), replicates=2, ratios=RATIOS)
+        for entry, (plate, well) in enumerate(zip(plate_map.plate, plate_map.well)):
+            self.assertEqual(plate_map.grid[plate][well], entry)
+        self.assertEqual(sum(cell != EMPTY for cell in plate_map.grid[0]), 12)
+
+    def test_each_dilution_starts_its_own_plate_when_over_half(self):
+        plate_map = PlateMap(constructs(25), replicates=2, ratios=RATIOS)
+        self.assertEqual(plate_map.number_plates, 2)
+        self.assertEqual(plate_map.plate_dilutions(1), [1])
+
+    def test_dilutions_spanning_several_plates_do_not_overlap(self):
+        plate_map = PlateMap(constructs(100), replicates=1, ratios=RATIOS)
+        self.assertEqual(plate_map.number_plates, 4)
+        self.assertEqual([plate_map.plate_dilutions(plate) for plate in range(4)], [[0], [0], [1], [1]])
+
+    def test_384_well_layout(self):
+        plate_map = PlateMap(constructs(96), replicates=2, ratios=RATIOS, wells=384)
+        self.assertEqual(plate_map.number_plates, 1)
+        self.assertEqual(plate_map.well[192], 192)
+        self.assertEqual(plate_map.geometry.names[plate_map.well[-1]], 'P24')
+
+    def test_scales_to_thousands_of_constructs(self):
+        plate_map = PlateMap(constructs(5000), replicates=3, ratios=RATIOS, wells=384)
+        self.assertEqual(len(plate_map), 30000)
+        self.assertEqual(plate_map.number_plates, 2 * 40)
+
+    def test_plate_format_from_load_name(self):
+        self.assertEqual(plate_format('corning_384_wellplate_112ul_flat'), 384)
+        self.assertEqual(plate_format('nest_96_wellplate_100ul_pcr_full_skirt'), 96)
+        self.assertEqual(plate_format('nunc_omnitray'), 96)
+
+    def test_invalid_replicates(self):
+        with self.assertRaises(ValueError):
+            PlateMap(constructs(1), replicates=0, ratios=RATIOS)
+
+
+# ---------------------------------------------------------------------------
+# 2. Outputs
+# ---------------------------------------------------------------------------
+
+class TestPlateMapOutputs(unittest.TestCase):
+
+    def test_to_dict(self):
+        plates = PlateMap(constructs(2), replicates=2, ratios=RATIOS).to_dict()
+        self.assertEqual(list(plates), ['plate_1'])
+        self.assertEqual(plates['plate_1']['dilution_2']['ratio'], '1/100')
+        self.assertEqual(plates['plate_1']['dilution_1']['wells']['B1'],
+                         {'construct': 'construct_0, plasmid', 'source_well': 'W0', 'replicate': 2})
+        self.assertIn('A7', plates['plate_1']['dilution_2']['wells'])
+
+    def test_render_markdown(self):
+        markdown = PlateMap(constructs(2), replicates=2, ratios=RATIOS, wells=384).render_markdown()
+        self.assertIn('## Plate 1 · Dilution 1: 1/10 | Dilution 2: 1/100', markdown)
+        rows = [line for line in markdown.splitlines() if line.startswith('| A |')]
+        self.assertEqual(len(rows[0].split('|')), 24 + 3)
+        self.assertIn('| construct_0 R1 (1/10) |', rows[0])
+
+    def test_write_excel_384(self):
+        plate_map = PlateMap(constructs(300), replicates=1, ratios=RATIOS, wells=384)
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = os.path.join(tmpdir, 'plating_layout.xlsx')
+            plate_map.write_excel(path)
+            self.assertTrue(zipfile.is_zipfile(path))
+
+    def test_plating_uses_the_agar_plate_format(self):
+        locations = {f'W{i}': f'construct_{i}' for i in range(60)}
+        plating = Plating(bacterium_locations=locations, agar_plate='corning_384_wellplate_112ul_flat')
+        plates = plating.build_agar_plate_map()
+        # 60 wells per dilution fit in half a 384-well plate
+        self.assertEqual(list(plates), ['plate_1'])
+        self.assertIn('A13', plates['plate_1']['dilution_2']['wells'])
+
+    def test_plating_writes_markdown(self):
+        plating = Plating(bacterium_locations={'A1': ['DH5alpha', 'plasmid_1']})
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = os.path.join(tmpdir, 'plating_layout.md')
+            plating.write_plates_markdown(path)
+            with open(path, encoding='utf-8') as handle:
+                self.assertIn('DH5alpha (1/100)', handle.read())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -7,11 +7,16 @@ Tests are split into:
   - TestDilutionFactor      : dilution_factor parameter and derived volume_lb_transfer
   - TestMergeParams         : param hierarchy (plating_data → json_params → kwargs)
   - TestPlateLayout         : calculate_plate_layout single/double plate logic
+  - TestPlatingOutputs      : JSON/xlsx outputs and naming helpers
+  - TestMultiChannelLB      : column-wise LB dispensing with a p300 multi
 """
 
+import contextlib
+import io
 import json
 import unittest
 from unittest.mock import MagicMock
+from pudu.dry_run import dry_run
 from pudu.plating import Plating
 
 
@@ -496,5 +501,43 @@ class TestPlatingOutputs(unittest.TestCase):
             self.assertTrue(zipfile.is_zipfile(path))
 
 
+# ---------------------------------------------------------------------------
+# 7. Multi-channel LB dispensing
+# ---------------------------------------------------------------------------
+
+TWENTY_CONSTRUCTS = {f'{"ABCDEFGH"[i % 8]}{i // 8 + 1}': ['DH5alpha', f'plasmid_{i}'] for i in range(20)}
+
+
+class TestMultiChannelLB(unittest.TestCase):
+
+    def lb_dispenses(self, plating):
+        with contextlib.redirect_stdout(io.StringIO()):
+            command_log = dry_run(plating, simulating=False).command_log
+        return [record for record in command_log
+                if record['stage'] == 'distribute lb multichannel'
+                and record['command'] in ('distribute', 'transfer')]
+
+    def test_multichannel_flag(self):
+        self.assertTrue(make_plating(large_pipette='p300_multi_gen2').multichannel)
+        self.assertFalse(make_plating().multichannel)
+
+    def test_every_used_column_is_filled(self):
+        plating = make_plating(TWENTY_CONSTRUCTS, large_pipette='p300_multi_gen2')
+        records = self.lb_dispenses(plating)
+        # 20 wells per dilution step: columns 1-3 and 7-9, the last of each partly used
+        self.assertEqual(len(records), 1)
+        self.assertEqual(records[0]['name'], 'p300_multi_gen2')
+        self.assertEqual([dest['well'] for dest in records[0]['params']['dest']],
+                         ['A1', 'A2', 'A3', 'A7', 'A8', 'A9'])
+
+    def test_insufficient_lb_rejected(self):
+        plating = make_plating(TWENTY_CONSTRUCTS, large_pipette='p300_multi_gen2', volume_lb=100)
+        with self.assertRaises(ValueError):
+            self.lb_dispenses(plating)
+
+    def test_single_channel_mode_unchanged(self):
+        self.assertEqual(self.lb_dispenses(make_plating(TWENTY_CONSTRUCTS)), [])
+
+
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,104 @@
+"""
+Unit tests for the reagent volume planner (pudu.reagent_planner).
+
+Tests are split into:
+  - TestDeadVolume    : dead volume per labware type
+  - TestReagentPlan   : required volumes read back from dry runs
+"""
+
+import json
+import tempfile
+import unittest
+from pathlib import Path
+
+from pudu.assembly import SBOLLoopAssembly, DEFAULT_SBOL_ASSEMBLIES
+from pudu.dry_run import DryRunContext
+from pudu.reagent_planner import DEFAULT_DEAD_VOLUME, ReagentPlan, dead_volume, plan_reagent_volumes
+from pudu.transformation import HeatShockTransformation
+
+
+# ---------------------------------------------------------------------------
+# Shared fixtures
+# ---------------------------------------------------------------------------
+
+STRAINS = [
+    {'Strain': f'https://SBOL2Build.org/strain_{i}/1',
+     'Chassis': 'https://sbolcanvas.org/DH5alpha/1',
+     'Plasmids': [f'https://SBOL2Build.org/plasmid_{i}/1']}
+    for i in range(3)
+]
+
+TUBES = 'opentrons_24_tuberack_eppendorf_1.5ml_safelock_snapcap'
+
+
+def tube_context():
+    """A p20 and a tube rack with 30 µL of water in A1."""
+    context = DryRunContext(simulating=False)
+    tiprack = context.load_labware('opentrons_96_tiprack_20ul', '4')
+    tubes = context.load_labware(TUBES, '1')
+    pipette = context.load_instrument('p20_single_gen2', 'left', tip_racks=[tiprack])
+    tubes['A1'].load_liquid(context.define_liquid('Water'), volume=30)
+    return context, tubes, pipette
+
+
+# ---------------------------------------------------------------------------
+# 1. Dead volumes
+# ---------------------------------------------------------------------------
+
+class TestDeadVolume(unittest.TestCase):
+
+    def test_labware_types(self):
+        self.assertEqual(dead_volume(TUBES), 20)
+        self.assertEqual(dead_volume('opentrons_15_tuberack_falcon_15ml_conical'), 1000)
+        self.assertEqual(dead_volume('nest_12_reservoir_15ml'), 1500)
+        self.assertEqual(dead_volume('unknown_labware'), DEFAULT_DEAD_VOLUME)
+
+    def test_overrides_win(self):
+        self.assertEqual(dead_volume(TUBES, {TUBES: 5}), 5)
+
+
+# ---------------------------------------------------------------------------
+# 2. Plans
+# ---------------------------------------------------------------------------
+
+class TestReagentPlan(unittest.TestCase):
+
+    def test_peak_withdrawal_plus_dead_volume(self):
+        context, tubes, pipette = tube_context()
+        pipette.pick_up_tip()
+        pipette.aspirate(15, tubes['A1'])
+        pipette.dispense(15, tubes['B1'])
+        pipette.aspirate(10, tubes['B1'])
+
+        plan = ReagentPlan.from_context(context)
+        # B1 was filled by the robot before it was drawn from, so only A1 needs loading
+        water, = plan.tubes
+        self.assertEqual((water.well, water.liquid, water.used, water.required), ('A1', 'Water', 15, 35))
+        self.assertTrue(water.runs_dry)
+        self.assertEqual(plan.to_dict()['runs_dry'], ['1:A1'])
+
+    def test_assembly_reagents_are_planned(self):
+        plan = plan_reagent_volumes(SBOLLoopAssembly(DEFAULT_SBOL_ASSEMBLIES, output_xlsx=False))
+        liquids = plan.by_liquid()
+        self.assertIn('T4 DNA Ligase', liquids)
+        self.assertTrue(all(tube.slot == '1' for tube in plan.tubes))
+        self.assertEqual(plan.dry, [])
+
+    def test_transformation_flags_tubes_loaded_without_dead_volume(self):
+        plan = plan_reagent_volumes(HeatShockTransformation(transformation_data=STRAINS))
+        dry = {tube.liquid for tube in plan.dry}
+        self.assertIn('Competent Cell DH5alpha_1', dry)
+        self.assertIn('RUNS DRY', plan.summary())
+
+    def test_write(self):
+        context, tubes, pipette = tube_context()
+        pipette.pick_up_tip()
+        pipette.aspirate(5, tubes['A1'])
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp) / 'reagents.json'
+            ReagentPlan.from_context(context).write(path)
+            self.assertEqual(json.loads(path.read_text())['by_liquid'], {'Water': 25.0})
+
+
+if __name__ == '__main__':
+    unittest.main()
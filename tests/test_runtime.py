@@ -0,0 +1,144 @@
+"""
+Unit tests for the offline run-time estimator (pudu.runtime).
+
+Tests are split into:
+  - TestEstimateCommands : time model applied to hand-written command records
+  - TestEstimateRuntime  : end-to-end estimate of a simulated SBOLLoopAssembly
+"""
+
+import unittest
+
+from pudu.runtime import RuntimeModel, estimate_commands, estimate_runtime
+from pudu.assembly import SBOLLoopAssembly
+
+
+# ---------------------------------------------------------------------------
+# Shared fixtures
+# ---------------------------------------------------------------------------
+
+def make_command(command, target='pipette', name='p20_single_gen2', stage='stage', **params):
+    return {'command': command, 'target': target, 'name': name, 'stage': stage, 'params': params}
+
+
+LOAD_P20 = make_command(
+    'load_instrument', target='protocol', name='p20_single_gen2', stage='setup',
+    max_volume=20, min_volume=1, flow_rate={'aspirate': 10.0, 'dispense': 20.0, 'blow_out': 20.0},
+    tip_racks=[{'labware': 'opentrons_96_tiprack_20ul', 'slot': '2'}],
+)
+
+SOURCE = {'labware': 'tube_rack', 'slot': '1', 'well': 'A1'}
+DEST = {'labware': 'plate', 'slot': '3', 'well': 'A1'}
+
+ASSEMBLIES = [
+    {
+        "Product": "https://SBOL2Build.org/composite_1/1",
+        "Backbone": "https://sbolcanvas.org/pSB1C3/1",
+        "PartsList": [
+            "https://sbolcanvas.org/J23101/1",
+            "https://sbolcanvas.org/GFP/1",
+        ],
+        "Restriction Enzyme": "https://SBOL2Build.org/BsaI/1",
+    }
+]
+
+
+# ---------------------------------------------------------------------------
+# 1. Time model
+# ---------------------------------------------------------------------------
+
+class TestEstimateCommands(unittest.TestCase):
+
+    def setUp(self):
+        self.model = RuntimeModel(move_overhead=0, aspirate_overhead=0, gantry_speed=1e9)
+
+    def test_aspirate_and_dispense_use_flow_rate_and_rate(self):
+        commands = [
+            LOAD_P20,
+            make_command('aspirate', volume=10, location=SOURCE, rate=0.5),
+            make_command('dispense', volume=10, location=DEST, rate=1.0),
+        ]
+        estimate = estimate_commands(commands, self.model)
+        # 10 µL at 10 µL/s * 0.5 = 2 s, 10 µL at 20 µL/s = 0.5 s
+        self.assertAlmostEqual(estimate.categories['pipetting'], 2.5)
+
+    def test_mix_counts_every_repetition(self):
+        commands = [LOAD_P20, make_command('mix', repetitions=3, volume=10, location=DEST, rate=1.0)]
+        estimate = estimate_commands(commands, self.model)
+        self.assertAlmostEqual(estimate.categories['pipetting'], 3 * (1.0 + 0.5))
+
+    def test_tip_pickup_and_drop(self):
+        commands = [LOAD_P20, make_command('pick_up_tip'), make_command('drop_tip')]
+        estimate = estimate_commands(commands, self.model)
+        self.assertAlmostEqual(estimate.categories['tips'], self.model.tip_pickup + self.model.tip_drop)
+
+    def test_gantry_travel_between_slots(self):
+        model = RuntimeModel(move_overhead=0, aspirate_overhead=0, gantry_speed=100)
+        commands = [
+            LOAD_P20,
+            make_command('aspirate', volume=0, location={'point': [0, 0, 0]}),
+            make_command('dispense', volume=0, location={'point': [300, 400, 0]}),
+        ]
+        estimate = estimate_commands(commands, model)
+        self.assertAlmostEqual(estimate.categories['gantry'], 5.0)
+
+    def test_thermocycler_profile_adds_ramps_and_holds(self):
+        steps = [
+            {'temperature': 42, 'hold_time_minutes': 2},
+            {'temperature': 16, 'hold_time_minutes': 5},
+        ]
+        commands = [make_command('execute_profile', target='module', name='thermocycler',
+                                 steps=steps, repetitions=2)]
+        estimate = estimate_commands(commands, self.model)
+        holds = 2 * (2 + 5) * 60
+        ramps = (17 / 4.0 + 26 / 2.0) + (26 / 4.0 + 26 / 2.0)
+        self.assertAlmostEqual(estimate.total_seconds, holds + ramps)
+
+    def test_stages_are_reported_separately(self):
+        commands = [
+            LOAD_P20,
+            make_command('pick_up_tip', stage='transfer DNA'),
+            make_command('set_temperature', target='module', name='temperature module',
+                         stage='temperature control', celsius=4),
+        ]
+        estimate = estimate_commands(commands, self.model)
+        self.assertEqual(set(estimate.stages), {'transfer DNA', 'temperature control'})
+        self.assertAlmostEqual(sum(estimate.stages.values()), estimate.total_seconds)
+
+    def test_distribute_aspirates_in_trips(self):
+        model = RuntimeModel(move_overhead=0, aspirate_overhead=0, gantry_speed=1e9,
+                             blow_out=0, tip_pickup=0, tip_drop=0)
+        destinations = [dict(DEST, well=f'A{i}') for i in range(1, 5)]
+        commands = [
+            LOAD_P20,
+            make_command('distribute', volume=5, source=SOURCE, dest=destinations,
+                         disposal_volume=0),
+        ]
+        estimate = estimate_commands(commands, model)
+        # 20 µL aspirated (2 s) and 4 × 5 µL dispensed (1 s)
+        self.assertAlmostEqual(estimate.categories['pipetting'], 3.0)
+
+
+# ---------------------------------------------------------------------------
+# 2. End-to-end estimate
+# ---------------------------------------------------------------------------
+
+class TestEstimateRuntime(unittest.TestCase):
+
+    def test_assembly_estimate_includes_pipetting_and_thermocycling(self):
+        assembly = SBOLLoopAssembly(assemblies=ASSEMBLIES, output_xlsx=False)
+        estimate = estimate_runtime(assembly)
+
+        self.assertIn('process assembly combinations', estimate.stages)
+        self.assertIn('temperature control', estimate.stages)
+        # 75 cycles of 2 + 5 min and 2 × 10 min of denaturation
+        self.assertGreater(estimate.stages['temperature control'], (75 * 7 + 20) * 60)
+        self.assertGreater(estimate.categories['tips'], 0)
+
+    def test_estimate_does_not_modify_protocol_object(self):
+        assembly = SBOLLoopAssembly(assemblies=ASSEMBLIES, output_xlsx=False)
+        estimate_runtime(assembly)
+        self.assertEqual(assembly.dict_of_parts_in_thermocycler, {})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,183 @@
+"""
+Unit tests for pipetting work scheduled into thermocycler holds (pudu.scheduling).
+
+Tests are split into:
+  - TestHoldScheduler  : holds split into ramp, queued work and the remaining delay
+  - TestProtocolHolds  : schedule_holds in the assembly and transformation runs
+"""
+
+import contextlib
+import io
+import unittest
+
+from pudu.dry_run import DryRunContext, dry_run
+from pudu.scheduling import HoldScheduler, HoldTask, hold_seconds, schedulable
+from pudu.assembly import SBOLLoopAssembly, DEFAULT_SBOL_ASSEMBLIES
+from pudu.transformation import HeatShockTransformation
+
+
+# ---------------------------------------------------------------------------
+# Shared fixtures
+# ---------------------------------------------------------------------------
+
+STRAINS = [
+    {'Strain': f'https://SBOL2Build.org/strain_{i}/1',
+     'Chassis': 'https://sbolcanvas.org/DH5alpha/1',
+     'Plasmids': [f'https://SBOL2Build.org/plasmid_{i}/1']}
+    for i in range(3)
+]
+
+RECOVERY = [schedulable({'temperature': 37, 'hold_time_minutes': 60})]
+
+
+def commands(context, *names):
+    return [record for record in context.command_log if record['command'] in names]
+
+
+def pipetting_work(context):
+    """Work that picks up and drops a tip on a p20 loaded on *context*."""
+    tiprack = context.load_labware('opentrons_96_tiprack_20ul', '4')
+    pipette = context.load_instrument('p20_single_gen2', 'left', tip_racks=[tiprack])
+
+    def work(protocol):
+        pipette.pick_up_tip()
+        pipette.drop_tip()
+    return work
+
+
+def run_quietly(protocol_obj, simulating=True):
+    with contextlib.redirect_stdout(io.StringIO()):
+        return dry_run(protocol_obj, simulating=simulating)
+
+
+# ---------------------------------------------------------------------------
+# 1. Scheduler
+# ---------------------------------------------------------------------------
+
+class TestHoldScheduler(unittest.TestCase):
+
+    def setUp(self):
+        self.context = DryRunContext(simulating=True)
+        self.thermocycler = self.context.load_module('thermocycler module')
+
+    def test_without_work_the_profile_runs_unchanged(self):
+        HoldScheduler(self.context, self.thermocycler).execute_profile(RECOVERY, repetitions=1)
+        self.assertEqual(len(commands(self.context, 'execute_profile')), 1)
+        self.assertEqual(commands(self.context, 'delay'), [])
+
+    def test_work_runs_during_the_hold(self):
+        scheduler = HoldScheduler(self.context, self.thermocycler)
+        scheduler.add('Pick up a tip', pipetting_work(self.context), seconds=600)
+        scheduler.execute_profile(RECOVERY, repetitions=1, block_max_volume=30)
+
+        self.assertEqual(commands(self.context, 'execute_profile'), [])
+        self.assertEqual(len(commands(self.context, 'pick_up_tip')), 1)
+        delay, = commands(self.context, 'delay')
+        self.assertEqual(delay['params']['seconds'], 3000)
+        self.assertEqual(scheduler.completed, [('Pick up a tip', '37°C hold')])
+
+    def test_work_longer_than_every_hold_waits(self):
+        scheduler = HoldScheduler(self.context, self.thermocycler)
+        scheduler.add('Long work', pipetting_work(self.context), seconds=7200)
+        scheduler.execute_profile(RECOVERY, repetitions=1)
+        self.assertEqual(commands(self.context, 'pick_up_tip'), [])
+
+        scheduler.run_pending()
+        self.assertEqual(len(commands(self.context, 'pick_up_tip')), 1)
+        self.assertEqual(scheduler.completed, [('Long work', None)])
+
+    def test_unmarked_steps_hold_on_the_thermocycler(self):
+        scheduler = HoldScheduler(self.context, self.thermocycler)
+        scheduler.add('Short work', pipetting_work(self.context), seconds=30)
+        scheduler.execute_profile([schedulable({'temperature': 4, 'hold_time_seconds': 20}),
+                                   {'temperature': 42, 'hold_time_minutes': 1},
+                                   {'temperature': 16, 'hold_time_minutes': 5}], repetitions=1)
+
+        self.assertEqual(commands(self.context, 'pick_up_tip'), [])
+        self.assertEqual(len(scheduler.pending), 1)
+        heat_shock = commands(self.context, 'set_block_temperature')[1]
+        self.assertEqual(heat_shock['params']['hold_time_seconds'], 60)
+
+    def test_profile_without_schedulable_steps_runs_unchanged(self):
+        scheduler = HoldScheduler(self.context, self.thermocycler)
+        scheduler.add('Work', pipetting_work(self.context), seconds=60)
+        scheduler.execute_profile([{'temperature': 37, 'hold_time_minutes': 60}], repetitions=1)
+        self.assertEqual(len(commands(self.context, 'execute_profile')), 1)
+        self.assertEqual(len(scheduler.pending), 1)
+
+    def test_cycling_profile_runs_unchanged(self):
+        scheduler = HoldScheduler(self.context, self.thermocycler)
+        scheduler.add('Work', pipetting_work(self.context), seconds=60)
+        scheduler.execute_profile([{'temperature': 42, 'hold_time_minutes': 2},
+                                   {'temperature': 16, 'hold_time_minutes': 5}], repetitions=75)
+        self.assertEqual(len(commands(self.context, 'execute_profile')), 1)
+        self.assertEqual(len(scheduler.pending), 1)
+
+    def test_disabled_scheduler_leaves_holds_alone(self):
+        scheduler = HoldScheduler(self.context, self.thermocycler, enabled=False)
+        scheduler.add('Work', pipetting_work(self.context), seconds=60)
+        scheduler.execute_profile(RECOVERY, repetitions=1)
+        self.assertEqual(len(commands(self.context, 'execute_profile')), 1)
+
+    def test_hold_seconds_and_validation(self):
+        self.assertEqual(hold_seconds({'temperature': 4, 'hold_time_minutes': 2, 'hold_time_seconds': 5}), 125)
+        with self.assertRaises(ValueError):
+            HoldTask('Work', lambda protocol: None, seconds=-1)
+
+
+# ---------------------------------------------------------------------------
+# 2. Protocols
+# ---------------------------------------------------------------------------
+
+class TestProtocolHolds(unittest.TestCase):
+
+    def test_transformation_runs_work_in_the_cold_incubation(self):
+        transformation = HeatShockTransformation(transformation_data=STRAINS, schedule_holds=True)
+        ran = []
+        transformation.schedule_during_holds('Prepare next plate', ran.append, seconds=600)
+        context = run_quietly(transformation, simulating=False)
+
+        self.assertEqual(len(ran), 1)
+        self.assertEqual(transformation.hold_scheduler.completed, [('Prepare next plate', '4°C hold')])
+        recovery, = commands(context, 'execute_profile')
+        self.assertEqual(recovery['params']['steps'], [transformation.recovery_incubation])
+        heat_shock, = [record for record in commands(context, 'set_block_temperature')
+                       if record['params']['temperature'] == transformation.heat_shock['temperature']]
+        self.assertEqual(len(commands(context, 'start_set_temperature', 'await_temperature')), 2)
+        self.assertEqual(heat_shock['params']['hold_time_seconds'], hold_seconds(transformation.heat_shock))
+
+    def test_transformation_heat_shock_never_hosts_work(self):
+        transformation = HeatShockTransformation(transformation_data=STRAINS, schedule_holds=True)
+        first_cold, heat_shock = transformation.cold_incubation1, transformation.heat_shock
+        transformation.schedule_during_holds('Fills the first cold incubation', lambda protocol: None,
+                                             seconds=hold_seconds(first_cold))
+        transformation.schedule_during_holds('As long as the heat shock', lambda protocol: None,
+                                             seconds=hold_seconds(heat_shock))
+        run_quietly(transformation, simulating=False)
+
+        holds = dict(transformation.hold_scheduler.completed)
+        self.assertEqual(holds['Fills the first cold incubation'], f"{first_cold['temperature']}°C hold")
+        self.assertNotEqual(holds['As long as the heat shock'], f"{heat_shock['temperature']}°C hold")
+
+    def test_assembly_without_scheduling_runs_work_after_thermocycling(self):
+        assembly = SBOLLoopAssembly(DEFAULT_SBOL_ASSEMBLIES, output_xlsx=False)
+        ran = []
+        assembly.schedule_during_holds('Prepare next batch', ran.append, seconds=60)
+        context = run_quietly(assembly, simulating=False)
+
+        self.assertEqual(len(ran), 1)
+        self.assertEqual(assembly.hold_scheduler.completed, [('Prepare next batch', None)])
+        self.assertEqual(len(commands(context, 'execute_profile')), 2)
+
+    def test_assembly_denaturation_hosts_work(self):
+        assembly = SBOLLoopAssembly(DEFAULT_SBOL_ASSEMBLIES, output_xlsx=False, schedule_holds=True)
+        assembly.schedule_during_holds('Prepare next batch', lambda protocol: None, seconds=60)
+        context = run_quietly(assembly, simulating=False)
+
+        self.assertEqual(assembly.hold_scheduler.completed, [('Prepare next batch', '60°C hold')])
+        profile, = commands(context, 'execute_profile')
+        self.assertEqual(profile['params']['repetitions'], 75)
+
+
+if __name__ == '__main__':
+    unittest.main()
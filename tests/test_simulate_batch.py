@@ -0,0 +1,103 @@
+"""
+Unit tests for the parallel protocol simulation runner (pudu.simulate_batch).
+
+The simulator command is replaced by the Python interpreter, so each "protocol"
+is a small script that prints, fails or writes an output file.
+
+Tests are split into:
+  - TestSimulateFiles  : return codes, logs, artifacts, summary and concurrency
+"""
+
+import json
+import os
+import sys
+import tempfile
+import time
+import unittest
+from pathlib import Path
+
+from pudu.simulate_batch import find_protocols, simulate_files
+
+
+# ---------------------------------------------------------------------------
+# Shared fixtures
+# ---------------------------------------------------------------------------
+
+PASSING = "print('simulated')\nopen('plating_input.json', 'w').write('{}')\n"
+FAILING = "import sys\nsys.stderr.write('deck conflict')\nsys.exit(2)\n"
+SLOW = "import time\ntime.sleep(0.5)\n"
+
+
+class TestSimulateFiles(unittest.TestCase):
+
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.root = Path(tmp.name)
+        self.protocols = self.root / 'protocols'
+        self.protocols.mkdir()
+        self.report_dir = self.root / 'report'
+
+    def write(self, name, code, directory=None):
+        path = (directory or self.protocols) / name
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(code)
+        return path
+
+    def simulate(self, protocols, **kwargs):
+        return simulate_files(protocols, self.report_dir, command=[sys.executable], **kwargs)
+
+    def test_results_logs_and_artifacts(self):
+        self.write('a_pass.py', PASSING)
+        self.write('b_fail.py', FAILING)
+        reports = self.simulate(find_protocols([self.protocols]))
+
+        self.assertEqual([report.returncode for report in reports], [0, 2])
+        self.assertEqual(reports[0].artifacts, ['plating_input.json'])
+        self.assertEqual((Path(reports[0].workdir) / 'run.log').read_text().strip(), 'simulated')
+        self.assertEqual(reports[1].stderr, 'deck conflict')
+
+        with open(self.report_dir / 'summary.json') as f:
+            summary = json.load(f)
+        self.assertEqual((summary['total'], summary['passed'], summary['failed']), (2, 1, 1))
+        self.assertFalse(summary['protocols'][1]['passed'])
+
+    def test_colliding_names_get_separate_workdirs(self):
+        first = self.write('protocol.py', PASSING, self.root / 'libre')
+        second = self.write('protocol.py', PASSING, self.root / 'automated')
+        reports = self.simulate([first, second])
+        self.assertEqual([Path(report.workdir).name for report in reports],
+                         ['libre_protocol', 'automated_protocol'])
+
+    def test_simulations_run_concurrently(self):
+        protocols = [self.write(f'slow_{i}.py', SLOW) for i in range(4)]
+        start = time.perf_counter()
+        reports = self.simulate(protocols, workers=4)
+        self.assertTrue(all(report.passed for report in reports))
+        self.assertLess(time.perf_counter() - start, 1.9)
+
+    def test_missing_simulator_and_timeout_reported(self):
+        protocol = self.write('slow.py', SLOW)
+        missing = simulate_files([protocol], self.report_dir, command=['no-such-simulator'])
+        self.assertEqual(missing[0].returncode, 127)
+        timed_out = self.simulate([protocol], timeout=0.1)
+        self.assertEqual(timed_out[0].returncode, -1)
+
+    def test_inputs_are_copied_into_every_workdir(self):
+        reader = "import json\nprint(json.load(open('data/output.json'))['reads'])\n"
+        protocols = [self.write(f'reader_{i}.py', reader) for i in range(2)]
+        self.write('output.json', '{"reads": "input"}', self.root / 'data')
+        cwd = os.getcwd()
+        os.chdir(self.root)
+        try:
+            reports = self.simulate(protocols, inputs=['data/output.json'])
+        finally:
+            os.chdir(cwd)
+        for report in reports:
+            self.assertTrue(report.passed, report.stderr)
+            self.assertEqual((Path(report.workdir) / 'run.log').read_text().strip(), 'input')
+            self.assertEqual(report.artifacts, [])
+
+
+if __name__ == '__main__':
+    unittest.main()
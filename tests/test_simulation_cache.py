@@ -0,0 +1,207 @@
+"""
+Unit tests for the simulation result cache (pudu.simulation_cache).
+
+Tests are split into:
+  - TestSimulationKey      : what the cache key depends on
+  - TestSimulateCached     : hits, misses and restored output files
+  - TestEviction           : size-bounded least-recently-used eviction
+  - TestSimulateProtocol   : cached simulation from generate_protocol inputs
+"""
+
+import contextlib
+import io
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+import unittest
+from pathlib import Path
+from unittest import mock
+
+from pudu import simulation_cache
+from pudu.simulation_cache import SimulationCache, simulate_cached, simulation_key
+from pudu.assembly import ManualLoopAssembly, DEFAULT_MANUAL_ASSEMBLIES
+from pudu.generate_protocol import main, simulate_protocol
+
+
+# ---------------------------------------------------------------------------
+# Shared fixtures
+# ---------------------------------------------------------------------------
+
+TRANSFORMATION_DATA = [
+    {'Strain': f'https://SBOL2Build.org/strain_{i}/1',
+     'Chassis': 'https://sbolcanvas.org/DH5alpha/1',
+     'Plasmids': [f'https://SBOL2Build.org/plasmid_{i}/1']}
+    for i in range(3)
+]
+
+
+def manual_assembly(**kwargs):
+    return ManualLoopAssembly(DEFAULT_MANUAL_ASSEMBLIES, output_xlsx=False, **kwargs)
+
+
+class CacheTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.cache = SimulationCache(Path(self.tmp.name) / 'cache')
+        self.output_dir = Path(self.tmp.name) / 'run'
+
+
+# ---------------------------------------------------------------------------
+# 1. Cache key
+# ---------------------------------------------------------------------------
+
+class TestSimulationKey(unittest.TestCase):
+
+    def test_equal_inputs_share_a_key(self):
+        self.assertEqual(simulation_key(manual_assembly()), simulation_key(manual_assembly()))
+
+    def test_params_change_the_key(self):
+        self.assertNotEqual(simulation_key(manual_assembly()), simulation_key(manual_assembly(replicates=2)))
+
+    def test_json_params_and_kwargs_agree(self):
+        from_json = ManualLoopAssembly(DEFAULT_MANUAL_ASSEMBLIES, json_params={'output_xlsx': False,
+                                                                               'replicates': 2})
+        self.assertEqual(simulation_key(from_json), simulation_key(manual_assembly(replicates=2)))
+
+    def test_output_dir_does_not_change_the_key(self):
+        assembly = manual_assembly()
+        key = simulation_key(assembly)
+        assembly.output_dir = 'elsewhere'
+        self.assertEqual(simulation_key(assembly), key)
+
+    def test_labware_definitions_version_changes_the_key(self):
+        versions = {'opentrons_shared_data': '8.4.1', 'pudupy': '1.0.0'}
+        with mock.patch.object(simulation_cache, '_package_version', side_effect=versions.get):
+            key = simulation_key(manual_assembly())
+            versions['opentrons_shared_data'] = '8.5.0'
+            self.assertNotEqual(simulation_key(manual_assembly()), key)
+
+
+# ---------------------------------------------------------------------------
+# 2. Hits and misses
+# ---------------------------------------------------------------------------
+
+class TestSimulateCached(CacheTestCase):
+
+    def test_second_run_is_a_hit(self):
+        first = simulate_cached(manual_assembly(), cache=self.cache)
+        with mock.patch.object(simulation_cache, '_simulate') as simulate:
+            second = simulate_cached(manual_assembly(), cache=self.cache)
+        simulate.assert_not_called()
+        self.assertFalse(first.cache_hit)
+        self.assertTrue(second.cache_hit)
+        self.assertEqual(first.command_log, second.command_log)
+        self.assertEqual(first.outputs, second.outputs)
+
+    def test_outputs_written_on_hit(self):
+        simulate_cached(manual_assembly(), cache=self.cache)
+        simulate_cached(manual_assembly(), cache=self.cache, output_dir=self.output_dir)
+        with open(self.output_dir / 'transformation_input.json') as f:
+            self.assertIn('Odd_1', json.dumps(json.load(f)))
+
+    def test_working_directory_untouched(self):
+        cwd = os.getcwd()
+        before = set(os.listdir(cwd))
+        simulate_cached(manual_assembly(), cache=self.cache)
+        self.assertEqual(os.getcwd(), cwd)
+        self.assertEqual(set(os.listdir(cwd)), before)
+
+    def test_simulations_from_several_threads(self):
+        cwd, stdout = os.getcwd(), sys.stdout
+        results = {}
+
+        def simulate(replicates):
+            results[replicates] = simulate_cached(manual_assembly(replicates=replicates), cache=self.cache,
+                                                  output_dir=self.output_dir / str(replicates))
+
+        threads = [threading.Thread(target=simulate, args=(replicates,)) for replicates in (1, 2, 3)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(os.getcwd(), cwd)
+        self.assertIs(sys.stdout, stdout)
+        self.assertEqual(len({result.key for result in results.values()}), 3)
+        for replicates in (1, 2, 3):
+            self.assertTrue((self.output_dir / str(replicates) / 'transformation_input.json').exists())
+
+    def test_use_cache_false_resimulates(self):
+        simulate_cached(manual_assembly(), cache=self.cache)
+        result = simulate_cached(manual_assembly(), cache=self.cache, use_cache=False)
+        self.assertFalse(result.cache_hit)
+
+
+# ---------------------------------------------------------------------------
+# 3. Eviction
+# ---------------------------------------------------------------------------
+
+class TestEviction(CacheTestCase):
+
+    def test_least_recently_used_entry_evicted(self):
+        first = simulate_cached(manual_assembly(), cache=self.cache)
+        second = simulate_cached(manual_assembly(replicates=2), cache=self.cache)
+        past = time.time() - 60
+        os.utime(self.cache.cache_dir / second.key, (past, past))
+        self.cache.get(first.key)  # refresh the older entry
+
+        self.cache.max_bytes = self.cache.size() - 1
+        self.cache.evict()
+        self.assertIsNotNone(self.cache.get(first.key))
+        self.assertIsNone(self.cache.get(second.key))
+
+    def test_invalid_size_raises(self):
+        with self.assertRaises(ValueError):
+            SimulationCache(self.tmp.name, max_bytes=0)
+
+
+# ---------------------------------------------------------------------------
+# 4. generate_protocol inputs
+# ---------------------------------------------------------------------------
+
+class TestSimulateProtocol(CacheTestCase):
+
+    def test_transformation_writes_plating_input(self):
+        result = simulate_protocol(TRANSFORMATION_DATA, json_params={'replicates': 1},
+                                   protocol_type='transformation',
+                                   output_dir=self.output_dir, cache=self.cache)
+        self.assertIn('plating_input.json', result.outputs)
+        with open(self.output_dir / 'plating_input.json') as f:
+            self.assertEqual(len(json.load(f)['bacterium_locations']), 3)
+
+        again = simulate_protocol(TRANSFORMATION_DATA, json_params={'replicates': 1},
+                                  protocol_type='transformation', cache=self.cache)
+        self.assertTrue(again.cache_hit)
+
+    def test_command_line_simulation_uses_the_cache(self):
+        inputs = Path(self.tmp.name) / 'strains.json'
+        inputs.write_text(json.dumps(TRANSFORMATION_DATA))
+        protocol = self.output_dir / 'transformation_protocol.py'
+        self.output_dir.mkdir()
+        argv = ['generate_protocol', str(inputs), '-o', str(protocol), '--protocol-type', 'transformation',
+                '--simulate']
+        outputs = []
+        for _ in range(2):
+            with mock.patch.object(sys, 'argv', argv), \
+                    mock.patch.dict(os.environ, {'PUDU_CACHE_DIR': str(self.cache.cache_dir)}), \
+                    contextlib.redirect_stdout(io.StringIO()) as output:
+                main()
+            outputs.append(output.getvalue())
+
+        self.assertIn('Simulated (simulation)', outputs[0])
+        self.assertIn('Simulated (cache)', outputs[1])
+        self.assertTrue((self.output_dir / 'plating_input.json').exists())
+        self.assertTrue((self.output_dir / 'tip_state.json').exists())
+
+    def test_assembly_requires_subtype(self):
+        with self.assertRaises(ValueError):
+            simulate_protocol(DEFAULT_MANUAL_ASSEMBLIES, protocol_type='assembly', cache=self.cache)
+
+
+if __name__ == '__main__':
+    unittest.main()
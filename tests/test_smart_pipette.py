@@ -0,0 +1,183 @@
+"""
+Unit tests for the liquid-level tracking of SmartPipette (pudu.utils).
+
+Tests are split into:
+  - TestConicalGeometry : cone-plus-cylinder liquid heights
+  - TestVolumeLedger    : local volume tracking and periodic API reads
+  - TestDistribute      : multi-dispense from one aspiration
+"""
+
+import unittest
+from types import SimpleNamespace
+
+from pudu.dry_run import DryRunContext
+from pudu.utils import SmartPipette, cone_height, conical_liquid_height
+
+
+# ---------------------------------------------------------------------------
+# Shared fixtures
+# ---------------------------------------------------------------------------
+
+CONICAL_RACK = 'opentrons_15_tuberack_falcon_15ml_conical'
+
+
+def falcon_15ml(volume=10000, load_name=CONICAL_RACK):
+    """A well with the dimensions of the Opentrons 15 mL Falcon tube definition."""
+    return SimpleNamespace(parent=SimpleNamespace(load_name=load_name), well_name='A1', depth=117.98,
+                           diameter=14.9, max_volume=15000, current_liquid_volume=lambda: volume)
+
+
+class CountingWell:
+    """Forwards to a dry-run well, counting ``current_liquid_volume`` calls."""
+
+    def __init__(self, well):
+        self._well = well
+        self.reads = 0
+
+    def current_liquid_volume(self):
+        self.reads += 1
+        return self._well.current_liquid_volume()
+
+    def __getattr__(self, name):
+        return getattr(self._well, name)
+
+
+def setup_smart_pipette(volume=10000, **kwargs):
+    context = DryRunContext(simulating=True)
+    tiprack = context.load_labware('opentrons_96_tiprack_300ul', '4')
+    rack = context.load_labware(CONICAL_RACK, '1')
+    plate = context.load_labware('nest_96_wellplate_100ul_pcr_full_skirt', '2')
+    pipette = context.load_instrument('p300_single_gen2', 'right', tip_racks=[tiprack])
+    rack['A1'].load_liquid(context.define_liquid('LB'), volume=volume)
+    return SmartPipette(pipette, context, **kwargs), CountingWell(rack['A1']), plate, context
+
+
+# ---------------------------------------------------------------------------
+# 1. Geometry
+# ---------------------------------------------------------------------------
+
+class TestConicalGeometry(unittest.TestCase):
+
+    def setUp(self):
+        self.tube = falcon_15ml()
+
+    def test_known_tube_cone_height(self):
+        self.assertEqual(cone_height(self.tube), 22.0)
+
+    def test_unknown_tube_cone_height_from_definition(self):
+        tube = falcon_15ml(load_name='custom_6_tuberack_conical')
+        area = 3.141592653589793 * (tube.diameter / 2) ** 2
+        height = cone_height(tube)
+        # The cylinder on the derived cone holds max_volume
+        self.assertAlmostEqual(area * (tube.depth - 2 * height / 3), tube.max_volume, places=6)
+
+    def test_height_is_continuous_at_the_top_of_the_cone(self):
+        area = 3.141592653589793 * (self.tube.diameter / 2) ** 2
+        cone_volume = area * cone_height(self.tube) / 3
+        self.assertAlmostEqual(conical_liquid_height(self.tube, cone_volume), 22.0, places=6)
+        self.assertAlmostEqual(conical_liquid_height(self.tube, cone_volume + area), 23.0, places=6)
+
+    def test_cone_holds_small_volumes_higher_than_a_linear_model(self):
+        linear = self.tube.depth * 500 / self.tube.max_volume
+        self.assertGreater(conical_liquid_height(self.tube, 500), linear)
+        self.assertEqual(conical_liquid_height(self.tube, 0), 0)
+        self.assertLessEqual(conical_liquid_height(self.tube, 10 ** 6), self.tube.depth)
+
+
+# ---------------------------------------------------------------------------
+# 2. Ledger
+# ---------------------------------------------------------------------------
+
+class TestVolumeLedger(unittest.TestCase):
+
+    def test_transfers_are_tracked_locally(self):
+        smart, tube, plate, _ = setup_smart_pipette(reconcile_every=100)
+        for well in plate.wells()[:10]:
+            self.assertTrue(smart.liquid_transfer(50, tube, well))
+        self.assertEqual(tube.reads, 1)
+        self.assertEqual(smart.tracked_volume(tube), 9500)
+
+    def test_ledger_reconciles_with_the_api(self):
+        smart, tube, plate, _ = setup_smart_pipette(reconcile_every=3)
+        for well in plate.wells()[:6]:
+            smart.liquid_transfer(50, tube, well)
+        self.assertEqual(tube.reads, 2)
+        self.assertEqual(smart.tracked_volume(tube), tube.current_liquid_volume())
+
+    def test_aspiration_height_follows_the_ledger(self):
+        smart, _, _, context = setup_smart_pipette()
+        tube = falcon_15ml()
+        full = smart.get_conical_tube_aspiration_height(tube)
+        smart.record(tube, -5000)
+        self.assertLess(smart.get_conical_tube_aspiration_height(tube), full)
+        self.assertFalse(any('Conical calculation' in comment['params']['msg']
+                             for comment in context.command_log if comment['command'] == 'comment'))
+
+    def test_insufficient_volume_is_refused(self):
+        smart, tube, plate, _ = setup_smart_pipette(volume=40)
+        self.assertFalse(smart.liquid_transfer(50, tube, plate['A1']))
+
+    def test_invalid_reconcile_interval(self):
+        with self.assertRaises(ValueError):
+            setup_smart_pipette(reconcile_every=0)
+
+
+# ---------------------------------------------------------------------------
+# 3. Distribute
+# ---------------------------------------------------------------------------
+
+def pipette_commands(context, command):
+    return [entry for entry in context.command_log if entry['command'] == command]
+
+
+class TestDistribute(unittest.TestCase):
+
+    def test_fills_wells_with_full_tips(self):
+        smart, tube, plate, context = setup_smart_pipette(reconcile_every=100)
+        wells = plate.wells()[:10]
+        self.assertTrue(smart.distribute(100, tube, wells))
+        # The default disposal volume (the p300 minimum, 20 µL) leaves room for two doses per trip
+        self.assertEqual([entry['params']['volume'] for entry in pipette_commands(context, 'aspirate')],
+                         [220] * 5)
+        self.assertEqual(len(pipette_commands(context, 'dispense')), 10)
+        self.assertEqual(len(pipette_commands(context, 'blow_out')), 5)
+        self.assertEqual(len(pipette_commands(context, 'pick_up_tip')), 1)
+        self.assertTrue(all(well.net_change == 100 for well in wells))
+        self.assertEqual(smart.tracked_volume(tube), 9000)
+
+    def test_disposal_volume_is_returned_to_the_source(self):
+        smart, tube, plate, context = setup_smart_pipette(reconcile_every=100)
+        smart.distribute(100, tube, plate.wells()[:4], disposal_volume=20)
+        self.assertEqual([entry['params']['volume'] for entry in pipette_commands(context, 'aspirate')],
+                         [220, 220])
+        self.assertEqual(smart.tracked_volume(tube), 9600)
+
+    def test_without_disposal_volume(self):
+        smart, tube, plate, context = setup_smart_pipette()
+        smart.distribute(100, tube, plate.wells()[:10], disposal_volume=0)
+        self.assertEqual(len(pipette_commands(context, 'aspirate')), 4)
+        self.assertEqual(smart.tracked_volume(tube), 9000)
+
+    def test_aspiration_height_is_recomputed_per_trip(self):
+        smart, tube, plate, _ = setup_smart_pipette()
+        heights = []
+        original = smart.get_aspiration_location
+        smart.get_aspiration_location = lambda well, use=False: heights.append(
+            smart.tracked_volume(well)) or original(well, use)
+        smart.distribute(100, tube, plate.wells()[:9], disposal_volume=0, use=True)
+        self.assertEqual(heights, [10000, 9700, 9400])
+
+    def test_stops_when_the_source_runs_out(self):
+        smart, tube, plate, context = setup_smart_pipette(volume=450)
+        self.assertFalse(smart.distribute(100, tube, plate.wells()[:6], disposal_volume=0))
+        self.assertEqual(len(pipette_commands(context, 'dispense')), 3)
+        self.assertEqual(len(pipette_commands(context, 'drop_tip')), 1)
+
+    def test_dose_larger_than_the_pipette(self):
+        smart, tube, plate, _ = setup_smart_pipette()
+        with self.assertRaises(ValueError):
+            smart.distribute(290, tube, plate.wells()[:2], disposal_volume=20)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,288 @@
+"""
+Unit tests for the shared tip rack budget (pudu.tip_budget).
+
+Tests are split into:
+  - TestTipBudgetSizing  : racks and batches from a pickup count
+  - TestTipBudgetSwaps   : racks loaded off deck and swapped in as tips run out
+  - TestProtocolTips     : precomputed counts match the pickups of full runs
+  - TestTipState         : partially used racks carried from one protocol to the next, opt-in export
+"""
+
+import contextlib
+import io
+import json
+import os
+import tempfile
+import unittest
+from pathlib import Path
+
+from pudu.dry_run import DryRunContext, dry_run
+from pudu.tip_budget import TipBudget, apply_tip_state, tip_index, tip_well_name, updated_tip_state
+from pudu.benchmark import plating_input
+from pudu.generate_protocol import generate_protocol, simulate_protocol
+from pudu.simulation_cache import SimulationCache
+from pudu.assembly import DEFAULT_SBOL_ASSEMBLIES
+from pudu.plating import Plating
+from pudu.transformation import HeatShockTransformation
+from pudu.sample_preparation import PlateWithGradient
+
+
+# ---------------------------------------------------------------------------
+# Shared fixtures
+# ---------------------------------------------------------------------------
+
+FORTY_EIGHT_STRAINS = [
+    {
+        'Strain':  f'https://SBOL2Build.org/strain_{i}/1',
+        'Chassis': 'https://sbolcanvas.org/DH5alpha/1',
+        'Plasmids': [f'https://SBOL2Build.org/plasmid_{i % 12}/1', f'https://SBOL2Build.org/backbone_{i % 6}/1']
+    }
+    for i in range(48)
+]
+
+
+def run_quietly(protocol_obj, simulating=False):
+    """Run against DryRunContext without printing and return the context."""
+    with contextlib.redirect_stdout(io.StringIO()):
+        return dry_run(protocol_obj, simulating=simulating)
+
+
+@contextlib.contextmanager
+def in_temporary_directory():
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory() as tmpdir:
+        os.chdir(tmpdir)
+        try:
+            yield tmpdir
+        finally:
+            os.chdir(cwd)
+
+
+def count_commands(command_log, command):
+    return sum(1 for record in command_log if record['command'] == command)
+
+
+# ---------------------------------------------------------------------------
+# 1. Sizing
+# ---------------------------------------------------------------------------
+
+class TestTipBudgetSizing(unittest.TestCase):
+
+    def test_tip_index_is_column_major(self):
+        self.assertEqual(tip_index('A1'), 0)
+        self.assertEqual(tip_index('H1'), 7)
+        self.assertEqual(tip_index('A2'), 8)
+        self.assertEqual(tip_index('H12'), 95)
+        with self.assertRaises(ValueError):
+            tip_index('J1')
+
+    def test_racks_needed(self):
+        self.assertEqual(TipBudget('rack', ['9'], 0).racks_needed, 1)
+        self.assertEqual(TipBudget('rack', ['9'], 96).racks_needed, 1)
+        self.assertEqual(TipBudget('rack', ['9'], 97).racks_needed, 2)
+        self.assertEqual(TipBudget('rack', ['9'], 96, initial_tip='A2').racks_needed, 2)
+
+    def test_batches_fill_every_slot(self):
+        budget = TipBudget('rack', ['2', '3'], 400)
+        self.assertEqual(budget.racks_needed, 5)
+        self.assertEqual(budget.total_batches, 3)
+        self.assertEqual(budget.first_batch_pickups, 192)
+
+    def test_multichannel_pickups_take_a_column(self):
+        budget = TipBudget('rack', ['9'], 13, channels=8)
+        self.assertEqual(budget.pickups_per_rack, 12)
+        self.assertEqual(budget.racks_needed, 2)
+        self.assertEqual(TipBudget('rack', ['9'], 1, initial_tip='A12', channels=8).first_rack_pickups, 1)
+
+    def test_invalid_setup_raises(self):
+        with self.assertRaises(ValueError):
+            TipBudget('rack', [], 10)
+        with self.assertRaises(ValueError):
+            TipBudget('rack', ['9'], 10, channels=4)
+        with self.assertRaises(ValueError):
+            TipBudget('rack', ['9'], 10, initial_tip='B1', channels=8).racks_needed
+
+
+# ---------------------------------------------------------------------------
+# 2. Swaps
+# ---------------------------------------------------------------------------
+
+class TestTipBudgetSwaps(unittest.TestCase):
+
+    def test_pickups_past_one_rack_swap_in_the_next(self):
+        context = DryRunContext(simulating=False)
+        budget = TipBudget('opentrons_96_tiprack_20ul', ['9'], 200)
+        pipette = budget.load_pipette(context, 'p20_single_gen2', 'left')
+        self.assertEqual(len(budget.all_racks), 3)
+        self.assertEqual(len(budget.off_deck_racks), 2)
+
+        for _ in range(200):
+            budget.pick_up_tip(context, pipette)
+            pipette.drop_tip()
+
+        self.assertEqual(budget.current_batch, 3)
+        self.assertEqual(budget.off_deck_racks, [])
+        self.assertEqual(count_commands(context.command_log, 'move_labware'), 4)
+
+    def test_initial_tip_shortens_first_batch(self):
+        context = DryRunContext(simulating=False)
+        budget = TipBudget('opentrons_96_tiprack_20ul', ['9'], 10, initial_tip='H12')
+        pipette = budget.load_pipette(context, 'p20_single_gen2', 'left')
+        for _ in range(10):
+            budget.pick_up_tip(context, pipette)
+            pipette.drop_tip()
+        self.assertEqual(budget.current_batch, 2)
+
+    def test_swaps_on_the_opentrons_simulator(self):
+        from opentrons import protocol_api, simulate
+
+        protocol = simulate.get_protocol_api('2.21')
+        budget = TipBudget('opentrons_96_tiprack_20ul', ['9'], 200)
+        pipette = budget.load_pipette(protocol, 'p20_single_gen2', 'left')
+        for _ in range(200):
+            budget.pick_up_tip(protocol, pipette)
+            pipette.drop_tip()
+        self.assertEqual(budget.current_batch, 3)
+        self.assertEqual([rack.parent for rack in budget.all_racks[:2]], [protocol_api.OFF_DECK] * 2)
+        self.assertEqual(budget.all_racks[2].parent, '9')
+
+
+# ---------------------------------------------------------------------------
+# 3. Protocol tip counts
+# ---------------------------------------------------------------------------
+
+class TestProtocolTips(unittest.TestCase):
+
+    def assertBudgetsUsed(self, budgets):
+        for name, budget in budgets.items():
+            self.assertEqual(budget.tips_used, budget.tips_needed, msg=name)
+
+    def test_full_plate_plating_swaps_small_racks(self):
+        plating = Plating(plating_data=plating_input(96))
+        context = run_quietly(plating)
+        self.assertBudgetsUsed(plating.tip_budgets)
+        self.assertEqual(plating.tip_budgets['small'].racks_needed, 2)
+        self.assertEqual(count_commands(context.command_log, 'move_labware'), 2)
+
+    def test_multichannel_plating(self):
+        plating = Plating(plating_data=plating_input(96), large_pipette='p300_multi_gen2')
+        run_quietly(plating)
+        self.assertBudgetsUsed(plating.tip_budgets)
+
+    def test_full_plate_transformation(self):
+        for kwargs in ({}, {'pipette_p300': 'p300_multi_gen2', 'thermocycler_starting_well': 4,
+                            'replicates': 1}):
+            with self.subTest(**kwargs):
+                transformation = HeatShockTransformation(
+                    transformation_data=FORTY_EIGHT_STRAINS, tube_volume_competent_cell=200,
+                    **dict({'replicates': 2}, **kwargs))
+                run_quietly(transformation)
+                self.assertBudgetsUsed(transformation.tip_budgets)
+
+        self.assertGreater(transformation.tip_budgets['p20'].tips_needed, 96)
+
+    def test_gradient_beyond_one_rack(self):
+        gradient = PlateWithGradient(sample_name='cells', inducer_name='iptg', replicates=8, dilution_steps=10)
+        run_quietly(gradient)
+        self.assertEqual(gradient.tip_budget.tips_needed, 104)
+        self.assertEqual(gradient.tip_budget.tips_used, 104)
+
+
+# ---------------------------------------------------------------------------
+# 4. Tip state
+# ---------------------------------------------------------------------------
+
+class TestTipState(unittest.TestCase):
+
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.cache = SimulationCache(Path(tmp.name) / 'cache')
+
+    def used_budget(self, tips_used, **kwargs):
+        budget = TipBudget('opentrons_96_tiprack_20ul', ['9'], tips_used, **kwargs)
+        budget.tips_used = tips_used
+        return budget
+
+    def test_tip_well_name_inverts_tip_index(self):
+        for index in range(96):
+            self.assertEqual(tip_index(tip_well_name(index)), index)
+
+    def test_next_tip(self):
+        self.assertIsNone(self.used_budget(0).next_tip)
+        self.assertEqual(self.used_budget(9).next_tip, 'B2')
+        self.assertEqual(self.used_budget(3, initial_tip='B2').next_tip, 'E2')
+        self.assertIsNone(self.used_budget(96).next_tip)
+        self.assertEqual(self.used_budget(100).next_tip, 'E1')
+        self.assertEqual(self.used_budget(2, channels=8).next_tip, 'A3')
+
+    def test_apply_keeps_explicit_initial_tip(self):
+        context = DryRunContext(simulating=False)
+        state = {'opentrons_96_tiprack_20ul': {'next_tip': 'C4'}}
+        explicit, fresh, second = (TipBudget('opentrons_96_tiprack_20ul', ['9'], 1, initial_tip='A2'),
+                                   TipBudget('opentrons_96_tiprack_20ul', ['9'], 1),
+                                   TipBudget('opentrons_96_tiprack_20ul', ['3'], 1))
+        apply_tip_state(context, [explicit, fresh, second], state)
+        self.assertEqual([explicit.initial_tip, fresh.initial_tip, second.initial_tip], ['A2', 'C4', None])
+
+    def test_multichannel_only_continues_from_row_a(self):
+        context = DryRunContext(simulating=False)
+        budget = TipBudget('opentrons_96_tiprack_20ul', ['9'], 1, channels=8)
+        apply_tip_state(context, [budget], {'opentrons_96_tiprack_20ul': {'next_tip': 'C4'}})
+        self.assertIsNone(budget.initial_tip)
+
+    def test_update_drops_used_up_racks_and_keeps_others(self):
+        state = {'opentrons_96_tiprack_20ul': {'next_tip': 'C4'}, 'other_rack': {'next_tip': 'A2'}}
+        state = updated_tip_state([self.used_budget(96)], state)
+        self.assertEqual(list(state), ['other_rack'])
+
+    def test_update_rejects_two_partial_racks_of_one_labware(self):
+        with self.assertRaises(ValueError):
+            updated_tip_state([self.used_budget(9), self.used_budget(20)])
+        # A used-up rack of the same labware does not drop the partially used one
+        state = updated_tip_state([self.used_budget(9), self.used_budget(96)])
+        self.assertEqual(state['opentrons_96_tiprack_20ul']['next_tip'], 'B2')
+
+    def test_simulation_writes_tip_state_only_when_asked(self):
+        locations = {'A1': ['DH5alpha', 'plasmid_1']}
+        with in_temporary_directory() as tmpdir:
+            run_quietly(Plating(bacterium_locations=locations), simulating=True)
+            self.assertNotIn('tip_state.json', os.listdir(tmpdir))
+
+            output = os.path.join(tmpdir, 'chain', 'next_tip_state.json')
+            os.mkdir(os.path.dirname(output))
+            run_quietly(Plating(bacterium_locations=locations, tip_state_output=output), simulating=True)
+            with open(output) as f:
+                self.assertIn('opentrons_96_filtertiprack_20ul', json.load(f))
+
+    def test_chain_continues_partially_used_racks(self):
+        assembly = simulate_protocol(DEFAULT_SBOL_ASSEMBLIES, json_params={'output_xlsx': False},
+                                     assembly_subtype='SBOL', cache=self.cache)
+        tip_state = json.loads(assembly.outputs['tip_state.json'])
+        assembly_rack = tip_state['opentrons_96_tiprack_20ul']
+        self.assertEqual(assembly_rack['pipette'], 'p20_single_gen2')
+
+        strains = [{'Strain': 'https://SBOL2Build.org/strain_0/1',
+                    'Chassis': 'https://sbolcanvas.org/DH5alpha/1',
+                    'Plasmids': list(json.loads(assembly.outputs['transformation_input.json']))[:1]}]
+        transformation = simulate_protocol(strains, protocol_type='transformation', tip_state=tip_state,
+                                           cache=self.cache)
+        self.assertTrue(any(record['params'].get('msg', '').endswith(f"from tip {assembly_rack['next_tip']}")
+                            for record in transformation.command_log if record['command'] == 'comment'))
+        p20_rack = json.loads(transformation.outputs['tip_state.json'])['opentrons_96_tiprack_20ul']
+        self.assertEqual(p20_rack['protocol'], 'HeatShockTransformation')
+        self.assertGreater(p20_rack['tips_consumed'], assembly_rack['tips_consumed'])
+
+    def test_generated_protocol_embeds_tip_state(self):
+        code = generate_protocol(plating_input(4), protocol_type='plating',
+                                 tip_state={'opentrons_96_filtertiprack_20ul': {'next_tip': 'B1'}})
+        self.assertIn("tip_state = {", code)
+        self.assertIn("tip_state=tip_state", code)
+
+    def test_generated_protocol_embeds_tip_state_output(self):
+        code = generate_protocol(plating_input(4), protocol_type='plating', tip_state_output='tip_state.json')
+        self.assertIn("tip_state_output='tip_state.json'", code)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -10,10 +10,14 @@ Tests are split into:
   - TestTransformationDataParsing  : __init__ / _parse_transformation_data
   - TestValidateProtocol           : _validate_protocol edge cases
   - TestInitialTips                : initial_tip_p20 / initial_tip_p300 params
+  - TestMultiChannel               : column-wise media dispensing with a p300 multi
 """
 
+import contextlib
+import io
 import unittest
 from unittest.mock import MagicMock
+from pudu.dry_run import dry_run
 from pudu.transformation import HeatShockTransformation
 
 
@@ -443,5 +447,66 @@ class TestInitialTips(unittest.TestCase):
         mock_tiprack_p300.__getitem__.assert_not_called()
 
 
+# ---------------------------------------------------------------------------
+# 4. Multi-channel mode
+# ---------------------------------------------------------------------------
+
+TWELVE_STRAINS = [
+    {
+        'Strain':  f'https://SBOL2Build.org/strain_{i}/1',
+        'Chassis': 'https://sbolcanvas.org/DH5alpha/1',
+        'Plasmids': [f'https://SBOL2Build.org/plasmid_{i}/1']
+    }
+    for i in range(12)
+]
+
+
+def run_transformation(transformation):
+    """Run against DryRunContext and return the recorded commands."""
+    with contextlib.redirect_stdout(io.StringIO()):
+        return dry_run(transformation, simulating=False).command_log
+
+
+class TestMultiChannel(unittest.TestCase):
+
+    def media_dispenses(self, command_log):
+        return [record for record in command_log
+                if record['command'] in ('distribute', 'transfer') and record['stage'] == 'transfer liquid broth multichannel']
+
+    def test_full_columns_dispensed_eight_at_a_time(self):
+        transformation = make_transformation(TWELVE_STRAINS, pipette_p300='p300_multi_gen2')
+        records = self.media_dispenses(run_transformation(transformation))
+        self.assertEqual(len(records), 1)
+        self.assertEqual(records[0]['name'], 'p300_multi_gen2')
+        self.assertEqual(len(records[0]['params']['dest']), 3)
+
+    def test_partial_columns_use_one_nozzle(self):
+        transformation = make_transformation(TWELVE_STRAINS, pipette_p300='p300_multi_gen2',
+                                             thermocycler_starting_well=4)
+        records = self.media_dispenses(run_transformation(transformation))
+        self.assertEqual({record['name'] for record in records}, {'p300_multi_gen2'})
+        self.assertEqual([len(record['params']['dest']) for record in records], [2, 8])
+
+    def test_every_well_receives_media(self):
+        transformation = make_transformation(TWELVE_STRAINS, pipette_p300='p300_multi_gen2',
+                                             thermocycler_starting_well=4)
+        run_transformation(transformation)
+        self.assertEqual(len(transformation.dict_of_parts_in_thermocycler), 24)
+        for contents in transformation.dict_of_parts_in_thermocycler.values():
+            self.assertIn('Media_1', contents)
+        self.assertEqual(transformation.dict_of_parts_in_reservoir, {'Media_1': 'A1'})
+
+    def test_single_channel_mode_unchanged(self):
+        transformation = make_transformation(TWELVE_STRAINS)
+        self.assertFalse(transformation.multichannel)
+        command_log = run_transformation(transformation)
+        self.assertEqual(self.media_dispenses(command_log), [])
+
+    def test_large_competent_cell_volume_rejected(self):
+        with self.assertRaises(ValueError):
+            make_transformation(TWELVE_STRAINS, pipette_p300='p300_multi_gen2',
+                                transfer_volume_competent_cell=30)
+
+
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,110 @@
+"""
+Unit tests for the assembly -> transformation -> plating workflow (pudu.workflow).
+
+Tests are split into:
+  - TestWorkflowPlan   : stage outputs handed to the next stage in-process
+  - TestWorkflowWrite  : protocol files and the combined report
+"""
+
+import json
+import os
+import tempfile
+import unittest
+from pathlib import Path
+
+from pudu.assembly import DEFAULT_SBOL_ASSEMBLIES
+from pudu.workflow import REPORT_FILE, Workflow, main
+
+
+# ---------------------------------------------------------------------------
+# Shared fixtures
+# ---------------------------------------------------------------------------
+
+STRAINS = [
+    {'Strain': 'https://SBOL2Build.org/strain_1/1',
+     'Chassis': 'https://sbolcanvas.org/DH5alpha/1',
+     'Plasmids': ['https://SBOL2Build.org/composite_1/1']}
+]
+
+
+def workflow(**kwargs):
+    return Workflow(DEFAULT_SBOL_ASSEMBLIES, STRAINS, assembly_params={'output_xlsx': False}, **kwargs)
+
+
+class WorkflowTestCase(unittest.TestCase):
+
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.tmp = Path(tmp.name)
+
+
+# ---------------------------------------------------------------------------
+# 1. Planning
+# ---------------------------------------------------------------------------
+
+class TestWorkflowPlan(WorkflowTestCase):
+
+    def test_outputs_feed_the_next_stage(self):
+        assembly, transformation, plating = workflow().plan()
+        self.assertEqual(assembly.outputs, {'https://SBOL2Build.org/composite_1/1': ['A1']})
+        self.assertEqual(transformation.spec['plasmid_locations'], assembly.outputs)
+        self.assertEqual(plating.spec['protocol_data'], transformation.outputs)
+        self.assertEqual(len(transformation.outputs['bacterium_locations']), 2)
+        self.assertIn('agar_plates', plating.outputs)
+
+    def test_tip_racks_chain_between_stages(self):
+        assembly, transformation, _ = workflow().plan()
+        self.assertEqual(transformation.spec['tip_state'], assembly.tip_state)
+        self.assertEqual(transformation.protocol.tip_budgets['p20'].initial_tip,
+                         assembly.tip_state['opentrons_96_tiprack_20ul']['next_tip'])
+
+        _, unchained, _ = workflow(chain_tip_racks=False).plan()
+        self.assertIsNone(unchained.protocol.tip_budgets['p20'].initial_tip)
+
+    def test_nothing_written_while_planning(self):
+        cwd = os.getcwd()
+        os.chdir(self.tmp)
+        try:
+            workflow().plan()
+        finally:
+            os.chdir(cwd)
+        self.assertEqual(list(self.tmp.iterdir()), [])
+
+    def test_plasmid_not_assembled_raises(self):
+        strains = [dict(STRAINS[0], Plasmids=['https://SBOL2Build.org/not_assembled/1'])]
+        with self.assertRaises(ValueError):
+            Workflow(DEFAULT_SBOL_ASSEMBLIES, strains, assembly_params={'output_xlsx': False}).plan()
+
+
+# ---------------------------------------------------------------------------
+# 2. Files
+# ---------------------------------------------------------------------------
+
+class TestWorkflowWrite(WorkflowTestCase):
+
+    def test_protocol_files_and_report(self):
+        paths = workflow().write(self.tmp)
+        self.assertEqual([path.name for path in paths],
+                         ['assembly_protocol.py', 'transformation_protocol.py', 'plating_protocol.py', REPORT_FILE])
+        self.assertIn('plasmid_locations = {', paths[1].read_text())
+        self.assertIn("'bacterium_locations'", paths[2].read_text())
+
+        report = json.loads(paths[3].read_text())
+        self.assertEqual([stage['stage'] for stage in report['stages']], ['assembly', 'transformation', 'plating'])
+        self.assertEqual(report['stages'][0]['protocol_file'], 'assembly_protocol.py')
+        self.assertGreater(report['estimated_minutes'], 0)
+
+    def test_cli(self):
+        assembly_input, strains_input = self.tmp / 'assemblies.json', self.tmp / 'strains.json'
+        params = self.tmp / 'params.json'
+        assembly_input.write_text(json.dumps(DEFAULT_SBOL_ASSEMBLIES))
+        strains_input.write_text(json.dumps(STRAINS))
+        params.write_text(json.dumps({'output_xlsx': False}))
+
+        main([str(assembly_input), str(strains_input), '-o', str(self.tmp / 'run'), '--assembly-params', str(params)])
+        self.assertTrue((self.tmp / 'run' / REPORT_FILE).exists())
+
+
+if __name__ == '__main__':
+    unittest.main()